@@ -12,11 +12,17 @@ USUARIO_SQL = getenv('USUARIO_SQL')
 BASE_DE_DATOS=getenv('BD_DATASTEWARD')
 BD_DATASTEWARD=getenv('BD_DATASTEWARD')
 CONTRASENA_SQL = getenv('CONTRASENA_SQL')
+#Backend de consultas: sqlserver (por defecto) o sqlite (archivo local RUTA_BASE_SQLITE, para pruebas de rendimiento)
+BACKEND_SQL = getenv('BACKEND_SQL','sqlserver')
+RUTA_BASE_SQLITE = getenv('RUTA_BASE_SQLITE')
 
 #conexion servidor FTP
 SERVIDOR_FTP=getenv('SERVIDOR_FTP')
 USUARIO_FTP=getenv('USUARIO_FTP')
 CONTRASENA_FTP=getenv('CONTRASENA_FTP')
+PUERTO_FTP=int(getenv('PUERTO_FTP','21'))
+#Ruta fija en el FTP (opcional); si no se define se consulta en la base de datos
+RUTA_FTP=getenv('RUTA_FTP')
 
 #Ruta a archivos
 RUTA_LOG=resource_path(getenv('RUTA_LOG'))
@@ -31,7 +37,11 @@ NOMBRE_ARCHIVO_CORREO= getenv('NOMBRE_ARCHIVO_CORREO')
 #Envío de correo
 CORREO_REMITENTE = getenv('CORREO_REMITENTE')
 SERVIDOR_SMTP = getenv('SERVIDOR_SMTP')
-PUERTO_SERVIDOR_SMTP = getenv('PUERTO_SERVIDOR_SMTP')
+PUERTO_SERVIDOR_SMTP = int(getenv('PUERTO_SERVIDOR_SMTP','25'))
+USUARIO_SMTP = getenv('USUARIO_SMTP')
+CONTRASENA_SMTP = getenv('CONTRASENA_SMTP')
+USAR_STARTTLS_SMTP = getenv('USAR_STARTTLS_SMTP','true').lower() == 'true'
+TIEMPO_ESPERA_SMTP = int(getenv('TIEMPO_ESPERA_SMTP','60'))
 ASUNTO_CORREO = getenv('ASUNTO_CORREO')
 MENSAJE_CORREO = getenv('MENSAJE_CORREO')
 NOMBRE_ADJUNTO_CORREO= getenv('NOMBRE_ADJUNTO_CORREO')
@@ -40,6 +50,52 @@ NOMBRE_ADJUNTO_CORREO= getenv('NOMBRE_ADJUNTO_CORREO')
 ASUNTO_CORREO_ERROR=getenv('ASUNTO_CORREO_ERROR')
 MENSAJE_CORREO_ERROR = getenv('MENSAJE_CORREO_ERROR')
 NOMBRE_ARCHIVO_ERROR = getenv('NOMBRE_ARCHIVO_ERROR')
+TAMANO_MAXIMO_ADJUNTO_LOG = int(getenv('TAMANO_MAXIMO_ADJUNTO_LOG','1048576'))
+TAMANO_MAXIMO_LOG = int(getenv('TAMANO_MAXIMO_LOG','10485760'))
+HORAS_ROTACION_LOG = float(getenv('HORAS_ROTACION_LOG','24'))
+RESPALDOS_LOG = int(getenv('RESPALDOS_LOG','7'))
+TRACEMALLOC_ETAPAS = getenv('TRACEMALLOC_ETAPAS','false').lower() == 'true'
+RUTA_METRICAS_ETAPAS = getenv('RUTA_METRICAS_ETAPAS')
+ETAPAS_MAS_LENTAS = int(getenv('ETAPAS_MAS_LENTAS','3'))
+HILOS_PIPELINE = int(getenv('HILOS_PIPELINE','4'))
+RUTA_CHECKPOINT = getenv('RUTA_CHECKPOINT')
 RANGO_FECHA_CONSULTA= getenv('RANGO_FECHA_CONSULTA')
+RUTA_MARCA_AGUA = getenv('RUTA_MARCA_AGUA')
+DIAS_SOLAPAMIENTO_MARCA_AGUA = int(getenv('DIAS_SOLAPAMIENTO_MARCA_AGUA','3'))
+TAMANO_PAGINA_PUBLICOS = int(getenv('TAMANO_PAGINA_PUBLICOS','500'))
+if TAMANO_PAGINA_PUBLICOS < 1:
+    raise ValueError(f'TAMANO_PAGINA_PUBLICOS debe ser mayor o igual a 1: {TAMANO_PAGINA_PUBLICOS}')
+RUTA_REPLICA_DDA = getenv('RUTA_REPLICA_DDA')
+RUTA_CACHE_ENRIQUECIMIENTO = getenv('RUTA_CACHE_ENRIQUECIMIENTO')
+HORAS_CACHE_ENRIQUECIMIENTO = float(getenv('HORAS_CACHE_ENRIQUECIMIENTO','24'))
+#Información de correo con consultas paralelas por fuente (modelo.motor_enriquecimiento) en lugar de la consulta única
+ENRIQUECIMIENTO_PARALELO = getenv('ENRIQUECIMIENTO_PARALELO','false').lower() in ('1','true','si','sí')
+HILOS_ENRIQUECIMIENTO = int(getenv('HILOS_ENRIQUECIMIENTO','6'))
+#Copia local de parámetros, tipos de vehículo, salas y ciudades (modelo.cache_dimensiones)
+RUTA_CACHE_DIMENSIONES = getenv('RUTA_CACHE_DIMENSIONES')
+HORAS_CACHE_DIMENSIONES = float(getenv('HORAS_CACHE_DIMENSIONES','24'))
+#Historial de ejecuciones y detección de regresiones (modelo.historial_ejecuciones)
+RUTA_HISTORIAL_EJECUCIONES = getenv('RUTA_HISTORIAL_EJECUCIONES')
+VENTANA_HISTORIAL = int(getenv('VENTANA_HISTORIAL','20'))
+DESVIACIONES_REGRESION = float(getenv('DESVIACIONES_REGRESION','3'))
+#Verificación previa en paralelo de SQL Server, FTP y SMTP (controlador.controlador_verificacion_previa)
+VERIFICACION_PREVIA = getenv('VERIFICACION_PREVIA','false').lower() in ('1','true','si','sí')
+TIEMPO_VERIFICACION_PREVIA = float(getenv('TIEMPO_VERIFICACION_PREVIA','5'))
+#Modo servicio (python main.py --servicio): segundos entre consultas al FTP y puerto del control local (0 sin control)
+INTERVALO_SONDEO_FTP = float(getenv('INTERVALO_SONDEO_FTP','10'))
+PUERTO_CONTROL_SERVICIO = int(getenv('PUERTO_CONTROL_SERVICIO','0'))
+#Modo lote (python main.py --lote): patrón de los archivos pendientes en el FTP y descargas simultáneas
+PATRON_ARCHIVOS_CMDM = getenv('PATRON_ARCHIVOS_CMDM') or NOMBRE_ARCHIVO_DESCARGA
+HILOS_DESCARGA_FTP = int(getenv('HILOS_DESCARGA_FTP','4'))
+REINTENTOS_DESCARGA_FTP = int(getenv('REINTENTOS_DESCARGA_FTP','2'))
+PAUSA_REINTENTO_FTP = float(getenv('PAUSA_REINTENTO_FTP','1'))
+#Modo incremental (modelo.huellas_filas): huellas por fila de la última ejecución, por defecto junto a los backups
+INCREMENTAL_FILAS = getenv('INCREMENTAL_FILAS','false').lower() in ('1','true','si','sí')
+RUTA_HUELLAS_FILAS = (getenv('RUTA_HUELLAS_FILAS') or f'{RUTA_ARCHIVO_BACUP}huellas_filas.npz') if INCREMENTAL_FILAS else None
+#Archivo CMDM final con copia tal cual (mmap) de las líneas sin cambios de la entrada (modelo.escritor_lineas_cmdm)
+ESCRITURA_LINEAS_ORIGINALES = getenv('ESCRITURA_LINEAS_ORIGINALES','false').lower() in ('1','true','si','sí')
+#Razón social: terminaciones (precedidas de un espacio) y comienzos del nombre del cliente
+SUFIJOS_EMPRESA = getenv('SUFIJOS_EMPRESA','S.A,S.A.,SA,SAS,S.A.S,S.A.S.,S A,LTDA').split(',')
+PREFIJOS_EMPRESA = getenv('PREFIJOS_EMPRESA','COOPERATIVA,BANCO,BBVA,CONSULTORES,TRANSPORTES,SUPERTIENDAS,DROGUERIAS,LEASING,TECNOLOGIA,INVERSORA').split(',')
 
 COLUMNA_ARCHIVO_CMDM = getenv('COLUMNA_ARCHIVO_CMDM').split(',')
\ No newline at end of file
@@ -28,8 +28,11 @@ Métodos:
     Ejecuta el flujo completo de procesamiento del archivo CMDM:
     - Valida existencia y tamaño del archivo.
     - Lee y trata datos nulos.
+    - En modo incremental (RUTA_HUELLAS_FILAS) compara la huella de cada fila con las de la ejecución anterior.
     - Consulta reporte DDA y separa VINs entregados/no entregados.
     - Inserta VINs no entregados en la tabla delta_cmdm_file.
+    - Marca como procesados los VINs del delta con entrega DDA; si una etapa posterior falla antes de generar el
+      archivo CMDM los devuelve a pendiente, y la marca de agua solo avanza cuando el archivo se generó.
     - Consulta y actualiza estados en la base de datos.
     - Fusiona DataFrames y actualiza fechas de entrega.
     - Consulta y actualiza vehículos de servicio público.
@@ -37,8 +40,21 @@ Métodos:
     - Modifica columna HO según acuerdos y tipo de vehículo.
     - Prepara información para correo y genera archivo Excel.
     - Elimina vehículos de servicio público del archivo final.
-    - Genera archivo CMDM y backup.
+    - Genera archivo CMDM y backup; con ESCRITURA_LINEAS_ORIGINALES copia tal cual las líneas sin cambios de la entrada.
     - Registra eventos y errores en el log.
+    - Mide cada etapa (tiempo, CPU, memoria, filas y bytes) y registra el resumen al terminar.
+    - Las etapas declaran con @etapa las claves del contexto que leen y escriben; PlanificadorEtapas
+      ejecuta en paralelo (HILOS_PIPELINE hilos) las que no dependen entre sí.
+
+- fn_ultima_medicion(self):
+    Retorna las métricas por etapa de la última ejecución.
+
+- fn_registrar_historial(self, tiempos_ftp, tiempos_verificacion):
+    Guarda la última ejecución en el historial (RUTA_HISTORIAL_EJECUCIONES) y registra en el log las etapas más
+    lentas que su línea base.
+
+- fn_hay_punto_control(self) / fn_eliminar_punto_control(self):
+    Consultan y eliminan el punto de control (RUTA_CHECKPOINT) que permite reanudar con fn_gestion_archivo(reanudar=True).
 
 - fn_cargar_data_cmdm(self):
     Ejecuta el flujo de carga de datos CMDM desde la tabla delta_cmdm_file:
@@ -57,19 +73,50 @@ Dependencias:
 - ProcesarArchivo: Clase para procesamiento de archivos y operaciones de base de datos.
 - correo_modificacion_encuestas: Función para envío de correos de modificaciones.
 - crea_log: Función para registrar eventos en log.
+- MedicionEtapas: Medición por etapa del pipeline.
+- PlanificadorEtapas / etapa: Ejecución en paralelo de las etapas según las claves del contexto que leen y escriben.
+- PuntoControl: Contexto guardado después de cada etapa para reanudar ejecuciones fallidas.
+- HistorialEjecuciones: Historial local de ejecuciones y detección de regresiones de rendimiento.
+- HuellasFilas: Huellas por fila de la ejecución anterior para el procesamiento incremental.
 
 Notas:
 ------
 - Todas las operaciones críticas registran eventos en el log para trazabilidad.
 - El controlador maneja errores y retorna diccionarios con el estado de la operación.
 - El flujo está diseñado para ser robusto ante archivos vacíos, errores de consulta y problemas de actualización en la base de datos.
+- Modo incremental: una fila idéntica a una de la ejecución anterior que tenía entrega DDA se toma como entregada sin
+  consultarla (reporte_dda es casi solo de inserción), y una que no la tenía no se vuelve a insertar en
+  delta_cmdm_file, donde ya está con los mismos valores (_consultar_delta la libera cuando llegue la entrega). Las
+  demás etapas no cambian, así el archivo CMDM y el correo son los mismos que sin el modo incremental. Las huellas
+  se guardan solo cuando la ejecución termina bien.
 
 """
 
 import config
+import os
 import pandas as pd
+from os import path
+from modelo.escritor_lineas_cmdm import COLUMNA_LINEA_CMDM
 from modelo.procesar_archivo import ProcesarArchivo
+from controlador.medicion_etapas import MedicionEtapas, fn_memoria_pico
+from controlador.planificador_etapas import PlanificadorEtapas, etapa
+from modelo.historial_ejecuciones import HistorialEjecuciones
+from modelo.huellas_filas import HuellasFilas
+from modelo.punto_control import PuntoControl, fn_hash_archivo
 from vista.crear_log import crea_log
+from vista.registro_log import fn_id_ejecucion
+
+# Categorías de filas del historial: clave del contexto de cada una
+CATEGORIAS_FILAS = {
+    "dda": "df_dda",
+    "no_dda": "df_no_dda",
+    "delta": "df_delta",
+    "reenvio": "df_reenvios",
+    "publicos": "df_publicos",
+    "ho_modificado": "df_mod_ho",
+    "correo": "df_email_final",
+    "final": "df_final",
+}
 
 
 class ControladorGestionArchivoCmdm:
@@ -82,58 +129,264 @@ class ControladorGestionArchivoCmdm:
         )
         self.__ruta_archivo_backup = config.RUTA_ARCHIVO_BACUP
         self.__obj = ProcesarArchivo()
+        self.__huellas_filas = HuellasFilas(config.RUTA_HUELLAS_FILAS)
+        self.__ultima_medicion = None
+        self.__punto_control_reanudar = None
+        # Hash del archivo de entrada y la firma (tamaño, fecha) con que se calculó
+        self.__hash_entrada = (None, None)
 
     # ==================================================
     #                PIPELINE PRINCIPAL
     # ==================================================
-    def fn_gestion_archivo(self):
+    def fn_gestion_archivo(self, reanudar=False):
 
         contexto = {}
-
+        completadas = set()
+        punto_control = None
+
+        # Punto de control: se reanuda desde la primera etapa incompleta o se inicia uno nuevo
+        if config.RUTA_CHECKPOINT:
+            if reanudar and self.fn_hay_punto_control():
+                punto_control = self.__punto_control_reanudar
+                if punto_control.completo:
+                    crea_log("Se reanuda: el procesamiento del archivo ya había terminado")
+                    return {"error": False, "tamano": True}
+                contexto = punto_control.fn_cargar_contexto()
+                completadas = punto_control.etapas_completadas
+                crea_log(f"Se reanuda desde el punto de control con {len(completadas)} etapas completadas")
+            else:
+                try:
+                    punto_control = PuntoControl(config.RUTA_CHECKPOINT)
+                    punto_control.fn_iniciar(self.__ruta_archivo_cmdm, fn_id_ejecucion(), self.__hash_archivo_entrada())
+                except OSError as ex:
+                    punto_control = None
+                    crea_log(f"Error - No fue posible crear el punto de control: {ex}")
+
+        # El archivo de entrada se reemplaza con el resultado: su tamaño y hash se toman antes
+        entrada = {"bytes": None, "hash": None}
+        if config.RUTA_HISTORIAL_EJECUCIONES:
+            try:
+                entrada = {"bytes": path.getsize(self.__ruta_archivo_cmdm),
+                           "hash": self.__hash_archivo_entrada()}
+            except OSError:
+                pass
+
+        medicion = MedicionEtapas(config.TRACEMALLOC_ETAPAS)
+
+        def fn_ejecutar_paso(paso, ctx):
+            res = medicion.fn_medir(paso, ctx)
+            if res["ok"] and punto_control is not None:
+                try:
+                    punto_control.fn_guardar_etapa(paso, ctx)
+                except Exception as ex:
+                    crea_log(f"Error - No fue posible guardar el punto de control de {paso.__name__}: {ex}")
+            return res
+
+        # El orden declarado define las dependencias; las etapas independientes se ejecutan en paralelo
         pasos = [
+            self._sincronizar_replica_dda,
             self._validar_archivo,
             self._leer_archivo_si_existe,
             self._tratar_datos,
+            self._comparar_huellas,
             self._consultar_reporte_dda,
             self._separar_vines,
             self._insertar_no_dda,
+            # Libera (estado=1) las filas del delta solo después de leer, consultar e insertar el archivo
             self._consultar_delta,
-            self._actualizar_delta,
             self._fusionar_data,
             self._consultar_fechas_dda,
             self._aplicar_fechas,
             self._consultar_servicio_publico,
             self._consultar_reenvios,
+            self._fusionar_reenvios,
             self._modificar_ho,
             self._preparar_info_email,
             self._consultar_info_email,
             self._generar_excel,
             self._eliminar_publicos,
             self._generar_cmdm,
+            self._confirmar_delta,
             self._generar_backup,
+            self._guardar_huellas,
         ]
-
-        for paso in pasos:
-            res = paso(contexto)
-            if not res["ok"]:
+        planificador = PlanificadorEtapas(pasos, config.HILOS_PIPELINE)
+
+        try:
+            try:
+                paso, res = planificador.fn_ejecutar(contexto, fn_ejecutar_paso, completadas)
+            except Exception:
+                # Una etapa que lanza excepción también debe devolver los VIN ya liberados
+                self.__revertir_delta(contexto, punto_control)
+                raise
+            if paso is not None:
                 crea_log(f"Error en {paso.__name__}: {res['error']}")
+                self.__revertir_delta(contexto, punto_control)
                 return {"error": True, "tamano": False}
 
+            if punto_control is not None:
+                punto_control.fn_marcar_completo(self.__ruta_archivo_cmdm)
+        finally:
+            # Resumen de tiempos, memoria, filas y bytes por etapa
+            self.__ultima_medicion = medicion.fn_finalizar()
+            self.__ultima_medicion["entrada"] = dict(
+                entrada, filas=len(contexto["df"]) if isinstance(contexto.get("df"), pd.DataFrame) else None
+            )
+            self.__ultima_medicion["filas"] = {
+                categoria: len(contexto[clave])
+                for categoria, clave in CATEGORIAS_FILAS.items()
+                if isinstance(contexto.get(clave), pd.DataFrame)
+            }
+            segundos_ruta, ruta = planificador.fn_ruta_critica(
+                {metrica['etapa']: metrica['segundos'] for metrica in self.__ultima_medicion['etapas']}
+            )
+            crea_log(f"Ruta crítica {segundos_ruta:.3f} s: {' > '.join(ruta)}"
+                     ,etapa='resumen_etapas'
+                     ,duracion=self.__ultima_medicion['segundos_total'])
+
         return {"error": False, "tamano": True}
 
+    def __revertir_delta(self, contexto, punto_control):
+        """
+        Si la ejecución falló después de marcar filas del delta como procesadas y antes de generar el archivo CMDM,
+        las devuelve a pendiente para que la siguiente ejecución las envíe. El punto de control se descarta: al
+        reanudar se usarían las filas guardadas en el contexto, que ya no están marcadas.
+        """
+        liberado = contexto.get("delta_liberado")
+        # Sin VINs marcados no hay nada que devolver y el punto de control sigue sirviendo para --reanudar
+        if not liberado or not liberado["vin"] or contexto.get("delta_confirmado"):
+            return
+
+        r = self.__obj.fn_revertir_delta_cmdm(liberado["vin"])
+        if not r["exito"]:
+            # Las filas siguen marcadas: el punto de control las conserva para --reanudar
+            crea_log(f"Error - No fue posible devolver a pendiente {len(liberado['vin'])} VINs del delta: {r['error']}")
+            return
+
+        crea_log(f"Se devolvieron a pendiente {r['data']} VINs del delta marcados en esta ejecución")
+        if punto_control is not None:
+            self.fn_eliminar_punto_control()
+
+    def __hash_archivo_entrada(self):
+        """
+        Hash SHA-256 del archivo de entrada (punto de control e historial). Se calcula una sola vez mientras el
+        archivo no cambie de tamaño ni de fecha de modificación; None si el archivo no existe.
+        """
+        try:
+            estado = os.stat(self.__ruta_archivo_cmdm)
+        except OSError:
+            return None
+        firma = (estado.st_size, estado.st_mtime_ns)
+        if self.__hash_entrada[0] != firma:
+            self.__hash_entrada = (firma, fn_hash_archivo(self.__ruta_archivo_cmdm))
+        return self.__hash_entrada[1]
+
+    def fn_hay_punto_control(self):
+        """
+        Indica si el archivo local tiene un punto de control desde el que se puede reanudar.
+        """
+        if not config.RUTA_CHECKPOINT:
+            return False
+        if self.__punto_control_reanudar is None:
+            punto_control = PuntoControl(config.RUTA_CHECKPOINT)
+            if punto_control.fn_cargar(self.__ruta_archivo_cmdm, self.__hash_archivo_entrada()):
+                self.__punto_control_reanudar = punto_control
+        return self.__punto_control_reanudar is not None
+
+    def fn_eliminar_punto_control(self):
+        """
+        Elimina los puntos de control; se llama cuando el flujo completo (incluida la carga al FTP) terminó bien.
+        """
+        if config.RUTA_CHECKPOINT:
+            PuntoControl(config.RUTA_CHECKPOINT).fn_eliminar_todos()
+        self.__punto_control_reanudar = None
+
+    def fn_ultima_medicion(self):
+        """
+        Retorna las métricas por etapa de la última ejecución de fn_gestion_archivo (None si no se ha ejecutado).
+        """
+        return self.__ultima_medicion
+
+    def fn_registrar_historial(self, tiempos_ftp=None, tiempos_verificacion=None):
+        """
+        Guarda la última ejecución de fn_gestion_archivo en el historial y registra en el log las métricas que
+        superan su línea base en más de DESVIACIONES_REGRESION desviaciones estándar.
+
+        Parameters:
+        -----------
+        tiempos_ftp : dict, opcional
+            Segundos de descarga, eliminación y carga (GestionFTP.tiempos).
+        tiempos_verificacion : dict, opcional
+            Latencia de la verificación previa por servicio (ControladorVerificacionPrevia.tiempos).
+        """
+        if not config.RUTA_HISTORIAL_EJECUCIONES or self.__ultima_medicion is None:
+            return
+
+        medicion = self.__ultima_medicion
+        etapas_bd = [m for m in medicion["etapas"] if m["bytes_bd_envio"] or m["bytes_bd_recepcion"]]
+        ejecucion = {
+            "id_ejecucion": medicion["id_ejecucion"],
+            "inicio": medicion["inicio"],
+            "segundos_total": medicion["segundos_total"],
+            "exito": medicion["exito"],
+            "filas_archivo": medicion["entrada"]["filas"],
+            "bytes_archivo": medicion["entrada"]["bytes"],
+            "hash_archivo": medicion["entrada"]["hash"],
+            "memoria_pico": fn_memoria_pico(),
+            "metricas": {
+                "etapa": {m["etapa"]: m["segundos"] for m in medicion["etapas"]},
+                "ftp": dict(tiempos_ftp or {}),
+                "verificacion": dict(tiempos_verificacion or {}),
+                "bd": {"etapas_bd": round(sum(m["segundos"] for m in etapas_bd), 4)},
+                "filas": medicion["filas"],
+                "bytes": {tipo: sum(m[f"bytes_{tipo}"] for m in medicion["etapas"])
+                          for tipo in ("bd_envio", "bd_recepcion")},
+            },
+        }
+
+        historial = HistorialEjecuciones(config.RUTA_HISTORIAL_EJECUCIONES)
+        r = historial.fn_registrar(ejecucion)
+        if not r["exito"]:
+            crea_log(f"Error - No fue posible guardar el historial de ejecuciones: {r['error']}")
+            return
+
+        try:
+            regresiones = historial.fn_regresiones(config.VENTANA_HISTORIAL,
+                                                   config.DESVIACIONES_REGRESION,
+                                                   medicion["id_ejecucion"])
+        except Exception as ex:
+            crea_log(f"Error - No fue posible evaluar el historial de ejecuciones: {ex}")
+            return
+        for fila in regresiones.itertuples():
+            crea_log(f"Alerta - {fila.metrica} tardó {fila.segundos:.3f} s; línea base {fila.media:.3f} s "
+                     f"± {fila.desviacion:.3f} (z = {fila.puntaje_z})",
+                     etapa="historial_ejecuciones",
+                     duracion=fila.segundos)
+
     # ==================================================
     #            DEFINICIÓN DE CADA ETAPA
     # ==================================================
 
+    @etapa(escribe=("replica_dda",))
+    def _sincronizar_replica_dda(self, ctx):
+        # La réplica es opcional: si no se puede sincronizar se consulta SQL Server
+        r = self.__obj.fn_sincronizar_replica_dda()
+        if not r["exito"]:
+            crea_log(f"Error - No fue posible sincronizar la réplica de reporte_dda, se consulta SQL Server: {r['error']}")
+        return {"ok": True}
+
+    @etapa(lee=("archivo_cmdm",), escribe=("archivo_tiene_contenido",))
     def _validar_archivo(self, ctx):
         ctx["archivo_tiene_contenido"] = self.__obj.archivo_vacio(
             self.__ruta_archivo_cmdm
         )
         return {"ok": True}
 
+    @etapa(lee=("archivo_tiene_contenido", "archivo_cmdm"), escribe=("df", "lista_vin"))
     def _leer_archivo_si_existe(self, ctx):
         if not ctx["archivo_tiene_contenido"]:
             ctx["df"] = pd.DataFrame(columns=self.__columnas_archivo_cmdm)
+            ctx["lista_vin"] = []
             return {"ok": True}
 
         res = self.__obj.fn_leer_archivo(self.__ruta_archivo_cmdm)
@@ -141,8 +394,11 @@ class ControladorGestionArchivoCmdm:
             return {"ok": False, "error": "No se pudo leer archivo CMDM"}
 
         ctx["df"] = res["data"]
+        # Los VIN se toman antes de _tratar_datos (que solo cambia nulos por '') para consultar DDA en paralelo
+        ctx["lista_vin"] = ctx["df"]["SDI_VHCL.VIN"].fillna('').tolist()
         return {"ok": True}
 
+    @etapa(lee=("df",), escribe=("df",))
     def _tratar_datos(self, ctx):
         if ctx["df"].empty:
             return {"ok": True}
@@ -150,16 +406,51 @@ class ControladorGestionArchivoCmdm:
         ctx["df"] = self.__obj.fn_tratar_datos_nulos(ctx["df"])
         return {"ok": True}
 
+    @etapa(lee=("df",), escribe=("huellas",))
+    def _comparar_huellas(self, ctx):
+        ctx["huellas"] = None
+        if not self.__huellas_filas.disponible or ctx["df"].empty:
+            return {"ok": True}
+
+        df = ctx["df"]
+        huellas = self.__huellas_filas.fn_calcular(df)
+        r = self.__huellas_filas.fn_comparar(huellas, df.columns)
+        if r["error"]:
+            crea_log(f"Error - No se usan las huellas de la ejecución anterior: {r['error']}")
+        sin_cambios, entregadas = r["data"]
+
+        ctx["huellas"] = {
+            "huellas": huellas,
+            "sin_cambios": pd.Series(sin_cambios, index=df.index),
+            "entregadas": pd.Series(entregadas, index=df.index),
+        }
+        crea_log(f"Incremental: {int(sin_cambios.sum())} de {len(df)} filas sin cambios "
+                 f"({int(entregadas.sum())} con entrega DDA)",
+                 etapa="comparar_huellas")
+        return {"ok": True}
+
+    @etapa(lee=("lista_vin", "replica_dda", "huellas"), escribe=("vin_dda",))
     def _consultar_reporte_dda(self, ctx):
-        lista_vin = ctx["df"]["SDI_VHCL.VIN"].tolist() if not ctx["df"].empty else []
+        lista_vin = ctx["lista_vin"]
+        vin_entregados = []
+        huellas = ctx["huellas"]
+        if huellas is not None:
+            # Las filas sin cambios que ya tenían entrega DDA no se consultan
+            entregadas = huellas["entregadas"].to_numpy()
+            vin_entregados = [vin for vin, entregada in zip(lista_vin, entregadas) if entregada]
+            lista_vin = [vin for vin, entregada in zip(lista_vin, entregadas) if not entregada]
+            if not lista_vin:
+                ctx["vin_dda"] = vin_entregados
+                return {"ok": True}
 
         res = self.__obj.consultar_reporte_dda(lista_vin)
         if not res["exito"]:
             return {"ok": False, "error": res["error"]}
 
-        ctx["vin_dda"] = res["data"]
+        ctx["vin_dda"] = res["data"] + vin_entregados
         return {"ok": True}
 
+    @etapa(lee=("df", "vin_dda"), escribe=("df_no_dda", "df_dda"))
     def _separar_vines(self, ctx):
 
         df = ctx["df"]
@@ -175,41 +466,51 @@ class ControladorGestionArchivoCmdm:
         ctx["df_dda"] = df_dda
         return {"ok": True}
 
+    @etapa(lee=("df_no_dda", "huellas"), escribe=("tabla_delta",), efecto=True)
     def _insertar_no_dda(self, ctx):
-        if ctx["df_no_dda"].empty:
+        df_no_dda = ctx["df_no_dda"]
+        if ctx["huellas"] is not None and not df_no_dda.empty:
+            # Las filas sin cambios ya están en delta_cmdm_file; se insertan igual si su VIN tiene otra fila
+            # nueva o cambiada, para que el MERGE conserve la última fila del archivo
+            sin_cambios = ctx["huellas"]["sin_cambios"].reindex(df_no_dda.index, fill_value=False).to_numpy()
+            vin_cambiados = df_no_dda.loc[~sin_cambios, "SDI_VHCL.VIN"]
+            df_no_dda = df_no_dda[~sin_cambios | df_no_dda["SDI_VHCL.VIN"].isin(vin_cambiados).to_numpy()]
+
+        if df_no_dda.empty:
             return {"ok": True}
 
-        r = self.__obj.fn_insertar_data_delta_cmdm(ctx["df_no_dda"])
+        r = self.__obj.fn_insertar_data_delta_cmdm(df_no_dda)
         if not r["exito"]:
             return {"ok": False, "error": r["error"]}
 
         return {"ok": True}
 
+    @etapa(lee=("tabla_delta",), escribe=("df_delta", "tabla_delta", "delta_liberado"), efecto=True)
     def _consultar_delta(self, ctx):
+        # Consulta los VIN pendientes con entrega DDA y los marca como procesados en una sola sentencia.
+        # Si una etapa posterior falla se devuelven a pendiente (ver __revertir_delta)
         r = self.__obj.fn_consultar_data_delta_cmdm(self.__columnas_archivo_cmdm)
         if not r["exito"]:
             return {"ok": False, "error": r["error"]}
 
         ctx["df_delta"] = r["data"]
+        ctx["delta_liberado"] = {
+            "vin": r["data"]["SDI_VHCL.VIN"].tolist(),
+            "fecha_maxima": r.get("fecha_maxima"),
+        }
         return {"ok": True}
 
-    def _actualizar_delta(self, ctx):
-        if ctx["df_delta"].empty:
-            return {"ok": True}
-
-        lista_vin = ctx["df_delta"]["SDI_VHCL.VIN"].tolist()
-        r = self.__obj.fn_actualizar_estado_delta(lista_vin)
-
-        if not r["exito"]:
-            return {"ok": False, "error": r["error"]}
-
-        return {"ok": True}
-
+    @etapa(lee=("df_dda", "df_delta"), escribe=("df_final",))
     def _fusionar_data(self, ctx):
-        df_total = self.__obj.fn_fusionar_dataframes(ctx["df_dda"], ctx["df_delta"])
+        df_dda = ctx["df_dda"]
+        if config.ESCRITURA_LINEAS_ORIGINALES and not df_dda.empty:
+            # Posición de cada fila en el archivo de entrada, para copiar tal cual las que no cambien
+            df_dda = df_dda.assign(**{COLUMNA_LINEA_CMDM: df_dda.index})
+        df_total = self.__obj.fn_fusionar_dataframes(df_dda, ctx["df_delta"])
         ctx["df_final"] = df_total
         return {"ok": True}
 
+    @etapa(lee=("df_final", "replica_dda"), escribe=("df_fechas",))
     def _consultar_fechas_dda(self, ctx):
         if ctx["df_final"].empty:
             ctx["df_fechas"] = pd.DataFrame()
@@ -224,6 +525,7 @@ class ControladorGestionArchivoCmdm:
         ctx["df_fechas"] = r["data"]
         return {"ok": True}
 
+    @etapa(lee=("df_final", "df_fechas"), escribe=("df_final",))
     def _aplicar_fechas(self, ctx):
         if ctx["df_final"].empty:
             return {"ok": True}
@@ -234,6 +536,9 @@ class ControladorGestionArchivoCmdm:
         ctx["df_final"] = df
         return {"ok": True}
 
+    # No lee tabla_delta: _consultar_delta solo marca filas VP y _insertar_no_dda solo inserta VINs sin entrega DDA,
+    # que esta consulta (no VP y con entrega DDA) no selecciona; así corre junto a las etapas del archivo y del delta
+    @etapa(escribe=("df_publicos",))
     def _consultar_servicio_publico(self, ctx):
         r = self.__obj.fn_consultar_data_servicio_publico()
         if not r["exito"]:
@@ -242,13 +547,19 @@ class ControladorGestionArchivoCmdm:
         ctx["df_publicos"] = r["data"]
         return {"ok": True}
 
+    # Lee tabla_delta: debe correr después de _consultar_delta, que marca las filas VP pendientes con entrega DDA;
+    # antes, un VIN pendiente y marcado para reenvío saldría en el delta y también en los reenvíos
+    @etapa(lee=("tabla_delta",), escribe=("df_reenvios",))
     def _consultar_reenvios(self, ctx):
         r = self.__obj.fn_consultar_reenvios(self.__columnas_archivo_cmdm)
         if not r["exito"]:
             return {"ok": False, "error": r["error"]}
 
         ctx["df_reenvios"] = r["data"]
+        return {"ok": True}
 
+    @etapa(lee=("df_final", "df_reenvios"), escribe=("df_final",))
+    def _fusionar_reenvios(self, ctx):
         if not ctx["df_reenvios"].empty:
             ctx["df_final"] = self.__obj.fn_fusionar_dataframes(
                 ctx["df_final"], ctx["df_reenvios"]
@@ -256,12 +567,14 @@ class ControladorGestionArchivoCmdm:
 
         return {"ok": True}
 
+    @etapa(lee=("df_final",), escribe=("df_final", "df_mod_ho"))
     def _modificar_ho(self, ctx):
         df, df_mod = self.__obj.fn_mod_col_ho(ctx["df_final"])
         ctx["df_final"] = df
         ctx["df_mod_ho"] = df_mod
         return {"ok": True}
 
+    @etapa(lee=("df_no_dda", "df_dda", "df_delta", "df_reenvios", "df_publicos"), escribe=("df_email_pre",))
     def _preparar_info_email(self, ctx):
 
         df_email = self.__obj.fn_prep_info_email(
@@ -275,12 +588,19 @@ class ControladorGestionArchivoCmdm:
         ctx["df_email_pre"] = df_email
         return {"ok": True}
 
+    @etapa(lee=("df_email_pre", "df_mod_ho"), escribe=("df_email_final",))
     def _consultar_info_email(self, ctx):
         lista_vin = ctx["df_email_pre"]["SDI_VHCL.VIN"].tolist()
         r = self.__obj.fn_consul_info_email(lista_vin)
 
         if not r["exito"]:
             return {"ok": False, "error": r["error"]}
+        if r.get("advertencia"):
+            crea_log(f"Error - {r['advertencia']}")
+        for fuente, tiempo in (r.get("tiempos_fuentes") or {}).items():
+            crea_log(f"Enriquecimiento {fuente}: {tiempo['filas']} filas"
+                     ,etapa='consultar_info_email'
+                     ,duracion=tiempo['segundos'])
 
         df = self.__obj.fn_fusionar_dataframes_merge(r["data"], ctx["df_email_pre"])
         df = self.__obj.fn_columna_ho_email(df, ctx["df_mod_ho"])
@@ -288,20 +608,37 @@ class ControladorGestionArchivoCmdm:
         ctx["df_email_final"] = df
         return {"ok": True}
 
+    @etapa(lee=("df_email_final",), escribe=("archivo_correo",), efecto=True)
     def _generar_excel(self, ctx):
         self.__obj.fn_generar_archivo_ecxel(
             ctx["df_email_final"], self.__ruta_archivo_correo
         )
         return {"ok": True}
 
+    @etapa(lee=("df_final",), escribe=("df_final",))
     def _eliminar_publicos(self, ctx):
         ctx["df_final"] = self.__obj.fn_eliminar_pub_cmdm(ctx["df_final"])
         return {"ok": True}
 
+    @etapa(lee=("df_final", "df"), escribe=("archivo_cmdm",), efecto=True)
     def _generar_cmdm(self, ctx):
-        self.__obj.fn_generar_archivo_cmdm(ctx["df_final"], self.__ruta_archivo_cmdm)
+        r = self.__obj.fn_generar_archivo_cmdm(ctx["df_final"], self.__ruta_archivo_cmdm, ctx["df"])
+        if r["error"]:
+            crea_log(f"Error - No se copiaron las líneas del archivo de entrada, se generó completo: {r['error']}")
+        if COLUMNA_LINEA_CMDM in ctx["df_final"].columns:
+            crea_log(f"Archivo CMDM: {r['data']['copiadas']} líneas copiadas de la entrada, "
+                     f"{r['data']['serializadas']} serializadas",
+                     etapa="generar_cmdm")
         return {"ok": True}
 
+    @etapa(lee=("delta_liberado", "archivo_cmdm"), escribe=("delta_confirmado",), efecto=True)
+    def _confirmar_delta(self, ctx):
+        # El archivo CMDM ya tiene las filas liberadas: la marca de agua avanza y ya no se revierten
+        self.__obj.fn_confirmar_delta_cmdm(ctx["delta_liberado"]["fecha_maxima"])
+        ctx["delta_confirmado"] = True
+        return {"ok": True}
+
+    @etapa(lee=("df",), escribe=("archivo_backup",), efecto=True)
     def _generar_backup(self, ctx):
         if not ctx["df"].empty:
             self.__obj.fn_generar_backup_archivo_cmdm(
@@ -309,3 +646,15 @@ class ControladorGestionArchivoCmdm:
             )
 
         return {"ok": True}
+
+    @etapa(lee=("huellas", "lista_vin", "vin_dda", "df"), escribe=("archivo_huellas",), efecto=True)
+    def _guardar_huellas(self, ctx):
+        if ctx["huellas"] is None:
+            return {"ok": True}
+
+        entregadas = pd.Series(ctx["lista_vin"]).isin(set(ctx["vin_dda"])).to_numpy()
+        r = self.__huellas_filas.fn_guardar(ctx["huellas"]["huellas"], entregadas, ctx["df"].columns)
+        if not r["exito"]:
+            # Sin huellas la siguiente ejecución procesa todas las filas; no es una falla del archivo
+            crea_log(f"Error - No fue posible guardar las huellas de las filas: {r['error']}")
+        return {"ok": True}
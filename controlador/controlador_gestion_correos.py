@@ -1,7 +1,7 @@
 """
 Módulo controlador_gestion_correos.py
 
-Este módulo define la clase ControladorGestionCorreos, encargada de gestionar el envío de correos electrónicos relacionados con modificaciones y errores en el procesamiento de archivos CMDM. 
+Este módulo define la clase ControladorGestionCorreos, encargada de gestionar el envío de correos electrónicos relacionados con modificaciones y errores en el procesamiento de archivos CMDM.
 Integra la consulta de destinatarios, el envío de correos y el registro de eventos en el log.
 
 Clases:
@@ -12,6 +12,7 @@ ControladorGestionCorreos
 Dependencias:
 -------------
 - ConsultaCorreosDestinatarios: Clase para consultar los correos de los destinatarios.
+- ServicioCorreo: Conexión SMTP reutilizable con envío en segundo plano.
 - correo_modificacion_encuestas: Función para enviar correos de modificaciones.
 - fn_correo_errores: Función para enviar correos de errores.
 - crea_log: Función para registrar eventos en el log.
@@ -19,21 +20,36 @@ Dependencias:
 Métodos:
 --------
 - fn_correo_modificaciones(self):
-    Consulta los destinatarios y envía el correo de modificaciones. 
+    Consulta los destinatarios y encola el correo de modificaciones.
     Registra en el log si el envío fue exitoso o si ocurrió un error.
 
 - fn_correo_error(self):
-    Consulta los destinatarios y envía el correo de errores.
+    Consulta los destinatarios y encola el correo de errores.
     Registra en el log si el envío fue exitoso o si ocurrió un error.
 
+- fn_finalizar(self, esperar):
+    Cierra la conexión SMTP cuando terminan los envíos pendientes.
+
+- fn_iniciar_ejecucion(self):
+    Descarta los destinatarios de la ejecución anterior cuando la instancia se reutiliza (modo servicio).
+
+- fn_verificar_smtp(self, tiempo_espera):
+    Verifica el servidor SMTP (EHLO, STARTTLS y login) antes de procesar.
+
 Notas:
 ------
 - Ambos métodos validan que la consulta de destinatarios sea exitosa antes de intentar enviar el correo.
-- El resultado de cada operación se registra en el log para trazabilidad.
+- Los destinatarios se consultan una sola vez por ejecución y se reutilizan en los siguientes correos.
+  Con RUTA_CACHE_DIMENSIONES se toman de la copia local de TADEM03_PARAMETROS (modelo.cache_dimensiones).
+- El correo de errores adjunta solo los registros de la ejecución actual (ver vista.registro_log).
+- Los correos se envían en segundo plano; el resultado de cada envío se registra en el log al terminar.
 """
 from servicios.consulta_correos_destinatarios import  ConsultaCorreosDestinatarios
+from modelo.cache_dimensiones import CacheDimensiones
+import config
 from vista.envio_correo_modificaciones import correo_modificacion_encuestas
 from vista.envio_correo_errores import fn_correo_errores
+from vista.servicio_correo import ServicioCorreo
 from vista.crear_log import crea_log
 
 class ControladorGestionCorreos:
@@ -44,29 +60,106 @@ class ControladorGestionCorreos:
     --------
     - fn_correo_modificaciones: Envía correo de modificaciones a los destinatarios consultados.
     - fn_correo_error: Envía correo de errores a los destinatarios consultados.
+    - fn_finalizar: Cierra la conexión SMTP al terminar los envíos pendientes.
+    - fn_iniciar_ejecucion: Descarta los destinatarios de la ejecución anterior.
     """
+    def __init__(self):
+        self.__servicio_correo = ServicioCorreo()
+        self.__destinatarios = None
+
+    def fn_iniciar_ejecucion(self):
+        """
+        Descarta los destinatarios consultados en la ejecución anterior; la conexión SMTP sigue abierta.
+        """
+        self.__destinatarios = None
+
+    def __consultar_destinatarios(self):
+        """
+        Consulta los destinatarios una sola vez por ejecución.
+        """
+        if self.__destinatarios is None:
+            cache_dimensiones = CacheDimensiones(config.RUTA_CACHE_DIMENSIONES, config.HORAS_CACHE_DIMENSIONES)
+            if cache_dimensiones.disponible:
+                dic_retorno_cache = cache_dimensiones.fn_valores_parametro('Email cambios encuestas')
+                if dic_retorno_cache['error']:
+                    crea_log(f"Error - Caché de dimensiones: {dic_retorno_cache['error']}")
+                if dic_retorno_cache['exito'] and dic_retorno_cache['data']:
+                    #Misma forma que las filas de fn_consultar_destinatarios
+                    self.__destinatarios = [[valor] for valor in dic_retorno_cache['data']]
+                    return {'exito':True
+                            ,'data':self.__destinatarios
+                            ,'error':None}
+
+            dic_restorno_correo_destinatarios = ConsultaCorreosDestinatarios().fn_consulta_correos()
+            if not dic_restorno_correo_destinatarios['exito']:
+                return dic_restorno_correo_destinatarios
+            self.__destinatarios = dic_restorno_correo_destinatarios['data']
+
+        return {'exito':True
+                ,'data':self.__destinatarios
+                ,'error':None}
+
+    def __registrar_envio(self, envio, mensaje_exito, mensaje_error):
+        """
+        Registra en el log el resultado de un envío en segundo plano.
+        """
+        dic_retorno_envio_correo = envio.result()
+        if dic_retorno_envio_correo['exito']:
+            crea_log(mensaje_exito)
+        else:
+            crea_log(f"{mensaje_error}: {dic_retorno_envio_correo['error']}")
+
     def fn_correo_modificaciones(self):
         """
-        Consulta los destinatarios y envía el correo de modificaciones.
+        Consulta los destinatarios y encola el correo de modificaciones.
         Registra el resultado en el log.
         """
-        dic_restorno_correo_destinatarios = ConsultaCorreosDestinatarios().fn_consulta_correos()
+        dic_restorno_correo_destinatarios = self.__consultar_destinatarios()
         if dic_restorno_correo_destinatarios['exito']:
-            dic_retorno_envio_correo  = correo_modificacion_encuestas(dic_restorno_correo_destinatarios['data'])
+            dic_retorno_envio_correo  = correo_modificacion_encuestas(dic_restorno_correo_destinatarios['data']
+                                                                      ,self.__servicio_correo)
             if dic_retorno_envio_correo['exito']:
-                crea_log('Se envía correo de modificaciones correctamente\n')
+                dic_retorno_envio_correo['data'].add_done_callback(
+                    lambda envio: self.__registrar_envio(envio
+                                                         ,'Se envía correo de modificaciones correctamente\n'
+                                                         ,'Error - No fue posible enviar correo de modificaciones'))
             else:
-                crea_log(F'Error - No fue posible enviar correo de modificaciones')
+                crea_log(F"Error - No fue posible enviar correo de modificaciones: {dic_retorno_envio_correo['error']}")
 
     def  fn_correo_error(self):
         """
-        Consulta los destinatarios y envía el correo de errores.
+        Consulta los destinatarios y encola el correo de errores.
         Registra el resultado en el log.
         """
-        dic_restorno_correo_destinatarios = ConsultaCorreosDestinatarios().fn_consulta_correos()
+        dic_restorno_correo_destinatarios = self.__consultar_destinatarios()
         if dic_restorno_correo_destinatarios['exito']:
-            dic_retorno_envio_correo  = fn_correo_errores(dic_restorno_correo_destinatarios['data'])
+            dic_retorno_envio_correo  = fn_correo_errores(dic_restorno_correo_destinatarios['data']
+                                                          ,self.__servicio_correo)
             if dic_retorno_envio_correo['exito']:
-                crea_log('Se envía correo de errores correctamente')
+                dic_retorno_envio_correo['data'].add_done_callback(
+                    lambda envio: self.__registrar_envio(envio
+                                                         ,'Se envía correo de errores correctamente'
+                                                         ,'Error - No fue posible enviar correo de errores'))
             else:
-                crea_log(F'Error - No fue posible enviar correo de modificaciones')
+                crea_log(F"Error - No fue posible enviar correo de errores: {dic_retorno_envio_correo['data']}")
+
+    def fn_verificar_smtp(self, tiempo_espera=None):
+        """
+        Verifica el servidor SMTP sin enviar correo.
+
+        Returns:
+        --------
+        dict: {'exito': True, 'error': None} o {'exito': False, 'error': ex}
+        """
+        return self.__servicio_correo.fn_verificar(tiempo_espera)
+
+    def fn_finalizar(self, esperar=False):
+        """
+        Cierra la conexión SMTP cuando terminan los envíos pendientes.
+
+        Parameters:
+        -----------
+        esperar : bool
+            Si es True bloquea hasta que terminen los envíos.
+        """
+        self.__servicio_correo.fn_cerrar(esperar)
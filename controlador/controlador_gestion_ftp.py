@@ -13,14 +13,21 @@ Dependencias:
 - ConexionFTP: Clase para manejar la conexión y operaciones con el servidor FTP.
 - ConsultasSql: Clase para consultas a la base de datos (no utilizada directamente aquí).
 - crea_log: Función para registrar eventos y errores en el log.
+- fn_leer_contadores: Contadores de bytes transferidos, para registrar el tamaño de la descarga y la carga.
 - ConsultarRutaFtp: Clase para consultar la ruta del archivo en el FTP.
+- CacheDimensiones: Copia local de TADEM03_PARAMETROS, usada para la ruta FTP si RUTA_CACHE_DIMENSIONES está configurada.
+- LoteArchivos: Unión de los archivos descargados en modo lote y registro de sus nombres en el FTP.
 
 Atributos:
 ----------
 - __obj_ruta_ftp: Instancia de ConsultarRutaFtp para obtener la ruta del archivo en el FTP.
+- __cache_dimensiones: Instancia de CacheDimensiones con los parámetros en caché.
 - __conexion_ftp: Instancia de ConexionFTP para manejar la conexión y operaciones FTP.
+- __conexion_sondeo: Sesión FTP que se mantiene abierta entre consultas de fn_consultar_archivo_ftp (modo servicio).
 - __ruta_ftp: Ruta del archivo en el servidor FTP.
 - estado_archivo: Estado de existencia del archivo en el FTP.
+- tiempos: Segundos de la última descarga, eliminación y carga, para el historial de ejecuciones.
+- archivos_lote: Nombres en el FTP de los archivos del último lote descargado, en orden de llegada.
 
 Métodos:
 --------
@@ -28,6 +35,19 @@ Métodos:
     Consulta la ruta FTP, crea la conexión y valida el acceso al servidor FTP.
     Retorna True si la conexión es exitosa, False en caso contrario y registra el error en el log.
 
+- fn_verificar_conexion(self, tiempo_espera):
+    Inicia sesión en el FTP, se ubica en la ruta configurada y desconecta (verificación previa, sin registrar en el log).
+
+- fn_consultar_archivo_ftp(self):
+    Retorna el tamaño y la fecha de modificación del archivo a descargar usando una sesión FTP que queda abierta;
+    si la sesión se cayó se reconecta en la siguiente consulta. No registra en el log.
+
+- fn_cerrar_sondeo(self):
+    Cierra la sesión que usa fn_consultar_archivo_ftp.
+
+- fn_iniciar_ejecucion(self):
+    Limpia los tiempos y el lote de la ejecución anterior cuando la instancia se reutiliza (modo servicio).
+
 - fn_descargar_archivo_ftp(self):
     Conecta al FTP, valida la existencia del archivo y lo descarga si existe.
     Retorna True si la descarga es exitosa, False en caso contrario y registra el error en el log.
@@ -36,20 +56,39 @@ Métodos:
     Conecta al FTP y elimina el archivo especificado.
     Retorna True si la eliminación es exitosa, False en caso contrario y registra el error en el log.
 
+- fn_descargar_lote_ftp(self):
+    Lista los archivos que coinciden con PATRON_ARCHIVOS_CMDM, los descarga en paralelo (HILOS_DESCARGA_FTP
+    conexiones, REINTENTOS_DESCARGA_FTP reintentos por archivo) y los une en orden de llegada en RUTA_GUARDAR_ARCHIVO.
+    Los archivos que no se descargan o tienen otro encabezado se registran en el log y quedan en el FTP.
+    Retorna True si se descargó y unió al menos un archivo, False en caso contrario.
+
+- fn_eliminar_lote_ftp(self):
+    Elimina del FTP los archivos del último lote (o los del registro del lote, al reanudar).
+    Retorna True si se eliminaron todos, False en caso contrario y registra el error en el log.
+
 - fn_cargar_archivo_ftp(self):
     Conecta al FTP y carga el archivo especificado.
     Retorna True si la carga es exitosa, False en caso contrario y registra el error en el log.
 
 Notas:
 ------
-- Todos los métodos desconectan del FTP después de realizar la operación.
+- Todos los métodos desconectan del FTP después de realizar la operación, salvo fn_consultar_archivo_ftp.
 - Los errores y eventos importantes se registran en el log para trazabilidad.
 - El flujo está diseñado para ser robusto ante errores de conexión y operaciones fallidas.
 
 """
+import config
+import shutil
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from os import path
 from modelo.conexion_ftp import ConexionFTP
+from modelo.lote_archivos import LoteArchivos
+from modelo.contadores_io import fn_leer_contadores
 from vista.crear_log import crea_log
 from servicios.consultar_ruta_ftp import ConsultarRutaFtp
+from modelo.cache_dimensiones import CacheDimensiones
 
 class GestionFTP:
     """
@@ -62,17 +101,38 @@ class GestionFTP:
         Inicializa los objetos necesarios para la gestión FTP.
         """
         self.__obj_ruta_ftp = ConsultarRutaFtp()
+        self.__cache_dimensiones = CacheDimensiones(config.RUTA_CACHE_DIMENSIONES, config.HORAS_CACHE_DIMENSIONES)
         self.__conexion_ftp = None
+        self.__conexion_sondeo = None
         self.__ruta_ftp = None
+        #Segundos de la última descarga, eliminación y carga (historial de ejecuciones)
+        self.tiempos = {}
+        self.archivos_lote = []
+
+    def __consultar_ruta_ftp(self):
+        """
+        Retorna la ruta FTP de la caché de dimensiones; si no está configurada o falla, la consulta con ConsultarRutaFtp.
+        """
+        if self.__cache_dimensiones.disponible:
+            dic_retorno_cache = self.__cache_dimensiones.fn_valores_parametro('Ruta ftp')
+            if dic_retorno_cache['error']:
+                crea_log(f"Error - Caché de dimensiones: {dic_retorno_cache['error']}")
+            if dic_retorno_cache['exito'] and dic_retorno_cache['data']:
+                return {'exito':True,'data':dic_retorno_cache['data'][0],'error':None}
+
+        return self.__obj_ruta_ftp.fn_consultar_ruta_ftp()
 
     def fn_conexion_ftp(self):
         """
-        Consulta la ruta del archivo en el FTP y establece la conexión.
+        Consulta la ruta del archivo en el FTP (o usa RUTA_FTP si está configurada) y establece la conexión.
         Retorna True si la conexión es exitosa, False en caso contrario.
         Registra los errores en el log.
         """
         #Consultamos la ruta donde se encuentra el archivo en el FTP
-        dic_retorno_consulta = self.__obj_ruta_ftp.fn_consultar_ruta_ftp()
+        if config.RUTA_FTP:
+            dic_retorno_consulta = {'exito':True,'data':config.RUTA_FTP,'error':None}
+        else:
+            dic_retorno_consulta = self.__consultar_ruta_ftp()
 
         if dic_retorno_consulta['exito']:
 
@@ -93,6 +153,77 @@ class GestionFTP:
         else:
             False
 
+    def fn_verificar_conexion(self, tiempo_espera=None):
+        """
+        Inicia sesión en el FTP y se ubica en la ruta del archivo, sin transferir nada.
+
+        Parameters:
+        -----------
+        tiempo_espera : float, opcional
+            Segundos máximos por operación FTP.
+
+        Returns:
+        --------
+        dict: {'exito': True, 'error': None} o {'exito': False, 'error': ex}
+        """
+        if config.RUTA_FTP:
+            dic_retorno_consulta = {'exito':True,'data':config.RUTA_FTP,'error':None}
+        else:
+            dic_retorno_consulta = self.__consultar_ruta_ftp()
+        if not dic_retorno_consulta['exito']:
+            return {'exito':False,'error':dic_retorno_consulta['error']}
+
+        conexion_ftp = ConexionFTP(dic_retorno_consulta['data'])
+        dic_retorno_conexion_ftp = conexion_ftp.fn_conectar_ftp(tiempo_espera)
+        conexion_ftp.fn_desconecta()
+        return {'exito':dic_retorno_conexion_ftp['exito'],'error':dic_retorno_conexion_ftp['error']}
+
+    def fn_consultar_archivo_ftp(self):
+        """
+        Consulta si el archivo a descargar está en el FTP, reutilizando la sesión de la consulta anterior.
+
+        Returns:
+        --------
+        dict: {'exito': True, 'data': (tamano, modificado) o None si no hay archivo, 'error': None}
+              o {'exito': False, 'data': None, 'error': ex}
+        """
+        if self.__conexion_sondeo is None:
+            if config.RUTA_FTP:
+                dic_retorno_consulta = {'exito':True,'data':config.RUTA_FTP,'error':None}
+            else:
+                dic_retorno_consulta = self.__consultar_ruta_ftp()
+            if not dic_retorno_consulta['exito']:
+                return {'exito':False,'data':None,'error':dic_retorno_consulta['error']}
+
+            conexion_sondeo = ConexionFTP(dic_retorno_consulta['data'])
+            dic_retorno_conexion_ftp = conexion_sondeo.fn_conectar_ftp()
+            if not dic_retorno_conexion_ftp['exito']:
+                conexion_sondeo.fn_desconecta()
+                return {'exito':False,'data':None,'error':dic_retorno_conexion_ftp['error']}
+            self.__conexion_sondeo = conexion_sondeo
+
+        dic_retorno_firma = self.__conexion_sondeo.fn_firma_archivo_ftp()
+        if not dic_retorno_firma['exito']:
+            #La sesión se cayó o el servidor la cerró por inactividad: se abre otra en la siguiente consulta
+            self.fn_cerrar_sondeo()
+        return dic_retorno_firma
+
+    def fn_cerrar_sondeo(self):
+        """
+        Cierra la sesión que usa fn_consultar_archivo_ftp, si está abierta.
+        """
+        if self.__conexion_sondeo is not None:
+            self.__conexion_sondeo.fn_desconecta()
+            self.__conexion_sondeo = None
+
+    def fn_iniciar_ejecucion(self):
+        """
+        Limpia los tiempos y los archivos del lote de la ejecución anterior; la sesión de sondeo sigue abierta.
+        Un lote que no se pudo eliminar sigue en su registro en disco (LoteArchivos).
+        """
+        self.tiempos = {}
+        self.archivos_lote = []
+
     def fn_descargar_archivo_ftp(self):
         """
         Descarga el archivo desde el servidor FTP si existe en la ruta especificada.
@@ -105,10 +236,17 @@ class GestionFTP:
 
             if self.estado_archivo is True:
                 #Descargamos el archivo
+                inicio = time.perf_counter()
+                bytes_previos = fn_leer_contadores().get('ftp_descarga', 0)
                 dic_retorno_descarga_ftp = self.__conexion_ftp.fn_descargar_archivo_ftp()
 
                 if dic_retorno_descarga_ftp['exito']:
                     self.__conexion_ftp.fn_desconecta()
+                    bytes_descargados = fn_leer_contadores().get('ftp_descarga', 0) - bytes_previos
+                    self.tiempos['descarga'] = round(time.perf_counter() - inicio, 4)
+                    crea_log(f'Se descarga el archivo del FTP ({bytes_descargados} bytes)'
+                             ,etapa='descarga_ftp'
+                             ,duracion=self.tiempos['descarga'])
                     return True
                 else:
                     self.__conexion_ftp.fn_desconecta()
@@ -126,7 +264,9 @@ class GestionFTP:
         Registra los errores en el log.
         """
         if self.fn_conexion_ftp():
+            inicio = time.perf_counter()
             dic_retorno_eliminar_archivo_ftp = self.__conexion_ftp.fn_eliminar_archivo_ftp()
+            self.tiempos['eliminacion'] = round(time.perf_counter() - inicio, 4)
 
             if not dic_retorno_eliminar_archivo_ftp['exito']:
                 self.__conexion_ftp.fn_desconecta()
@@ -138,6 +278,138 @@ class GestionFTP:
         else:
             return False
 
+    def fn_descargar_lote_ftp(self):
+        """
+        Descarga todos los archivos pendientes que coinciden con PATRON_ARCHIVOS_CMDM y los une en RUTA_GUARDAR_ARCHIVO.
+        Los archivos que no se pudieron descargar o se rechazaron al unir no forman parte del lote: quedan en el FTP
+        para el siguiente.
+        Retorna True si se descargó y unió al menos un archivo, False en caso contrario.
+        Registra los errores en el log.
+        """
+        if not self.fn_conexion_ftp():
+            return False
+        try:
+            dic_retorno_listado = self.__conexion_ftp.fn_listar_archivos_ftp(config.PATRON_ARCHIVOS_CMDM)
+        finally:
+            self.__conexion_ftp.fn_desconecta()
+
+        if not dic_retorno_listado['exito']:
+            crea_log(f"Error - No fue posible listar los archivos del FTP: {dic_retorno_listado['error']}\n")
+            return False
+        archivos = [archivo['nombre'] for archivo in dic_retorno_listado['data']]
+        if not archivos:
+            crea_log(f'Error - No hay archivos en la ruta FTP que coincidan con {config.PATRON_ARCHIVOS_CMDM}.\n')
+            return False
+
+        #Cada descarga usa su propia conexión; los archivos se guardan junto al archivo a procesar
+        inicio = time.perf_counter()
+        obj_lote = LoteArchivos(config.RUTA_GUARDAR_ARCHIVO)
+        carpeta = tempfile.mkdtemp(prefix='lote_', dir=path.dirname(config.RUTA_GUARDAR_ARCHIVO) or None)
+        try:
+            rutas = [path.join(carpeta, f'{posicion:05d}.csv') for posicion in range(len(archivos))]
+            with ThreadPoolExecutor(max_workers=max(1, min(config.HILOS_DESCARGA_FTP, len(archivos)))
+                                    ,thread_name_prefix='descarga_ftp') as ejecutor:
+                descargas = list(ejecutor.map(self.__descargar_archivo_lote, archivos, rutas))
+
+            fallidos = [f"{nombre} ({descarga['intentos']} intentos): {descarga['error']}"
+                        for nombre, descarga in zip(archivos, descargas) if not descarga['exito']]
+            if fallidos:
+                crea_log(f"Error - Archivos del lote que no se pudieron descargar y quedan en el FTP: {'; '.join(fallidos)}\n")
+            descargados = {ruta: nombre for nombre, ruta, descarga in zip(archivos, rutas, descargas) if descarga['exito']}
+            if not descargados:
+                return False
+
+            dic_retorno_lote = obj_lote.fn_consolidar(list(descargados))
+        finally:
+            shutil.rmtree(carpeta, ignore_errors=True)
+
+        if not dic_retorno_lote['exito']:
+            crea_log(f"Error - No fue posible unir los archivos del lote: {dic_retorno_lote['error']}\n")
+            return False
+
+        rechazados = dic_retorno_lote['data']['rechazados']
+        if rechazados:
+            crea_log(f"Error - Archivos del lote rechazados que quedan en el FTP: "
+                     f"{'; '.join(f'{descargados[ruta]}: {motivo}' for ruta, motivo in rechazados.items())}\n")
+        if dic_retorno_lote['data']['vacios']:
+            crea_log(f"Archivos del lote vacíos: {', '.join(descargados[ruta] for ruta in dic_retorno_lote['data']['vacios'])}")
+
+        archivos = [nombre for ruta, nombre in descargados.items() if ruta not in rechazados]
+        obj_lote.fn_guardar(archivos)
+        self.archivos_lote = archivos
+        self.tiempos['descarga'] = round(time.perf_counter() - inicio, 4)
+        crea_log(f"Se descargan {len(archivos)} archivos del FTP "
+                 f"({sum(descarga['bytes'] for descarga in descargas if descarga['exito'])} bytes)"
+                 f" y se unen en orden de llegada: {', '.join(archivos)}"
+                 ,etapa='descarga_ftp'
+                 ,duracion=self.tiempos['descarga'])
+        return True
+
+    def __descargar_archivo_lote(self, nombre_archivo, ruta_destino):
+        """
+        Descarga un archivo del lote (se ejecuta en un hilo del lote). Si falla lo reintenta hasta
+        REINTENTOS_DESCARGA_FTP veces con una conexión nueva, esperando PAUSA_REINTENTO_FTP segundos más en cada intento.
+        """
+        reintentos = max(0, config.REINTENTOS_DESCARGA_FTP)
+        for intento in range(1, reintentos + 2):
+            dic_retorno_descarga_ftp = self.__descargar_archivo_lote_intento(nombre_archivo, ruta_destino)
+            if dic_retorno_descarga_ftp['exito'] or intento > reintentos:
+                return dict(dic_retorno_descarga_ftp, intentos=intento)
+            time.sleep(config.PAUSA_REINTENTO_FTP * intento)
+
+    def __descargar_archivo_lote_intento(self, nombre_archivo, ruta_destino):
+        """
+        Descarga un archivo del lote con una conexión propia.
+        """
+        conexion_ftp = ConexionFTP(self.__ruta_ftp)
+        dic_retorno_conexion_ftp = conexion_ftp.fn_conectar_ftp()
+        if not dic_retorno_conexion_ftp['exito']:
+            conexion_ftp.fn_desconecta()
+            return {'exito':False,'error':dic_retorno_conexion_ftp['error'],'bytes':0}
+
+        #Los contadores de bytes son por hilo
+        bytes_previos = fn_leer_contadores().get('ftp_descarga', 0)
+        try:
+            dic_retorno_descarga_ftp = conexion_ftp.fn_descargar_archivo_ftp(nombre_archivo, ruta_destino)
+        finally:
+            conexion_ftp.fn_desconecta()
+        return dict(dic_retorno_descarga_ftp, bytes=fn_leer_contadores().get('ftp_descarga', 0) - bytes_previos)
+
+    def fn_eliminar_lote_ftp(self):
+        """
+        Elimina del FTP los archivos del último lote descargado, o los del registro del lote si se reanuda.
+        Retorna True si se eliminaron todos, False en caso contrario.
+        Registra los errores en el log.
+        """
+        obj_lote = LoteArchivos(config.RUTA_GUARDAR_ARCHIVO)
+        archivos = self.archivos_lote or obj_lote.fn_leer()
+        if not archivos:
+            crea_log('Error - No hay registro de los archivos del lote a eliminar del FTP.\n')
+            return False
+
+        if not self.fn_conexion_ftp():
+            return False
+        inicio = time.perf_counter()
+        pendientes = []
+        errores = []
+        for nombre in archivos:
+            dic_retorno_eliminar_archivo_ftp = self.__conexion_ftp.fn_eliminar_archivo_ftp(nombre)
+            if not dic_retorno_eliminar_archivo_ftp['exito']:
+                pendientes.append(nombre)
+                errores.append(f"{nombre}: {dic_retorno_eliminar_archivo_ftp['error']}")
+        self.__conexion_ftp.fn_desconecta()
+        self.tiempos['eliminacion'] = round(time.perf_counter() - inicio, 4)
+
+        if errores:
+            #Solo quedan en el registro los que no se pudieron eliminar
+            obj_lote.fn_guardar(pendientes)
+            self.archivos_lote = pendientes
+            crea_log(f"Error - Error al eliminar archivos del lote en el ftp: {'; '.join(errores)}")
+            return False
+        obj_lote.fn_eliminar()
+        self.archivos_lote = []
+        return True
+
     def fn_cargar_archivo_ftp(self):
         """
         Carga el archivo especificado al servidor FTP.
@@ -146,9 +418,15 @@ class GestionFTP:
         """
         if self.fn_conexion_ftp():
 
+            inicio = time.perf_counter()
+            bytes_previos = fn_leer_contadores().get('ftp_carga', 0)
             dic_retorno_cargar_archivo = self.__conexion_ftp.fn_cargar_archivo_ftp()
             if dic_retorno_cargar_archivo['exito']:
-                crea_log(f'Se carga correctamente el archivo al FTP')
+                bytes_cargados = fn_leer_contadores().get('ftp_carga', 0) - bytes_previos
+                self.tiempos['carga'] = round(time.perf_counter() - inicio, 4)
+                crea_log(f'Se carga correctamente el archivo al FTP ({bytes_cargados} bytes)'
+                         ,etapa='carga_ftp'
+                         ,duracion=self.tiempos['carga'])
                 self.__conexion_ftp.fn_desconecta()
                 return True
             else:
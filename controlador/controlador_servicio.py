@@ -0,0 +1,262 @@
+"""
+Módulo controlador_servicio.py
+
+Este módulo define la clase ControladorServicio, que ejecuta el proceso como servicio de larga duración
+(python main.py --servicio): consulta el FTP cada INTERVALO_SONDEO_FTP segundos y ejecuta el flujo principal
+cuando aparece un archivo nuevo, sin pagar en cada ejecución el arranque del ejecutable, la importación de pandas y
+pyodbc ni la carga del .env.
+
+Clases:
+-------
+ControladorServicio
+    - fn_ejecutar_servicio(): Ciclo del servicio; retorna cuando se solicita detenerlo.
+    - fn_solicitar_ejecucion(): Fuerza una ejecución sin esperar un archivo nuevo.
+    - fn_detener(): Detiene el servicio al terminar la ejecución en curso.
+    - fn_estado(): Estado del servicio (ejecución en curso, última ejecución, archivo conocido).
+
+Control local:
+--------------
+Si PUERTO_CONTROL_SERVICIO es distinto de 0 se atiende HTTP en 127.0.0.1:
+- GET  /estado    -> Estado del servicio en JSON.
+- POST /ejecutar  -> Fuerza una ejecución (202).
+En sistemas con señales POSIX, SIGUSR1 fuerza una ejecución y SIGTERM/SIGINT detienen el servicio.
+
+Dependencias:
+-------------
+- GestionFTP: Consulta del archivo en el FTP con una sesión que queda abierta entre consultas.
+- ControladorGestionCorreos: Correos de cada ejecución, con la conexión SMTP abierta entre ejecuciones.
+- fn_iniciar_ejecucion: Nuevo id de ejecución y registros en memoria limpios para cada ejecución.
+- crea_log: Registro de eventos del servicio (etapa 'servicio').
+- config: INTERVALO_SONDEO_FTP, PUERTO_CONTROL_SERVICIO.
+
+Notas:
+------
+- Un archivo se procesa cuando su firma (tamaño y fecha de modificación) es distinta de la del último archivo
+  visto y se repite en dos consultas seguidas, para no descargarlo mientras todavía se está escribiendo.
+- Después de cada ejecución exitosa se toma como conocida la firma del archivo que queda en el FTP, así el archivo
+  cargado por el proceso (si tiene el mismo nombre que el de descarga) no dispara otra ejecución. Si la ejecución
+  falla la firma conocida no cambia y el archivo que sigue en el FTP se vuelve a procesar.
+- El servicio crea una sola vez los controladores de FTP y correo y los pasa a cada ejecución: la sesión de sondeo
+  del FTP y la conexión SMTP no se abren de nuevo en cada ejecución. La conexión SMTP se cierra al detenerlo.
+- Las ejecuciones nunca se solapan: las solicitudes que llegan durante una ejecución se atienden al terminar.
+- Las conexiones a SQL Server quedan en el pool del administrador ODBC (pyodbc.pooling) entre ejecuciones, y los
+  módulos cargados en la primera ejecución no se vuelven a importar.
+- El pico de memoria que se reporta por ejecución es el del proceso desde que inició el servicio.
+"""
+import datetime
+import json
+import signal
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import config
+from controlador.controlador_gestion_correos import ControladorGestionCorreos
+from controlador.controlador_gestion_ftp import GestionFTP
+from vista.crear_log import crea_log
+from vista.registro_log import fn_iniciar_ejecucion
+
+
+class ControladorServicio:
+    """
+    Ejecución del flujo principal como servicio con sondeo del FTP y control local.
+    """
+    def __init__(self, fn_ejecutar):
+        """
+        Parameters:
+        -----------
+        fn_ejecutar : callable
+            Flujo principal a ejecutar (main.main); recibe obj_gestion_ftp y obj_gestion_correos y retorna True si
+            la ejecución terminó bien.
+        """
+        self.__fn_ejecutar = fn_ejecutar
+        self.__intervalo = config.INTERVALO_SONDEO_FTP
+        self.__puerto = config.PUERTO_CONTROL_SERVICIO
+        self.__obj_gestion_ftp = GestionFTP()
+        self.__obj_gestion_correos = ControladorGestionCorreos()
+        self.__solicitud = threading.Event()
+        self.__detenido = threading.Event()
+        self.__bloqueo = threading.Lock()
+        self.__servidor_control = None
+        self.__estado = {'inicio': None
+                         ,'en_ejecucion': False
+                         ,'ejecuciones': 0
+                         ,'ultima_ejecucion': None
+                         ,'archivo_conocido': None
+                         ,'error_ftp': None}
+
+    def fn_solicitar_ejecucion(self):
+        """Fuerza una ejecución en cuanto termine la espera o la ejecución en curso."""
+        self.__solicitud.set()
+
+    def fn_detener(self):
+        """Detiene el servicio; si hay una ejecución en curso se espera a que termine."""
+        self.__detenido.set()
+        self.__solicitud.set()
+
+    def fn_estado(self):
+        """
+        Retorna el estado del servicio.
+
+        Returns:
+        --------
+        dict: {'inicio', 'en_ejecucion', 'ejecuciones', 'ultima_ejecucion', 'archivo_conocido', 'error_ftp'}
+        """
+        with self.__bloqueo:
+            return dict(self.__estado)
+
+    def __actualizar_estado(self, **valores):
+        with self.__bloqueo:
+            self.__estado.update(valores)
+
+    def __iniciar_control(self):
+        """Levanta el control HTTP local si PUERTO_CONTROL_SERVICIO está configurado."""
+        if not self.__puerto:
+            return
+        servicio = self
+
+        class ManejadorControl(BaseHTTPRequestHandler):
+            def __responder(self, codigo, cuerpo):
+                contenido = json.dumps(cuerpo, default=str).encode('utf-8')
+                self.send_response(codigo)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(contenido)))
+                self.end_headers()
+                self.wfile.write(contenido)
+
+            def do_GET(self):
+                if self.path == '/estado':
+                    self.__responder(200, servicio.fn_estado())
+                else:
+                    self.__responder(404, {'error': 'Ruta no encontrada'})
+
+            def do_POST(self):
+                if self.path == '/ejecutar':
+                    servicio.fn_solicitar_ejecucion()
+                    self.__responder(202, {'solicitada': True})
+                else:
+                    self.__responder(404, {'error': 'Ruta no encontrada'})
+
+            def log_message(self, formato, *args):
+                #Las peticiones de control no se registran en el log del proceso
+                pass
+
+        self.__servidor_control = ThreadingHTTPServer(('127.0.0.1', self.__puerto), ManejadorControl)
+        threading.Thread(target=self.__servidor_control.serve_forever
+                         ,name='control_servicio'
+                         ,daemon=True).start()
+
+    def __registrar_senales(self):
+        """SIGUSR1 fuerza una ejecución; SIGTERM y SIGINT detienen el servicio (solo en el hilo principal)."""
+        if threading.current_thread() is not threading.main_thread():
+            return
+        if hasattr(signal, 'SIGUSR1'):
+            signal.signal(signal.SIGUSR1, lambda senal, marco: self.fn_solicitar_ejecucion())
+        signal.signal(signal.SIGTERM, lambda senal, marco: self.fn_detener())
+        signal.signal(signal.SIGINT, lambda senal, marco: self.fn_detener())
+
+    def __consultar_archivo(self):
+        """
+        Retorna la firma del archivo en el FTP (None si no hay archivo) o False si la consulta falló.
+        Registra en el log solo el primer error y la recuperación, no cada consulta.
+        """
+        dic_retorno = self.__obj_gestion_ftp.fn_consultar_archivo_ftp()
+        error_previo = self.fn_estado()['error_ftp']
+        if not dic_retorno['exito']:
+            #Algunas excepciones de ftplib (EOFError al cerrarse la sesión) no traen mensaje
+            error = str(dic_retorno['error']) or type(dic_retorno['error']).__name__
+            if error_previo is None:
+                crea_log(f'Error - Servicio: falló la consulta del archivo en el FTP: {error}', etapa='servicio')
+            self.__actualizar_estado(error_ftp=error)
+            return False
+        if error_previo is not None:
+            crea_log('Servicio: la consulta del archivo en el FTP se recuperó', etapa='servicio')
+            self.__actualizar_estado(error_ftp=None)
+        return dic_retorno['data']
+
+    def __ejecutar(self, motivo):
+        """
+        Ejecuta el flujo principal con un id de ejecución nuevo; un error no detiene el servicio.
+        Retorna True si la ejecución terminó bien.
+        """
+        id_ejecucion = fn_iniciar_ejecucion()
+        self.__actualizar_estado(en_ejecucion=True)
+        crea_log(f'Servicio: inicia la ejecución ({motivo})', etapa='servicio')
+        inicio = time.perf_counter()
+        error = None
+        exito = False
+        try:
+            exito = bool(self.__fn_ejecutar(obj_gestion_ftp=self.__obj_gestion_ftp
+                                            ,obj_gestion_correos=self.__obj_gestion_correos))
+        except Exception as ex:
+            error = str(ex)
+            crea_log(f'Error - Servicio: la ejecución terminó con una excepción: {ex}', etapa='servicio')
+        segundos = round(time.perf_counter() - inicio, 4)
+        crea_log(f'Servicio: termina la ejecución ({motivo})', etapa='servicio', duracion=segundos)
+
+        with self.__bloqueo:
+            self.__estado['en_ejecucion'] = False
+            self.__estado['ejecuciones'] += 1
+            self.__estado['ultima_ejecucion'] = {'id_ejecucion': id_ejecucion
+                                                 ,'motivo': motivo
+                                                 ,'fin': datetime.datetime.now().isoformat(timespec='seconds')
+                                                 ,'segundos': segundos
+                                                 ,'exito': exito
+                                                 ,'error': error}
+        return exito
+
+    def fn_ejecutar_servicio(self):
+        """
+        Ciclo del servicio: espera INTERVALO_SONDEO_FTP segundos o una solicitud, consulta el archivo y ejecuta
+        el flujo principal si corresponde. Retorna cuando se llama fn_detener (o llega SIGTERM/SIGINT).
+        """
+        self.__actualizar_estado(inicio=datetime.datetime.now().isoformat(timespec='seconds'))
+        self.__registrar_senales()
+        self.__iniciar_control()
+        crea_log(f'Servicio: iniciado (consulta del FTP cada {self.__intervalo:g} s'
+                 + (f', control en 127.0.0.1:{self.__puerto})' if self.__puerto else ')')
+                 ,etapa='servicio')
+
+        archivo_conocido = None
+        archivo_pendiente = None
+        #La primera consulta se hace sin esperar: un archivo que ya está en el FTP se procesa al iniciar
+        esperar = 0
+        try:
+            while not self.__detenido.is_set():
+                forzada = self.__solicitud.wait(esperar)
+                esperar = self.__intervalo
+                if self.__detenido.is_set():
+                    break
+
+                if forzada:
+                    self.__solicitud.clear()
+                    motivo = 'solicitud'
+                else:
+                    firma = self.__consultar_archivo()
+                    if firma is False:
+                        continue
+                    if firma is None or firma == archivo_conocido:
+                        archivo_pendiente = None
+                        continue
+                    if firma != archivo_pendiente:
+                        #Se espera otra consulta con la misma firma: el archivo puede estar escribiéndose
+                        archivo_pendiente = firma
+                        continue
+                    motivo = 'archivo nuevo'
+
+                exito = self.__ejecutar(motivo)
+                archivo_pendiente = None
+                if not exito:
+                    #El archivo sigue en el FTP sin procesar: se vuelve a tomar en las siguientes consultas
+                    continue
+
+                firma = self.__consultar_archivo()
+                archivo_conocido = firma if firma is not False else archivo_conocido
+                self.__actualizar_estado(archivo_conocido=archivo_conocido)
+        finally:
+            if self.__servidor_control is not None:
+                self.__servidor_control.shutdown()
+                self.__servidor_control.server_close()
+            self.__obj_gestion_ftp.fn_cerrar_sondeo()
+            self.__obj_gestion_correos.fn_finalizar()
+            crea_log('Servicio: detenido', etapa='servicio')
@@ -0,0 +1,104 @@
+"""
+Módulo controlador_verificacion_previa.py
+
+Este módulo define la clase ControladorVerificacionPrevia, que antes de descargar el archivo verifica en paralelo
+las tres dependencias externas del proceso y mide la latencia de cada una.
+
+Clases:
+-------
+ControladorVerificacionPrevia
+    - fn_verificar(obj_gestion_ftp, obj_gestion_correos): Verifica SQL Server, FTP y SMTP al mismo tiempo, dentro de
+      TIEMPO_VERIFICACION_PREVIA segundos, y registra en el log el resultado y la latencia de cada uno.
+
+Verificaciones:
+---------------
+- sql: inicio de sesión ODBC y SELECT 1 (o el backend configurado en BACKEND_SQL).
+- ftp: inicio de sesión y cambio a la ruta del archivo (RUTA_FTP o la consultada en la base).
+- smtp: EHLO, STARTTLS y login con una conexión aparte de la de envío.
+
+Notas:
+------
+- El presupuesto de tiempo es para las tres juntas; una verificación que no termina a tiempo cuenta como fallida.
+  Cada conexión usa el mismo presupuesto como tiempo de espera, así los hilos que no terminaron se cierran solos.
+- Las latencias quedan en el atributo tiempos (segundos por servicio) para el historial de ejecuciones.
+"""
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+
+import config
+from modelo.fabrica_consultas import fn_crear_consultas_sql
+from vista.crear_log import crea_log
+
+
+class ControladorVerificacionPrevia:
+    """
+    Verificación previa en paralelo de SQL Server, FTP y SMTP.
+    """
+    def __init__(self):
+        self.__tiempo_limite = config.TIEMPO_VERIFICACION_PREVIA
+        #Segundos de la última verificación de cada servicio
+        self.tiempos = {}
+
+    def __medir(self, fn_verificacion):
+        """Ejecuta una verificación y agrega su duración al resultado."""
+        inicio = time.perf_counter()
+        try:
+            resultado = fn_verificacion()
+        except Exception as ex:
+            resultado = {'exito': False, 'error': ex}
+        return dict(resultado, segundos=round(time.perf_counter() - inicio, 4))
+
+    def fn_verificar(self, obj_gestion_ftp, obj_gestion_correos):
+        """
+        Verifica las tres dependencias en paralelo.
+
+        Parameters:
+        -----------
+        obj_gestion_ftp : GestionFTP
+        obj_gestion_correos : ControladorGestionCorreos
+
+        Returns:
+        --------
+        dict: {'exito': bool, 'data': {servicio: {'exito', 'error', 'segundos'}}, 'error': servicios fallidos o None}
+        """
+        tiempo_limite = self.__tiempo_limite
+        verificaciones = {
+            'sql': lambda: fn_crear_consultas_sql().fn_verificar_conexion(tiempo_limite),
+            'ftp': lambda: obj_gestion_ftp.fn_verificar_conexion(tiempo_limite),
+            'smtp': lambda: obj_gestion_correos.fn_verificar_smtp(tiempo_limite),
+        }
+
+        ejecutor = ThreadPoolExecutor(max_workers=len(verificaciones)
+                                      ,thread_name_prefix='verificacion_previa')
+        try:
+            futuros = {servicio: ejecutor.submit(self.__medir, verificacion)
+                       for servicio, verificacion in verificaciones.items()}
+            wait(futuros.values(), timeout=tiempo_limite)
+        finally:
+            #No se espera a las verificaciones colgadas: terminan solas con su tiempo de espera
+            ejecutor.shutdown(wait=False, cancel_futures=True)
+
+        resultados = {}
+        for servicio, futuro in futuros.items():
+            if futuro.done():
+                resultados[servicio] = futuro.result()
+            else:
+                resultados[servicio] = {'exito': False
+                                        ,'error': f'Sin respuesta en {tiempo_limite} s'
+                                        ,'segundos': tiempo_limite}
+
+        for servicio, resultado in resultados.items():
+            self.tiempos[servicio] = resultado['segundos']
+            if resultado['exito']:
+                crea_log(f'Verificación previa {servicio}: disponible'
+                         ,etapa='verificacion_previa'
+                         ,duracion=resultado['segundos'])
+            else:
+                crea_log(f"Error - Verificación previa {servicio}: {resultado['error']}"
+                         ,etapa='verificacion_previa'
+                         ,duracion=resultado['segundos'])
+
+        fallidos = [servicio for servicio, resultado in resultados.items() if not resultado['exito']]
+        return {'exito': not fallidos
+                ,'data': resultados
+                ,'error': ', '.join(fallidos) if fallidos else None}
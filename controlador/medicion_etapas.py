@@ -0,0 +1,196 @@
+"""
+Módulo medicion_etapas.py
+
+Este módulo define la clase MedicionEtapas, que mide cada etapa del pipeline de ControladorGestionArchivoCmdm
+y al final de la ejecución registra un resumen en el log.
+
+Clases:
+-------
+MedicionEtapas
+    - Mide por etapa: tiempo real, tiempo de CPU, incremento del pico de memoria (RSS), memoria Python
+      (tracemalloc, opcional), filas de entrada y salida, y bytes movidos con la base de datos y el FTP.
+    - Al finalizar registra la tabla resumen, el registro JSON de la ejecución y las etapas más lentas.
+
+Dependencias:
+-------------
+- resource / psutil (opcionales): Pico de memoria del proceso. Si ninguno está disponible se reporta None.
+- tracemalloc: Pico de memoria reservada por Python, si TRACEMALLOC_ETAPAS está activo.
+- contadores_io: Bytes enviados y recibidos por hilo.
+- config: TRACEMALLOC_ETAPAS, RUTA_METRICAS_ETAPAS, ETAPAS_MAS_LENTAS.
+
+Notas:
+------
+- Las filas de entrada son las filas de los DataFrames que la etapa declara leer del contexto (@etapa);
+  las de salida, las de los DataFrames que declara escribir.
+- Las etapas pueden ejecutarse en paralelo: el tiempo de CPU y los bytes se miden por hilo, pero el pico de
+  memoria (RSS y tracemalloc) es del proceso y puede incluir lo reservado por etapas simultáneas.
+- El registro JSON se agrega a RUTA_METRICAS_ETAPAS (una línea por ejecución) si está configurada.
+"""
+import datetime
+import json
+import sys
+import time
+import tracemalloc
+
+import pandas as pd
+
+import config
+from modelo.contadores_io import fn_leer_contadores
+from vista.crear_log import crea_log
+from vista.registro_log import fn_id_ejecucion
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+TIPOS_BYTES = ('bd_envio', 'bd_recepcion', 'ftp_descarga', 'ftp_carga')
+
+
+def fn_memoria_pico():
+    """
+    Retorna el pico de memoria residente del proceso en bytes, o None si no se puede obtener.
+    """
+    if resource is not None:
+        pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        #En Linux ru_maxrss está en KB; en macOS en bytes
+        return pico if sys.platform == 'darwin' else pico * 1024
+    if psutil is not None:
+        memoria = psutil.Process().memory_info()
+        return getattr(memoria, 'peak_wset', memoria.rss)
+    return None
+
+
+def fn_contar_filas(ctx, claves):
+    """
+    Suma las filas de los DataFrames del contexto en las claves indicadas.
+    """
+    valores = (ctx.get(clave) for clave in claves)
+    return sum(len(valor) for valor in valores if isinstance(valor, pd.DataFrame))
+
+
+class MedicionEtapas:
+    """
+    Mide las etapas de una ejecución del pipeline y registra el resumen.
+    """
+    def __init__(self, usar_tracemalloc = False):
+        """
+        Parameters:
+        -----------
+        usar_tracemalloc : bool
+            Si es True mide también el pico de memoria reservada por Python en cada etapa (más lento).
+        """
+        self.__usar_tracemalloc = usar_tracemalloc
+        self.__inicio_tracemalloc = False
+        if usar_tracemalloc and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self.__inicio_tracemalloc = True
+
+        self.__inicio = time.perf_counter()
+        self.__fecha_inicio = datetime.datetime.now().isoformat(timespec='seconds')
+        self.etapas = []
+
+    def fn_medir(self, paso, ctx):
+        """
+        Ejecuta una etapa y registra sus métricas, también si la etapa lanza una excepción.
+
+        Parameters:
+        -----------
+        paso : callable
+            Etapa del pipeline; recibe el contexto y retorna {"ok": bool, ...}.
+        ctx : dict
+
+        Returns:
+        --------
+        dict: Resultado de la etapa.
+        """
+        contadores_previos = fn_leer_contadores()
+        memoria_previa = fn_memoria_pico()
+        if self.__usar_tracemalloc:
+            tracemalloc.reset_peak()
+            memoria_python_previa = tracemalloc.get_traced_memory()[0]
+        inicio = time.perf_counter()
+        cpu_inicio = time.thread_time()
+
+        res = {"ok": False, "error": "Excepción no controlada"}
+        try:
+            res = paso(ctx)
+            return res
+        finally:
+            segundos = time.perf_counter() - inicio
+            cpu = time.thread_time() - cpu_inicio
+            memoria = fn_memoria_pico()
+            contadores = fn_leer_contadores()
+
+            metrica = {'etapa': paso.__name__
+                       ,'ok': bool(res.get("ok"))
+                       ,'inicio_relativo': round(inicio - self.__inicio, 4)
+                       ,'segundos': round(segundos, 4)
+                       ,'cpu_segundos': round(cpu, 4)
+                       ,'rss_pico_delta': (memoria - memoria_previa) if memoria is not None else None
+                       ,'memoria_python_pico': None
+                       ,'filas_entrada': fn_contar_filas(ctx, getattr(paso, 'lee', ()))
+                       ,'filas_salida': fn_contar_filas(ctx, getattr(paso, 'escribe', ()))}
+            if self.__usar_tracemalloc:
+                metrica['memoria_python_pico'] = tracemalloc.get_traced_memory()[1] - memoria_python_previa
+            for tipo in TIPOS_BYTES:
+                metrica[f'bytes_{tipo}'] = contadores.get(tipo, 0) - contadores_previos.get(tipo, 0)
+
+            self.etapas.append(metrica)
+
+    def fn_tabla_resumen(self):
+        """
+        Retorna la tabla de métricas por etapa como texto.
+        """
+        def mb(valor):
+            return f'{valor / 1048576:.1f}' if valor is not None else '-'
+
+        lineas = [f"{'Etapa':<28}{'Seg':>9}{'CPU':>9}{'Filas ent':>11}{'Filas sal':>11}"
+                  f"{'RSS MB':>9}{'BD env KB':>11}{'BD rec KB':>11}"]
+        for metrica in self.etapas:
+            lineas.append(f"{metrica['etapa']:<28}{metrica['segundos']:>9.3f}{metrica['cpu_segundos']:>9.3f}"
+                          f"{metrica['filas_entrada']:>11}{metrica['filas_salida']:>11}"
+                          f"{mb(metrica['rss_pico_delta']):>9}"
+                          f"{metrica['bytes_bd_envio'] / 1024:>11.1f}{metrica['bytes_bd_recepcion'] / 1024:>11.1f}")
+        return '\n'.join(lineas)
+
+    def fn_finalizar(self):
+        """
+        Registra en el log la tabla resumen, el registro JSON y las etapas más lentas.
+
+        Returns:
+        --------
+        dict: Registro de la ejecución {'id_ejecucion', 'inicio', 'segundos_total', 'exito', 'etapas'}.
+        """
+        if self.__inicio_tracemalloc:
+            tracemalloc.stop()
+
+        total = round(time.perf_counter() - self.__inicio, 4)
+        registro = {'id_ejecucion': fn_id_ejecucion()
+                    ,'inicio': self.__fecha_inicio
+                    ,'segundos_total': total
+                    ,'exito': all(metrica['ok'] for metrica in self.etapas)
+                    ,'etapas': self.etapas}
+
+        crea_log(f'Resumen de etapas\n{self.fn_tabla_resumen()}', etapa='resumen_etapas', duracion=total)
+        crea_log(json.dumps(registro, ensure_ascii=False), etapa='metricas_etapas', duracion=total)
+
+        lentas = sorted(self.etapas, key=lambda metrica: metrica['segundos'], reverse=True)[:config.ETAPAS_MAS_LENTAS]
+        crea_log('Etapas más lentas: ' + ', '.join(f"{metrica['etapa']} ({metrica['segundos']:.3f} s)"
+                                                     for metrica in lentas)
+                 ,etapa='resumen_etapas'
+                 ,duracion=total)
+
+        if config.RUTA_METRICAS_ETAPAS:
+            try:
+                with open(config.RUTA_METRICAS_ETAPAS, 'a', encoding='utf-8') as archivo:
+                    archivo.write(json.dumps(registro, ensure_ascii=False) + '\n')
+            except OSError as ex:
+                crea_log(f'Error - No fue posible guardar las métricas de etapas: {ex}')
+
+        return registro
@@ -0,0 +1,103 @@
+"""
+Módulo perfil_arranque.py
+
+Este módulo mide el tiempo de importación de los módulos que usa una ejecución (python main.py --perfil-arranque),
+con el mismo desglose que python -X importtime pero dentro del proceso, así funciona también en el ejecutable
+empaquetado con PyInstaller, donde las opciones -X del intérprete no están disponibles.
+
+Funciones:
+----------
+- fn_perfil_importaciones(modulos): Importa los módulos midiendo cada importación (tiempo propio y acumulado).
+- fn_reporte_arranque(perfil, limite): Retorna el desglose como texto.
+
+Notas:
+------
+- Durante la medición se reemplaza _find_and_load del sistema de importación, el mismo punto que mide -X importtime;
+  al terminar se restaura.
+- Solo se miden los módulos que no estaban importados: el perfil debe tomarse en un proceso nuevo.
+- El tiempo propio de un módulo excluye el de los módulos que importa; el acumulado los incluye.
+"""
+import importlib
+import sys
+import time
+
+
+def fn_perfil_importaciones(modulos):
+    """
+    Importa los módulos indicados midiendo cada importación que ocurre mientras tanto.
+
+    Parameters:
+    -----------
+    modulos : iterable de str
+        Módulos a importar, en orden.
+
+    Returns:
+    --------
+    dict: {'segundos': tiempo total, 'modulos': [{'modulo', 'nivel', 'propio', 'acumulado'}] en orden de
+           finalización (como -X importtime)}
+    """
+    sistema_importacion = sys.modules['_frozen_importlib']
+    find_and_load = sistema_importacion._find_and_load
+    pila = []
+    medidos = []
+
+    def fn_medir(nombre, *argumentos):
+        pila.append(0.0)
+        inicio = time.perf_counter()
+        try:
+            return find_and_load(nombre, *argumentos)
+        finally:
+            acumulado = time.perf_counter() - inicio
+            hijos = pila.pop()
+            if pila:
+                pila[-1] += acumulado
+            medidos.append({'modulo': nombre
+                            ,'nivel': len(pila)
+                            ,'propio': acumulado - hijos
+                            ,'acumulado': acumulado})
+
+    inicio = time.perf_counter()
+    sistema_importacion._find_and_load = fn_medir
+    try:
+        for modulo in modulos:
+            importlib.import_module(modulo)
+    finally:
+        sistema_importacion._find_and_load = find_and_load
+
+    return {'segundos': time.perf_counter() - inicio, 'modulos': medidos}
+
+
+def fn_reporte_arranque(perfil, limite = 30):
+    """
+    Retorna el desglose del perfil de importaciones.
+
+    Parameters:
+    -----------
+    perfil : dict
+        Resultado de fn_perfil_importaciones.
+    limite : int
+        Módulos a listar (los de mayor tiempo acumulado).
+
+    Returns:
+    --------
+    str: Total, tiempo por paquete raíz y los módulos más costosos.
+    """
+    medidos = perfil['modulos']
+    lineas = [f"Importaciones: {perfil['segundos']:.3f} s, {len(medidos)} módulos"]
+
+    paquetes = {}
+    for medido in medidos:
+        raiz = medido['modulo'].split('.')[0]
+        paquetes[raiz] = paquetes.get(raiz, 0.0) + medido['propio']
+    lineas.append('')
+    lineas.append(f"{'Paquete':<40}{'ms':>10}{'%':>7}")
+    for raiz, segundos in sorted(paquetes.items(), key=lambda par: par[1], reverse=True)[:limite]:
+        porcentaje = 100 * segundos / perfil['segundos'] if perfil['segundos'] else 0.0
+        lineas.append(f'{raiz:<40}{segundos * 1000:>10.1f}{porcentaje:>7.1f}')
+
+    lineas.append('')
+    lineas.append(f"{'Propio ms':>10}{'Acumulado ms':>14}  Módulo")
+    for medido in sorted(medidos, key=lambda medido: medido['acumulado'], reverse=True)[:limite]:
+        lineas.append(f"{medido['propio'] * 1000:>10.1f}{medido['acumulado'] * 1000:>14.1f}  "
+                      f"{'  ' * medido['nivel']}{medido['modulo']}")
+    return '\n'.join(lineas)
@@ -0,0 +1,190 @@
+"""
+Módulo planificador_etapas.py
+
+Este módulo ejecuta las etapas del pipeline CMDM en paralelo respetando sus dependencias.
+Cada etapa declara qué claves del contexto lee y escribe; a partir de esas declaraciones se arma un grafo
+de dependencias (DAG) y las etapas independientes se ejecutan a la vez en un pool de hilos.
+
+Funciones:
+----------
+- etapa(lee, escribe, efecto): Decorador que declara las claves que lee y escribe una etapa.
+
+Clases:
+-------
+PlanificadorEtapas
+    - Arma el DAG a partir del orden declarado de las etapas y de sus lecturas y escrituras.
+    - Ejecuta las etapas listas en un ThreadPoolExecutor de HILOS_PIPELINE hilos; con un hilo, en el hilo que llama.
+    - Ante la primera falla deja de lanzar etapas, espera las que están en curso y reporta la falla
+      de la etapa declarada primero entre las ejecutadas, como el recorrido secuencial.
+
+Notas:
+------
+- Una etapa depende de cualquier etapa declarada antes que escriba una clave que ella lee (lectura tras escritura),
+  que lea una clave que ella escribe (escritura tras lectura) o que escriba la misma clave (escritura tras escritura).
+- Los efectos fuera del contexto (tablas, archivos) se declaran con claves ficticias, por ejemplo 'tabla_delta'.
+- Las etapas con efecto=True (escrituras en base de datos o archivos) esperan a que terminen con éxito todas las
+  etapas declaradas antes, para que una falla no deje más cambios que la ejecución secuencial.
+- Con un solo hilo las etapas se ejecutan exactamente en el orden declarado, en el hilo que llama y sin pool (así
+  cProfile, que antes de Python 3.12 solo mide el hilo en que se activa, mide las etapas).
+"""
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+
+
+def etapa(lee = (), escribe = (), efecto = False):
+    """
+    Declara las claves del contexto que lee y escribe una etapa del pipeline.
+
+    Parameters:
+    -----------
+    lee : tuple
+        Claves del contexto (o recursos ficticios) que la etapa lee.
+    escribe : tuple
+        Claves del contexto (o recursos ficticios) que la etapa escribe o modifica.
+    efecto : bool
+        True si la etapa modifica la base de datos o archivos.
+    """
+    def decorador(funcion):
+        funcion.lee = frozenset(lee)
+        funcion.escribe = frozenset(escribe)
+        funcion.efecto = efecto
+        return funcion
+    return decorador
+
+
+class PlanificadorEtapas:
+    """
+    Ejecuta etapas declaradas con @etapa según sus dependencias.
+    """
+    def __init__(self, pasos, hilos):
+        """
+        Parameters:
+        -----------
+        pasos : list
+            Etapas en el orden declarado; el orden define cómo se resuelven los conflictos de claves.
+        hilos : int
+            Número máximo de etapas ejecutándose a la vez.
+        """
+        self.__pasos = pasos
+        self.__hilos = max(1, hilos)
+        self.dependencias = self.__construir_dependencias()
+
+    def __construir_dependencias(self):
+        """Retorna, por cada etapa, el conjunto de índices de las etapas de las que depende."""
+        dependencias = []
+        for i, paso in enumerate(self.__pasos):
+            previas = set()
+            for j in range(i):
+                anterior = self.__pasos[j]
+                if (paso.efecto
+                        or anterior.escribe & paso.lee
+                        or anterior.lee & paso.escribe
+                        or anterior.escribe & paso.escribe):
+                    previas.add(j)
+            dependencias.append(previas)
+        return dependencias
+
+    def fn_ejecutar(self, ctx, ejecutar_paso, completadas = ()):
+        """
+        Ejecuta las etapas.
+
+        Parameters:
+        -----------
+        ctx : dict
+            Contexto compartido por las etapas.
+        ejecutar_paso : callable
+            Función (paso, ctx) -> {"ok": bool, ...} que ejecuta una etapa (permite medirla).
+        completadas : iterable
+            Nombres de etapas ya completadas en una ejecución anterior (reanudación); no se vuelven a ejecutar.
+
+        Returns:
+        --------
+        tuple: (None, None) si todas las etapas terminaron bien; (paso, resultado) de la primera etapa
+        declarada que falló en caso contrario. Si esa etapa lanzó una excepción, se propaga.
+        """
+        completadas = set(completadas)
+        hechas = {i for i, paso in enumerate(self.__pasos) if paso.__name__ in completadas}
+        if self.__hilos == 1:
+            return self.__ejecutar_en_orden(ctx, ejecutar_paso, hechas)
+
+        pendientes = {i: previas - hechas for i, previas in enumerate(self.dependencias) if i not in hechas}
+        en_curso = {}
+        fallas = {}
+
+        with ThreadPoolExecutor(max_workers=self.__hilos
+                                ,thread_name_prefix='etapa_cmdm') as ejecutor:
+            while pendientes or en_curso:
+                if not fallas:
+                    listas = sorted(i for i, previas in pendientes.items() if not previas)
+                    for i in listas[:self.__hilos - len(en_curso)]:
+                        del pendientes[i]
+                        en_curso[ejecutor.submit(ejecutar_paso, self.__pasos[i], ctx)] = i
+
+                if not en_curso:
+                    break
+
+                terminadas, _ = wait(en_curso, return_when=FIRST_COMPLETED)
+                for futuro in terminadas:
+                    i = en_curso.pop(futuro)
+                    try:
+                        res = futuro.result()
+                    except Exception as ex:
+                        fallas[i] = ex
+                        continue
+                    if not res["ok"]:
+                        fallas[i] = res
+                        continue
+                    for previas in pendientes.values():
+                        previas.discard(i)
+
+        if not fallas:
+            return None, None
+
+        primera = min(fallas)
+        if isinstance(fallas[primera], Exception):
+            raise fallas[primera]
+        return self.__pasos[primera], fallas[primera]
+
+    def __ejecutar_en_orden(self, ctx, ejecutar_paso, hechas):
+        """Ejecuta las etapas una tras otra en el orden declarado, en el hilo que llama; se detiene en la primera falla."""
+        for i, paso in enumerate(self.__pasos):
+            if i in hechas:
+                continue
+            res = ejecutar_paso(paso, ctx)
+            if not res["ok"]:
+                return paso, res
+        return None, None
+
+    def fn_ruta_critica(self, segundos):
+        """
+        Calcula la ruta crítica del DAG con las duraciones medidas.
+
+        Parameters:
+        -----------
+        segundos : dict
+            {nombre_etapa: segundos}
+
+        Returns:
+        --------
+        tuple: (segundos de la ruta crítica, lista de nombres de etapas en la ruta)
+        """
+        fin = {}
+        anterior = {}
+        for i, paso in enumerate(self.__pasos):
+            inicio = 0.0
+            for j in self.dependencias[i]:
+                if j in fin and fin[j] > inicio:
+                    inicio = fin[j]
+                    anterior[i] = j
+            if paso.__name__ in segundos:
+                fin[i] = inicio + segundos[paso.__name__]
+
+        if not fin:
+            return 0.0, []
+
+        actual = max(fin, key=fin.get)
+        total = fin[actual]
+        ruta = [self.__pasos[actual].__name__]
+        while actual in anterior:
+            actual = anterior[actual]
+            ruta.append(self.__pasos[actual].__name__)
+        return total, list(reversed(ruta))
@@ -9,9 +9,13 @@ Dependencias:
 - GestionFTP: Clase para la gestión de operaciones con el servidor FTP (descarga, eliminación, carga).
 - ControladorGestionCorreos: Clase para la gestión y envío de correos electrónicos de modificaciones y errores.
 - ControladorGestionArchivoCmdm: Clase para el procesamiento y generación de archivos CMDM.
+- ControladorVerificacionPrevia: Verificación en paralelo de SQL Server, FTP y SMTP antes de empezar.
+- ControladorServicio: Ejecución como servicio, con sondeo del FTP y control local (--servicio).
 
 Flujo principal:
 ----------------
+0. Con VERIFICACION_PREVIA verifica en paralelo SQL Server, FTP y SMTP; si alguno falla termina antes de descargar
+   (y envía el correo de error si el SMTP responde).
 1. Descarga el archivo CMDM desde el servidor FTP.
 2. Procesa el archivo descargado:
    - Si el archivo no está vacío y no hay error, elimina el archivo original del FTP y carga el nuevo archivo procesado.
@@ -23,61 +27,240 @@ Flujo principal:
 
 Funciones:
 ----------
-- main():
-    Ejecuta el flujo principal de procesamiento, integración FTP y notificación por correo.
+- main(reanudar, lote, obj_gestion_ftp, obj_gestion_correos):
+    Crea los controladores (o usa los del servicio), ejecuta el flujo principal y libera la conexión SMTP al
+    terminar si la abrió. Retorna True si el archivo se cargó al FTP.
+- fn_precargar_modulos(modulos):
+    Importa en segundo plano los módulos del procesamiento (MODULOS_PROCESAMIENTO).
+- fn_crear_gestion_archivo():
+    Crea el ControladorGestionArchivoCmdm, esperando la precarga si no terminó.
+- fn_flujo_principal(obj_gestion_ftp, obj_gestion_correos, obj_gestion_archivo, reanudar, obj_verificacion, lote):
+    Ejecuta el flujo principal de procesamiento, integración FTP y notificación por correo. Retorna una tupla con el
+    ControladorGestionArchivoCmdm usado (None si el flujo terminó antes de procesar el archivo) y True si el archivo
+    se cargó al FTP.
+- fn_verificar():
+    Ejecuta solo la verificación previa e imprime el resultado.
+- fn_argumentos():
+    Lee los argumentos de línea de comandos.
+
+Uso:
+----
+python main.py                 Ejecución normal.
+python main.py --reanudar      Reanuda la última ejecución fallida desde su punto de control (alias --resume):
+                               no descarga de nuevo el archivo y omite las etapas ya completadas.
+python main.py --lote          Procesa juntos todos los archivos pendientes del FTP (PATRON_ARCHIVOS_CMDM) en orden de
+                               llegada: un archivo de salida, un correo y una consulta a la base por etapa.
+python main.py --servicio      Servicio de larga duración: ejecuta main() cada vez que llega un archivo nuevo al FTP
+                               (INTERVALO_SONDEO_FTP) o cuando se solicita por el control local (PUERTO_CONTROL_SERVICIO),
+                               con los mismos controladores de FTP y correo en todas las ejecuciones.
+python main.py --perfil-arranque
+                               Imprime el tiempo de importación de cada módulo de una ejecución (alias
+                               --startup-profile), con el desglose de python -X importtime.
+python main.py --verificar     Verifica SQL Server, FTP y SMTP e imprime la latencia de cada uno (código 1 si falla).
+python main.py --historial 30  Muestra las últimas 30 ejecuciones del historial (RUTA_HISTORIAL_EJECUCIONES), la
+                               tendencia de cada etapa y las ejecuciones más lentas que su línea base.
 
 Notas:
 ------
 - El módulo debe ejecutarse como script principal (`__main__`).
+- Los controladores se importan al usarse: --historial, --verificar y --perfil-arranque no cargan el pipeline, y
+  en la ejecución normal pandas y el pipeline se importan en un hilo mientras se verifica y se descarga el archivo.
 - Todos los eventos importantes y errores se gestionan mediante los controladores y se notifican por correo.
+- Los correos se envían en segundo plano: main() retorna mientras el adjunto termina de cargarse.
+- El punto de control (RUTA_CHECKPOINT) se elimina solo cuando el archivo se cargó al FTP.
+- Si RUTA_HISTORIAL_EJECUCIONES está configurada cada ejecución que procesa el archivo se guarda en el historial.
 - El flujo está diseñado para ser robusto ante archivos vacíos, errores de FTP y problemas de procesamiento.
 
 """
 
-from controlador.controlador_gestion_ftp import GestionFTP
-from controlador.controlador_gestion_correos import ControladorGestionCorreos
-from controlador.controlador_gestion_archivo_cmdm import ControladorGestionArchivoCmdm
+import argparse
+import importlib
+import sys
+import threading
 
+#Módulos del procesamiento del archivo (pandas, numpy, Excel): se importan en segundo plano al iniciar main()
+MODULOS_PROCESAMIENTO = ('controlador.controlador_gestion_archivo_cmdm',)
+#Módulos que importa una ejecución normal, en el orden en que se usan (perfil de arranque)
+MODULOS_EJECUCION = ('config'
+                     ,'controlador.controlador_gestion_ftp'
+                     ,'controlador.controlador_gestion_correos'
+                     ,'controlador.controlador_verificacion_previa') + MODULOS_PROCESAMIENTO
 
-def main():
 
-    obj_gestion_ftp = GestionFTP()
-    obj_gestion_correos = ControladorGestionCorreos()
-    obj_gestion_archivo = ControladorGestionArchivoCmdm()
+def main(reanudar=False, lote=False, obj_gestion_ftp=None, obj_gestion_correos=None):
 
-    # Descarga archivo desde FTP
-    retorno_descarga_ftp = obj_gestion_ftp.fn_descargar_archivo_ftp()
+    # pandas y el pipeline se importan mientras se verifica y se descarga el archivo
+    fn_precargar_modulos()
 
-    if not retorno_descarga_ftp:
-        obj_gestion_correos.fn_correo_error()
-        return
+    from controlador.controlador_gestion_ftp import GestionFTP
+    from controlador.controlador_gestion_correos import ControladorGestionCorreos
+    from controlador.controlador_verificacion_previa import ControladorVerificacionPrevia
+
+    # El servicio pasa sus controladores: la sesión SMTP y la de sondeo del FTP quedan abiertas entre ejecuciones
+    correos_propios = obj_gestion_correos is None
+    if obj_gestion_ftp is None:
+        obj_gestion_ftp = GestionFTP()
+    if correos_propios:
+        obj_gestion_correos = ControladorGestionCorreos()
+    obj_gestion_ftp.fn_iniciar_ejecucion()
+    obj_gestion_correos.fn_iniciar_ejecucion()
+    obj_verificacion = ControladorVerificacionPrevia()
+
+    try:
+        obj_gestion_archivo, exito = fn_flujo_principal(obj_gestion_ftp, obj_gestion_correos, None, reanudar
+                                                        ,obj_verificacion, lote)
+        if obj_gestion_archivo is not None:
+            obj_gestion_archivo.fn_registrar_historial(obj_gestion_ftp.tiempos, obj_verificacion.tiempos)
+    finally:
+        # Los correos terminan de enviarse en segundo plano antes de que finalice el proceso
+        if correos_propios:
+            obj_gestion_correos.fn_finalizar()
+
+    return exito
+
+
+def fn_precargar_modulos(modulos=MODULOS_PROCESAMIENTO):
+    def precargar():
+        for modulo in modulos:
+            try:
+                importlib.import_module(modulo)
+            except ImportError:
+                # El error se reporta cuando el flujo importe el módulo
+                return
+
+    hilo = threading.Thread(target=precargar, name='precarga_modulos', daemon=True)
+    hilo.start()
+    return hilo
+
+
+def fn_crear_gestion_archivo():
+    # Si la precarga no terminó, la importación espera a que termine en lugar de repetirla
+    from controlador.controlador_gestion_archivo_cmdm import ControladorGestionArchivoCmdm
+    return ControladorGestionArchivoCmdm()
+
+
+def fn_flujo_principal(obj_gestion_ftp, obj_gestion_correos, obj_gestion_archivo=None, reanudar=False, obj_verificacion=None
+                       ,lote=False):
+
+    import config
+
+    # Verificación previa: se termina antes de cualquier efecto si una dependencia no responde
+    if obj_verificacion is not None and config.VERIFICACION_PREVIA:
+        retorno_verificacion = obj_verificacion.fn_verificar(obj_gestion_ftp, obj_gestion_correos)
+        if not retorno_verificacion["exito"]:
+            if retorno_verificacion["data"]["smtp"]["exito"]:
+                obj_gestion_correos.fn_correo_error()
+            return None, False
+
+    # Al reanudar se usa el archivo ya descargado si tiene punto de control
+    if reanudar:
+        obj_gestion_archivo = obj_gestion_archivo or fn_crear_gestion_archivo()
+        reanudar = obj_gestion_archivo.fn_hay_punto_control()
+
+    if not reanudar:
+        # Descarga archivo desde FTP (en modo lote, todos los pendientes unidos en un solo archivo)
+        if lote:
+            retorno_descarga_ftp = obj_gestion_ftp.fn_descargar_lote_ftp()
+        else:
+            retorno_descarga_ftp = obj_gestion_ftp.fn_descargar_archivo_ftp()
+
+        if not retorno_descarga_ftp:
+            obj_gestion_correos.fn_correo_error()
+            return None, False
 
     # Procesa archivo (o delta si no existe/está vacío)
-    retorno_archivo = obj_gestion_archivo.fn_gestion_archivo()
+    obj_gestion_archivo = obj_gestion_archivo or fn_crear_gestion_archivo()
+    retorno_archivo = obj_gestion_archivo.fn_gestion_archivo(reanudar)
 
     # Si hubo un error en el pipeline → correo error
     if retorno_archivo["error"]:
         obj_gestion_correos.fn_correo_error()
-        return
+        return obj_gestion_archivo, False
 
     # Si el pipeline fue exitoso → continuamos con FTP
-    # Eliminamos el archivo original del FTP
-    retorno_eliminacion_ftp = obj_gestion_ftp.fn_eliminar_archivo_ftp()
+    # Eliminamos el archivo original del FTP (o los archivos del lote)
+    if lote:
+        retorno_eliminacion_ftp = obj_gestion_ftp.fn_eliminar_lote_ftp()
+    else:
+        retorno_eliminacion_ftp = obj_gestion_ftp.fn_eliminar_archivo_ftp()
 
     if not retorno_eliminacion_ftp:
         obj_gestion_correos.fn_correo_error()
-        return
+        return obj_gestion_archivo, False
 
     # Cargamos nuevo archivo CMDM generado al FTP
     retorno_carga_ftp = obj_gestion_ftp.fn_cargar_archivo_ftp()
 
     if not retorno_carga_ftp:
         obj_gestion_correos.fn_correo_error()
-        return
+        return obj_gestion_archivo, False
+
+    # El archivo ya está en el FTP; el punto de control ya no se necesita
+    obj_gestion_archivo.fn_eliminar_punto_control()
 
     # Todo bien → enviamos correo de modificaciones
     obj_gestion_correos.fn_correo_modificaciones()
 
+    return obj_gestion_archivo, True
+
+
+def fn_verificar():
+    from controlador.controlador_gestion_ftp import GestionFTP
+    from controlador.controlador_gestion_correos import ControladorGestionCorreos
+    from controlador.controlador_verificacion_previa import ControladorVerificacionPrevia
+
+    obj_gestion_correos = ControladorGestionCorreos()
+    try:
+        retorno_verificacion = ControladorVerificacionPrevia().fn_verificar(GestionFTP(), obj_gestion_correos)
+    finally:
+        obj_gestion_correos.fn_finalizar()
+
+    for servicio, resultado in retorno_verificacion["data"].items():
+        estado = "disponible" if resultado["exito"] else f"error: {resultado['error']}"
+        print(f"{servicio:<6}{resultado['segundos']:>8.3f} s  {estado}")
+    return retorno_verificacion["exito"]
+
+
+def fn_argumentos():
+    parser = argparse.ArgumentParser(description='Procesamiento del archivo CMDM')
+    parser.add_argument('--reanudar', '--resume'
+                        ,action='store_true'
+                        ,help='Reanuda la última ejecución fallida desde su punto de control (requiere RUTA_CHECKPOINT)')
+    parser.add_argument('--lote'
+                        ,action='store_true'
+                        ,help='Procesa en una sola ejecución todos los archivos del FTP que coinciden con PATRON_ARCHIVOS_CMDM')
+    parser.add_argument('--servicio'
+                        ,action='store_true'
+                        ,help='Queda en ejecución y procesa cada archivo nuevo que llega al FTP')
+    parser.add_argument('--perfil-arranque', '--startup-profile'
+                        ,action='store_true'
+                        ,help='Importa los módulos de una ejecución, imprime el tiempo de cada importación y termina')
+    parser.add_argument('--verificar'
+                        ,action='store_true'
+                        ,help='Verifica SQL Server, FTP y SMTP en paralelo, imprime la latencia de cada uno y termina')
+    parser.add_argument('--historial'
+                        ,type=int
+                        ,nargs='?'
+                        ,const=20
+                        ,metavar='N'
+                        ,help='Muestra las últimas N ejecuciones del historial, sus tendencias y regresiones, y termina')
+    return parser.parse_args()
+
 
 if __name__ == "__main__":
-    main()
+    argumentos = fn_argumentos()
+    if argumentos.historial is not None:
+        from vista.reporte_historial import fn_reporte_historial
+        print(fn_reporte_historial(argumentos.historial))
+    elif argumentos.verificar:
+        sys.exit(0 if fn_verificar() else 1)
+    elif argumentos.perfil_arranque:
+        from controlador.perfil_arranque import fn_perfil_importaciones, fn_reporte_arranque
+        print(fn_reporte_arranque(fn_perfil_importaciones(MODULOS_EJECUCION)))
+    elif argumentos.servicio:
+        from controlador.controlador_servicio import ControladorServicio
+        # El servicio deja los módulos del procesamiento cargados desde el inicio
+        fn_precargar_modulos()
+        ControladorServicio(main).fn_ejecutar_servicio()
+    else:
+        main(reanudar=argumentos.reanudar, lote=argumentos.lote)
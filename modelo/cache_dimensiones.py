@@ -0,0 +1,200 @@
+"""
+Módulo cache_dimensiones.py
+
+Este módulo define la clase CacheDimensiones, una copia local en SQLite de las tablas pequeñas que el proceso
+consulta en cada ejecución: parámetros (TADEM03_PARAMETROS: ruta FTP y destinatarios), tipos de vehículo
+(TB08_VEHICULO), salas (EXTT_Salas) y las ciudades con departamento (GEN_CIUDADES, GEN_DEPARTAMENTOS).
+
+Clases:
+-------
+CacheDimensiones
+    - fn_obtener(nombre): Retorna la dimensión como DataFrame, refrescándola si corresponde.
+    - fn_valores_parametro(descripcion): Valores de TADEM03_PARAMETROS para una descripción.
+
+Estructura en disco:
+--------------------
+RUTA_CACHE_DIMENSIONES -> tabla dimensiones(nombre, version, verificado, datos): version = CHECKSUM_AGG de la tabla
+en el servidor, verificado = time.time() de la última comparación y datos = DataFrame en pickle.
+
+Notas:
+------
+- Mientras no pasen HORAS_CACHE_DIMENSIONES horas desde la última verificación la dimensión se lee solo del disco.
+  Después se consulta el checksum en SQL Server (una fila) y la tabla completa solo se vuelve a traer si cambió.
+- Cada dimensión se lee del disco una vez por ejecución; puede usarse desde varios hilos.
+- Si SQL Server no responde al verificar, se usa la copia local vencida y la falla se informa en el retorno.
+"""
+import os
+import pickle
+import sqlite3
+import threading
+import time
+from os import path
+
+from modelo.fabrica_consultas import fn_crear_consultas_sql
+
+#nombre: (consulta de la tabla, consulta del checksum)
+DIMENSIONES = {
+    'parametros': ("""SELECT CADEM03_DESCRIPCION, CADEM03_VALOR
+                      FROM CONEXION..[TADEM03_PARAMETROS]"""
+                   ,"""SELECT CHECKSUM_AGG(BINARY_CHECKSUM(CADEM03_DESCRIPCION, CADEM03_VALOR)), COUNT(*)
+                       FROM CONEXION..[TADEM03_PARAMETROS]""")
+    ,'tipos_vehiculo': ("""SELECT CB08_CODVEH, CB08_NOMVEH
+                           FROM Conexion.dbo.TB08_VEHICULO"""
+                        ,"""SELECT CHECKSUM_AGG(BINARY_CHECKSUM(CB08_CODVEH, CB08_NOMVEH)), COUNT(*)
+                            FROM Conexion.dbo.TB08_VEHICULO""")
+    ,'salas': ("""SELECT ide_Sala, Cod_Bir, Nom_Sala
+                  FROM Conexion.dbo.EXTT_Salas"""
+               ,"""SELECT CHECKSUM_AGG(BINARY_CHECKSUM(ide_Sala, Cod_Bir, Nom_Sala)), COUNT(*)
+                   FROM Conexion.dbo.EXTT_Salas""")
+    ,'geografia': ("""SELECT DISTINCT ciu.CODCIU
+                      FROM SISC.dbo.GEN_CIUDADES ciu
+                      INNER JOIN SISC.dbo.GEN_DEPARTAMENTOS dep ON dep.coddep = ciu.CODDEP"""
+                   ,"""SELECT CHECKSUM_AGG(BINARY_CHECKSUM(ciu.CODCIU, dep.coddep)), COUNT(*)
+                       FROM SISC.dbo.GEN_CIUDADES ciu
+                       INNER JOIN SISC.dbo.GEN_DEPARTAMENTOS dep ON dep.coddep = ciu.CODDEP"""),
+}
+
+
+class CacheDimensiones:
+    """
+    Copia local, versionada por checksum, de las tablas de dimensiones.
+    """
+    def __init__(self, ruta, horas_refresco, fn_crear_consultas = fn_crear_consultas_sql):
+        """
+        Parameters:
+        -----------
+        ruta : str
+            Archivo SQLite de la caché (RUTA_CACHE_DIMENSIONES). Si está vacío la caché no se usa.
+        horas_refresco : float
+            Horas entre verificaciones del checksum en el servidor.
+        fn_crear_consultas : callable
+            Crea el objeto de consultas con el que se verifica y se refresca.
+        """
+        self.__ruta = ruta
+        self.__segundos_refresco = horas_refresco * 3600
+        self.__fn_crear_consultas = fn_crear_consultas
+        self.__memoria = {}
+        self.__bloqueo = threading.Lock()
+
+    @property
+    def disponible(self):
+        """True si la caché está configurada."""
+        return bool(self.__ruta)
+
+    def __conectar(self):
+        carpeta = path.dirname(self.__ruta)
+        if carpeta:
+            os.makedirs(carpeta, exist_ok=True)
+        conexion = sqlite3.connect(self.__ruta)
+        conexion.execute("""CREATE TABLE IF NOT EXISTS dimensiones (nombre TEXT PRIMARY KEY
+                                                                   ,version TEXT NOT NULL
+                                                                   ,verificado REAL NOT NULL
+                                                                   ,datos BLOB NOT NULL)""")
+        return conexion
+
+    def __consultar_servidor(self, sql_query):
+        """
+        Ejecuta una consulta sin parámetros en SQL Server.
+
+        Returns:
+        --------
+        dict: {'exito': True, 'data': filas, 'columnas': nombres} o {'exito': False, 'error': ...}
+        """
+        obj_consultas_sql = self.__fn_crear_consultas()
+        estado_conexion, mensaje_error = obj_consultas_sql.conectar_db_conexion()
+        if not estado_conexion:
+            return {'exito': False, 'error': mensaje_error}
+        try:
+            return obj_consultas_sql.fn_consultar_por_claves(sql_query, None)
+        finally:
+            obj_consultas_sql.desconectar()
+
+    def fn_obtener(self, nombre):
+        """
+        Retorna una dimensión, desde la memoria, el disco o SQL Server según su vigencia y su checksum.
+
+        Parameters:
+        -----------
+        nombre : str
+            Clave de DIMENSIONES.
+
+        Returns:
+        --------
+        dict: {'exito': True, 'data': DataFrame, 'error': None | mensaje} o {'exito': False, 'data': None, 'error': ...}
+            Con exito True, error describe una verificación fallida en la que se usó la copia local vencida.
+        """
+        with self.__bloqueo:
+            if nombre in self.__memoria:
+                return {'exito': True, 'data': self.__memoria[nombre], 'error': None}
+
+            sql_datos, sql_version = DIMENSIONES[nombre]
+            conexion = self.__conectar()
+            try:
+                guardado = conexion.execute('SELECT version, verificado, datos FROM dimensiones WHERE nombre = ?'
+                                            ,(nombre,)).fetchone()
+                if guardado is not None:
+                    try:
+                        guardado = (guardado[0], guardado[1], pickle.loads(guardado[2]))
+                    except Exception:
+                        #Copia ilegible (por ejemplo, de otra versión de pandas): se vuelve a traer
+                        guardado = None
+
+                if guardado is not None and time.time() - guardado[1] < self.__segundos_refresco:
+                    self.__memoria[nombre] = guardado[2]
+                    return {'exito': True, 'data': self.__memoria[nombre], 'error': None}
+
+                dic_version = self.__consultar_servidor(sql_version)
+                if not dic_version['exito']:
+                    if guardado is None:
+                        return {'exito': False, 'data': None, 'error': dic_version['error']}
+                    self.__memoria[nombre] = guardado[2]
+                    return {'exito': True, 'data': self.__memoria[nombre], 'error': f"{nombre}: {dic_version['error']}"}
+                version = repr(tuple(dic_version['data'][0]))
+
+                if guardado is not None and guardado[0] == version:
+                    #Sin cambios en el servidor: solo se renueva la verificación
+                    conexion.execute('UPDATE dimensiones SET verificado = ? WHERE nombre = ?', (time.time(), nombre))
+                    conexion.commit()
+                    self.__memoria[nombre] = guardado[2]
+                    return {'exito': True, 'data': self.__memoria[nombre], 'error': None}
+
+                dic_datos = self.__consultar_servidor(sql_datos)
+                if not dic_datos['exito']:
+                    return {'exito': False, 'data': None, 'error': dic_datos['error']}
+
+                #pandas se importa aquí y no al importar el módulo: el FTP y los correos usan la caché sin el pipeline
+                import pandas as pd
+                dataframe = pd.DataFrame(dic_datos['data'], columns=dic_datos['columnas'], dtype=object)
+                conexion.execute('INSERT OR REPLACE INTO dimensiones (nombre, version, verificado, datos) VALUES (?, ?, ?, ?)'
+                                 ,(nombre, version, time.time(), pickle.dumps(dataframe, protocol=pickle.HIGHEST_PROTOCOL)))
+                conexion.commit()
+                self.__memoria[nombre] = dataframe
+                return {'exito': True, 'data': dataframe, 'error': None}
+            finally:
+                conexion.close()
+
+    def fn_valores_parametro(self, descripcion):
+        """
+        Retorna los valores de TADEM03_PARAMETROS cuya descripción es igual a la indicada, como el
+        LIKE sin comodines de fn_consultar_ruta_ftp y fn_consultar_destinatarios.
+
+        Parameters:
+        -----------
+        descripcion : str
+            Por ejemplo 'Ruta ftp' o 'Email cambios encuestas'.
+
+        Returns:
+        --------
+        dict: {'exito': True, 'data': [valor, ...], 'error': None | mensaje} o {'exito': False, 'data': None, 'error': ...}
+            Como en fn_obtener, error con exito True indica que se usó la copia local vencida.
+        """
+        dic_retorno = self.fn_obtener('parametros')
+        if not dic_retorno['exito']:
+            return dic_retorno
+
+        parametros = dic_retorno['data']
+        #LIKE sin comodines: igualdad sin distinguir mayúsculas ni espacios finales
+        buscada = descripcion.rstrip(' ').upper()
+        coincide = parametros['CADEM03_DESCRIPCION'].map(lambda valor: valor is not None
+                                                         and str(valor).rstrip(' ').upper() == buscada)
+        return {'exito': True, 'data': parametros.loc[coincide, 'CADEM03_VALOR'].tolist(), 'error': dic_retorno['error']}
@@ -0,0 +1,130 @@
+"""
+Módulo cache_enriquecimiento.py
+
+Este módulo define la clase CacheEnriquecimiento, una caché persistente en SQLite de las filas que retorna
+fn_consulta_info_vin_email (datos de cliente, concesionario y entrega de cada VIN), para que el reporte de correo
+solo consulte en SQL Server los VINs que no están en la caché.
+
+Clases:
+-------
+CacheEnriquecimiento
+    - fn_consultar(lista_vin): Retorna las filas en caché vigentes y la lista de VINs que faltan.
+    - fn_guardar(filas, indice_vin): Guarda las filas consultadas, agrupadas por VIN.
+
+Estructura en disco:
+--------------------
+RUTA_CACHE_ENRIQUECIMIENTO -> tabla cache_email(vin, filas, guardado): filas en pickle (conservan los tipos de
+pyodbc) y guardado = time.time() del momento en que se consultaron.
+
+Notas:
+------
+- Una entrada vence a las HORAS_CACHE_ENRIQUECIMIENTO horas.
+- Si la réplica de reporte_dda (RUTA_REPLICA_DDA) está configurada, una entrada también se invalida cuando la réplica
+  recibió una entrega de ese VIN después de guardarla (la fecha de entrega DDA hace parte de las filas).
+- Los VINs sin filas no se guardan: se vuelven a consultar en cada ejecución, por si sus datos aparecen después.
+"""
+import os
+import pickle
+import sqlite3
+import time
+from os import path
+
+
+class CacheEnriquecimiento:
+    """
+    Caché por VIN de la información de correo.
+    """
+    def __init__(self, ruta, horas_vigencia, ruta_replica_dda = None):
+        """
+        Parameters:
+        -----------
+        ruta : str
+            Archivo SQLite de la caché (RUTA_CACHE_ENRIQUECIMIENTO). Si está vacío la caché no se usa.
+        horas_vigencia : float
+            Horas que una entrada es válida.
+        ruta_replica_dda : str, opcional
+            Archivo de la réplica de reporte_dda, para invalidar los VINs con entregas nuevas.
+        """
+        self.__ruta = ruta
+        self.__segundos_vigencia = horas_vigencia * 3600
+        self.__ruta_replica_dda = ruta_replica_dda
+
+    @property
+    def disponible(self):
+        """True si la caché está configurada."""
+        return bool(self.__ruta)
+
+    def __conectar(self):
+        carpeta = path.dirname(self.__ruta)
+        if carpeta:
+            os.makedirs(carpeta, exist_ok=True)
+        conexion = sqlite3.connect(self.__ruta)
+        conexion.execute("""CREATE TABLE IF NOT EXISTS cache_email (vin TEXT PRIMARY KEY
+                                                                   ,filas BLOB NOT NULL
+                                                                   ,guardado REAL NOT NULL)""")
+        return conexion
+
+    def fn_consultar(self, lista_vin):
+        """
+        Busca los VINs en la caché.
+
+        Parameters:
+        -----------
+        lista_vin : list
+
+        Returns:
+        --------
+        tuple: (filas, vin_faltantes)
+            filas: lista con las filas en caché de los VINs encontrados.
+            vin_faltantes: VINs (sin repetir, en el orden recibido) que se deben consultar en SQL Server.
+        """
+        vin_unicos = list(dict.fromkeys(lista_vin))
+        conexion = self.__conectar()
+        try:
+            conexion.execute('CREATE TEMP TABLE vin_buscar (vin TEXT PRIMARY KEY)')
+            conexion.executemany('INSERT OR IGNORE INTO vin_buscar (vin) VALUES (?)', [(vin,) for vin in vin_unicos])
+
+            filtro_replica = ''
+            if self.__ruta_replica_dda and path.isfile(self.__ruta_replica_dda):
+                conexion.execute('ATTACH DATABASE ? AS replica', (self.__ruta_replica_dda,))
+                filtro_replica = """AND NOT EXISTS (SELECT 1 FROM replica.reporte_dda AS dda
+                                                    WHERE dda.vin = cache.vin AND dda.sincronizado > cache.guardado)"""
+
+            encontrados = conexion.execute(f"""SELECT cache.vin, cache.filas
+                                               FROM cache_email AS cache
+                                                   INNER JOIN vin_buscar ON vin_buscar.vin = cache.vin
+                                               WHERE cache.guardado >= ?
+                                               {filtro_replica}""", (time.time() - self.__segundos_vigencia,)).fetchall()
+        finally:
+            conexion.close()
+
+        filas_por_vin = {vin: pickle.loads(filas) for vin, filas in encontrados}
+        filas = [fila for vin in vin_unicos for fila in filas_por_vin.get(vin, [])]
+        vin_faltantes = [vin for vin in vin_unicos if vin not in filas_por_vin]
+        return filas, vin_faltantes
+
+    def fn_guardar(self, filas, indice_vin):
+        """
+        Guarda las filas consultadas, reemplazando las entradas de sus VINs, y elimina las entradas vencidas.
+
+        Parameters:
+        -----------
+        filas : list
+            Filas (listas) retornadas por la consulta.
+        indice_vin : int
+            Posición de la columna VIN en cada fila.
+        """
+        filas_por_vin = {}
+        for fila in filas:
+            filas_por_vin.setdefault(fila[indice_vin], []).append(fila)
+
+        guardado = time.time()
+        conexion = self.__conectar()
+        try:
+            conexion.executemany('INSERT OR REPLACE INTO cache_email (vin, filas, guardado) VALUES (?, ?, ?)'
+                                 ,[(vin, pickle.dumps(filas_vin, protocol=pickle.HIGHEST_PROTOCOL), guardado)
+                                   for vin, filas_vin in filas_por_vin.items()])
+            conexion.execute('DELETE FROM cache_email WHERE guardado < ?', (guardado - self.__segundos_vigencia,))
+            conexion.commit()
+        finally:
+            conexion.close()
@@ -0,0 +1,200 @@
+"""
+Módulo clasificador_clientes.py
+
+Este módulo clasifica a los clientes del reporte de correo como empresa o persona y arma el nombre y el apellido
+que se muestran, a partir de las columnas sin procesar NOMCLI, APECLI y CODTIPPER de SISC..GEN_CLIENTES.
+Reemplaza las cascadas CASE WHEN ... LIKE que fn_consulta_info_vin_email evaluaba fila por fila en SQL Server.
+
+Funciones:
+----------
+- fn_patron_empresa(sufijos, prefijos): Compila la expresión regular de razón social.
+- fn_like_a_regex(patron): Traduce un patrón LIKE de SQL Server (%, _, [...]) a una expresión regular.
+- fn_es_empresa(serie, patron): Indica, vectorizado, qué nombres corresponden a una razón social.
+- fn_clasificar_clientes(dataframe, columna_nombre, columna_apellido, columna_tipo): Calcula nombre, apellido
+  y tipo de persona.
+
+Reglas (en orden, como en la consulta original):
+-------------------------------------------------
+Nombre:   NOMCLI = 'POR DEFINIR' -> ' ' | NOMCLI = APECLI -> ' ' | NOMCLI empresa -> ' ' | APECLI empresa -> ' '
+          | NOMCLI no nulo -> NOMCLI depurado | ' '
+Apellido: NOMCLI = 'POR DEFINIR' -> ' ' | APECLI nulo -> NOMCLI | NOMCLI empresa -> NOMCLI
+          | LEN(NOMCLI) > LEN(APECLI) y NOMCLI LIKE '%'+APECLI+'%' -> NOMCLI depurado | APECLI depurado | ' '
+Tipo:     NOMCLI o APECLI empresa -> 'Empresa' | CODTIPPER 1 -> 'Persona Natural' | 2 -> 'Persona Juridica' | ' '
+
+Notas:
+------
+- Una razón social es un nombre que termina en ' ' + sufijo (SUFIJOS_EMPRESA) o empieza por un prefijo
+  (PREFIJOS_EMPRESA). Las cuatro copias de la lista en la consulta original diferían levemente (' SA' frente a
+  ' S.A', 'BANCO' sin comodín); aquí se usa una sola lista con todas las variantes.
+- Se reproduce la semántica de SQL Server: comparaciones sin distinguir mayúsculas, espacios finales del valor
+  ignorados (LIKE, = y LEN) y NULL que no cumple ninguna condición.
+"""
+import re
+
+import numpy as np
+import pandas as pd
+
+import config
+
+#Caracteres que la consulta original quitaba o reemplazaba con REPLACE(..., char(n), ...)
+DEPURAR_NOMBRE = str.maketrans({'\n': '', '\r': '', ';': '', ',': ' ', '£': 'Ñ', '¥': 'Ñ'})
+DEPURAR_NOMBRE_EN_APELLIDO = str.maketrans({'\n': '', '\r': '', ';': '', '"': '', '£': 'Ñ'})
+DEPURAR_APELLIDO = str.maketrans({'\n': '', '\r': '', ';': '', '"': '', ',': ' ', '£': 'Ñ', '¥': 'Ñ'})
+
+
+def fn_patron_empresa(sufijos, prefijos):
+    """
+    Compila la expresión regular que reconoce una razón social.
+
+    Parameters:
+    -----------
+    sufijos : list
+        Terminaciones precedidas de un espacio, por ejemplo 'S.A.S' o 'LTDA'.
+    prefijos : list
+        Comienzos del nombre, por ejemplo 'BANCO'.
+
+    Returns:
+    --------
+    re.Pattern
+    """
+    alternativas = []
+    if prefijos:
+        alternativas.append(r'\A(?:' + '|'.join(re.escape(prefijo) for prefijo in prefijos) + ')')
+    if sufijos:
+        alternativas.append(r' (?:' + '|'.join(re.escape(sufijo) for sufijo in sufijos) + r')\Z')
+    #Sin palabras clave ningún nombre es empresa
+    return re.compile('|'.join(alternativas) or r'(?!)', re.IGNORECASE | re.DOTALL)
+
+
+def fn_like_a_regex(patron):
+    """
+    Traduce un patrón LIKE de SQL Server a una expresión regular equivalente (sin distinguir mayúsculas).
+
+    Parameters:
+    -----------
+    patron : str
+
+    Returns:
+    --------
+    re.Pattern
+    """
+    partes = []
+    i = 0
+    while i < len(patron):
+        caracter = patron[i]
+        if caracter == '%':
+            partes.append('.*')
+        elif caracter == '_':
+            partes.append('.')
+        elif caracter == '[' and ']' in patron[i + 1:]:
+            fin = patron.index(']', i + 1)
+            contenido = patron[i + 1:fin]
+            negado = contenido.startswith('^')
+            if negado:
+                contenido = contenido[1:]
+            clase = ''.join('-' if (c == '-' and 0 < j < len(contenido) - 1) else re.escape(c)
+                            for j, c in enumerate(contenido))
+            partes.append(f"[{'^' if negado else ''}{clase}]")
+            i = fin
+        else:
+            partes.append(re.escape(caracter))
+        i += 1
+    return re.compile(''.join(partes), re.IGNORECASE | re.DOTALL)
+
+
+def fn_es_empresa(serie, patron):
+    """
+    Indica qué valores de la serie son una razón social. Los nulos retornan False.
+
+    Parameters:
+    -----------
+    serie : pandas.Series
+    patron : re.Pattern
+        Resultado de fn_patron_empresa.
+
+    Returns:
+    --------
+    pandas.Series de bool
+    """
+    no_nulo = serie.notna()
+    texto = serie.where(no_nulo, '').astype(str)
+    #LIKE ignora los espacios finales del valor
+    coincide = texto.str.contains(patron) | texto.str.rstrip(' ').str.contains(patron)
+    return coincide & no_nulo
+
+
+def fn_clasificar_clientes(dataframe, columna_nombre, columna_apellido, columna_tipo, patron = None):
+    """
+    Reemplaza NOMCLI, APECLI y CODTIPPER por el nombre, el apellido y el tipo de persona del reporte.
+
+    Parameters:
+    -----------
+    dataframe : pandas.DataFrame
+    columna_nombre : str
+        Columna con NOMCLI; recibe el nombre del cliente.
+    columna_apellido : str
+        Columna con APECLI; recibe el apellido del cliente.
+    columna_tipo : str
+        Columna con CODTIPPER; recibe el tipo de persona.
+    patron : re.Pattern, opcional
+        Patrón de razón social; por defecto se construye con SUFIJOS_EMPRESA y PREFIJOS_EMPRESA de config.
+
+    Returns:
+    --------
+    pandas.DataFrame: Copia con las tres columnas calculadas.
+    """
+    if patron is None:
+        patron = fn_patron_empresa(config.SUFIJOS_EMPRESA, config.PREFIJOS_EMPRESA)
+
+    resultado = dataframe.copy()
+    nombre = dataframe[columna_nombre]
+    apellido = dataframe[columna_apellido]
+    nombre_no_nulo = nombre.notna().to_numpy()
+    apellido_no_nulo = apellido.notna().to_numpy()
+
+    texto_nombre = nombre.where(nombre.notna(), '').astype(str)
+    texto_apellido = apellido.where(apellido.notna(), '').astype(str)
+    #= y LEN de SQL Server ignoran los espacios finales
+    nombre_sin_espacios = texto_nombre.str.rstrip(' ')
+    apellido_sin_espacios = texto_apellido.str.rstrip(' ')
+
+    por_definir = nombre_no_nulo & (nombre_sin_espacios.str.upper() == 'POR DEFINIR').to_numpy()
+    nombre_igual_apellido = (nombre_no_nulo & apellido_no_nulo
+                             & (nombre_sin_espacios.str.upper() == apellido_sin_espacios.str.upper()).to_numpy())
+    nombre_empresa = fn_es_empresa(nombre, patron).to_numpy()
+    apellido_empresa = fn_es_empresa(apellido, patron).to_numpy()
+
+    nombre_depurado = texto_nombre.str.translate(DEPURAR_NOMBRE).to_numpy(dtype=object)
+    resultado[columna_nombre] = np.select(
+        [por_definir, nombre_igual_apellido, nombre_empresa, nombre_no_nulo & apellido_empresa, nombre_no_nulo]
+        ,[' ', ' ', ' ', ' ', nombre_depurado]
+        ,default=' ')
+
+    #NOMCLI LIKE '%'+APECLI+'%' solo para las filas que llegan a esa condición (el patrón cambia por fila)
+    candidatos = (nombre_no_nulo & apellido_no_nulo & ~por_definir & ~nombre_empresa
+                  & (nombre_sin_espacios.str.len() > apellido_sin_espacios.str.len()).to_numpy())
+    nombre_contiene_apellido = np.zeros(len(dataframe), dtype=bool)
+    for posicion in np.flatnonzero(candidatos):
+        regex = fn_like_a_regex('%' + texto_apellido.iat[posicion] + '%')
+        valor = texto_nombre.iat[posicion]
+        nombre_contiene_apellido[posicion] = bool(regex.fullmatch(valor) or regex.fullmatch(valor.rstrip(' ')))
+
+    nombre_original = nombre.where(nombre.notna(), None).to_numpy(dtype=object)
+    resultado[columna_apellido] = np.select(
+        [por_definir, ~apellido_no_nulo, nombre_no_nulo & nombre_empresa, nombre_contiene_apellido, apellido_no_nulo]
+        ,[' '
+          ,nombre_original
+          ,nombre_original
+          ,texto_nombre.str.translate(DEPURAR_NOMBRE_EN_APELLIDO).to_numpy(dtype=object)
+          ,texto_apellido.str.translate(DEPURAR_APELLIDO).to_numpy(dtype=object)]
+        ,default=' ')
+    #ISNULL(CUSTOMER_SURNAME_1, '') de la consulta original
+    resultado[columna_apellido] = resultado[columna_apellido].where(resultado[columna_apellido].notna(), '')
+
+    tipo = pd.to_numeric(dataframe[columna_tipo], errors='coerce').to_numpy()
+    resultado[columna_tipo] = np.select(
+        [nombre_empresa | apellido_empresa, tipo == 1, tipo == 2]
+        ,['Empresa', 'Persona Natural', 'Persona Juridica']
+        ,default=' ')
+
+    return resultado
@@ -1,5 +1,7 @@
+import fnmatch
 import ftplib
 import config
+from modelo.contadores_io import fn_sumar_bytes
 
 class ConexionFTP:
 
@@ -11,8 +13,10 @@ class ConexionFTP:
         - SERVIDOR_FTP: Dirección del servidor FTP.
         - USUARIO_FTP: Nombre de usuario para la conexión FTP.
         - CONTRASENA_FTP: Contraseña para la conexión FTP.
+        - PUERTO_FTP: Puerto del servidor FTP (por defecto 21).
         """
         self.__host = config.SERVIDOR_FTP
+        self.__puerto = config.PUERTO_FTP
         self.__user = config.USUARIO_FTP
         self.__passwd = config.CONTRASENA_FTP
         self.__nombre_archivo = config.NOMBRE_ARCHIVO_DESCARGA
@@ -21,13 +25,17 @@ class ConexionFTP:
         self.__ruta_ftp = ruta_ftp
         self.__ftp = None
 
-    def fn_conectar_ftp(self):
-        """Conecta al servidor FTP y navega a la ruta especificada."""
+    def fn_conectar_ftp(self, tiempo_espera = None):
+        """Conecta al servidor FTP y navega a la ruta especificada (tiempo_espera: segundos por operación)."""
         # Crear la conexión FTP
         try:
-            self.__ftp = ftplib.FTP(host = self.__host
-                                  ,user = self.__user
-                                  ,passwd = self.__passwd)
+            self.__ftp = ftplib.FTP()
+            parametros = {} if tiempo_espera is None else {'timeout': tiempo_espera}
+            self.__ftp.connect(host = self.__host
+                              ,port = self.__puerto
+                              ,**parametros)
+            self.__ftp.login(user = self.__user
+                            ,passwd = self.__passwd)
 
             # Nos ubicamos en la ruta que nos interesa
             self.directorio = self.__ftp.cwd(self.__ruta_ftp)
@@ -44,21 +52,100 @@ class ConexionFTP:
         else:
             return True
 
-    def fn_descargar_archivo_ftp(self):
+    def fn_firma_archivo_ftp(self):
+        """
+        Retorna el tamaño y la fecha de modificación (MDTM) del archivo a descargar, sin descargarlo.
+        Si el servidor no soporta SIZE o MDTM ese valor queda en None.
+
+        Returns:
+        --------
+        dict: {'exito': True, 'data': (tamano, modificado) o None si el archivo no existe, 'error': None}
+              o {'exito': False, 'data': None, 'error': ex}
+        """
+        try:
+            self.__ftp.voidcmd('TYPE I')
+            try:
+                tamano = self.__ftp.size(self.__nombre_archivo)
+            except ftplib.error_perm:
+                #Sin SIZE (o sin archivo): se confirma la existencia con el listado
+                if self.__nombre_archivo not in self.__ftp.nlst():
+                    return {'exito':True,'data':None,'error':None}
+                tamano = None
+            try:
+                modificado = self.__ftp.voidcmd(f'MDTM {self.__nombre_archivo}')[4:].strip()
+            except ftplib.error_perm:
+                modificado = None
+            return {'exito':True,'data':(tamano, modificado),'error':None}
+        except Exception as ex:
+            return {'exito':False,'data':None,'error':ex}
+
+    def fn_listar_archivos_ftp(self, patron):
+        """
+        Lista los archivos de la ruta FTP cuyo nombre coincide con el patrón (sin distinguir mayúsculas),
+        en orden de llegada: fecha de modificación y, para la misma fecha, nombre.
+
+        Parameters:
+        -----------
+        patron : str
+            Patrón de nombres al estilo del shell (por ejemplo 'CMDM_*.CSV').
+
+        Returns:
+        --------
+        dict: {'exito': True, 'data': [{'nombre', 'modificado', 'tamano'}], 'error': None}
+              o {'exito': False, 'data': None, 'error': ex}
+        """
+        try:
+            try:
+                #MLSD trae la fecha de todos los archivos en una sola respuesta
+                archivos = [{'nombre': nombre
+                             ,'modificado': hechos.get('modify')
+                             ,'tamano': int(hechos['size']) if 'size' in hechos else None}
+                            for nombre, hechos in self.__ftp.mlsd(facts=['type', 'modify', 'size'])
+                            if hechos.get('type') == 'file']
+            except ftplib.error_perm:
+                #Servidor sin MLSD: listado de nombres y MDTM por archivo
+                archivos = []
+                for nombre in self.__ftp.nlst():
+                    try:
+                        modificado = self.__ftp.voidcmd(f'MDTM {nombre}')[4:].strip()
+                    except ftplib.error_perm:
+                        modificado = None
+                    archivos.append({'nombre': nombre, 'modificado': modificado, 'tamano': None})
+
+            archivos = [archivo for archivo in archivos
+                        if fnmatch.fnmatchcase(archivo['nombre'].upper(), patron.upper())]
+            archivos.sort(key=lambda archivo: (archivo['modificado'] or '', archivo['nombre']))
+            return {'exito':True,'data':archivos,'error':None}
+        except Exception as ex:
+            return {'exito':False,'data':None,'error':ex}
+
+    def fn_descargar_archivo_ftp(self, nombre_archivo = None, ruta_destino = None):
+        """
+        Descarga un archivo de la ruta FTP; por defecto NOMBRE_ARCHIVO_DESCARGA en RUTA_GUARDAR_ARCHIVO.
+        """
+        nombre_archivo = nombre_archivo or self.__nombre_archivo
+        ruta_destino = ruta_destino or self.__ruta_descarga_archivo
 
         #descargamos el archivo
         try:
-            with open (self.__ruta_descarga_archivo, 'wb') as data:
-                self.__ftp.retrbinary(f'RETR {self.__nombre_archivo}'
-                                                ,data.write)
+            with open (ruta_destino, 'wb') as data:
+                def escribir(bloque):
+                    data.write(bloque)
+                    fn_sumar_bytes('ftp_descarga', len(bloque))
+
+                self.__ftp.retrbinary(f'RETR {nombre_archivo}'
+                                                ,escribir)
             return {'exito':True,'error':None}
         except Exception as ex:
             return {'exito':False, 'error':ex}
 
-    def fn_eliminar_archivo_ftp(self):
+    def fn_eliminar_archivo_ftp(self, nombre_archivo = None):
+        """
+        Elimina un archivo de la ruta FTP; por defecto NOMBRE_ARCHIVO_DESCARGA.
+        """
         try:
             #Elimina archivo en ftp
-            self.__ftp.delete(self.__nombre_archivo)
+            self.__ftp.delete(nombre_archivo or self.__nombre_archivo)
             return {'exito':True,'error':None}
         except Exception as ex:
             return {'exito':False,'error':ex}
@@ -68,7 +155,7 @@ class ConexionFTP:
             with open(self.__ruta_descarga_archivo, "rb") as datos:
                 self.__ftp.storbinary(f'STOR {self.__ruta_ftp+self.__nombre_archivo_carga}'
                                             ,datos
-                                            ,callback=None)
+                                            ,callback=lambda bloque: fn_sumar_bytes('ftp_carga', len(bloque)))
             return {'exito':True,'error':None}
         except Exception as ex:
             return {'exito':False,'error':ex}
@@ -15,28 +15,32 @@ Atributos:
 - __database: Base de datos.
 - __username: Usuario de la base de datos.
 - __password: Contraseña de la base de datos.
-- __cursor: Cursor de la conexión SQL.
+- __conexion, __cursor: Conexión y cursor SQL del hilo actual (cada hilo tiene los suyos).
 
 Métodos:
 --------
-- conectar_db_conexion(self): Conecta a la base de datos SQL Server.
+- conectar_db_conexion(self, tiempo_espera): Conecta a la base de datos SQL Server.
 - desconectar(self): Desconecta y cierra la conexión a la base de datos.
+- fn_verificar_conexion(self, tiempo_espera): Conecta, ejecuta SELECT 1 y desconecta (verificación previa).
 - fn_consultar_ruta_ftp(self): Consulta la ruta FTP desde la base de datos.
 - fn_consultar_fechas_vin(self, lista_vin): Consulta las fechas de entrega DDA para una lista de VINs.
 - fn_consultar_destinatarios(self): Consulta los destinatarios de correos electrónicos.
 - fn_consulta_estado_dda(self, lista_vin): Consulta el estado de entrega DDA para una lista de VINs.
-- fn_insertar_vin_delta_cmdm(self, df_vin_no_dda): Inserta datos de VINs no entregados en DDA en la tabla temporal delta_cmdm_file.
+- fn_consultar_reporte_dda_desde(self, fecha_desde, tamano_lote, fn_procesar_lote): Lee vin y fecha_entrega de reporte_dda por lotes (réplica local).
+- fn_insertar_vin_delta_cmdm(self, df_vin_no_dda): Inserta o actualiza (MERGE por VIN) los VINs no entregados en DDA en la tabla delta_cmdm_file.
 - typeToSize(self, df): Determina los tamaños de los tipos de datos para la inserción en la base de datos.
-- fn_validar_vin_cmdm_dda(self): Valida los VINs entregados en DDA y tipo de vehículo VP en la tabla delta_cmdm_file.
-- fn_actu_estado_cmdm(self, lista_vin): Actualiza el estado de los VINs en la tabla delta_cmdm_file.
+- fn_validar_vin_cmdm_dda(self, fecha_desde): Marca como procesados y retorna los VINs entregados en DDA y tipo de vehículo VP en la tabla delta_cmdm_file.
+- fn_revertir_vin_cmdm(self, lista_vin): Devuelve a pendiente (estado=0) los VINs marcados en una ejecución que falló.
 - fn_reenvio_vin_cmdm(self): Consulta los VINs que requieren reenvío en la tabla delta_cmdm_file.
 - fn_consulta_info_vin_email(self, lista_vin): Consulta información detallada de los VINs para envío de correos.
-- fn_validar_vin_dda_publicos(self): Valida los VINs de servicio público entregados en DDA.
+- fn_consultar_por_claves(self, sql_query, claves, tamano_bloque): Ejecuta una consulta IN (...) por bloques de claves.
+- fn_validar_vin_dda_publicos(self, tamano_pagina, vin_desde): Valida los VINs de servicio público entregados en DDA, una página a la vez.
 
 Dependencias:
 -------------
 - pyodbc: Conexión y operaciones con SQL Server.
 - config: Variables de configuración (servidor, base de datos, usuario, contraseña).
+- CursorMedido: Envoltura del cursor que cuenta los bytes enviados y recibidos (ver modelo.contadores_io).
 
 Notas:
 ------
@@ -45,8 +49,10 @@ Notas:
 - Se recomienda validar que las listas de VINs no estén vacías antes de ejecutar consultas con parámetros.
 
 """
+import threading
 import pyodbc
 import config
+from modelo.contadores_io import CursorMedido
 
 class ConsultasSql:
     """
@@ -61,19 +67,44 @@ class ConsultasSql:
         self.__database = config.BASE_DE_DATOS
         self.__username = config.USUARIO_SQL
         self.__password = config.CONTRASENA_SQL
-        self.__cursor = None
+        #Conexión y cursor por hilo: las etapas del pipeline pueden consultar en paralelo con la misma instancia
+        self.__local = threading.local()
 
-    def conectar_db_conexion(self):
+    @property
+    def __conexion(self):
+        return getattr(self.__local, 'conexion', None)
+
+    @__conexion.setter
+    def __conexion(self, conexion):
+        self.__local.conexion = conexion
+
+    @property
+    def __cursor(self):
+        return getattr(self.__local, 'cursor', None)
+
+    @__cursor.setter
+    def __cursor(self, cursor):
+        self.__local.cursor = cursor
+
+    def conectar_db_conexion(self, tiempo_espera = None):
         """
         Conecta a la base de datos SQL Server.
 
+        Parameters:
+        -----------
+        tiempo_espera : int, opcional
+            Segundos máximos para el inicio de sesión; por defecto el del controlador ODBC.
+
         Returns:
         --------
         tuple: (True, None) si la conexión es exitosa, (False, ex) si ocurre un error.
         """
         try:
-            self.__conexion = pyodbc.connect(f'DRIVER={{SQL Server}};SERVER={self.__server};DATABASE={self.__database};UID={self.__username};PWD={self.__password}')
-            self.__cursor = self.__conexion.cursor()
+            parametros = {} if tiempo_espera is None else {'timeout': int(tiempo_espera)}
+            self.__conexion = pyodbc.connect(f'DRIVER={{SQL Server}};SERVER={self.__server};DATABASE={self.__database};UID={self.__username};PWD={self.__password}'
+                                             ,**parametros)
+            #El cursor medido registra los bytes aproximados que mueve cada consulta
+            self.__cursor = CursorMedido(self.__conexion.cursor())
             return True,None
         except pyodbc.Error as ex:
             return False, ex
@@ -86,6 +117,31 @@ class ConsultasSql:
         self.__cursor.close() #Cerramos cursor
         self.__conexion.close() #Cerramos la conexion
 
+    def fn_verificar_conexion(self, tiempo_espera = None):
+        """
+        Inicia sesión, ejecuta una consulta trivial y cierra la conexión.
+
+        Parameters:
+        -----------
+        tiempo_espera : int, opcional
+            Segundos máximos para el inicio de sesión.
+
+        Returns:
+        --------
+        dict: {'exito': True, 'error': None} o {'exito': False, 'error': ex}
+        """
+        estado_conexion, mensaje_error = self.conectar_db_conexion(tiempo_espera)
+        if not estado_conexion:
+            return {'exito':False, 'error':mensaje_error}
+        try:
+            self.__cursor.execute('SELECT 1')
+            self.__cursor.fetchall()
+            return {'exito':True, 'error':None}
+        except pyodbc.Error as ex:
+            return {'exito':False, 'error':ex}
+        finally:
+            self.desconectar()
+
     def fn_consultar_ruta_ftp(self):
         """
         Consulta la ruta FTP desde la base de datos.
@@ -209,38 +265,117 @@ class ConsultasSql:
                     ,'data':None
                     ,'error':ex}
 
+    def fn_consultar_reporte_dda_desde(self, fecha_desde, tamano_lote, fn_procesar_lote):
+        """
+        Lee vin y fecha_entrega de reporte_dda desde una fecha, por lotes, para sincronizar la réplica local.
+
+        Parameters:
+        -----------
+        fecha_desde : datetime.date o None
+            Fecha mínima de entrega; None lee toda la tabla. Las filas sin fecha se leen siempre.
+        tamano_lote : int
+            Filas por lote (fetchmany).
+        fn_procesar_lote : callable
+            Función que recibe cada lote de filas (vin, fecha_entrega).
+
+        Returns:
+        --------
+        dict: {'exito': True, 'data': total_filas, 'error': None} o {'exito': False, 'data': None, 'error': ex}
+        """
+        try:
+            total_filas = 0
+            if fecha_desde is None:
+                self.__cursor.execute(""" SELECT vin, fecha_entrega FROM [DATASTEWARD].[dbo].[reporte_dda] """)
+            else:
+                self.__cursor.execute(""" SELECT vin, fecha_entrega FROM [DATASTEWARD].[dbo].[reporte_dda]
+                                          WHERE fecha_entrega >= ? OR fecha_entrega IS NULL
+                                      """, fecha_desde)
+
+            while True:
+                filas = self.__cursor.fetchmany(tamano_lote)
+                if not filas:
+                    break
+                fn_procesar_lote(filas)
+                total_filas += len(filas)
+
+            return {'exito':True
+                    ,'data':total_filas
+                    ,'error':None}
+
+        except Exception as ex:
+            return {'exito':False
+                    ,'data':None
+                    ,'error':ex}
+
     def fn_insertar_vin_delta_cmdm(self,df_vin_no_dda):
         """
-        Inserta los datos de un DataFrame en la tabla temporal delta_cmdm_file.
+        Inserta o actualiza (upsert) los datos de un DataFrame en la tabla delta_cmdm_file.
+
+        Las filas se cargan en una tabla temporal de la sesión (#staging_delta_cmdm) con fast_executemany y luego
+        se aplican con un único MERGE por SDI_VHCL_VIN:
+        - Si el VIN se repite en el DataFrame, gana la última fila (la última escritura).
+        - Si el VIN ya existe en delta_cmdm_file se actualizan sus columnas, solo cuando algún valor cambió. La
+          columna estado no se actualiza: un VIN ya enviado (estado=1) no vuelve a quedar pendiente.
+        - Si no existe se inserta, con el estado del DataFrame.
+        Reprocesar el mismo archivo no agrega filas duplicadas ni modifica filas.
 
         Parameters:
         -----------
         df_vin_no_dda : pandas.DataFrame
-            DataFrame que contiene los datos a insertar.
+            DataFrame que contiene los datos a insertar, con las columnas en el orden de la tabla.
 
         Returns:
         --------
         dict: {'exito': True, 'error': None} o {'exito': False, 'error': e}
         """
-        param = "(?"
-
-        for i in range(len(df_vin_no_dda.columns)):
-            if i != 0:
-                if i != len(df_vin_no_dda.columns)-1:
-                    param += ",?"
-                else:
-                    param += ",?)"
-
-        query_sql = f'INSERT INTO DATASTEWARD..delta_cmdm_file VALUES {param}'
+        tabla_staging = '#staging_delta_cmdm'
 
         try:
+            #Tabla temporal con la misma estructura de delta_cmdm_file más el orden de llegada de cada fila
+            self.__cursor.execute(f"""IF OBJECT_ID('tempdb..{tabla_staging}') IS NOT NULL DROP TABLE {tabla_staging};
+                                      SELECT TOP 0 * INTO {tabla_staging} FROM DATASTEWARD..delta_cmdm_file;
+                                      ALTER TABLE {tabla_staging} ADD _orden INT IDENTITY(1,1) NOT NULL;""")
+
+            #Nombres de las columnas de la tabla, en el orden en que el DataFrame trae los valores
+            self.__cursor.execute(f'SELECT TOP 0 * FROM {tabla_staging}')
+            columnas = [f'[{descripcion[0]}]' for descripcion in self.__cursor.description if descripcion[0] != '_orden']
+            lista_columnas = ', '.join(columnas)
+            placeholders = ', '.join(['?'] * len(columnas))
+
+            self.__cursor.fast_executemany = True
             self.__cursor.setinputsizes(self.typeToSize(df_vin_no_dda))
-            self.__cursor.executemany(query_sql, df_vin_no_dda.values.tolist())
+            self.__cursor.executemany(f'INSERT INTO {tabla_staging} ({lista_columnas}) VALUES ({placeholders})'
+                                      ,df_vin_no_dda.values.tolist())
+
+            #estado solo se asigna al insertar; lo cambian fn_validar_vin_cmdm_dda y fn_revertir_vin_cmdm
+            columnas_actualizar = [columna for columna in columnas
+                                   if columna.upper() not in ('[SDI_VHCL_VIN]', '[ESTADO]')]
+            asignaciones = ', '.join(f'{columna} = origen.{columna}' for columna in columnas_actualizar)
+            columnas_origen = ', '.join(f'origen.{columna}' for columna in columnas_actualizar)
+            columnas_destino = ', '.join(f'destino.{columna}' for columna in columnas_actualizar)
+            valores_origen = ', '.join(f'origen.{columna}' for columna in columnas)
+
+            #EXCEPT compara también los NULL, así un VIN sin cambios no se reescribe
+            self.__cursor.execute(f""" MERGE DATASTEWARD..delta_cmdm_file WITH (HOLDLOCK) AS destino
+                                       USING (SELECT {lista_columnas}
+                                              FROM (SELECT *
+                                                           ,ROW_NUMBER() OVER (PARTITION BY SDI_VHCL_VIN ORDER BY _orden DESC) AS _fila
+                                                    FROM {tabla_staging}) AS staging
+                                              WHERE _fila = 1) AS origen
+                                           ON destino.SDI_VHCL_VIN = origen.SDI_VHCL_VIN
+                                       WHEN MATCHED AND EXISTS (SELECT {columnas_origen} EXCEPT SELECT {columnas_destino})
+                                           THEN UPDATE SET {asignaciones}
+                                       WHEN NOT MATCHED BY TARGET
+                                           THEN INSERT ({lista_columnas}) VALUES ({valores_origen});
+                                       DROP TABLE {tabla_staging};
+                                   """)
 
             return {'exito': True, 'error': None}
 
         except Exception as e:
             return {'exito': False, 'error':e}
+        finally:
+            self.__cursor.fast_executemany = False
 
     def typeToSize(self,df):
         """
@@ -276,62 +411,96 @@ class ConsultasSql:
         except Exception as e:
             return None
 
-    def fn_validar_vin_cmdm_dda(self):
+    def fn_validar_vin_cmdm_dda(self, fecha_desde = None):
         """
-        Valida los VINs entregados en DDA y tipo de vehículo VP en la tabla delta_cmdm_file.
+        Marca como procesados (estado=1) los VINs de la tabla delta_cmdm_file entregados en DDA y tipo de vehículo VP,
+        y retorna las filas marcadas.
+
+        La lectura y el cambio de estado se hacen en una sola sentencia (UPDATE ... OUTPUT inserted.*), así no se
+        envía la lista de VINs de vuelta al servidor y ninguna fila puede cambiar entre la consulta y la actualización.
+
+        Parameters:
+        -----------
+        fecha_desde : datetime.date, opcional
+            Marca de agua: se revisan las entregas desde esta fecha hasta hoy. Sin marca se revisan las
+            entregas de los últimos RANGO_FECHA_CONSULTA días.
 
         Returns:
         --------
-        dict: {'exito': True, 'data': lista_cmdm} o {'exito': False, 'error': ex}
+        dict: {'exito': True, 'data': lista_cmdm, 'fecha_maxima': fecha} o {'exito': False, 'error': ex}
+            fecha_maxima es la mayor fecha de entrega DDA de las filas marcadas (None si no hubo filas).
         """
         rango_consulta = config.RANGO_FECHA_CONSULTA
         lista_cmdm = []
+        if fecha_desde is None:
+            filtro_fecha = f'DDA.fecha_entrega BETWEEN (CONVERT (DATE, GETDATE(){rango_consulta})) AND CONVERT(DATE, GETDATE())'
+            parametros = []
+        else:
+            #Una entrega con fecha futura no debe adelantar la marca de agua
+            filtro_fecha = 'DDA.fecha_entrega >= ? AND DDA.fecha_entrega <= CONVERT(DATE, GETDATE())'
+            parametros = [fecha_desde]
         try:
-            sql_query = f""" SELECT CMDM.*
+            sql_query = f""" UPDATE CMDM
+                             SET CMDM.estado=1
+                             OUTPUT inserted.*, DDA.fecha_entrega
                              FROM DATASTEWARD.[dbo].[delta_cmdm_file] AS CMDM
                                 INNER JOIN DATASTEWARD.[dbo].[reporte_dda] AS DDA
                                     ON CMDM.SDI_VHCL_VIN = DDA.vin
                             WHERE CMDM.estado=0
                             AND CMDM.SDI_VHCL_VHCL_TYP_CD = 'VP'
-                            AND DDA.fecha_entrega BETWEEN (CONVERT (DATE, GETDATE(){rango_consulta})) AND CONVERT(DATE, GETDATE())
+                            AND {filtro_fecha}
                          """
-            self.__cursor.execute(sql_query)
-            lista_cmdm = self.__cursor.fetchall()
+            self.__cursor.execute(sql_query, *parametros)
+            filas = self.__cursor.fetchall()
+
+            #La última columna es la fecha de entrega DDA, que solo se usa para avanzar la marca de agua
+            lista_cmdm = [tuple(fila)[:-1] for fila in filas]
+            fecha_maxima = max((fila[-1] for fila in filas if fila[-1] is not None), default=None)
 
             return {'exito':True
-                    ,'data':lista_cmdm}
+                    ,'data':lista_cmdm
+                    ,'fecha_maxima':fecha_maxima}
 
         except Exception as ex:
 
             return {'exito':False
                     ,'error':ex}
-    
-    def fn_actu_estado_cmdm(self,lista_vin):
+
+    def fn_revertir_vin_cmdm(self, lista_vin, tamano_bloque = 2000):
         """
-        Actualiza el estado de los VINs en la tabla delta_cmdm_file.
+        Devuelve a pendiente (estado=0) los VINs que fn_validar_vin_cmdm_dda marcó como procesados, cuando la
+        ejecución falla antes de generar el archivo CMDM. Se ejecuta en bloques para no superar el límite de 2100
+        parámetros de SQL Server.
 
         Parameters:
         -----------
         lista_vin : list
-            Lista de VINs a actualizar.
+            VINs marcados en la ejecución.
 
         Returns:
         --------
-        dict: {'exito': True} o {'exito': False, 'error': ex}
+        dict: {'exito': True, 'data': filas_revertidas, 'error': None} o {'exito': False, 'data': None, 'error': ex}
         """
-        placeholders = ', '.join(['?'] * len(lista_vin))
         try:
+            revertidas = 0
+            for inicio in range(0, len(lista_vin), tamano_bloque):
+                bloque = list(lista_vin[inicio:inicio + tamano_bloque])
+                placeholders = ', '.join(['?'] * len(bloque))
+                self.__cursor.execute(f""" UPDATE DATASTEWARD.[dbo].[delta_cmdm_file]
+                                           SET estado=0
+                                           WHERE estado=1
+                                           AND SDI_VHCL_VIN IN ({placeholders})
+                                       """, bloque)
+                revertidas += max(self.__cursor.rowcount, 0)
+            return {'exito':True
+                    ,'data':revertidas
+                    ,'error':None}
 
-            sql_query = f""" UPDATE  DATASTEWARD.[dbo].[delta_cmdm_file]
-                        SET estado=1
-                        WHERE SDI_VHCL_VIN IN ({placeholders}) 
-                        """
-            self.__cursor.execute(sql_query,lista_vin)
-            return {'exito':True}
         except Exception as ex:
             return {'exito':False
+                    ,'data':None
                     ,'error':ex}
-    
+
     def fn_reenvio_vin_cmdm(self):
         """
         Consulta los VINs que requieren reenvío en la tabla delta_cmdm_file.
@@ -471,40 +640,14 @@ class ConsultasSql:
                                         SDI_CMDM as(
                                         SELECT cli.NUMIDECLI AS ID_CUSTOMER,
 
-                                        CASE 
-                                            when (cli.NOMCLI = 'POR DEFINIR') then ' '
-                                            WHEN (cli.NOMCLI=CLI.APECLI) THEN ' '
-                                            when (cli.NOMCLI LIKE '% S.A' OR cli.NOMCLI LIKE '% S.A ' OR cli.NOMCLI LIKE '% S.A.' OR cli.NOMCLI LIKE '% SAS' OR cli.NOMCLI LIKE '% SAS ' OR cli.NOMCLI LIKE '% S.A.S' OR cli.NOMCLI LIKE '% S A' OR cli.NOMCLI LIKE '% S.A.S.' OR cli.NOMCLI LIKE '% LTDA' OR cli.NOMCLI LIKE 'COOPERATIVA%' OR cli.NOMCLI LIKE 'BANCO%' OR cli.NOMCLI LIKE 'BBVA%%' OR cli.NOMCLI LIKE 'CONSULTORES%' OR cli.NOMCLI LIKE 'TRANSPORTES%' OR cli.NOMCLI LIKE 'SUPERTIENDAS%' OR cli.NOMCLI LIKE 'DROGUERIAS%' OR cli.NOMCLI LIKE 'LEASING%' OR cli.NOMCLI LIKE 'TECNOLOGIA%' OR cli.NOMCLI LIKE 'INVERSORA%') then ' '
-                                            when (cli.nomcli is not null AND (cli.NOMCLI LIKE '% S.A' OR cli.NOMCLI LIKE '% S.A ' OR cli.NOMCLI LIKE '% S.A.' OR cli.NOMCLI LIKE '% SAS' OR cli.NOMCLI LIKE '% SAS ' OR cli.NOMCLI LIKE '% S.A.S' OR cli.NOMCLI LIKE '% S A' OR cli.NOMCLI LIKE '% S.A.S.' OR cli.NOMCLI LIKE '% LTDA' OR cli.NOMCLI LIKE 'COOPERATIVA%' OR cli.NOMCLI LIKE 'BANCO' OR cli.NOMCLI LIKE 'BBVA%' OR cli.NOMCLI LIKE 'CONSULTORES%' OR cli.NOMCLI LIKE 'TRANSPORTES%' OR cli.NOMCLI LIKE 'SUPERTIENDAS%' OR cli.NOMCLI LIKE 'DROGUERIAS%' OR cli.NOMCLI LIKE 'LEASING%' OR cli.NOMCLI LIKE 'TECNOLOGIA%' OR cli.NOMCLI LIKE 'INVERSORA%') AND (cli.APECLI NOT LIKE '% S.A' OR cli.APECLI NOT LIKE '% S.A.' OR cli.APECLI NOT LIKE '% S.A ' OR cli.APECLI NOT LIKE '% SAS' OR cli.APECLI NOT LIKE '% S.A.S' OR cli.APECLI NOT LIKE '% S A' OR cli.APECLI NOT LIKE '% S.A.S.' OR cli.APECLI NOT LIKE '% LTDA' OR cli.APECLI NOT LIKE 'COOPERATIVA%' OR cli.APECLI NOT LIKE 'BANCO%' OR cli.APECLI NOT LIKE 'BBVA%' OR cli.APECLI NOT LIKE 'CONSULTORES%' OR cli.APECLI NOT LIKE 'TRANSPORTES%' OR cli.APECLI NOT LIKE 'SUPERTIENDAS%' OR cli.APECLI NOT LIKE 'DROGUERIAS%' OR cli.APECLI NOT LIKE 'LEASING%' OR cli.APECLI NOT LIKE 'TECNOLOGIA%' OR cli.APECLI NOT LIKE 'INVERSORA%')) then ' '
-                                            when (cli.nomcli is not null AND (cli.NOMCLI LIKE '% S.A' OR cli.NOMCLI LIKE '% S.A ' OR cli.NOMCLI LIKE '% S.A.' OR cli.NOMCLI LIKE '% SAS' OR cli.NOMCLI LIKE '% SAS ' OR cli.NOMCLI LIKE '% S.A.S' OR cli.NOMCLI LIKE '% S A' OR cli.NOMCLI LIKE '% S.A.S.' OR cli.NOMCLI LIKE '% LTDA' OR cli.NOMCLI LIKE 'COOPERATIVA%' OR cli.NOMCLI LIKE 'BANCO' OR cli.NOMCLI LIKE 'BBVA%' OR cli.NOMCLI LIKE 'CONSULTORES%' OR cli.NOMCLI LIKE 'TRANSPORTES%' OR cli.NOMCLI LIKE 'SUPERTIENDAS%' OR cli.NOMCLI LIKE 'DROGUERIAS%' OR cli.NOMCLI LIKE 'LEASING%' OR cli.NOMCLI LIKE 'TECNOLOGIA%' OR cli.NOMCLI LIKE 'INVERSORA%') AND (cli.APECLI NOT LIKE '% S.A' OR cli.APECLI NOT LIKE '% S.A.' OR cli.APECLI NOT LIKE '% S.A ' OR cli.APECLI NOT LIKE '% SAS' OR cli.APECLI NOT LIKE '% S.A.S' OR cli.APECLI NOT LIKE '% S A' OR cli.APECLI NOT LIKE '% S.A.S.' OR cli.APECLI NOT LIKE '% LTDA' OR cli.APECLI NOT LIKE 'COOPERATIVA%' OR cli.APECLI NOT LIKE 'BANCO%' OR cli.APECLI NOT LIKE 'BBVA%' OR cli.APECLI NOT LIKE 'CONSULTORES%' OR cli.APECLI NOT LIKE 'TRANSPORTES%' OR cli.APECLI NOT LIKE 'SUPERTIENDAS%' OR cli.APECLI NOT LIKE 'DROGUERIAS%' OR cli.APECLI NOT LIKE 'LEASING%' OR cli.APECLI NOT LIKE 'TECNOLOGIA%' OR cli.APECLI NOT LIKE 'INVERSORA%')) then ' '
-                                            when (cli.nomcli is not null AND (cli.NOMCLI NOT LIKE '% S.A' OR cli.NOMCLI NOT LIKE '% S.A ' OR cli.NOMCLI NOT LIKE '% S.A.' OR cli.NOMCLI NOT LIKE '% SAS' OR cli.NOMCLI NOT LIKE '% SAS ' OR cli.NOMCLI NOT LIKE '% S.A.S' OR cli.NOMCLI NOT LIKE '% S A' OR cli.NOMCLI NOT LIKE '% S.A.S.' OR cli.NOMCLI NOT LIKE '% LTDA' OR cli.NOMCLI NOT LIKE 'COOPERATIVA%' OR cli.NOMCLI NOT LIKE 'BANCO%' OR cli.NOMCLI NOT LIKE 'BBVA%' OR cli.NOMCLI NOT LIKE 'CONSULTORES%' OR cli.NOMCLI NOT LIKE 'TRANSPORTES%' OR cli.NOMCLI NOT LIKE 'SUPERTIENDAS%' OR cli.NOMCLI NOT LIKE 'DROGUERIAS%' OR cli.NOMCLI NOT LIKE 'LEASING%' OR cli.NOMCLI NOT LIKE 'TECNOLOGIA%' OR cli.NOMCLI NOT LIKE 'INVERSORA%') AND (cli.APECLI LIKE '% S.A' OR cli.APECLI LIKE '% S.A.' OR cli.APECLI LIKE '% S.A ' OR cli.APECLI LIKE '% SAS' OR cli.APECLI LIKE '% S.A.S' OR cli.APECLI LIKE '% S A' OR cli.APECLI LIKE '% S.A.S.' OR cli.APECLI LIKE '% LTDA' OR cli.APECLI LIKE 'COOPERATIVA%' OR cli.APECLI LIKE 'BANCO%' OR cli.APECLI LIKE 'BBVA%' OR cli.APECLI LIKE 'CONSULTORES%' OR cli.APECLI LIKE 'TRANSPORTES%' OR cli.APECLI LIKE 'SUPERTIENDAS%' OR cli.APECLI LIKE 'DROGUERIAS%' OR cli.APECLI LIKE 'LEASING%' OR cli.APECLI  LIKE 'TECNOLOGIA%' OR cli.APECLI LIKE 'INVERSORA%')) then ' '
-                                            WHEN (cli.NOMCLI is not null) THEN replace(replace(replace(replace(replace(replace((cli.NOMCLI), char(10), ''), char(13), ''), char(59), ''), char(44), ' '), char(163), 'Ñ') , CHAR(165), 'Ñ')
-                                            else  
-                                            
-                                                    ' ' 
-                                            end as  CUSTOMER_NAME_1,
+                                        --Nombre, apellido y tipo de persona se calculan en modelo.clasificador_clientes
+                                        cli.NOMCLI AS CUSTOMER_NAME_1,
                                             
-                                        CASE 
-                                            when (cli.NOMCLI = 'POR DEFINIR') then ' '
-                                            when (cli.apecli is null) then cli.nomcli
-                                            when (cli.nomcli is not null AND (cli.NOMCLI LIKE '% S.A' OR cli.NOMCLI LIKE '% S.A.' OR cli.NOMCLI LIKE '% SAS' OR cli.NOMCLI LIKE '% S.A.S' OR cli.NOMCLI LIKE '% S A' OR cli.NOMCLI LIKE '% S.A.S.' OR cli.NOMCLI LIKE '% LTDA' OR cli.NOMCLI LIKE 'COOPERATIVA%' OR cli.NOMCLI LIKE 'BANCO%' OR cli.NOMCLI LIKE 'BBVA%' OR cli.NOMCLI LIKE 'CONSULTORES%' OR cli.NOMCLI LIKE 'TRANSPORTES%' OR cli.NOMCLI LIKE 'SUPERTIENDAS%' OR cli.NOMCLI LIKE 'DROGUERIAS%' OR cli.NOMCLI LIKE 'LEASING%' OR cli.NOMCLI LIKE 'TECNOLOGIA%' OR cli.NOMCLI LIKE 'INVERSORA%') AND (cli.APECLI NOT LIKE '% S.A' OR cli.APECLI NOT LIKE '% S.A.' OR cli.APECLI NOT LIKE '% SAS' OR cli.APECLI NOT LIKE '% S.A.S' OR cli.APECLI NOT LIKE '% S A' OR cli.APECLI NOT LIKE '% S.A.S.' OR cli.APECLI NOT LIKE '% LTDA' OR cli.APECLI NOT LIKE 'COOPERATIVA%' OR cli.APECLI NOT LIKE 'BANCO%' OR cli.APECLI NOT LIKE 'BBVA%' OR cli.APECLI NOT LIKE 'CONSULTORES%' OR cli.APECLI NOT LIKE 'TRANSPORTES%' OR cli.APECLI NOT LIKE 'SUPERTIENDAS%' OR cli.APECLI NOT LIKE 'DROGUERIAS%' OR cli.APECLI NOT LIKE 'LEASING%' OR cli.APECLI  NOT LIKE 'TECNOLOGIA%' OR cli.APECLI NOT LIKE 'INVERSORA%')) then cli.nomcli
-                                            when (cli.nomcli is not null AND LEN(cli.NOMCLI)> LEN(CLI.APECLI) AND (cli.NOMCLI LIKE '% S.A' OR cli.NOMCLI LIKE '% S.A.' OR cli.NOMCLI LIKE '% SAS' OR cli.NOMCLI LIKE '% S.A.S' OR cli.NOMCLI LIKE '% S A' OR cli.NOMCLI LIKE '% S.A.S.' OR cli.NOMCLI LIKE '% LTDA' OR cli.NOMCLI LIKE 'COOPERATIVA%' OR cli.NOMCLI LIKE 'BANCO%' OR cli.NOMCLI LIKE 'BBVA%' OR cli.NOMCLI LIKE 'CONSULTORES%' OR cli.NOMCLI LIKE 'TRANSPORTES%' OR cli.NOMCLI LIKE 'SUPERTIENDAS%' OR cli.NOMCLI LIKE 'DROGUERIAS%' OR cli.NOMCLI LIKE 'LEASING%' OR cli.NOMCLI LIKE 'TECNOLOGIA%' OR cli.NOMCLI LIKE 'INVERSORA%') AND (cli.APECLI  LIKE '% S.A' OR cli.APECLI  LIKE '% S.A.' OR cli.APECLI  LIKE '% SAS' OR cli.APECLI  LIKE '% S.A.S' OR cli.APECLI  LIKE '% S A' OR cli.APECLI  LIKE '% S.A.S.' OR cli.APECLI  LIKE '% LTDA' OR cli.APECLI  LIKE 'COOPERATIVA%' OR cli.APECLI  LIKE 'BANCO%' OR cli.APECLI LIKE 'BBVA%' OR cli.APECLI LIKE 'CONSULTORES%' OR cli.APECLI LIKE 'TRANSPORTES%' OR cli.APECLI LIKE 'SUPERTIENDAS%' OR cli.APECLI LIKE 'DROGUERIAS%' OR cli.APECLI LIKE 'LEASING%' OR cli.APECLI  LIKE 'TECNOLOGIA%' OR cli.APECLI LIKE 'INVERSORA%')) then cli.nomcli
-                                            when (cli.apecli is not null AND LEN(cli.APECLI)> LEN(CLI.NOMCLI) AND (cli.NOMCLI LIKE '% S.A' OR cli.NOMCLI LIKE '% S.A.' OR cli.NOMCLI LIKE '% SAS' OR cli.NOMCLI LIKE '% S.A.S' OR cli.NOMCLI LIKE '% S A' OR cli.NOMCLI LIKE '% S.A.S.' OR cli.NOMCLI LIKE '% LTDA' OR cli.NOMCLI LIKE 'COOPERATIVA%' OR cli.NOMCLI LIKE 'BANCO%' OR cli.NOMCLI LIKE 'BBVA%' OR cli.NOMCLI LIKE 'CONSULTORES%' OR cli.NOMCLI LIKE 'TRANSPORTES%' OR cli.NOMCLI LIKE 'SUPERTIENDAS%' OR cli.NOMCLI LIKE 'DROGUERIAS%' OR cli.NOMCLI LIKE 'LEASING%' OR cli.NOMCLI LIKE 'TECNOLOGIA%' OR cli.NOMCLI LIKE 'INVERSORA%') AND (cli.APECLI  LIKE '% S.A' OR cli.APECLI  LIKE '% S.A.' OR cli.APECLI  LIKE '% SAS' OR cli.APECLI  LIKE '% S.A.S' OR cli.APECLI  LIKE '% S A' OR cli.APECLI  LIKE '% S.A.S.' OR cli.APECLI  LIKE '% LTDA' OR cli.APECLI  LIKE 'COOPERATIVA%' OR cli.APECLI  LIKE 'BANCO%' OR cli.APECLI LIKE 'BBVA%' OR cli.APECLI LIKE 'CONSULTORES%' OR cli.APECLI LIKE 'TRANSPORTES%' OR cli.APECLI LIKE 'SUPERTIENDAS%' OR cli.APECLI LIKE 'DROGUERIAS%' OR cli.APECLI LIKE 'LEASING%' OR cli.APECLI  LIKE 'TECNOLOGIA%' OR cli.APECLI LIKE 'INVERSORA%')) then cli.apecli
-                                            WHEN (cli.NOMCLI is not null AND LEN(cli.NOMCLI)> LEN(CLI.APECLI) AND cli.NOMCLI LIKE '%'+cli.APECLI+'%') THEN replace(replace(replace(replace(replace((cli.NOMCLI), char(10), ''), char(13), ''), char(59), ''), CHAR(34), ''), char(163), 'Ñ') 
-                                            WHEN (cli.APECLI is not null) THEN replace(replace(replace(replace(replace(replace(replace((cli.APECLI), char(10), ''), char(13), ''), char(59), ''), CHAR(34), ''), char(44), ' '), char(163), 'Ñ'), CHAR(165), 'Ñ')
-                                                    else  
-                                                    ' ' 
-                                            end as  CUSTOMER_SURNAME_1,
+                                        cli.APECLI AS CUSTOMER_SURNAME_1,
                                             '' AS CUSTOMER_SURNAME_2,
                                         --cli.CODTIPPER as Tipo_de_pedido,
                                             '' as COMPANY_NAME,
-                                        CASE 
-                                            WHEN (cli.NOMCLI LIKE '% SA' OR cli.NOMCLI LIKE '% S.A.' OR cli.NOMCLI LIKE '% SAS' OR cli.NOMCLI LIKE '% S.A.S' OR cli.NOMCLI LIKE '% S A' OR cli.NOMCLI LIKE '% S.A.S.' OR cli.NOMCLI LIKE '% LTDA' OR cli.NOMCLI LIKE 'COOPERATIVA%' OR cli.NOMCLI LIKE 'BANCO%' OR cli.NOMCLI LIKE 'BBVA%%' OR cli.NOMCLI LIKE 'CONSULTORES%' OR cli.NOMCLI LIKE 'TRANSPORTES%' OR cli.NOMCLI LIKE 'SUPERTIENDAS%' OR cli.NOMCLI LIKE 'DROGUERIAS%' OR cli.NOMCLI LIKE 'LEASING%' OR cli.NOMCLI LIKE 'TECNOLOGIA%' OR cli.NOMCLI LIKE 'INVERSORA%') then 'Empresa'
-                                            WHEN (cli.APECLI LIKE '% SA' OR cli.APECLI LIKE '% S.A.' OR cli.APECLI LIKE '% SAS' OR cli.APECLI LIKE '% S.A.S' OR cli.APECLI LIKE '% S A' OR cli.APECLI LIKE '% S.A.S.' OR cli.APECLI LIKE '% LTDA' OR cli.APECLI LIKE 'COOPERATIVA%' OR cli.APECLI LIKE 'BANCO%' OR cli.APECLI LIKE 'BBVA%%' OR cli.APECLI LIKE 'CONSULTORES%' OR cli.APECLI LIKE 'TRANSPORTES%' OR cli.APECLI LIKE 'SUPERTIENDAS%' OR cli.APECLI LIKE 'DROGUERIAS%' OR cli.APECLI LIKE 'LEASING%' OR cli.APECLI  LIKE 'TECNOLOGIA%' OR cli.APECLI LIKE 'INVERSORA%') then 'Empresa'
-                                            WHEN (cli.CODTIPPER = 1) THEN 'Persona Natural'  
-                                            WHEN (cli.CODTIPPER = 2) THEN 'Persona Juridica' 
-                                            else ' '
-                                            end as  TYPE_OF_CLIENT,
+                                        cli.CODTIPPER AS TYPE_OF_CLIENT,
 
                                             '' AS SUB_TYPE_OF_CLIENT,
 
@@ -594,13 +737,6 @@ class ConsultasSql:
                                         '' AS ID_SALES_ADVISOR,
                                         'THERM' AS FUEL_TYPE,
 
-                                        CASE 
-                                            WHEN (cli.NOMCLI LIKE '% SA' OR cli.NOMCLI LIKE '% S.A.' OR cli.NOMCLI LIKE '% SAS' OR cli.NOMCLI LIKE '% S.A.S' OR cli.NOMCLI LIKE '% S A' OR cli.NOMCLI LIKE '% S.A.S.' OR cli.NOMCLI LIKE '% LTDA' OR cli.NOMCLI LIKE 'COOPERATIVA%' OR cli.NOMCLI LIKE 'BANCO%' OR cli.NOMCLI LIKE 'BBVA%%' OR cli.NOMCLI LIKE 'CONSULTORES%' OR cli.NOMCLI LIKE 'TRANSPORTES%' OR cli.NOMCLI LIKE 'SUPERTIENDAS%' OR cli.NOMCLI LIKE 'DROGUERIAS%' OR cli.NOMCLI LIKE 'LEASING%' OR cli.NOMCLI LIKE 'TECNOLOGIA%' OR cli.NOMCLI LIKE 'INVERSORA%') then 'Independent'
-                                            WHEN (cli.APECLI LIKE '% SA' OR cli.APECLI LIKE '% S.A.' OR cli.APECLI LIKE '% SAS' OR cli.APECLI LIKE '% S.A.S' OR cli.APECLI LIKE '% S A' OR cli.APECLI LIKE '% S.A.S.' OR cli.APECLI LIKE '% LTDA' OR cli.APECLI LIKE 'COOPERATIVA%' OR cli.APECLI LIKE 'BANCO%' OR cli.APECLI LIKE 'BBVA%%' OR cli.APECLI LIKE 'CONSULTORES%' OR cli.APECLI LIKE 'TRANSPORTES%' OR cli.APECLI LIKE 'SUPERTIENDAS%' OR cli.APECLI LIKE 'DROGUERIAS%' OR cli.APECLI LIKE 'LEASING%' OR cli.APECLI  LIKE 'TECNOLOGIA%' OR cli.APECLI LIKE 'INVERSORA%') then 'Independent'
-                                            WHEN (cli.CODTIPPER = 1) THEN ' '  
-                                            WHEN (cli.CODTIPPER = 2) THEN 'Independent' 
-                                            else ' '
-                                            end AS SEGMENTATION_OF_CLIENT,
                                         CASE 
                                             WHEN (cli.CODTIPPER = 1)
                                                 THEN 'N'
@@ -633,13 +769,6 @@ class ConsultasSql:
                                             WHEN (cli.AutEnvioInfo = 1) THEN 'Y' 
                                             else 'no value'
                                             end as  Acuerdo_SMS,
-                                        CASE	
-                                            WHEN pf.CCA29_DES_POLITICA like '%proximidad%' OR cli.CODTIPPER = 2 THEN 'N'
-                                            WHEN (cli.NOMCLI LIKE '% SA' OR cli.NOMCLI LIKE '% S.A.' OR cli.NOMCLI LIKE '% SAS' OR cli.NOMCLI LIKE '% S.A.S' OR cli.NOMCLI LIKE '% S A' OR cli.NOMCLI LIKE '% S.A.S.' OR cli.NOMCLI LIKE '% LTDA' OR cli.NOMCLI LIKE 'COOPERATIVA%' OR cli.NOMCLI LIKE 'BANCO%' OR cli.NOMCLI LIKE 'BBVA%%' OR cli.NOMCLI LIKE 'CONSULTORES%' OR cli.NOMCLI LIKE 'TRANSPORTES%' OR cli.NOMCLI LIKE 'SUPERTIENDAS%' OR cli.NOMCLI LIKE 'DROGUERIAS%' OR cli.NOMCLI LIKE 'LEASING%' OR cli.NOMCLI LIKE 'TECNOLOGIA%' OR cli.NOMCLI LIKE 'INVERSORA%') THEN 'N'
-                                            WHEN (cli.APECLI LIKE '% SA' OR cli.APECLI LIKE '% S.A.' OR cli.APECLI LIKE '% SAS' OR cli.APECLI LIKE '% S.A.S' OR cli.APECLI LIKE '% S A' OR cli.APECLI LIKE '% S.A.S.' OR cli.APECLI LIKE '% LTDA' OR cli.APECLI LIKE 'COOPERATIVA%' OR cli.APECLI LIKE 'BANCO%' OR cli.APECLI LIKE 'BBVA%%' OR cli.APECLI LIKE 'CONSULTORES%' OR cli.APECLI LIKE 'TRANSPORTES%' OR cli.APECLI LIKE 'SUPERTIENDAS%' OR cli.APECLI LIKE 'DROGUERIAS%' OR cli.APECLI LIKE 'LEASING%' OR cli.APECLI  LIKE 'TECNOLOGIA%' OR cli.APECLI LIKE 'INVERSORA%') THEN 'N'
-                                        ELSE 'Y'
-                                        END as tipo_de_flotilla,
-
                                         CCA29_DES_POLITICA as descrip_politica
 
                                         FROM SGS.dbo.VEH_Vehiculos veh
@@ -658,8 +787,8 @@ class ConsultasSql:
 
 
                                         select distinct ID_CUSTOMER AS 'N° Identificación'
-                                                        ,ISNULL (CUSTOMER_NAME_1,'') AS 'Nombre Cliente'
-                                                        ,ISNULL (CUSTOMER_SURNAME_1,'') AS 'Apellido Cliente '
+                                                        ,CUSTOMER_NAME_1 AS 'Nombre Cliente'
+                                                        ,CUSTOMER_SURNAME_1 AS 'Apellido Cliente '
                                                         ,ISNULL (E_MAIL_1_EXTRANET,'') AS 'Correo Extranet'
                                                         ,CMDM.VIN AS 'VIN'
                                                         ,TipSer AS 'Tipo Servicio'
@@ -671,7 +800,7 @@ class ConsultasSql:
                                                         ,ISNULL(Acuerdo_cod_postal,'') AS 'Acuerdo Postal'
                                                         ,ISNULL(Acuerdo_telefono,'') AS 'Acuerdo Telefono'
                                                         ,ISNULL(Acuerdo_SMS,'') AS 'Acuerdo SMS'
-                                                        ,ISNULL(TYPE_OF_CLIENT,'') AS 'Tipo Persona'
+                                                        ,TYPE_OF_CLIENT AS 'Tipo Persona'
                                                         ,ISNULL(descrip_politica,'') AS 'Describción Política'
                                                         ,fecha_entrega AS 'Fecha de entrega DDA'
                                         from SDI_CMDM AS CMDM
@@ -688,9 +817,59 @@ class ConsultasSql:
             return {'exito':False
                     ,'error':ex}
 
-    def fn_validar_vin_dda_publicos(self):
+    def fn_consultar_por_claves(self, sql_query, claves, tamano_bloque = 2000):
+        """
+        Ejecuta una consulta con una lista IN (...) de claves, en bloques para no superar el límite de
+        2100 parámetros de SQL Server.
+
+        Parameters:
+        -----------
+        sql_query : str
+            Consulta con el marcador {placeholders} dentro de IN (...).
+        claves : list o None
+            Valores de la lista IN. None ejecuta la consulta una sola vez, sin parámetros.
+        tamano_bloque : int
+            Máximo de claves por ejecución.
+
+        Returns:
+        --------
+        dict: {'exito': True, 'data': filas, 'columnas': nombres} o {'exito': False, 'error': ex}
+        """
+        try:
+            filas = []
+            columnas = None
+            if claves is None:
+                bloques = [None]
+            else:
+                bloques = [list(claves[inicio:inicio + tamano_bloque]) for inicio in range(0, len(claves), tamano_bloque)]
+
+            for bloque in bloques:
+                if bloque is None:
+                    self.__cursor.execute(sql_query)
+                else:
+                    placeholders = ', '.join(['?'] * len(bloque))
+                    self.__cursor.execute(sql_query.format(placeholders=placeholders), bloque)
+                columnas = [descripcion[0] for descripcion in self.__cursor.description]
+                filas.extend(tuple(fila) for fila in self.__cursor.fetchall())
+
+            return {'exito':True
+                    ,'data':filas
+                    ,'columnas':columnas}
+
+        except Exception as ex:
+            return {'exito':False
+                    ,'error':ex}
+
+    def fn_validar_vin_dda_publicos(self, tamano_pagina, vin_desde = ''):
         """
-        Valida los VINs de servicio público entregados en DDA.
+        Valida los VINs de servicio público entregados en DDA, por páginas ordenadas por VIN (paginación por clave).
+
+        Parameters:
+        -----------
+        tamano_pagina : int
+            Máximo de VINs de la página.
+        vin_desde : str
+            Último VIN de la página anterior; la página empieza en el VIN siguiente ('' para la primera).
 
         Returns:
         --------
@@ -698,14 +877,16 @@ class ConsultasSql:
         """
         lista_data_ser_publico = []
         try:
-            sql_query = f""" SELECT top 500 CMDM.SDI_VHCL_VIN
+            sql_query = f""" SELECT DISTINCT TOP (?) CMDM.SDI_VHCL_VIN
                              FROM DATASTEWARD.[dbo].[delta_cmdm_file] AS CMDM
                                 INNER JOIN DATASTEWARD.[dbo].[reporte_dda] AS DDA
                                     ON CMDM.SDI_VHCL_VIN = DDA.vin
                             WHERE CMDM.estado=0
                             AND CMDM.SDI_VHCL_VHCL_TYP_CD <> 'VP'
+                            AND CMDM.SDI_VHCL_VIN > ?
+                            ORDER BY CMDM.SDI_VHCL_VIN
                          """
-            self.__cursor.execute(sql_query)
+            self.__cursor.execute(sql_query, tamano_pagina, vin_desde)
             lista_data_ser_publico = self.__cursor.fetchall()
 
             return {'exito':True
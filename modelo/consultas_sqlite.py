@@ -0,0 +1,475 @@
+"""
+Módulo consultas_sqlite.py
+
+Este módulo define la clase ConsultasSqlite, el backend local de consultas: implementa los mismos métodos y
+retornos que ConsultasSql sobre un archivo SQLite (RUTA_BASE_SQLITE), para ejecutar y perfilar el pipeline
+completo sin SQL Server. Se selecciona con BACKEND_SQL=sqlite (ver modelo.fabrica_consultas).
+
+Clases:
+-------
+ConsultasSqlite
+    - Mismos métodos públicos que ConsultasSql (salvo typeToSize, propio de pyodbc).
+
+Funciones:
+----------
+- fn_crear_esquema(conexion, columnas_delta): Crea las tablas que usa el proceso, vacías.
+- fn_traducir_sql(sql_query): Adapta una consulta corta de SQL Server (nombres de tres partes, corchetes) a SQLite.
+
+Esquema:
+--------
+Las tablas de las bases DATASTEWARD, SGS, SISC y Conexion quedan en un solo archivo, sin el prefijo de la base:
+delta_cmdm_file (columnas de COLUMNA_ARCHIVO_CMDM con '.' cambiado por '_'), reporte_dda, reenvio_encuestas_cmdm,
+TADEM03_PARAMETROS y las tablas de enriquecimiento del correo (VEH_Vehiculos, GEN_CLIENTES, GEN_CIUDADES,
+GEN_DEPARTAMENTOS, EXTT_DetalleVentaJuridica, EXTT_ContactoPersonaJuridica, TB08_VEHICULO, EXTT_Salas,
+TCA29_POLITICAS_FLOTILLAS y vin_excluir_cierre).
+
+Notas:
+------
+- fn_consulta_info_vin_email usa el motor de enriquecimiento por fuentes (modelo.motor_enriquecimiento): la consulta
+  única de SQL Server usa funciones y sintaxis propias de T-SQL.
+- CHECKSUM_AGG y BINARY_CHECKSUM se registran como funciones de la conexión para la caché de dimensiones.
+- Las fechas se guardan como texto ISO y se leen como datetime.date, igual que las columnas DATE con pyodbc.
+"""
+import datetime
+import re
+import sqlite3
+import threading
+import zlib
+
+import config
+from modelo.contadores_io import CursorMedido
+
+sqlite3.register_adapter(datetime.date, lambda fecha: fecha.isoformat())
+sqlite3.register_adapter(datetime.datetime, lambda fecha: fecha.isoformat(sep=' '))
+sqlite3.register_converter('DATE', lambda valor: datetime.date.fromisoformat(valor.decode()))
+sqlite3.register_converter('DATETIME', lambda valor: datetime.datetime.fromisoformat(valor.decode()))
+
+ESQUEMA_TABLAS = """
+CREATE TABLE IF NOT EXISTS reporte_dda (vin TEXT NOT NULL, fecha_entrega DATE);
+CREATE INDEX IF NOT EXISTS ix_reporte_dda_vin ON reporte_dda (vin);
+CREATE TABLE IF NOT EXISTS reenvio_encuestas_cmdm (VIN TEXT NOT NULL);
+CREATE TABLE IF NOT EXISTS TADEM03_PARAMETROS (CADEM03_DESCRIPCION TEXT, CADEM03_VALOR TEXT);
+CREATE TABLE IF NOT EXISTS VEH_Vehiculos (NumVin TEXT PRIMARY KEY, NumIdeCli TEXT, CODTIPIDE TEXT, TipVehSap TEXT
+                                          ,FecVtaVeh DATETIME, CodConCom TEXT, FecEntVeh DATETIME, TipSer TEXT
+                                          ,motped TEXT, ide_Sala INTEGER, Politica_Flotillas INTEGER);
+CREATE TABLE IF NOT EXISTS GEN_CLIENTES (CODCLI INTEGER PRIMARY KEY, NUMIDECLI TEXT, CodTipIde TEXT, NOMCLI TEXT
+                                         ,APECLI TEXT, CODTIPPER INTEGER, CORELECLI TEXT, AutEnvioInfo INTEGER
+                                         ,CODCIU INTEGER);
+CREATE INDEX IF NOT EXISTS ix_gen_clientes_ide ON GEN_CLIENTES (NUMIDECLI);
+CREATE TABLE IF NOT EXISTS GEN_CIUDADES (CODCIU INTEGER PRIMARY KEY, CODDEP INTEGER);
+CREATE TABLE IF NOT EXISTS GEN_DEPARTAMENTOS (coddep INTEGER PRIMARY KEY);
+CREATE TABLE IF NOT EXISTS EXTT_DetalleVentaJuridica (codVehiculo TEXT, idclientefinal INTEGER, idContactoUno TEXT);
+CREATE INDEX IF NOT EXISTS ix_detalle_juridica_vin ON EXTT_DetalleVentaJuridica (codVehiculo);
+CREATE TABLE IF NOT EXISTS EXTT_ContactoPersonaJuridica (Ide_Cedula TEXT PRIMARY KEY, Vlr_Email TEXT);
+CREATE TABLE IF NOT EXISTS TB08_VEHICULO (CB08_CODVEH TEXT PRIMARY KEY, CB08_NOMVEH TEXT);
+CREATE TABLE IF NOT EXISTS EXTT_Salas (ide_Sala INTEGER PRIMARY KEY, Cod_Bir TEXT, Nom_Sala TEXT);
+CREATE TABLE IF NOT EXISTS TCA29_POLITICAS_FLOTILLAS (CCA29_COD_POLITICA INTEGER PRIMARY KEY, CCA29_DES_POLITICA TEXT);
+CREATE TABLE IF NOT EXISTS vin_excluir_cierre (vin TEXT PRIMARY KEY);
+"""
+
+
+def fn_crear_esquema(conexion, columnas_delta):
+    """
+    Crea las tablas del proceso si no existen.
+
+    Parameters:
+    -----------
+    conexion : sqlite3.Connection
+    columnas_delta : list
+        Columnas del archivo CMDM (config.COLUMNA_ARCHIVO_CMDM); en delta_cmdm_file el '.' se cambia por '_'.
+    """
+    columnas = []
+    for columna in columnas_delta:
+        nombre = columna.replace('.', '_')
+        tipo = 'INTEGER NOT NULL DEFAULT 0' if nombre.upper() == 'ESTADO' else 'TEXT'
+        columnas.append(f'"{nombre}" {tipo}')
+    conexion.executescript(f"""CREATE TABLE IF NOT EXISTS delta_cmdm_file ({', '.join(columnas)});
+                               CREATE UNIQUE INDEX IF NOT EXISTS ux_delta_cmdm_file_vin ON delta_cmdm_file (SDI_VHCL_VIN);
+                               {ESQUEMA_TABLAS}""")
+
+
+def fn_traducir_sql(sql_query):
+    """
+    Adapta una consulta de SQL Server a SQLite: quita los corchetes y el prefijo de base y esquema de los nombres
+    de tres partes (SGS.dbo.VEH_Vehiculos, CONEXION..TB08_VEHICULO).
+    """
+    sql_query = re.sub(r'\[([^\]]*)\]', r'\1', sql_query)
+    return re.sub(r'\b\w+\.(?:dbo)?\.(\w+)', r'\1', sql_query, flags=re.IGNORECASE)
+
+
+def fn_binary_checksum(*valores):
+    """BINARY_CHECKSUM de SQL Server: suma de verificación de los valores de una fila."""
+    return zlib.crc32(repr(valores).encode('utf-8'))
+
+
+class ChecksumAgg:
+    """CHECKSUM_AGG de SQL Server: XOR de las sumas de verificación."""
+    def __init__(self):
+        self.valor = None
+
+    def step(self, checksum):
+        if checksum is not None:
+            self.valor = checksum if self.valor is None else self.valor ^ checksum
+
+    def finalize(self):
+        return self.valor
+
+
+def fn_bit(valor):
+    """Convierte un valor a bit como SQL Server ('false'/'true', 0/1)."""
+    if isinstance(valor, str):
+        texto = valor.strip().lower()
+        if texto in ('true', '1'):
+            return 1
+        if texto in ('false', '0'):
+            return 0
+    if valor is None:
+        return None
+    return 1 if valor else 0
+
+
+class ConsultasSqlite:
+    """
+    Backend de consultas sobre SQLite con la interfaz de ConsultasSql.
+    """
+    #Constructor
+    def __init__(self, ruta_base = None):
+        """
+        Parameters:
+        -----------
+        ruta_base : str, opcional
+            Archivo SQLite; por defecto RUTA_BASE_SQLITE.
+        """
+        self.__ruta_base = ruta_base or config.RUTA_BASE_SQLITE
+        #Conexión y cursor por hilo, como en ConsultasSql
+        self.__local = threading.local()
+
+    @property
+    def __conexion(self):
+        return getattr(self.__local, 'conexion', None)
+
+    @__conexion.setter
+    def __conexion(self, conexion):
+        self.__local.conexion = conexion
+
+    @property
+    def __cursor(self):
+        return getattr(self.__local, 'cursor', None)
+
+    @__cursor.setter
+    def __cursor(self, cursor):
+        self.__local.cursor = cursor
+
+    def conectar_db_conexion(self, tiempo_espera = None):
+        """
+        Abre la base SQLite y crea el esquema si no existe. tiempo_espera se acepta por compatibilidad con
+        ConsultasSql; la espera por bloqueos es siempre de 30 segundos.
+
+        Returns:
+        --------
+        tuple: (True, None) si la conexión es exitosa, (False, ex) si ocurre un error.
+        """
+        try:
+            self.__conexion = sqlite3.connect(self.__ruta_base
+                                             ,detect_types=sqlite3.PARSE_DECLTYPES | sqlite3.PARSE_COLNAMES
+                                             ,timeout=30)
+            self.__conexion.create_function('BINARY_CHECKSUM', -1, fn_binary_checksum, deterministic=True)
+            self.__conexion.create_aggregate('CHECKSUM_AGG', 1, ChecksumAgg)
+            fn_crear_esquema(self.__conexion, config.COLUMNA_ARCHIVO_CMDM)
+            self.__cursor = CursorMedido(self.__conexion.cursor())
+            return True,None
+        except sqlite3.Error as ex:
+            return False, ex
+
+    def desconectar(self):
+        """
+        Confirma los cambios y cierra la conexión.
+        """
+        self.__conexion.commit()
+        self.__cursor.close()
+        self.__conexion.close()
+
+    def fn_verificar_conexion(self, tiempo_espera = None):
+        """
+        Abre la base, ejecuta una consulta trivial y la cierra.
+
+        Returns:
+        --------
+        dict: {'exito': True, 'error': None} o {'exito': False, 'error': ex}
+        """
+        estado_conexion, mensaje_error = self.conectar_db_conexion(tiempo_espera)
+        if not estado_conexion:
+            return {'exito':False, 'error':mensaje_error}
+        try:
+            self.__cursor.execute('SELECT 1')
+            self.__cursor.fetchall()
+            return {'exito':True, 'error':None}
+        except sqlite3.Error as ex:
+            return {'exito':False, 'error':ex}
+        finally:
+            self.desconectar()
+
+    def fn_consultar_ruta_ftp(self):
+        """
+        Consulta la ruta FTP en TADEM03_PARAMETROS.
+
+        Returns:
+        --------
+        dict: {'exito': True, 'data': ruta_ftp, 'error': None} o {'exito': False, 'data': None, 'error': ex}
+        """
+        try:
+            self.__cursor.execute("""SELECT CADEM03_VALOR FROM TADEM03_PARAMETROS
+                                     WHERE CADEM03_DESCRIPCION LIKE 'Ruta ftp'""")
+            ruta_ftp = self.__cursor.fetchall()[0]
+            return {'exito':True, 'data':ruta_ftp[0], 'error':None}
+        except Exception as ex:
+            return {'exito':False, 'data':None, 'error':ex}
+
+    def fn_consultar_fechas_vin(self,lista_vin):
+        """
+        Consulta las fechas de entrega DDA (dd/mm/aaaa y dd/mm/aaaa 12:00:00) de una lista de VINs.
+
+        Returns:
+        --------
+        dict: {'exito': True, 'data': lista_vin} o {'exito': False, 'error': ex}
+        """
+        try:
+            placeholders = ', '.join(['?'] * len(lista_vin))
+            self.__cursor.execute(f"""SELECT vin
+                                             ,strftime('%d/%m/%Y', fecha_entrega)
+                                             ,strftime('%d/%m/%Y', fecha_entrega) || ' 12:00:00'
+                                      FROM reporte_dda
+                                      WHERE vin IN ({placeholders})""", list(lista_vin))
+            return {'exito':True, 'data':self.__cursor.fetchall()}
+        except Exception as ex:
+            return {'exito':False, 'error':ex}
+
+    def fn_consultar_destinatarios(self):
+        """
+        Consulta los destinatarios de correo en TADEM03_PARAMETROS.
+
+        Returns:
+        --------
+        dict: {'exito': True, 'data': destinatarios, 'error': None} o {'exito': False, 'data': None, 'error': ex}
+        """
+        try:
+            self.__cursor.execute("""SELECT CADEM03_VALOR FROM TADEM03_PARAMETROS
+                                     WHERE CADEM03_DESCRIPCION LIKE 'Email cambios encuestas'""")
+            return {'exito':True, 'data':self.__cursor.fetchall(), 'error':None}
+        except Exception as ex:
+            return {'exito':False, 'data':None, 'error':ex}
+
+    def fn_consulta_estado_dda(self,lista_vin):
+        """
+        Consulta los VINs de la lista con entrega en reporte_dda.
+
+        Returns:
+        --------
+        dict: {'exito': True, 'data': res_lista_vin, 'error': None} o {'exito': False, 'data': None, 'error': ex}
+        """
+        try:
+            placeholders = ', '.join(['?'] * len(lista_vin))
+            self.__cursor.execute(f'SELECT vin FROM reporte_dda WHERE vin IN ({placeholders})', list(lista_vin))
+            return {'exito':True, 'data':self.__cursor.fetchall(), 'error':None}
+        except Exception as ex:
+            return {'exito':False, 'data':None, 'error':ex}
+
+    def fn_consultar_reporte_dda_desde(self, fecha_desde, tamano_lote, fn_procesar_lote):
+        """
+        Lee vin y fecha_entrega de reporte_dda desde una fecha, por lotes (ver ConsultasSql).
+
+        Returns:
+        --------
+        dict: {'exito': True, 'data': total_filas, 'error': None} o {'exito': False, 'data': None, 'error': ex}
+        """
+        try:
+            total_filas = 0
+            if fecha_desde is None:
+                self.__cursor.execute('SELECT vin, fecha_entrega FROM reporte_dda')
+            else:
+                self.__cursor.execute("""SELECT vin, fecha_entrega FROM reporte_dda
+                                         WHERE fecha_entrega >= ? OR fecha_entrega IS NULL""", [fecha_desde])
+            while True:
+                filas = self.__cursor.fetchmany(tamano_lote)
+                if not filas:
+                    break
+                fn_procesar_lote(filas)
+                total_filas += len(filas)
+            return {'exito':True, 'data':total_filas, 'error':None}
+        except Exception as ex:
+            return {'exito':False, 'data':None, 'error':ex}
+
+    def fn_insertar_vin_delta_cmdm(self,df_vin_no_dda):
+        """
+        Inserta o actualiza por SDI_VHCL_VIN las filas del DataFrame en delta_cmdm_file, con la misma semántica del
+        MERGE de ConsultasSql: gana la última fila de cada VIN, un VIN sin cambios no se reescribe y la columna estado
+        solo se asigna al insertar.
+
+        Returns:
+        --------
+        dict: {'exito': True, 'error': None} o {'exito': False, 'error': e}
+        """
+        try:
+            columnas = [fila[1] for fila in self.__conexion.execute('PRAGMA table_info(delta_cmdm_file)')]
+            posicion_estado = [columna.upper() for columna in columnas].index('ESTADO') if any(
+                columna.upper() == 'ESTADO' for columna in columnas) else None
+
+            filas = df_vin_no_dda.values.tolist()
+            if posicion_estado is not None:
+                for fila in filas:
+                    fila[posicion_estado] = fn_bit(fila[posicion_estado])
+
+            lista_columnas = ', '.join(f'"{columna}"' for columna in columnas)
+            placeholders = ', '.join(['?'] * len(columnas))
+            actualizar = [columna for columna in columnas if columna.upper() not in ('SDI_VHCL_VIN', 'ESTADO')]
+            asignaciones = ', '.join(f'"{columna}" = excluded."{columna}"' for columna in actualizar)
+            cambios = ' OR '.join(f'"{columna}" IS NOT excluded."{columna}"' for columna in actualizar)
+
+            self.__cursor.executemany(f"""INSERT INTO delta_cmdm_file ({lista_columnas}) VALUES ({placeholders})
+                                          ON CONFLICT (SDI_VHCL_VIN) DO UPDATE SET {asignaciones}
+                                          WHERE {cambios}""", filas)
+            return {'exito': True, 'error': None}
+        except Exception as e:
+            return {'exito': False, 'error':e}
+
+    def fn_validar_vin_cmdm_dda(self, fecha_desde = None):
+        """
+        Marca como procesados (estado=1) los VINs VP de delta_cmdm_file con entrega DDA desde fecha_desde hasta hoy (o en los
+        últimos RANGO_FECHA_CONSULTA días si no hay marca) y los retorna, como el UPDATE ... OUTPUT de ConsultasSql
+        (en SQLite: selección y actualización en la misma transacción).
+
+        Returns:
+        --------
+        dict: {'exito': True, 'data': lista_cmdm, 'fecha_maxima': fecha} o {'exito': False, 'error': ex}
+        """
+        if fecha_desde is None:
+            filtro_fecha = "DDA.fecha_entrega BETWEEN date('now', ?) AND date('now')"
+            parametros = [f'{int(config.RANGO_FECHA_CONSULTA)} days']
+        else:
+            filtro_fecha = "DDA.fecha_entrega >= ? AND DDA.fecha_entrega <= date('now')"
+            parametros = [fecha_desde]
+        try:
+            self.__cursor.execute('DROP TABLE IF EXISTS temp.marcados')
+            self.__cursor.execute(f"""CREATE TEMP TABLE marcados AS
+                                      SELECT CMDM.rowid AS fila, MAX(DDA.fecha_entrega) AS fecha_entrega
+                                      FROM delta_cmdm_file AS CMDM
+                                          INNER JOIN reporte_dda AS DDA ON CMDM.SDI_VHCL_VIN = DDA.vin
+                                      WHERE CMDM.estado = 0
+                                      AND CMDM.SDI_VHCL_VHCL_TYP_CD = 'VP'
+                                      AND {filtro_fecha}
+                                      GROUP BY CMDM.rowid""", parametros)
+            self.__cursor.execute('UPDATE delta_cmdm_file SET estado = 1 WHERE rowid IN (SELECT fila FROM temp.marcados)')
+            self.__cursor.execute("""SELECT CMDM.*, marcados.fecha_entrega AS "fecha_entrega [DATE]"
+                                     FROM delta_cmdm_file AS CMDM
+                                         INNER JOIN temp.marcados ON marcados.fila = CMDM.rowid""")
+            filas = self.__cursor.fetchall()
+            self.__cursor.execute('DROP TABLE temp.marcados')
+
+            lista_cmdm = [tuple(fila)[:-1] for fila in filas]
+            fecha_maxima = max((fila[-1] for fila in filas if fila[-1] is not None), default=None)
+            return {'exito':True, 'data':lista_cmdm, 'fecha_maxima':fecha_maxima}
+        except Exception as ex:
+            return {'exito':False, 'error':ex}
+
+    def fn_revertir_vin_cmdm(self, lista_vin, tamano_bloque = 2000):
+        """
+        Devuelve a pendiente (estado=0) los VINs marcados como procesados en una ejecución que falló.
+
+        Returns:
+        --------
+        dict: {'exito': True, 'data': filas_revertidas, 'error': None} o {'exito': False, 'data': None, 'error': ex}
+        """
+        try:
+            revertidas = 0
+            for inicio in range(0, len(lista_vin), tamano_bloque):
+                bloque = list(lista_vin[inicio:inicio + tamano_bloque])
+                placeholders = ', '.join(['?'] * len(bloque))
+                self.__cursor.execute(f"""UPDATE delta_cmdm_file SET estado = 0
+                                          WHERE estado = 1 AND SDI_VHCL_VIN IN ({placeholders})""", bloque)
+                revertidas += max(self.__cursor.rowcount, 0)
+            return {'exito':True, 'data':revertidas, 'error':None}
+        except Exception as ex:
+            return {'exito':False, 'data':None, 'error':ex}
+
+    def fn_reenvio_vin_cmdm(self):
+        """
+        Consulta los VINs VP pendientes que requieren reenvío.
+
+        Returns:
+        --------
+        dict: {'exito': True, 'data': lista_cmdm} o {'exito': False, 'error': ex}
+        """
+        try:
+            self.__cursor.execute("""SELECT CMDM.*
+                                     FROM delta_cmdm_file AS CMDM
+                                         INNER JOIN reenvio_encuestas_cmdm AS RRE ON CMDM.SDI_VHCL_VIN = RRE.VIN
+                                     WHERE CMDM.estado = 0
+                                     AND SDI_VHCL_VHCL_TYP_CD = 'VP'""")
+            return {'exito':True, 'data':self.__cursor.fetchall()}
+        except Exception as ex:
+            return {'exito':False, 'error':ex}
+
+    def fn_consulta_info_vin_email(self,lista_vin):
+        """
+        Consulta la información de correo de los VINs con el motor de enriquecimiento por fuentes.
+
+        Returns:
+        --------
+        dict: {'exito': True, 'data': filas} o {'exito': False, 'error': ...}
+        """
+        #Import local: motor_enriquecimiento crea sus consultas con la fábrica, que importa este módulo
+        from modelo.motor_enriquecimiento import MotorEnriquecimiento
+        #Instancia propia sobre la misma base: con un hilo el motor consulta en este hilo y no debe cerrar esta conexión
+        return MotorEnriquecimiento(config.HILOS_ENRIQUECIMIENTO
+                                    ,fn_crear_consultas=lambda: ConsultasSqlite(self.__ruta_base)).fn_consultar(lista_vin)
+
+    def fn_consultar_por_claves(self, sql_query, claves, tamano_bloque = 2000):
+        """
+        Ejecuta una consulta con lista IN (...) por bloques, traducida a SQLite (ver ConsultasSql).
+
+        Returns:
+        --------
+        dict: {'exito': True, 'data': filas, 'columnas': nombres} o {'exito': False, 'error': ex}
+        """
+        try:
+            sql_query = fn_traducir_sql(sql_query)
+            filas = []
+            columnas = None
+            if claves is None:
+                bloques = [None]
+            else:
+                bloques = [list(claves[inicio:inicio + tamano_bloque]) for inicio in range(0, len(claves), tamano_bloque)]
+
+            for bloque in bloques:
+                if bloque is None:
+                    self.__cursor.execute(sql_query)
+                else:
+                    placeholders = ', '.join(['?'] * len(bloque))
+                    self.__cursor.execute(sql_query.format(placeholders=placeholders), bloque)
+                columnas = [descripcion[0] for descripcion in self.__cursor.description]
+                filas.extend(tuple(fila) for fila in self.__cursor.fetchall())
+
+            return {'exito':True, 'data':filas, 'columnas':columnas}
+        except Exception as ex:
+            return {'exito':False, 'error':ex}
+
+    def fn_validar_vin_dda_publicos(self, tamano_pagina, vin_desde = ''):
+        """
+        Valida los VINs de servicio público pendientes con entrega DDA, por páginas ordenadas por VIN.
+
+        Returns:
+        --------
+        dict: {'exito': True, 'data': lista_data_ser_publico} o {'exito': False, 'error': ex}
+        """
+        try:
+            self.__cursor.execute("""SELECT DISTINCT CMDM.SDI_VHCL_VIN
+                                     FROM delta_cmdm_file AS CMDM
+                                         INNER JOIN reporte_dda AS DDA ON CMDM.SDI_VHCL_VIN = DDA.vin
+                                     WHERE CMDM.estado = 0
+                                     AND CMDM.SDI_VHCL_VHCL_TYP_CD <> 'VP'
+                                     AND CMDM.SDI_VHCL_VIN > ?
+                                     ORDER BY CMDM.SDI_VHCL_VIN
+                                     LIMIT ?""", [vin_desde, tamano_pagina])
+            return {'exito':True, 'data':self.__cursor.fetchall()}
+        except Exception as ex:
+            return {'exito':False, 'error':ex}
@@ -0,0 +1,119 @@
+"""
+Módulo contadores_io.py
+
+Este módulo lleva la cuenta aproximada de los bytes que el proceso intercambia con la base de datos y el FTP,
+para que la medición de etapas del pipeline pueda reportar cuánto dato movió cada una.
+
+Clases:
+-------
+CursorMedido
+    - Envuelve un cursor pyodbc y suma los bytes enviados (consultas y parámetros) y recibidos (filas leídas).
+
+Funciones:
+----------
+- fn_sumar_bytes(tipo, cantidad): Suma bytes al contador del hilo actual.
+- fn_leer_contadores(): Retorna una copia de los contadores del hilo actual.
+- fn_estimar_bytes_filas(filas): Estima el tamaño en bytes de una lista de filas a partir de una muestra.
+
+Notas:
+------
+- Los contadores son por hilo: cada etapa lee la diferencia de los contadores del hilo que la ejecuta.
+- Los bytes de la base de datos son una estimación (longitud del texto de cada valor sobre una muestra de filas),
+  no el tamaño real de los paquetes TDS.
+- Tipos usados: 'bd_envio', 'bd_recepcion', 'ftp_descarga', 'ftp_carga'.
+"""
+import threading
+
+TAMANO_MUESTRA = 100
+
+_contadores = threading.local()
+
+
+def fn_sumar_bytes(tipo, cantidad):
+    """
+    Suma bytes al contador del hilo actual.
+
+    Parameters:
+    -----------
+    tipo : str
+    cantidad : int
+    """
+    valores = getattr(_contadores, 'valores', None)
+    if valores is None:
+        valores = _contadores.valores = {}
+    valores[tipo] = valores.get(tipo, 0) + cantidad
+
+
+def fn_leer_contadores():
+    """
+    Retorna una copia de los contadores del hilo actual.
+
+    Returns:
+    --------
+    dict: {tipo: bytes}
+    """
+    return dict(getattr(_contadores, 'valores', {}))
+
+
+def fn_estimar_bytes_filas(filas):
+    """
+    Estima el tamaño de una lista de filas a partir de las primeras TAMANO_MUESTRA filas.
+
+    Parameters:
+    -----------
+    filas : list
+        Lista de filas (tuplas, listas o pyodbc.Row).
+
+    Returns:
+    --------
+    int: Bytes estimados.
+    """
+    if not filas:
+        return 0
+    muestra = filas[:TAMANO_MUESTRA]
+    bytes_muestra = sum(len(str(valor)) for fila in muestra for valor in fila)
+    return int(bytes_muestra * len(filas) / len(muestra))
+
+
+class CursorMedido:
+    """
+    Cursor pyodbc que registra los bytes aproximados enviados y recibidos.
+    Delega en el cursor original todo lo que no sea ejecución o lectura de filas.
+    """
+    def __init__(self, cursor):
+        object.__setattr__(self, '_cursor', cursor)
+
+    def __getattr__(self, nombre):
+        return getattr(self._cursor, nombre)
+
+    def __setattr__(self, nombre, valor):
+        setattr(self._cursor, nombre, valor)
+
+    def execute(self, consulta, *parametros):
+        if len(parametros) == 1 and isinstance(parametros[0], (list, tuple)):
+            valores = parametros[0]
+        else:
+            valores = parametros
+        fn_sumar_bytes('bd_envio', len(consulta) + sum(len(str(valor)) for valor in valores))
+        self._cursor.execute(consulta, *parametros)
+        return self
+
+    def executemany(self, consulta, parametros):
+        fn_sumar_bytes('bd_envio', len(consulta) + fn_estimar_bytes_filas(parametros))
+        self._cursor.executemany(consulta, parametros)
+
+    def fetchall(self):
+        filas = self._cursor.fetchall()
+        fn_sumar_bytes('bd_recepcion', fn_estimar_bytes_filas(filas))
+        return filas
+
+    def fetchmany(self, tamano):
+        filas = self._cursor.fetchmany(tamano)
+        fn_sumar_bytes('bd_recepcion', fn_estimar_bytes_filas(filas))
+        return filas
+
+    def fetchone(self):
+        fila = self._cursor.fetchone()
+        if fila is not None:
+            fn_sumar_bytes('bd_recepcion', sum(len(str(valor)) for valor in fila))
+        return fila
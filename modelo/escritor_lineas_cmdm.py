@@ -0,0 +1,167 @@
+"""
+Módulo escritor_lineas_cmdm.py
+
+Este módulo define la clase EscritorLineasCmdm, que escribe el archivo CMDM final copiando tal cual, desde el
+archivo de entrada abierto con mmap, las líneas de las filas que el pipeline no modificó, y serializa con pandas
+solo las filas modificadas o que no vienen del archivo (delta_cmdm_file y reenvíos).
+
+Clases:
+-------
+EscritorLineasCmdm
+    - fn_escribir(dataframe, dataframe_entrada): Escribe el archivo final sobre el archivo de entrada.
+
+Constantes:
+-----------
+- COLUMNA_LINEA_CMDM: Columna auxiliar con la posición de la fila en el archivo de entrada (NaN si no viene de él).
+
+Notas:
+------
+- Una fila se copia si viene del archivo de entrada y todos sus valores son iguales a los de la fila leída (después
+  de fn_tratar_datos_nulos); así las filas sin cambios quedan idénticas byte a byte a la entrada.
+- Si el archivo no se puede indexar línea a línea (campos con saltos de línea, filas que no coinciden con las
+  leídas, columnas en otro orden) el escritor no se usa y el archivo se genera completo con pandas.
+- El encabezado y las filas serializadas usan el fin de línea del archivo de entrada.
+- El resultado se escribe en un archivo temporal y reemplaza a la entrada con os.replace, después de cerrar el mmap
+  (en Windows no se puede reemplazar un archivo mapeado).
+"""
+import mmap
+import os
+from os import path
+
+import numpy as np
+
+COLUMNA_LINEA_CMDM = '_LINEA_CMDM'
+
+
+class EscritorLineasCmdm:
+    """
+    Escritura del archivo CMDM final con copia de las líneas sin cambios del archivo de entrada.
+    """
+    def __init__(self, ruta):
+        """
+        Parameters:
+        -----------
+        ruta : str
+            Archivo CMDM de entrada, que se reemplaza con el resultado (RUTA_GUARDAR_ARCHIVO).
+        """
+        self.__ruta = ruta
+
+    def __indexar_lineas(self, contenido):
+        """
+        Retorna el fin de línea del encabezado y los límites (inicio, fin) de cada línea de datos no vacía; fin
+        incluye el fin de línea.
+        """
+        bytes_archivo = np.frombuffer(contenido, dtype=np.uint8)
+        try:
+            fines = np.flatnonzero(bytes_archivo == ord('\n')) + 1
+            if not len(fines) or fines[-1] != len(bytes_archivo):
+                fines = np.append(fines, len(bytes_archivo))
+            inicios = np.concatenate(([0], fines[:-1]))
+
+            #Longitud sin el fin de línea: read_csv omite las líneas vacías, las demás son filas en orden
+            longitudes = fines - inicios - (bytes_archivo[fines - 1] == ord('\n'))
+            retorno = (longitudes > 0) & (bytes_archivo[np.maximum(inicios + longitudes - 1, 0)] == ord('\r'))
+            longitudes = longitudes - retorno
+            fin_linea = b'\r\n' if retorno[0] else b'\n'
+        finally:
+            #El mmap no se puede cerrar mientras numpy tenga una vista sobre él
+            del bytes_archivo
+
+        datos = longitudes[1:] > 0
+        return fin_linea, inicios[1:][datos], fines[1:][datos]
+
+    def fn_escribir(self, dataframe, dataframe_entrada):
+        """
+        Escribe el archivo final sobre el archivo de entrada.
+
+        Parameters:
+        -----------
+        dataframe : pandas.DataFrame
+            Filas finales, sin la columna ESTADO y sin duplicados, con COLUMNA_LINEA_CMDM.
+        dataframe_entrada : pandas.DataFrame
+            Filas leídas del archivo de entrada (índice = posición de la fila), ya tratadas.
+
+        Returns:
+        --------
+        dict: {'exito': True, 'data': {'copiadas': filas, 'serializadas': filas}, 'error': None}
+              o {'exito': False, 'data': None, 'error': motivo} si hay que generar el archivo con pandas.
+        """
+        columnas = [columna for columna in dataframe.columns if columna != COLUMNA_LINEA_CMDM]
+        if columnas != [columna for columna in dataframe_entrada.columns if columna != 'ESTADO']:
+            return {'exito': False, 'data': None, 'error': 'las columnas no están en el orden del archivo'}
+
+        temporal = self.__ruta + '.tmp'
+        try:
+            with open(self.__ruta, 'rb') as archivo:
+                if path.getsize(self.__ruta) == 0:
+                    return {'exito': False, 'data': None, 'error': 'el archivo de entrada está vacío'}
+                contenido = mmap.mmap(archivo.fileno(), 0, access=mmap.ACCESS_READ)
+            try:
+                fin_linea, inicios, fines = self.__indexar_lineas(contenido)
+                if len(inicios) != len(dataframe_entrada):
+                    return {'exito': False, 'data': None, 'error': 'las líneas no coinciden con las filas leídas'}
+                copiadas, serializadas = self.__escribir_temporal(temporal, contenido, dataframe, dataframe_entrada
+                                                                   ,columnas, fin_linea, inicios, fines)
+                if copiadas is None:
+                    return {'exito': False, 'data': None, 'error': 'hay campos con saltos de línea'}
+            finally:
+                contenido.close()
+            os.replace(temporal, self.__ruta)
+        except (OSError, ValueError) as ex:
+            return {'exito': False, 'data': None, 'error': ex}
+        finally:
+            if path.exists(temporal):
+                os.remove(temporal)
+
+        return {'exito': True, 'data': {'copiadas': copiadas, 'serializadas': serializadas}, 'error': None}
+
+    def __escribir_temporal(self, temporal, contenido, dataframe, dataframe_entrada, columnas, fin_linea
+                            ,inicios, fines):
+        """
+        Escribe el resultado en el archivo temporal. Retorna (copiadas, serializadas), o (None, None) si las filas
+        serializadas no se pueden separar por líneas.
+        """
+        lineas = dataframe[COLUMNA_LINEA_CMDM].fillna(-1).to_numpy(dtype=np.int64)
+        posiciones = np.full(len(dataframe), -1, dtype=np.int64)
+        posiciones[lineas >= 0] = dataframe_entrada.index.get_indexer(lineas[lineas >= 0])
+
+        #Fila sin cambios: viene de la entrada y todos sus valores son iguales a los leídos
+        copiable = posiciones >= 0
+        for columna in columnas:
+            finales = dataframe[columna].to_numpy(dtype=object)[copiable]
+            originales = dataframe_entrada[columna].to_numpy(dtype=object)[posiciones[copiable]]
+            copiable[copiable] = finales == originales
+
+        texto_fin_linea = fin_linea.decode('ascii')
+        serializadas = dataframe.loc[~copiable, columnas].to_csv(header=False, index=False, sep=';'
+                                                                 ,lineterminator=texto_fin_linea)
+        serializadas = serializadas.encode('utf-8').split(fin_linea)[:-1]
+        if len(serializadas) != int((~copiable).sum()):
+            return None, None
+        encabezado = dataframe.head(0)[columnas].to_csv(index=False, sep=';', lineterminator=texto_fin_linea)
+
+        #Tramos de filas consecutivas del mismo tipo: copiadas de líneas contiguas de la entrada, o serializadas
+        inicio_fila = inicios[posiciones]
+        fin_fila = fines[posiciones]
+        continua = np.zeros(len(dataframe), dtype=bool)
+        continua[1:] = ((copiable[1:] & copiable[:-1] & (inicio_fila[1:] == fin_fila[:-1]))
+                        | (~copiable[1:] & ~copiable[:-1]))
+        limites = np.append(np.flatnonzero(~continua), len(dataframe))
+
+        with open(temporal, 'wb') as destino:
+            destino.write(encabezado.encode('utf-8'))
+            siguiente_serializada = 0
+            for desde, hasta in zip(limites[:-1], limites[1:]):
+                if copiable[desde]:
+                    fin = fin_fila[hasta - 1]
+                    destino.write(contenido[inicio_fila[desde]:fin])
+                    #La última línea de la entrada puede no tener fin de línea
+                    if contenido[fin - 1:fin] != b'\n':
+                        destino.write(fin_linea)
+                else:
+                    filas = serializadas[siguiente_serializada:siguiente_serializada + hasta - desde]
+                    destino.write(fin_linea.join(filas) + fin_linea)
+                    siguiente_serializada += hasta - desde
+
+        copiadas = int(copiable.sum())
+        return copiadas, len(dataframe) - copiadas
@@ -0,0 +1,41 @@
+"""
+Módulo fabrica_consultas.py
+
+Este módulo selecciona el backend de consultas según BACKEND_SQL. Los backends exponen los mismos métodos y
+retornos (conectar_db_conexion, desconectar y los fn_... de consultas):
+
+- 'sqlserver' (por defecto): ConsultasSql, SQL Server con pyodbc.
+- 'sqlite': ConsultasSqlite, archivo local RUTA_BASE_SQLITE, para ejecutar y perfilar el pipeline sin SQL Server
+  (ver rendimiento/generador_base_sqlite.py y rendimiento/perfil_gestion_archivo.py).
+
+Funciones:
+----------
+- fn_crear_consultas_sql(): Retorna una instancia del backend configurado.
+
+Notas:
+------
+- Los módulos se importan al crear la instancia: el backend SQLite no necesita pyodbc instalado.
+"""
+import config
+
+
+def fn_crear_consultas_sql():
+    """
+    Crea el objeto de consultas del backend configurado en BACKEND_SQL.
+
+    Returns:
+    --------
+    ConsultasSql o ConsultasSqlite
+
+    Raises:
+    -------
+    ValueError: Si BACKEND_SQL no es 'sqlserver' ni 'sqlite'.
+    """
+    backend = (config.BACKEND_SQL or 'sqlserver').lower()
+    if backend == 'sqlite':
+        from modelo.consultas_sqlite import ConsultasSqlite
+        return ConsultasSqlite()
+    if backend == 'sqlserver':
+        from modelo.consultas_sql import ConsultasSql
+        return ConsultasSql()
+    raise ValueError(f"BACKEND_SQL no soportado: {config.BACKEND_SQL}")
@@ -0,0 +1,232 @@
+"""
+Módulo historial_ejecuciones.py
+
+Este módulo define la clase HistorialEjecuciones, una base SQLite local con un registro por ejecución del proceso:
+tamaño y hash del archivo de entrada, filas por categoría, duración de cada etapa, tiempos del FTP y de la base de
+datos, bytes movidos y memoria pico. Sobre el historial calcula tendencias y detecta regresiones de rendimiento.
+
+Clases:
+-------
+HistorialEjecuciones
+    - fn_registrar(ejecucion): Guarda una ejecución.
+    - fn_ejecuciones(limite): Últimas ejecuciones como DataFrame.
+    - fn_regresiones(ventana, desviaciones, id_ejecucion): Métricas más lentas que su línea base móvil.
+    - fn_tendencias(ventana): Última medición, media y pendiente de cada métrica en las últimas ejecuciones.
+
+Estructura en disco:
+--------------------
+RUTA_HISTORIAL_EJECUCIONES -> tablas ejecuciones(id_ejecucion, inicio, segundos_total, exito, filas_archivo,
+bytes_archivo, hash_archivo, memoria_pico) y metricas(id_ejecucion, tipo, nombre, valor). Tipos de métrica:
+'etapa' (segundos por etapa), 'ftp' (segundos de descarga, eliminación y carga), 'bd' (segundos de las etapas que
+consultan la base), 'verificacion' (latencia de la verificación previa de sql, ftp y smtp), 'filas' (filas por
+categoría) y 'bytes' (bd_envio y bd_recepcion estimados por las etapas).
+
+Notas:
+------
+- La línea base de cada métrica es la media y la desviación estándar de las VENTANA_HISTORIAL ejecuciones exitosas
+  anteriores; se marca una regresión si la medición la supera en más de DESVIACIONES_REGRESION desviaciones y en al
+  menos DIFERENCIA_MINIMA_SEGUNDOS (para no alertar por ruido en etapas de milisegundos).
+- Se requieren al menos MINIMO_EJECUCIONES_BASE ejecuciones previas para evaluar una métrica.
+- hash_archivo es el SHA-256 del archivo de entrada (modelo.punto_control.fn_hash_archivo), el mismo que identifica
+  su punto de control; el controlador lo calcula una sola vez por ejecución.
+"""
+import os
+import sqlite3
+from os import path
+
+import numpy as np
+import pandas as pd
+
+MINIMO_EJECUCIONES_BASE = 5
+DIFERENCIA_MINIMA_SEGUNDOS = 0.05
+TIPOS_TIEMPO = ('etapa', 'ftp', 'bd', 'verificacion')
+
+
+class HistorialEjecuciones:
+    """
+    Historial local de ejecuciones y detección de regresiones de rendimiento.
+    """
+    def __init__(self, ruta):
+        """
+        Parameters:
+        -----------
+        ruta : str
+            Archivo SQLite del historial (RUTA_HISTORIAL_EJECUCIONES). Si está vacío el historial no se usa.
+        """
+        self.__ruta = ruta
+
+    @property
+    def disponible(self):
+        """True si el historial está configurado."""
+        return bool(self.__ruta)
+
+    def __conectar(self):
+        carpeta = path.dirname(self.__ruta)
+        if carpeta:
+            os.makedirs(carpeta, exist_ok=True)
+        conexion = sqlite3.connect(self.__ruta)
+        conexion.executescript("""CREATE TABLE IF NOT EXISTS ejecuciones (id_ejecucion TEXT PRIMARY KEY
+                                                                         ,inicio TEXT NOT NULL
+                                                                         ,segundos_total REAL
+                                                                         ,exito INTEGER NOT NULL
+                                                                         ,filas_archivo INTEGER
+                                                                         ,bytes_archivo INTEGER
+                                                                         ,hash_archivo TEXT
+                                                                         ,memoria_pico INTEGER);
+                                  CREATE TABLE IF NOT EXISTS metricas (id_ejecucion TEXT NOT NULL
+                                                                      ,tipo TEXT NOT NULL
+                                                                      ,nombre TEXT NOT NULL
+                                                                      ,valor REAL
+                                                                      ,PRIMARY KEY (id_ejecucion, tipo, nombre));
+                                  CREATE INDEX IF NOT EXISTS ix_ejecuciones_inicio ON ejecuciones (inicio);""")
+        return conexion
+
+    def fn_registrar(self, ejecucion):
+        """
+        Guarda una ejecución (si el id ya existe, la reemplaza).
+
+        Parameters:
+        -----------
+        ejecucion : dict
+            {'id_ejecucion', 'inicio', 'segundos_total', 'exito', 'filas_archivo', 'bytes_archivo', 'hash_archivo',
+             'memoria_pico', 'metricas': {tipo: {nombre: valor}}}
+
+        Returns:
+        --------
+        dict: {'exito': True, 'data': metricas_guardadas, 'error': None} o {'exito': False, 'data': None, 'error': ex}
+        """
+        try:
+            conexion = self.__conectar()
+        except (sqlite3.Error, OSError) as ex:
+            return {'exito': False, 'data': None, 'error': ex}
+        try:
+            filas = [(ejecucion['id_ejecucion'], tipo, nombre, valor)
+                     for tipo, valores in ejecucion['metricas'].items()
+                     for nombre, valor in valores.items()]
+            with conexion:
+                conexion.execute('DELETE FROM metricas WHERE id_ejecucion = ?', (ejecucion['id_ejecucion'],))
+                conexion.execute("""INSERT OR REPLACE INTO ejecuciones (id_ejecucion, inicio, segundos_total, exito
+                                                                       ,filas_archivo, bytes_archivo, hash_archivo
+                                                                       ,memoria_pico)
+                                    VALUES (?, ?, ?, ?, ?, ?, ?, ?)"""
+                                 ,(ejecucion['id_ejecucion'], ejecucion['inicio'], ejecucion['segundos_total']
+                                   ,int(bool(ejecucion['exito'])), ejecucion['filas_archivo'], ejecucion['bytes_archivo']
+                                   ,ejecucion['hash_archivo'], ejecucion['memoria_pico']))
+                conexion.executemany('INSERT INTO metricas (id_ejecucion, tipo, nombre, valor) VALUES (?, ?, ?, ?)', filas)
+            return {'exito': True, 'data': len(filas), 'error': None}
+        except sqlite3.Error as ex:
+            return {'exito': False, 'data': None, 'error': ex}
+        finally:
+            conexion.close()
+
+    def fn_ejecuciones(self, limite = 20):
+        """
+        Retorna las últimas ejecuciones, de la más antigua a la más reciente.
+
+        Returns:
+        --------
+        pandas.DataFrame: Columnas de la tabla ejecuciones más una columna por métrica de tipo 'filas'
+        (filas_<categoría>).
+        """
+        conexion = self.__conectar()
+        try:
+            ejecuciones = pd.read_sql_query("""SELECT * FROM (SELECT * FROM ejecuciones ORDER BY inicio DESC LIMIT ?)
+                                               ORDER BY inicio""", conexion, params=(limite,))
+            filas = pd.read_sql_query("SELECT id_ejecucion, nombre, valor FROM metricas WHERE tipo = 'filas'", conexion)
+        finally:
+            conexion.close()
+
+        if filas.empty:
+            return ejecuciones
+        filas = filas.pivot(index='id_ejecucion', columns='nombre', values='valor').add_prefix('filas_')
+        return ejecuciones.merge(filas, left_on='id_ejecucion', right_index=True, how='left')
+
+    def __tiempos(self):
+        """
+        Retorna las métricas de tiempo de todas las ejecuciones como tabla (una fila por ejecución, en orden de
+        inicio, y una columna 'tipo:nombre' por métrica) junto con la columna de éxito.
+        """
+        conexion = self.__conectar()
+        try:
+            metricas = pd.read_sql_query(f"""SELECT e.id_ejecucion, e.inicio, e.exito, m.tipo || ':' || m.nombre AS metrica
+                                                   ,m.valor
+                                            FROM metricas m
+                                                INNER JOIN ejecuciones e ON e.id_ejecucion = m.id_ejecucion
+                                            WHERE m.tipo IN ({', '.join('?' * len(TIPOS_TIEMPO))})"""
+                                         ,conexion, params=TIPOS_TIEMPO)
+        finally:
+            conexion.close()
+
+        if metricas.empty:
+            return pd.DataFrame(), pd.Series(dtype=bool)
+        tabla = metricas.pivot_table(index=['inicio', 'id_ejecucion'], columns='metrica', values='valor', aggfunc='first')
+        tabla = tabla.sort_index()
+        exito = metricas.drop_duplicates('id_ejecucion').set_index(['inicio', 'id_ejecucion'])['exito'].astype(bool)
+        return tabla, exito.reindex(tabla.index)
+
+    def fn_regresiones(self, ventana, desviaciones, id_ejecucion = None):
+        """
+        Retorna las métricas de tiempo que superan su línea base móvil en más de desviaciones desviaciones estándar.
+
+        Parameters:
+        -----------
+        ventana : int
+            Ejecuciones exitosas anteriores que forman la línea base.
+        desviaciones : float
+        id_ejecucion : str, opcional
+            Si se indica, solo se evalúa esa ejecución.
+
+        Returns:
+        --------
+        pandas.DataFrame: Columnas id_ejecucion, inicio, metrica, segundos, media, desviacion, puntaje_z.
+        """
+        columnas = ['id_ejecucion', 'inicio', 'metrica', 'segundos', 'media', 'desviacion', 'puntaje_z']
+        tabla, exito = self.__tiempos()
+        if tabla.empty:
+            return pd.DataFrame(columns=columnas)
+
+        #Línea base de cada ejecución: las ventana ejecuciones exitosas anteriores a ella
+        media = pd.DataFrame(index=tabla.index, columns=tabla.columns, dtype=float)
+        desviacion = pd.DataFrame(index=tabla.index, columns=tabla.columns, dtype=float)
+        for metrica in tabla.columns:
+            exitosas = tabla.loc[exito, metrica].dropna()
+            ventanas = exitosas.rolling(ventana, min_periods=MINIMO_EJECUCIONES_BASE)
+            media[metrica] = ventanas.mean().reindex(tabla.index).ffill().shift(1)
+            desviacion[metrica] = ventanas.std().reindex(tabla.index).ffill().shift(1)
+
+        puntaje = (tabla - media) / desviacion.where(desviacion > 0)
+        marcadas = (puntaje > desviaciones) & ((tabla - media) >= DIFERENCIA_MINIMA_SEGUNDOS)
+
+        resultado = pd.DataFrame({'segundos': tabla.stack()
+                                  ,'media': media.stack()
+                                  ,'desviacion': desviacion.stack()
+                                  ,'puntaje_z': puntaje.stack()
+                                  ,'marcada': marcadas.stack()})
+        resultado = resultado[resultado['marcada']].drop(columns='marcada').reset_index()
+        if id_ejecucion is not None:
+            resultado = resultado[resultado['id_ejecucion'] == id_ejecucion]
+        return resultado[columnas].round({'segundos': 3, 'media': 3, 'desviacion': 3, 'puntaje_z': 1})
+
+    def fn_tendencias(self, ventana):
+        """
+        Retorna, para cada métrica de tiempo, la última medición, la media de las últimas ventana ejecuciones
+        exitosas y la pendiente (segundos por ejecución) de una recta ajustada sobre ellas.
+
+        Returns:
+        --------
+        pandas.DataFrame: Columnas metrica, ultima, media, pendiente; ordenado por pendiente descendente.
+        """
+        tabla, exito = self.__tiempos()
+        filas = []
+        recientes = tabla[exito].tail(ventana) if not tabla.empty else tabla
+        for metrica in recientes.columns:
+            serie = recientes[metrica].dropna()
+            if serie.empty:
+                continue
+            pendiente = np.polyfit(np.arange(len(serie)), serie.to_numpy(), 1)[0] if len(serie) > 1 else 0.0
+            filas.append({'metrica': metrica
+                          ,'ultima': round(tabla[metrica].dropna().iloc[-1], 3)
+                          ,'media': round(serie.mean(), 3)
+                          ,'pendiente': round(pendiente, 4)})
+        return pd.DataFrame(filas, columns=['metrica', 'ultima', 'media', 'pendiente']).sort_values(
+            'pendiente', ascending=False, ignore_index=True)
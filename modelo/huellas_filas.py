@@ -0,0 +1,130 @@
+"""
+Módulo huellas_filas.py
+
+Este módulo define la clase HuellasFilas, que guarda una huella (hash de 64 bits) de cada fila del archivo CMDM
+procesado junto con su resultado en DDA, para que la siguiente ejecución (modo incremental) reconozca las filas
+que llegan sin cambios y no vuelva a consultarlas ni a insertarlas en la base de datos.
+
+Clases:
+-------
+HuellasFilas
+    - fn_calcular(dataframe): Huella de cada fila.
+    - fn_comparar(huellas, columnas): Filas sin cambios frente a la ejecución anterior y cuáles tenían entrega DDA.
+    - fn_guardar(huellas, entregadas, columnas): Reemplaza las huellas guardadas con las de esta ejecución.
+
+Estructura en disco:
+--------------------
+RUTA_HUELLAS_FILAS -> archivo .npz de numpy con huellas (uint64), entregadas (bool, la fila tenía entrega DDA) y
+columnas (columnas del archivo con las que se calcularon).
+
+Notas:
+------
+- La huella se calcula sobre las filas ya tratadas (fn_tratar_datos_nulos) convertidas a texto, así una misma fila
+  tiene la misma huella aunque pandas infiera otro tipo para la columna en otro archivo.
+- Solo se guardan las huellas de la última ejecución exitosa; si cambian las columnas del archivo las huellas
+  anteriores se ignoran.
+- Una colisión de hashes de 64 bits haría pasar una fila cambiada por conocida; con los volúmenes del archivo la
+  probabilidad es despreciable.
+"""
+import os
+from os import path
+
+import numpy as np
+import pandas as pd
+
+
+class HuellasFilas:
+    """
+    Huellas por fila de la ejecución anterior para el procesamiento incremental.
+    """
+    def __init__(self, ruta):
+        """
+        Parameters:
+        -----------
+        ruta : str
+            Archivo de huellas (RUTA_HUELLAS_FILAS). Si está vacío el modo incremental no se usa.
+        """
+        self.__ruta = ruta
+
+    @property
+    def disponible(self):
+        """True si el archivo de huellas está configurado."""
+        return bool(self.__ruta)
+
+    def fn_calcular(self, dataframe):
+        """
+        Retorna la huella de cada fila del DataFrame, en el orden de sus filas.
+
+        Returns:
+        --------
+        numpy.ndarray: uint64, una huella por fila.
+        """
+        return pd.util.hash_pandas_object(dataframe.astype(str), index=False).to_numpy()
+
+    def fn_comparar(self, huellas, columnas):
+        """
+        Compara las huellas con las de la ejecución anterior.
+
+        Parameters:
+        -----------
+        huellas : numpy.ndarray
+            Resultado de fn_calcular.
+        columnas : list
+            Columnas del archivo; si son distintas a las guardadas no hay filas conocidas.
+
+        Returns:
+        --------
+        dict: {'exito': True, 'data': (sin_cambios, entregadas), 'error': None}: dos arreglos bool por fila, la fila
+              es idéntica a una de la ejecución anterior y esa fila tenía entrega DDA.
+              Si no hay huellas guardadas (o no se pueden leer) todas las filas son nuevas y 'error' trae el motivo.
+        """
+        sin_cambios = np.zeros(len(huellas), dtype=bool)
+        entregadas = np.zeros(len(huellas), dtype=bool)
+        if not path.isfile(self.__ruta):
+            return {'exito': True, 'data': (sin_cambios, entregadas), 'error': None}
+        try:
+            with np.load(self.__ruta) as guardado:
+                if list(guardado['columnas']) != list(columnas):
+                    return {'exito': True
+                            ,'data': (sin_cambios, entregadas)
+                            ,'error': 'las columnas del archivo cambiaron'}
+                previas = guardado['huellas']
+                previas_entregadas = previas[guardado['entregadas']]
+        except (OSError, ValueError, KeyError) as ex:
+            return {'exito': True, 'data': (sin_cambios, entregadas), 'error': ex}
+
+        sin_cambios = np.isin(huellas, previas)
+        entregadas = sin_cambios & np.isin(huellas, previas_entregadas)
+        return {'exito': True, 'data': (sin_cambios, entregadas), 'error': None}
+
+    def fn_guardar(self, huellas, entregadas, columnas):
+        """
+        Reemplaza las huellas guardadas (archivo temporal + os.replace).
+
+        Parameters:
+        -----------
+        huellas : numpy.ndarray
+        entregadas : numpy.ndarray
+            bool por fila: la fila tiene entrega DDA en esta ejecución.
+        columnas : list
+
+        Returns:
+        --------
+        dict: {'exito': True, 'data': filas_guardadas, 'error': None} o {'exito': False, 'data': None, 'error': ex}
+        """
+        temporal = self.__ruta + '.tmp'
+        try:
+            carpeta = path.dirname(self.__ruta)
+            if carpeta:
+                os.makedirs(carpeta, exist_ok=True)
+            with open(temporal, 'wb') as archivo:
+                np.savez(archivo
+                         ,huellas=np.asarray(huellas, dtype=np.uint64)
+                         ,entregadas=np.asarray(entregadas, dtype=bool)
+                         ,columnas=np.asarray(list(columnas), dtype=str))
+            os.replace(temporal, self.__ruta)
+            return {'exito': True, 'data': len(huellas), 'error': None}
+        except OSError as ex:
+            if path.exists(temporal):
+                os.remove(temporal)
+            return {'exito': False, 'data': None, 'error': ex}
@@ -0,0 +1,131 @@
+"""
+Módulo lote_archivos.py
+
+Este módulo define la clase LoteArchivos, que une en un solo archivo CMDM los archivos descargados en modo lote
+(python main.py --lote) y recuerda qué archivos del FTP forman el lote, para eliminarlos después de la carga.
+
+Clases:
+-------
+LoteArchivos
+    - fn_consolidar(rutas): Une los archivos en el archivo de destino, en el orden recibido y con un solo encabezado;
+      retorna los archivos vacíos y los rechazados por encabezado.
+    - fn_guardar(nombres): Guarda los nombres de los archivos del FTP que forman el lote.
+    - fn_leer(): Retorna los nombres guardados.
+    - fn_eliminar(): Elimina el registro del lote.
+
+Estructura en disco:
+--------------------
+<archivo de destino>.lote -> {"archivos": ["nombre1", ...], "creado": "AAAA-MM-DDTHH:MM:SS"}
+
+Notas:
+------
+- Los archivos se copian por bloques, sin interpretarlos: el costo es el de copiar los bytes.
+- El encabezado del lote es el del primer archivo con datos (se ignoran el BOM y el fin de línea). Los archivos con
+  otro encabezado se rechazan y los vacíos se omiten; ambos se reportan y el resto del lote se une igual.
+- El archivo de destino y el registro se reescriben de forma atómica (archivo temporal + os.replace).
+- El registro permite eliminar del FTP los archivos del lote al reanudar (--reanudar), sin volver a listarlos.
+"""
+import datetime
+import json
+import os
+import shutil
+from os import path
+
+BOM_UTF8 = b'\xef\xbb\xbf'
+
+
+class LoteArchivos:
+    """
+    Consolidación de los archivos de un lote y registro de sus nombres en el FTP.
+    """
+    def __init__(self, ruta_destino):
+        """
+        Parameters:
+        -----------
+        ruta_destino : str
+            Archivo CMDM que procesa el pipeline (RUTA_GUARDAR_ARCHIVO).
+        """
+        self.__ruta_destino = ruta_destino
+        self.__ruta_registro = ruta_destino + '.lote'
+
+    def fn_consolidar(self, rutas):
+        """
+        Une los archivos en el archivo de destino.
+
+        Parameters:
+        -----------
+        rutas : list
+            Archivos descargados, en orden de llegada.
+
+        Returns:
+        --------
+        dict: {'exito': True, 'data': {'archivos': unidos, 'bytes': tamaño del destino, 'vacios': [ruta, ...],
+              'rechazados': {ruta: motivo}}, 'error': None} o {'exito': False, 'data': None, 'error': ex}
+        """
+        temporal = self.__ruta_destino + '.tmp'
+        encabezado = None
+        unidos = 0
+        vacios = []
+        rechazados = {}
+        try:
+            with open(temporal, 'wb') as destino:
+                for ruta in rutas:
+                    with open(ruta, 'rb') as origen:
+                        primera_linea = origen.readline()
+                        if not primera_linea:
+                            vacios.append(ruta)
+                            continue
+                        if not primera_linea.endswith(b'\n'):
+                            primera_linea += b'\n'
+                        columnas = primera_linea.removeprefix(BOM_UTF8).rstrip(b'\r\n')
+                        if encabezado is None:
+                            encabezado = columnas
+                            destino.write(primera_linea)
+                        elif columnas != encabezado:
+                            rechazados[ruta] = 'encabezado distinto al del lote'
+                            continue
+
+                        shutil.copyfileobj(origen, destino)
+                        #El siguiente archivo debe empezar en una línea nueva
+                        if origen.tell() > len(primera_linea):
+                            origen.seek(-1, os.SEEK_END)
+                            if origen.read(1) != b'\n':
+                                destino.write(b'\n')
+                        unidos += 1
+                tamano = destino.tell()
+            os.replace(temporal, self.__ruta_destino)
+            return {'exito': True
+                    ,'data': {'archivos': unidos, 'bytes': tamano, 'vacios': vacios, 'rechazados': rechazados}
+                    ,'error': None}
+        except OSError as ex:
+            return {'exito': False, 'data': None, 'error': ex}
+        finally:
+            if path.exists(temporal):
+                os.remove(temporal)
+
+    def fn_guardar(self, nombres):
+        """
+        Guarda los nombres de los archivos del FTP que forman el lote.
+        """
+        temporal = self.__ruta_registro + '.tmp'
+        with open(temporal, 'w', encoding='utf-8') as archivo:
+            json.dump({'archivos': list(nombres)
+                       ,'creado': datetime.datetime.now().isoformat(timespec='seconds')}, archivo)
+        os.replace(temporal, self.__ruta_registro)
+
+    def fn_leer(self):
+        """
+        Retorna los nombres de los archivos del lote, o una lista vacía si no hay registro.
+        """
+        try:
+            with open(self.__ruta_registro, encoding='utf-8') as archivo:
+                return list(json.load(archivo)['archivos'])
+        except (OSError, ValueError, KeyError, TypeError):
+            return []
+
+    def fn_eliminar(self):
+        """
+        Elimina el registro del lote, si existe.
+        """
+        if path.exists(self.__ruta_registro):
+            os.remove(self.__ruta_registro)
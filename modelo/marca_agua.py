@@ -0,0 +1,98 @@
+"""
+Módulo marca_agua.py
+
+Este módulo define la clase MarcaAgua, que guarda en un archivo JSON local la última fecha de entrega DDA
+procesada por la consulta de la tabla delta_cmdm_file, para que cada ejecución solo revise entregas nuevas.
+
+Clases:
+-------
+MarcaAgua
+    - fn_leer(): Retorna la fecha desde la que se deben consultar las entregas (marca menos el solapamiento).
+    - fn_guardar(fecha_entrega): Avanza la marca si la fecha es posterior a la guardada (nunca más allá de hoy).
+
+Estructura en disco:
+--------------------
+RUTA_MARCA_AGUA -> {"fecha_entrega": "AAAA-MM-DD", "actualizado": "AAAA-MM-DDTHH:MM:SS"}
+
+Notas:
+------
+- El solapamiento (DIAS_SOLAPAMIENTO_MARCA_AGUA) vuelve a revisar los últimos días para cubrir entregas que se
+  registran en reporte_dda con una fecha anterior a la de su carga.
+- El archivo se reescribe de forma atómica (archivo temporal + os.replace).
+- Un archivo inexistente o dañado equivale a no tener marca: la consulta usa solo RANGO_FECHA_CONSULTA.
+- La marca guarda solo la fecha: reporte_dda no tiene un id de inserción que permita distinguir entregas del
+  mismo día, y el solapamiento ya vuelve a revisar ese día completo.
+"""
+import datetime
+import json
+import os
+from os import path
+
+
+class MarcaAgua:
+    """
+    Última fecha de entrega DDA procesada.
+    """
+    def __init__(self, ruta, dias_solapamiento):
+        """
+        Parameters:
+        -----------
+        ruta : str
+            Archivo JSON de la marca (RUTA_MARCA_AGUA).
+        dias_solapamiento : int
+            Días que se restan a la marca al consultar.
+        """
+        self.__ruta = ruta
+        self.__dias_solapamiento = dias_solapamiento
+
+    def __leer_fecha(self):
+        """Retorna la fecha guardada o None."""
+        if not self.__ruta or not path.isfile(self.__ruta):
+            return None
+        try:
+            with open(self.__ruta, encoding='utf-8') as archivo:
+                return datetime.date.fromisoformat(json.load(archivo)['fecha_entrega'])
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+
+    def fn_leer(self):
+        """
+        Retorna la fecha mínima de entrega a consultar.
+
+        Returns:
+        --------
+        datetime.date o None: Marca menos los días de solapamiento, o None si no hay marca.
+        """
+        fecha = self.__leer_fecha()
+        if fecha is None:
+            return None
+        return fecha - datetime.timedelta(days=self.__dias_solapamiento)
+
+    def fn_guardar(self, fecha_entrega):
+        """
+        Avanza la marca hasta la fecha indicada; no la retrocede. Una fecha futura se limita a hoy para no saltar
+        entregas que se registren con fechas anteriores a ella.
+
+        Parameters:
+        -----------
+        fecha_entrega : datetime.date o datetime.datetime
+            Mayor fecha de entrega procesada.
+        """
+        if not self.__ruta or fecha_entrega is None:
+            return
+        if isinstance(fecha_entrega, datetime.datetime):
+            fecha_entrega = fecha_entrega.date()
+        fecha_entrega = min(fecha_entrega, datetime.date.today())
+
+        fecha_actual = self.__leer_fecha()
+        if fecha_actual is not None and fecha_actual >= fecha_entrega:
+            return
+
+        carpeta = path.dirname(self.__ruta)
+        if carpeta:
+            os.makedirs(carpeta, exist_ok=True)
+        temporal = self.__ruta + '.tmp'
+        with open(temporal, 'w', encoding='utf-8') as archivo:
+            json.dump({'fecha_entrega': fecha_entrega.isoformat()
+                       ,'actualizado': datetime.datetime.now().isoformat(timespec='seconds')}, archivo)
+        os.replace(temporal, self.__ruta)
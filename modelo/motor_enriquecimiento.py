@@ -0,0 +1,433 @@
+"""
+Módulo motor_enriquecimiento.py
+
+Este módulo define la clase MotorEnriquecimiento, que arma la información de correo de los VINs (las mismas 17
+columnas de fn_consulta_info_vin_email) con consultas angostas por fuente, ejecutadas en paralelo, y une los
+resultados con pandas en lugar de enviar a SQL Server la consulta entre bases de datos SGS, SISC, Conexion y
+DATASTEWARD.
+
+Clases:
+-------
+MotorEnriquecimiento
+    - fn_consultar(lista_vin): Retorna las filas de información de correo de los VINs.
+    - tiempos: Segundos y filas de cada fuente en la última consulta.
+
+Fuentes (en dos rondas, cada ronda en paralelo):
+------------------------------------------------
+1. vehiculos, detalle_juridica, excluidos, dda (por VIN) y geografia (ciudades con departamento).
+2. clientes, clientes_finales, contactos, tipos_vehiculo, salas y politicas (por las claves de la ronda 1).
+Con la caché de dimensiones (modelo.cache_dimensiones), geografia, tipos_vehiculo y salas se toman de ella.
+
+Notas:
+------
+- Cada consulta abre su propia conexión en su hilo (ConsultasSql guarda una conexión por hilo) y el pooling de
+  pyodbc reutiliza las conexiones físicas entre consultas. Con un hilo las consultas se ejecutan una tras otra en el
+  hilo que llama, sin pool.
+- Las listas IN se envían en bloques de TAMANO_BLOQUE_CLAVES para no superar los 2100 parámetros de SQL Server;
+  la consulta original fallaba con listas más grandes.
+- Las uniones reproducen las de la consulta original, incluido el DISTINCT final. Las claves se comparan como en
+  SQL Server: sin distinguir mayúsculas y sin los espacios finales.
+- Los números de teléfono (CorregirNumero) y el modelo del vehículo no se calculan: la consulta original los
+  descartaba antes del SELECT final.
+"""
+import datetime
+import time
+from concurrent.futures import ThreadPoolExecutor
+from decimal import Decimal
+
+import pandas as pd
+
+from modelo.fabrica_consultas import fn_crear_consultas_sql
+
+TAMANO_BLOQUE_CLAVES = 2000
+
+#Concesionarios comerciales excluidos por la consulta original (veh.CodConCom != ...)
+CONCESIONARIOS_EXCLUIDOS = frozenset([
+    '100209', '100047', '100048', '100186', '86200065', '86200089', '100049', '100323', '100187', '0', '10', '11'
+    ,'15', '18', '19', '62', '101', '104', '105', '106', '107', '108', '109', '136', '139', '150', '158', '166'
+    ,'207', '260', '301', '302', '310', '402', '408', '410', '501', '502', '601', '801', '1101', '1201', '1202'
+    ,'1401', '1501', '1601', '1701', '1801', '2101', '3101', '4001', '4002', '5001', '5003', '7000', '9102'
+    ,'9104', '9105', '9106', '9107', '9109', '9110', '9201', '9207', '9208', '9209', '9304', '9306', '9308'
+    ,'9309', '9404', '23500', '90100', '100026', '100038', '100172', '100179', '100204', '100210', '100217'
+    ,'100221', '100252', '100253', '100255', '100256', '100257', '100269', '100281', '100353', '86200688'
+    ,'86200702', '86200707', '86200708', '86200727'])
+
+SQL_VEHICULOS = """SELECT NumVin, NumIdeCli, CODTIPIDE, TipVehSap, FecVtaVeh, CodConCom, FecEntVeh, TipSer, motped
+                          ,ide_Sala, Politica_Flotillas
+                   FROM SGS.dbo.VEH_Vehiculos
+                   WHERE NumVin IN ({placeholders})"""
+
+SQL_DETALLE_JURIDICA = """SELECT codVehiculo, idclientefinal, idContactoUno
+                          FROM Conexion.dbo.EXTT_DetalleVentaJuridica
+                          WHERE codVehiculo IN ({placeholders})"""
+
+SQL_EXCLUIDOS = """SELECT vin
+                   FROM Conexion.dbo.vin_excluir_cierre
+                   WHERE vin IN ({placeholders})"""
+
+SQL_DDA = """SELECT vin, fecha_entrega
+             FROM DATASTEWARD.dbo.reporte_dda
+             WHERE vin IN ({placeholders})"""
+
+SQL_GEOGRAFIA = """SELECT DISTINCT ciu.CODCIU
+                   FROM SISC.dbo.GEN_CIUDADES ciu
+                   INNER JOIN SISC.dbo.GEN_DEPARTAMENTOS dep ON dep.coddep = ciu.CODDEP"""
+
+SQL_CLIENTES = """SELECT NUMIDECLI, CodTipIde, NOMCLI, APECLI, CODTIPPER, CORELECLI, AutEnvioInfo, CODCIU
+                  FROM SISC.dbo.GEN_CLIENTES
+                  WHERE NUMIDECLI IN ({placeholders})"""
+
+SQL_CLIENTES_FINALES = """SELECT CODCLI, CORELECLI
+                          FROM SISC.dbo.GEN_CLIENTES
+                          WHERE CODCLI IN ({placeholders})"""
+
+SQL_CONTACTOS = """SELECT Ide_Cedula, Vlr_Email
+                   FROM Conexion.dbo.EXTT_ContactoPersonaJuridica
+                   WHERE Ide_Cedula IN ({placeholders})"""
+
+SQL_TIPOS_VEHICULO = """SELECT CB08_CODVEH
+                        FROM Conexion.dbo.TB08_VEHICULO
+                        WHERE CB08_CODVEH IN ({placeholders})"""
+
+SQL_SALAS = """SELECT ide_Sala, Cod_Bir, Nom_Sala
+               FROM Conexion.dbo.EXTT_Salas
+               WHERE ide_Sala IN ({placeholders})"""
+
+SQL_POLITICAS = """SELECT CCA29_COD_POLITICA, CCA29_DES_POLITICA
+                   FROM conexion.dbo.TCA29_POLITICAS_FLOTILLAS
+                   WHERE CCA29_COD_POLITICA IN ({placeholders})"""
+
+#REPLACE(..., char(n), ...) de la consulta original
+DEPURAR_CORREO = str.maketrans({',': ' ', '\n': '', '\r': '', ';': '', '"': ''})
+DEPURAR_VIN = str.maketrans({'\n': '', '\r': '', ';': '', '"': ''})
+
+#ISNULL(DELIVERY_DATE, '') convierte '' al tipo DATE: 1900-01-01
+FECHA_VACIA = datetime.date(1900, 1, 1)
+
+
+def fn_clave(valor):
+    """
+    Normaliza una clave de unión como la compara SQL Server: sin espacios finales y sin distinguir mayúsculas.
+    Los números enteros se comparan por su valor. Retorna None para NULL.
+    """
+    if valor is None or (not isinstance(valor, str) and pd.isna(valor)):
+        return None
+    if isinstance(valor, (int, float, Decimal)) and not isinstance(valor, bool):
+        if float(valor).is_integer():
+            return str(int(valor))
+        return str(valor)
+    return str(valor).rstrip(' ').upper()
+
+
+def fn_claves(serie):
+    """Aplica fn_clave a una serie."""
+    return serie.map(fn_clave).astype(object)
+
+
+def fn_es_vacio(valor):
+    """True si el valor es NULL o solo espacios (= '' de SQL Server ignora los espacios finales)."""
+    return valor is None or (not isinstance(valor, str) and pd.isna(valor)) or str(valor).strip(' ') == ''
+
+
+def fn_depurar(valor, tabla):
+    """REPLACE de caracteres; NULL se mantiene."""
+    if valor is None or (not isinstance(valor, str) and pd.isna(valor)):
+        return None
+    return str(valor).translate(tabla)
+
+
+def fn_nulo(valor):
+    """Convierte NaN/NaT de pandas en None."""
+    if valor is None or (not isinstance(valor, str) and pd.isna(valor)):
+        return None
+    return valor
+
+
+def fn_acuerdo(valor):
+    """CASE AutEnvioInfo 0 -> 'N', 1 -> 'Y', otro -> 'no value'."""
+    valor = fn_nulo(valor)
+    if valor is None:
+        return 'no value'
+    if valor == 0:
+        return 'N'
+    if valor == 1:
+        return 'Y'
+    return 'no value'
+
+
+class MotorEnriquecimiento:
+    """
+    Información de correo de los VINs con consultas paralelas por fuente.
+    """
+    def __init__(self, hilos, cache_dimensiones = None, fn_crear_consultas = fn_crear_consultas_sql):
+        """
+        Parameters:
+        -----------
+        hilos : int
+            Consultas simultáneas (HILOS_ENRIQUECIMIENTO).
+        cache_dimensiones : CacheDimensiones, opcional
+            Caché de las tablas pequeñas; si falla, esas fuentes se consultan en SQL Server.
+        fn_crear_consultas : callable
+            Crea el objeto de consultas; sus conexiones son por hilo.
+        """
+        self.__hilos = max(1, hilos)
+        self.__obj_consultas_sql = fn_crear_consultas()
+        self.__cache_dimensiones = cache_dimensiones
+        self.tiempos = {}
+
+    def __dimensiones_locales(self):
+        """Retorna {nombre: DataFrame} con las fuentes que se pudieron leer de la caché de dimensiones."""
+        dimensiones = {}
+        if self.__cache_dimensiones is None or not self.__cache_dimensiones.disponible:
+            return dimensiones
+        for nombre in ('geografia', 'tipos_vehiculo', 'salas'):
+            inicio = time.perf_counter()
+            dic_retorno = self.__cache_dimensiones.fn_obtener(nombre)
+            if dic_retorno['exito']:
+                dimensiones[nombre] = dic_retorno['data']
+                self.tiempos[nombre] = {'segundos': round(time.perf_counter() - inicio, 3)
+                                        ,'filas': len(dic_retorno['data'])}
+        return dimensiones
+
+    def __consultar_fuente(self, nombre, sql_query, claves):
+        """
+        Ejecuta la consulta de una fuente en el hilo actual.
+
+        Returns:
+        --------
+        dict: {'exito': True, 'data': DataFrame} o {'exito': False, 'error': ...}
+        """
+        inicio = time.perf_counter()
+        estado_conexion, mensaje_error = self.__obj_consultas_sql.conectar_db_conexion()
+        if not estado_conexion:
+            return {'exito': False, 'error': mensaje_error}
+        try:
+            dic_retorno = self.__obj_consultas_sql.fn_consultar_por_claves(sql_query, claves, TAMANO_BLOQUE_CLAVES)
+        finally:
+            self.__obj_consultas_sql.desconectar()
+
+        if not dic_retorno['exito']:
+            return {'exito': False, 'error': f"{nombre}: {dic_retorno['error']}"}
+
+        self.tiempos[nombre] = {'segundos': round(time.perf_counter() - inicio, 3), 'filas': len(dic_retorno['data'])}
+        #dtype object conserva los tipos de pyodbc (enteros con NULL, fechas)
+        return {'exito': True, 'data': pd.DataFrame(dic_retorno['data'], columns=dic_retorno['columnas'], dtype=object)}
+
+    def __consultar_ronda(self, consultas):
+        """
+        Ejecuta en paralelo las consultas {nombre: (sql, claves, columnas)}. Las fuentes sin claves no se consultan.
+
+        Returns:
+        --------
+        dict: {'exito': True, 'data': {nombre: DataFrame}} o {'exito': False, 'error': ...}
+        """
+        resultados = {}
+        pendientes = {}
+        for nombre, (sql_query, claves, columnas) in consultas.items():
+            if claves is not None and len(claves) == 0:
+                resultados[nombre] = pd.DataFrame(columns=columnas)
+                self.tiempos[nombre] = {'segundos': 0.0, 'filas': 0}
+            else:
+                pendientes[nombre] = (sql_query, claves)
+
+        if self.__hilos == 1:
+            retornos = ((nombre, self.__consultar_fuente(nombre, *consulta)) for nombre, consulta in pendientes.items())
+            return self.__reunir_ronda(resultados, retornos)
+
+        with ThreadPoolExecutor(max_workers=self.__hilos) as ejecutor:
+            futuros = {nombre: ejecutor.submit(self.__consultar_fuente, nombre, *consulta)
+                       for nombre, consulta in pendientes.items()}
+            return self.__reunir_ronda(resultados, ((nombre, futuro.result()) for nombre, futuro in futuros.items()))
+
+    def __reunir_ronda(self, resultados, retornos):
+        """
+        Agrega a resultados los DataFrames de los retornos (nombre, dic_retorno) de __consultar_fuente; se detiene en
+        la primera fuente con error.
+        """
+        for nombre, dic_retorno in retornos:
+            if not dic_retorno['exito']:
+                return dic_retorno
+            resultados[nombre] = dic_retorno['data']
+        return {'exito': True, 'data': resultados}
+
+    def fn_consultar(self, lista_vin):
+        """
+        Consulta la información de correo de los VINs.
+
+        Parameters:
+        -----------
+        lista_vin : list
+
+        Returns:
+        --------
+        dict: {'exito': True, 'data': filas} o {'exito': False, 'error': ...}
+            filas: tuplas con las columnas de fn_consulta_info_vin_email, sin repetir.
+        """
+        self.tiempos = {}
+        vin_unicos = list(dict.fromkeys(lista_vin))
+        if not vin_unicos:
+            return {'exito': True, 'data': []}
+
+        fuentes = self.__dimensiones_locales()
+        ronda = self.__consultar_ronda({nombre: consulta for nombre, consulta in {
+            'vehiculos': (SQL_VEHICULOS, vin_unicos, [])
+            ,'detalle_juridica': (SQL_DETALLE_JURIDICA, vin_unicos, [])
+            ,'excluidos': (SQL_EXCLUIDOS, vin_unicos, [])
+            ,'dda': (SQL_DDA, vin_unicos, [])
+            ,'geografia': (SQL_GEOGRAFIA, None, [])}.items() if nombre not in fuentes})
+        if not ronda['exito']:
+            return ronda
+        fuentes.update(ronda['data'])
+
+        vehiculos = fuentes['vehiculos']
+        detalle_juridica = fuentes['detalle_juridica']
+        ronda = self.__consultar_ronda({nombre: consulta for nombre, consulta in {
+            'clientes': (SQL_CLIENTES, self.__valores(vehiculos, 'NumIdeCli')
+                         ,['NUMIDECLI', 'CodTipIde', 'NOMCLI', 'APECLI', 'CODTIPPER', 'CORELECLI', 'AutEnvioInfo', 'CODCIU'])
+            ,'clientes_finales': (SQL_CLIENTES_FINALES, self.__valores(detalle_juridica, 'idclientefinal')
+                                  ,['CODCLI', 'CORELECLI'])
+            ,'contactos': (SQL_CONTACTOS, self.__valores(detalle_juridica, 'idContactoUno'), ['Ide_Cedula', 'Vlr_Email'])
+            ,'tipos_vehiculo': (SQL_TIPOS_VEHICULO, self.__valores(vehiculos, 'TipVehSap'), ['CB08_CODVEH'])
+            ,'salas': (SQL_SALAS, self.__valores(vehiculos, 'ide_Sala'), ['ide_Sala', 'Cod_Bir', 'Nom_Sala'])
+            ,'politicas': (SQL_POLITICAS, self.__valores(vehiculos, 'Politica_Flotillas')
+                           ,['CCA29_COD_POLITICA', 'CCA29_DES_POLITICA'])}.items() if nombre not in fuentes})
+        if not ronda['exito']:
+            return ronda
+        fuentes.update(ronda['data'])
+
+        inicio = time.perf_counter()
+        filas = self.__unir(fuentes)
+        self.tiempos['union_pandas'] = {'segundos': round(time.perf_counter() - inicio, 3), 'filas': len(filas)}
+        return {'exito': True, 'data': filas}
+
+    @staticmethod
+    def __valores(dataframe, columna):
+        """Valores no nulos y sin repetir de una columna, para una lista IN."""
+        if dataframe.empty:
+            return []
+        return list(dict.fromkeys(valor for valor in dataframe[columna].tolist() if fn_nulo(valor) is not None))
+
+    @staticmethod
+    def __con_clave(dataframe, columnas):
+        """Copia del DataFrame con columnas _k_<columna> normalizadas; descarta las filas con alguna clave NULL."""
+        resultado = dataframe.copy()
+        for columna in columnas:
+            resultado['_k_' + columna] = fn_claves(resultado[columna])
+        return resultado.dropna(subset=['_k_' + columna for columna in columnas])
+
+    def __unir(self, fuentes):
+        """
+        Reproduce las uniones de fn_consulta_info_vin_email sobre los DataFrames de cada fuente.
+
+        Returns:
+        --------
+        list: Filas (tuplas) sin repetir.
+        """
+        con_clave = self.__con_clave
+        vehiculos = con_clave(fuentes['vehiculos'], ['NumVin', 'NumIdeCli', 'CODTIPIDE'])
+        vehiculos['_k_TipVehSap'] = fn_claves(vehiculos['TipVehSap'])
+        clientes = con_clave(fuentes['clientes'], ['NUMIDECLI', 'CodTipIde'])
+        detalle_juridica = con_clave(fuentes['detalle_juridica'], ['codVehiculo'])
+        contactos = con_clave(fuentes['contactos'], ['Ide_Cedula'])
+        clientes_finales = con_clave(fuentes['clientes_finales'], ['CODCLI'])
+        tipos_vehiculo = con_clave(fuentes['tipos_vehiculo'], ['CB08_CODVEH'])
+
+        #veh con cli (llave compuesta), usado en a y en SDI_CMDM
+        veh_cli = vehiculos.merge(clientes
+                                  ,left_on=['_k_NumIdeCli', '_k_CODTIPIDE']
+                                  ,right_on=['_k_NUMIDECLI', '_k_CodTipIde'])
+
+        #a: vehículos vendidos fuera de los concesionarios excluidos, con tipo de vehículo en TB08
+        codigo_concesionario = fn_claves(veh_cli['CodConCom'])
+        a = veh_cli[veh_cli['FecVtaVeh'].notna()
+                    & codigo_concesionario.notna()
+                    & ~codigo_concesionario.isin(CONCESIONARIOS_EXCLUIDOS)]
+        a = a.merge(detalle_juridica[['_k_codVehiculo', 'idContactoUno', 'idclientefinal']]
+                    ,how='left', left_on='_k_NumVin', right_on='_k_codVehiculo')
+        a['_k_idContactoUno'] = fn_claves(a['idContactoUno'])
+        a = a.merge(contactos[['_k_Ide_Cedula', 'Vlr_Email']]
+                    ,how='left', left_on='_k_idContactoUno', right_on='_k_Ide_Cedula')
+        a = a.merge(tipos_vehiculo[['_k_CB08_CODVEH']], left_on='_k_TipVehSap', right_on='_k_CB08_CODVEH')
+        a['correo_NatJur'] = [fn_depurar(contacto, DEPURAR_CORREO) if fn_es_vacio(correo) else fn_depurar(correo, DEPURAR_CORREO)
+                              for correo, contacto in zip(a['CORELECLI'].tolist(), a['Vlr_Email'].tolist())]
+        a = a[['_k_NumVin', '_k_CB08_CODVEH', 'correo_NatJur']]
+
+        #b y c: correo del cliente final de las ventas jurídicas
+        c = a[['_k_NumVin']].merge(detalle_juridica[['_k_codVehiculo', 'idclientefinal']]
+                                   ,left_on='_k_NumVin', right_on='_k_codVehiculo')
+        c['_k_idclientefinal'] = fn_claves(c['idclientefinal'])
+        c = c.merge(clientes_finales[['_k_CODCLI', 'CORELECLI']], left_on='_k_idclientefinal', right_on='_k_CODCLI')
+        c = c[['_k_NumVin', 'CORELECLI']].rename(columns={'CORELECLI': 'cliente_final_jur'})
+
+        #d: correo por VIN
+        d = a.merge(c, how='left', on='_k_NumVin')
+        d['Correo'] = [fn_depurar(final, DEPURAR_CORREO) if fn_es_vacio(correo) else correo
+                       for correo, final in zip(d['correo_NatJur'].tolist(), d['cliente_final_jur'].tolist())]
+        d = d[['_k_NumVin', 'Correo']]
+
+        #e: tipos de vehículo de a
+        tipos_e = set(a['_k_CB08_CODVEH'].tolist())
+
+        #SDI_CMDM
+        geografia = set(fn_claves(fuentes['geografia']['CODCIU']).dropna().tolist())
+        excluidos = set(fn_claves(fuentes['excluidos']['vin']).dropna().tolist())
+        tipos_tb08 = set(tipos_vehiculo['_k_CB08_CODVEH'].tolist())
+
+        cmdm = veh_cli.merge(d, on='_k_NumVin')
+        cmdm = cmdm[fn_claves(cmdm['CODCIU']).isin(geografia)
+                    & cmdm['_k_TipVehSap'].isin(tipos_tb08)
+                    & ~cmdm['_k_NumVin'].isin(excluidos)
+                    & cmdm['_k_TipVehSap'].isin(tipos_e)]
+
+        salas = con_clave(fuentes['salas'], ['ide_Sala'])
+        cmdm = cmdm.assign(_k_ide_Sala=fn_claves(cmdm['ide_Sala'])).merge(
+            salas[['_k_ide_Sala', 'Cod_Bir', 'Nom_Sala']], how='left', on='_k_ide_Sala')
+        politicas = con_clave(fuentes['politicas'], ['CCA29_COD_POLITICA'])
+        cmdm = cmdm.assign(_k_Politica=fn_claves(cmdm['Politica_Flotillas'])).merge(
+            politicas[['_k_CCA29_COD_POLITICA', 'CCA29_DES_POLITICA']]
+            ,how='left', left_on='_k_Politica', right_on='_k_CCA29_COD_POLITICA')
+
+        entregado = cmdm['FecEntVeh'].notna().tolist()
+        salida = pd.DataFrame({
+            'ID_CUSTOMER': cmdm['NUMIDECLI'].map(fn_nulo).tolist()
+            ,'CUSTOMER_NAME_1': cmdm['NOMCLI'].map(fn_nulo).tolist()
+            ,'CUSTOMER_SURNAME_1': cmdm['APECLI'].map(fn_nulo).tolist()
+            ,'E_MAIL_1_EXTRANET': ['casaatipico@notiene.com' if fn_es_vacio(correo) else correo
+                                   for correo in cmdm['Correo'].tolist()]
+            ,'VIN': [fn_depurar(vin, DEPURAR_VIN) if si else ' ' for vin, si in zip(cmdm['NumVin'].tolist(), entregado)]
+            ,'TipSer': cmdm['TipSer'].map(fn_nulo).tolist()
+            ,'DELIVERY_DEALER': [' ' if si and fn_nulo(bir) is None else (fn_nulo(bir) if fn_nulo(bir) is not None else '')
+                                 for bir, si in zip(cmdm['Cod_Bir'].tolist(), entregado)]
+            ,'CONCESION': [(fn_nulo(sala) if fn_nulo(sala) is not None else '') if si else 'no value'
+                           for sala, si in zip(cmdm['Nom_Sala'].tolist(), entregado)]
+            ,'DELIVERY_DATE': [self.__fecha(fecha) for fecha in cmdm['FecEntVeh'].tolist()]
+            ,'razon': [fn_nulo(razon) if fn_nulo(razon) is not None else '' for razon in cmdm['motped'].tolist()]
+            ,'Acuerdo_email': cmdm['AutEnvioInfo'].map(fn_acuerdo).tolist()}, dtype=object)
+        salida['Acuerdo_cod_postal'] = salida['Acuerdo_email']
+        salida['Acuerdo_telefono'] = salida['Acuerdo_email']
+        salida['Acuerdo_SMS'] = salida['Acuerdo_email']
+        salida['TYPE_OF_CLIENT'] = cmdm['CODTIPPER'].map(fn_nulo).tolist()
+        salida['descrip_politica'] = [fn_nulo(politica) if fn_nulo(politica) is not None else ''
+                                      for politica in cmdm['CCA29_DES_POLITICA'].tolist()]
+
+        #LEFT JOIN reporte_dda ON CMDM.VIN = DDA.VIN
+        dda = con_clave(fuentes['dda'], ['vin'])
+        salida['_k_VIN'] = fn_claves(salida['VIN'])
+        salida = salida.merge(dda[['_k_vin', 'fecha_entrega']], how='left', left_on='_k_VIN', right_on='_k_vin')
+        salida = salida.drop(columns=['_k_VIN', '_k_vin'])
+        salida['fecha_entrega'] = salida['fecha_entrega'].astype(object).map(fn_nulo)
+
+        #SELECT DISTINCT
+        return list(dict.fromkeys(salida.astype(object).itertuples(index=False, name=None)))
+
+    @staticmethod
+    def __fecha(fecha):
+        """CONVERT(DATE, FecEntVeh) con ISNULL(..., '')."""
+        fecha = fn_nulo(fecha)
+        if fecha is None:
+            return FECHA_VACIA
+        if isinstance(fecha, pd.Timestamp):
+            fecha = fecha.to_pydatetime()
+        if isinstance(fecha, datetime.datetime):
+            return fecha.date()
+        return fecha
@@ -14,34 +14,42 @@ Dependencias:
 -------------
 - pandas: Manipulación de DataFrames.
 - datetime: Manejo de fechas y horas.
-- ConsultasSql: Clase para operaciones con la base de datos.
+- fn_crear_consultas_sql: Crea el backend de consultas (ConsultasSql o ConsultasSqlite según BACKEND_SQL).
+- MarcaAgua: Última fecha de entrega DDA procesada en la tabla delta_cmdm_file.
+- ReplicaDda: Réplica local (SQLite) de vin y fecha_entrega de reporte_dda, opcional (RUTA_REPLICA_DDA).
+- CacheEnriquecimiento: Caché por VIN de la información de correo, opcional (RUTA_CACHE_ENRIQUECIMIENTO).
+- fn_clasificar_clientes: Nombre, apellido y tipo de persona del cliente a partir de NOMCLI, APECLI y CODTIPPER.
+- EscritorLineasCmdm: Escritura del archivo CMDM final copiando las líneas sin cambios de la entrada, opcional
+  (ESCRITURA_LINEAS_ORIGINALES).
 - resource_path: Función para resolver rutas de archivos.
 
 Atributos:
 ----------
-- __obj_consultas_sql: Instancia de ConsultasSql para operaciones de base de datos.
+- __obj_consultas_sql: Instancia del backend de consultas para operaciones de base de datos.
 
 Métodos:
 --------
 - archivo_vacio(ruta_archivo): Verifica si el archivo está vacío.
 - fn_leer_archivo(ruta_archivo): Lee el archivo CSV y retorna un DataFrame.
 - fn_tratar_datos_nulos(dataframe): Trata valores nulos y normaliza columnas específicas.
-- consultar_reporte_dda(lista_vin): Consulta VINs entregados en DDA en la base de datos.
+- fn_sincronizar_replica_dda(): Trae a la réplica local las entregas DDA nuevas.
+- consultar_reporte_dda(lista_vin): Consulta VINs entregados en DDA (en la réplica local si está disponible).
 - fn_separar_vin(Lista_vin_dda, dataframe): Separa VINs entregados y no entregados en DDA.
 - fn_insertar_data_delta_cmdm(dataframe_vin_no_dda): Inserta VINs no entregados en DDA en la base de datos.
-- fn_consultar_data_delta_cmdm(columnas): Consulta datos de la tabla delta_cmdm_file.
-- fn_actualizar_estado_delta(lista_vin): Actualiza el estado de los VINs en la tabla delta_cmdm_file.
+- fn_consultar_data_delta_cmdm(columnas): Consulta y marca como procesados los datos de la tabla delta_cmdm_file.
+- fn_confirmar_delta_cmdm(fecha_maxima): Avanza la marca de agua cuando el archivo CMDM ya se generó.
+- fn_revertir_delta_cmdm(lista_vin): Devuelve a pendiente los VINs marcados en una ejecución que falló.
 - fn_fusionar_dataframes(dataframe1, dataframe2): Fusiona dos DataFrames por concatenación.
 - fn_mod_col_ho(dataframe): Modifica la columna de acuerdo de encuesta y retorna los VIN modificados.
-- fn_consultar_fechas_dda_vin(lista_vin_dda_fecha): Consulta fechas de entrega DDA para una lista de VINs.
+- fn_consultar_fechas_dda_vin(lista_vin_dda_fecha): Consulta fechas de entrega DDA para una lista de VINs (en la réplica local si está disponible).
 - fn_fusionar_dataframes_merge(dataframe1, dataframe2): Fusiona dos DataFrames por la columna VIN.
 - fn_actualizar_fechas_archivo(dataframe_vin_dda): Actualiza fechas en el DataFrame según información de entrega.
 - fn_consultar_reenvios(columnas): Consulta VINs marcados para reenvío.
 - fn_prep_info_email(...): Prepara un DataFrame con información de VIN y estado de entrega DDA para correo.
-- fn_consul_info_email(lista_vin_email): Consulta información detallada de VINs para envío de correos.
+- fn_consul_info_email(lista_vin_email): Consulta información detallada de VINs para envío de correos (solo los que no están en caché).
 - fn_columna_ho_email(dataframe_email, lista_vin_ho_si): Agrega columna indicando si hubo cambio HO.
 - fn_generar_archivo_ecxel(df_email, ruta_excel): Genera archivo Excel con la información de correo.
-- fn_generar_archivo_cmdm(dataframe_file_cmdm, ruta_csv_cmdm): Genera archivo CSV CMDM final.
+- fn_generar_archivo_cmdm(dataframe_file_cmdm, ruta_csv_cmdm, dataframe_entrada): Genera archivo CSV CMDM final.
 - fn_generar_backup_archivo_cmdm(dataframe, ruta_backup): Genera archivo backup del CMDM con fecha y hora.
 - fn_consultar_data_servicio_publico(): Consulta VINs de servicio público entregados en DDA.
 - fn_eliminar_pub_cmdm(dataframe): Elimina registros de vehículos de servicio público del DataFrame.
@@ -55,7 +63,15 @@ Notas:
 """
 from servicios.resolver_rutas import resource_path
 from os import path
-from modelo.consultas_sql import ConsultasSql
+from modelo.fabrica_consultas import fn_crear_consultas_sql
+from modelo.marca_agua import MarcaAgua
+from modelo.replica_dda import ReplicaDda
+from modelo.cache_enriquecimiento import CacheEnriquecimiento
+from modelo.clasificador_clientes import fn_clasificar_clientes
+from modelo.motor_enriquecimiento import MotorEnriquecimiento
+from modelo.cache_dimensiones import CacheDimensiones
+from modelo.escritor_lineas_cmdm import COLUMNA_LINEA_CMDM, EscritorLineasCmdm
+import config
 import pandas as pd
 from datetime import datetime
 
@@ -64,7 +80,17 @@ class ProcesarArchivo():
     Clase para el procesamiento de archivos CMDM y gestión de datos relacionados con VINs y reportes DDA.
     """
     def __init__(self):
-        self.__obj_consultas_sql = ConsultasSql()
+        self.__obj_consultas_sql = fn_crear_consultas_sql()
+        self.__marca_agua = MarcaAgua(config.RUTA_MARCA_AGUA, config.DIAS_SOLAPAMIENTO_MARCA_AGUA)
+        self.__replica_dda = ReplicaDda(config.RUTA_REPLICA_DDA, config.DIAS_SOLAPAMIENTO_MARCA_AGUA)
+        self.__cache_enriquecimiento = CacheEnriquecimiento(config.RUTA_CACHE_ENRIQUECIMIENTO
+                                                            ,config.HORAS_CACHE_ENRIQUECIMIENTO
+                                                            ,config.RUTA_REPLICA_DDA)
+        self.__motor_enriquecimiento = None
+        if config.ENRIQUECIMIENTO_PARALELO:
+            self.__motor_enriquecimiento = MotorEnriquecimiento(config.HILOS_ENRIQUECIMIENTO
+                                                                ,CacheDimensiones(config.RUTA_CACHE_DIMENSIONES
+                                                                                  ,config.HORAS_CACHE_DIMENSIONES))
 
     def archivo_vacio(self,ruta_archivo):
         """
@@ -146,6 +172,26 @@ class ProcesarArchivo():
 
         return dataframe
 
+    def fn_sincronizar_replica_dda(self):
+        """
+        Trae a la réplica local de reporte_dda las entregas nuevas. Si RUTA_REPLICA_DDA no está configurada no hace nada.
+
+        Returns:
+        --------
+        dict: {'exito': True, 'data': filas_nuevas, 'error': None} o {'exito': False, 'data': None, 'error': ...}
+        """
+        if not config.RUTA_REPLICA_DDA:
+            return {'exito': True, 'data': 0, 'error': None}
+
+        estado_conexion, mensaje_error = self.__obj_consultas_sql.conectar_db_conexion()
+
+        if estado_conexion:
+            dic_retorno = self.__replica_dda.fn_sincronizar(self.__obj_consultas_sql)
+            self.__obj_consultas_sql.desconectar()
+            return dic_retorno
+
+        return {'exito': False, 'data': None, 'error': mensaje_error}
+
     def consultar_reporte_dda(self,lista_vin):
         """
         Consulta VINs entregados en DDA en la base de datos.
@@ -160,6 +206,12 @@ class ProcesarArchivo():
         dict: {'exito': True, 'data': Lista_vin_dda, 'error': None} o {'exito': False, ...}
         """
         Lista_vin_dda = []
+        if self.__replica_dda.disponible:
+            return {'exito':True
+                    ,'data':self.__replica_dda.fn_vin_entregados(lista_vin)
+                    ,'error':None
+                    }
+
         estado_conexion, mensaje_error = self.__obj_consultas_sql.conectar_db_conexion()#Conectamos a la base de datos|
 
         if estado_conexion:
@@ -235,7 +287,11 @@ class ProcesarArchivo():
     
     def fn_consultar_data_delta_cmdm(self,columnas):
         """
-        Consulta los datos de la tabla delta_cmdm_file.
+        Consulta los datos de la tabla delta_cmdm_file con entrega en DDA y los marca como procesados
+        en la misma sentencia. Si RUTA_MARCA_AGUA está configurada se revisan las entregas desde la última
+        procesada (menos DIAS_SOLAPAMIENTO_MARCA_AGUA días) en lugar de las de los últimos RANGO_FECHA_CONSULTA
+        días. La marca no avanza aquí sino en
+        fn_confirmar_delta_cmdm, cuando el archivo CMDM ya se generó.
 
         Parameters:
         -----------
@@ -244,25 +300,24 @@ class ProcesarArchivo():
 
         Returns:
         --------
-        dict: {'exito': True, 'data': dataframe_lista_cmdm} o {'exito': False, 'error': ...}
+        dict: {'exito': True, 'data': dataframe_lista_cmdm, 'fecha_maxima': fecha} o {'exito': False, 'error': ...}
         """
         #Conectamos a la base de datos
         estado_conexion, mensaje_error = self.__obj_consultas_sql.conectar_db_conexion()
 
         if estado_conexion:
-            #Validamos si el vin ya cuenta con entrega en DDA
-            dic_retorno_delta = self.__obj_consultas_sql.fn_validar_vin_cmdm_dda()
+            #Validamos si el vin ya cuenta con entrega en DDA y actualizamos su estado
+            dic_retorno_delta = self.__obj_consultas_sql.fn_validar_vin_cmdm_dda(self.__marca_agua.fn_leer())
             self.__obj_consultas_sql.desconectar()
 
             if dic_retorno_delta['exito']:
-
                 lista_vin_dda = [[j for j in i] for i in dic_retorno_delta['data']]
 
                 #Creamos dataframe con la respuesta de la consulta
                 dataframe_lista_cmdm = pd.DataFrame(lista_vin_dda
                                                 ,columns = columnas)
 
-                return {'exito': True, 'data': dataframe_lista_cmdm}
+                return {'exito': True, 'data': dataframe_lista_cmdm, 'fecha_maxima': dic_retorno_delta['fecha_maxima']}
             else:
 
                 return {'exito': False, 'error': dic_retorno_delta['error']}
@@ -270,9 +325,21 @@ class ProcesarArchivo():
         else:
             return {'exito': False, 'error': mensaje_error}
 
-    def fn_actualizar_estado_delta(self, lista_vin):
+    def fn_confirmar_delta_cmdm(self, fecha_maxima):
+        """
+        Avanza la marca de agua hasta la mayor fecha de entrega de los VINs marcados por fn_consultar_data_delta_cmdm.
+        Se llama cuando el archivo CMDM con esos VINs ya se generó.
+
+        Parameters:
+        -----------
+        fecha_maxima : datetime.date o None
+        """
+        self.__marca_agua.fn_guardar(fecha_maxima)
+
+    def fn_revertir_delta_cmdm(self, lista_vin):
         """
-        Actualiza el estado de los VINs en la tabla delta_cmdm_file.
+        Devuelve a pendiente (estado=0) los VINs marcados por fn_consultar_data_delta_cmdm, para que la siguiente
+        ejecución los vuelva a enviar.
 
         Parameters:
         -----------
@@ -280,20 +347,20 @@ class ProcesarArchivo():
 
         Returns:
         --------
-        dict: {'exito': True} o {'exito': False, 'error': ...}
+        dict: {'exito': True, 'data': filas_revertidas, 'error': None} o {'exito': False, 'data': None, 'error': ...}
         """
+        if not lista_vin:
+            return {'exito': True, 'data': 0, 'error': None}
+
         estado_conexion, mensaje_error = self.__obj_consultas_sql.conectar_db_conexion()
 
         if estado_conexion:
-            dic_retorno = self.__obj_consultas_sql.fn_actu_estado_cmdm(lista_vin)
+            dic_retorno = self.__obj_consultas_sql.fn_revertir_vin_cmdm(lista_vin)
             self.__obj_consultas_sql.desconectar()
-            if dic_retorno['exito']:
-                return {'exito': True}
-            else:
-                return {'exito': False, 'error': dic_retorno['error']}
-        else:
-            return {'exito': False, 'error': mensaje_error}
-    
+            return dic_retorno
+
+        return {'exito': False, 'data': None, 'error': mensaje_error}
+
     def fn_fusionar_dataframes(self,dataframe1,dataframe2):
         """
         Fusiona dos DataFrames por concatenación.
@@ -349,6 +416,9 @@ class ProcesarArchivo():
         --------
         dict: {'exito': True, 'data': dataframe_vin_fecha_entrega} o {'exito': False, 'error': ...}
         """
+        if self.__replica_dda.disponible:
+            return {'exito': True, 'data': self.__replica_dda.fn_fechas_entrega(lista_vin_dda_fecha)}
+
         #Conectamos a la base de datos
         estado_conexion, mensaje_error = self.__obj_consultas_sql.conectar_db_conexion()
 
@@ -522,6 +592,8 @@ class ProcesarArchivo():
     def fn_consul_info_email(self,lista_vin_email):
         """
         Consulta información detallada de VINs para envío de correos.
+        Si RUTA_CACHE_ENRIQUECIMIENTO está configurada, solo se consultan en SQL Server los VINs que no están en caché.
+        Con ENRIQUECIMIENTO_PARALELO la consulta se divide por fuente (modelo.motor_enriquecimiento).
 
         Parameters:
         -----------
@@ -529,20 +601,59 @@ class ProcesarArchivo():
 
         Returns:
         --------
-        dict: {'exito': True, 'data': dataframe_email} o {'exito': False, 'error': ...}
-        """
-        #Conectamos a la base de datos
-        estado_conexion, mensaje_error = self.__obj_consultas_sql.conectar_db_conexion()
+        dict: {'exito': True, 'data': dataframe_email, 'advertencia': ..., 'tiempos_fuentes': ...} o {'exito': False, 'error': ...}
+            advertencia describe una falla de la caché (None si no hubo); la consulta sigue sin caché.
+            tiempos_fuentes tiene los segundos y filas de cada fuente con ENRIQUECIMIENTO_PARALELO ({} sin él).
+        """
+        filas_cache = []
+        advertencia = None
+        if self.__cache_enriquecimiento.disponible:
+            try:
+                filas_cache, lista_vin_email = self.__cache_enriquecimiento.fn_consultar(lista_vin_email)
+            except Exception as ex:
+                advertencia = f'No fue posible leer la caché de enriquecimiento: {ex}'
+
+        dic_retorno_email = {'exito': True, 'data': []}
+        estado_conexion, mensaje_error = True, None
+        tiempos_fuentes = {}
+        if self.__motor_enriquecimiento is not None:
+            if lista_vin_email:
+                #Cada fuente abre su conexión en su propio hilo
+                dic_retorno_email = self.__motor_enriquecimiento.fn_consultar(lista_vin_email)
+                tiempos_fuentes = self.__motor_enriquecimiento.tiempos
+        #Sin caché se consulta siempre, como antes; con caché solo si faltan VINs
+        elif lista_vin_email or not self.__cache_enriquecimiento.disponible:
+            #Conectamos a la base de datos
+            estado_conexion, mensaje_error = self.__obj_consultas_sql.conectar_db_conexion()
+
+            if estado_conexion:
+                #Validamos si el vin ya cuenta con entrega en DDA
+                dic_retorno_email = self.__obj_consultas_sql.fn_consulta_info_vin_email(lista_vin_email)
+                self.__obj_consultas_sql.desconectar()
 
         if estado_conexion:
-            #Validamos si el vin ya cuenta con entrega en DDA
-            dic_retorno_email = self.__obj_consultas_sql.fn_consulta_info_vin_email(lista_vin_email)
-            self.__obj_consultas_sql.desconectar()
 
             if dic_retorno_email['exito']:
 
                 lista_vin_email = [[j for j in i] for i in dic_retorno_email['data']]
 
+                if lista_vin_email:
+                    #La consulta trae NOMCLI, APECLI y CODTIPPER sin procesar; el DISTINCT se repite después de clasificar
+                    dataframe_clientes = fn_clasificar_clientes(pd.DataFrame(lista_vin_email)
+                                                                ,columna_nombre = 1
+                                                                ,columna_apellido = 2
+                                                                ,columna_tipo = 14)
+                    lista_vin_email = dataframe_clientes.drop_duplicates().values.tolist()
+
+                if self.__cache_enriquecimiento.disponible and lista_vin_email:
+                    try:
+                        #La columna VIN es la quinta de la consulta
+                        self.__cache_enriquecimiento.fn_guardar(lista_vin_email, 4)
+                    except Exception as ex:
+                        advertencia = f'No fue posible guardar la caché de enriquecimiento: {ex}'
+
+                lista_vin_email = filas_cache + lista_vin_email
+
                 #Creamos dataframe con la respuesta de la consulta
                 dataframe_email = pd.DataFrame(lista_vin_email
                                                 ,columns = ['N° Identificación'
@@ -566,7 +677,7 @@ class ProcesarArchivo():
                 if 'Fecha de entrega DDA' in dataframe_email.columns:
                     dataframe_email['Fecha de entrega DDA'] = dataframe_email['Fecha de entrega DDA'].fillna('')
 
-                return {'exito': True, 'data': dataframe_email}
+                return {'exito': True, 'data': dataframe_email, 'advertencia': advertencia, 'tiempos_fuentes': tiempos_fuentes}
             else:
                 return {'exito': False, 'error': dic_retorno_email['error']}
         else:
@@ -615,29 +726,53 @@ class ProcesarArchivo():
                         ,index=False)
 
     def fn_generar_archivo_cmdm(self,dataframe_file_cmdm
-                                ,ruta_csv_cmdm):
+                                ,ruta_csv_cmdm
+                                ,dataframe_entrada = None):
         """
         Genera archivo CSV CMDM final.
 
+        Si el DataFrame trae la columna COLUMNA_LINEA_CMDM y se recibe dataframe_entrada, las filas sin cambios se
+        copian tal cual del archivo de entrada (ruta_csv_cmdm) y solo se serializan las demás.
+
         Parameters:
         -----------
         dataframe_file_cmdm : pandas.DataFrame
         ruta_csv_cmdm : str
+        dataframe_entrada : pandas.DataFrame, opcional
+            Filas leídas de ruta_csv_cmdm, ya tratadas.
 
         Returns:
         --------
-        None
+        dict: {'exito': True, 'data': {'copiadas': filas, 'serializadas': filas}, 'error': motivo por el que no se
+              copiaron líneas o None}
         """
         #Eliminamos columna estado
         dataframe_file_cmdm = dataframe_file_cmdm.drop(columns=['ESTADO'])
 
-        #Eliminamos los duplicados
-        dataframe_file_cmdm = dataframe_file_cmdm.drop_duplicates()
+        motivo = None
+        if COLUMNA_LINEA_CMDM in dataframe_file_cmdm.columns:
+            #Eliminamos los duplicados sin tener en cuenta la línea de origen
+            columnas = [columna for columna in dataframe_file_cmdm.columns if columna != COLUMNA_LINEA_CMDM]
+            dataframe_file_cmdm = dataframe_file_cmdm.drop_duplicates(subset=columnas)
+
+            if dataframe_entrada is not None:
+                dic_retorno = EscritorLineasCmdm(ruta_csv_cmdm).fn_escribir(dataframe_file_cmdm, dataframe_entrada)
+                if dic_retorno['exito']:
+                    return dic_retorno
+                motivo = dic_retorno['error']
+            dataframe_file_cmdm = dataframe_file_cmdm.drop(columns=[COLUMNA_LINEA_CMDM])
+        else:
+            #Eliminamos los duplicados
+            dataframe_file_cmdm = dataframe_file_cmdm.drop_duplicates()
 
         dataframe_file_cmdm.to_csv(ruta_csv_cmdm
                                 ,index = False
                                 ,sep = ';')
 
+        return {'exito': True
+                ,'data': {'copiadas': 0, 'serializadas': len(dataframe_file_cmdm)}
+                ,'error': motivo}
+
     def fn_generar_backup_archivo_cmdm(self
                                        ,dataframe
                                        ,ruta_backup):
@@ -669,7 +804,9 @@ class ProcesarArchivo():
 
     def fn_consultar_data_servicio_publico(self):
         """
-        Consulta VINs de servicio público entregados en DDA.
+        Consulta todos los VINs de servicio público entregados en DDA, en páginas de TAMANO_PAGINA_PUBLICOS VINs
+        sobre la misma conexión. Cada página se convierte en DataFrame al llegar y sus filas se liberan antes de
+        pedir la siguiente, así en memoria solo quedan los VINs y una página de filas de la consulta.
 
         Returns:
         --------
@@ -680,16 +817,28 @@ class ProcesarArchivo():
 
         if estado_conexion:
             #Validamos si el vin ya cuenta con entrega en DDA y es servicio diferente a particular
-            dic_retorno_delta = self.__obj_consultas_sql.fn_validar_vin_dda_publicos()
+            tamano_pagina = config.TAMANO_PAGINA_PUBLICOS
+            paginas = []
+            vin_desde = ''
+            while True:
+                dic_retorno_delta = self.__obj_consultas_sql.fn_validar_vin_dda_publicos(tamano_pagina, vin_desde)
+                if not dic_retorno_delta['exito'] or not dic_retorno_delta['data']:
+                    break
+
+                #Creamos dataframe con la página de la consulta
+                paginas.append(pd.DataFrame([i[0] for i in dic_retorno_delta['data']]
+                                            ,columns = ['SDI_VHCL.VIN']))
+                #Una página incompleta es la última
+                if len(paginas[-1]) < tamano_pagina:
+                    break
+                vin_desde = paginas[-1]['SDI_VHCL.VIN'].iat[-1]
+                #Liberamos las filas de la página antes de pedir la siguiente
+                dic_retorno_delta = None
             self.__obj_consultas_sql.desconectar()
 
             if dic_retorno_delta['exito']:
-
-                lista_vin_dda = [i[0] for i in dic_retorno_delta['data']]
-
-                #Creamos dataframe con la respuesta de la consulta
-                dataframe_lista_cmdm_publico = pd.DataFrame(lista_vin_dda
-                                                ,columns = ['SDI_VHCL.VIN'])
+                dataframe_lista_cmdm_publico = (pd.concat(paginas, ignore_index=True) if paginas
+                                                else pd.DataFrame(columns = ['SDI_VHCL.VIN']))
 
                 return {'exito': True, 'data': dataframe_lista_cmdm_publico}
             else:
@@ -0,0 +1,236 @@
+"""
+Módulo punto_control.py
+
+Este módulo define la clase PuntoControl, que guarda en disco el contexto del pipeline CMDM después de cada etapa
+para poder reanudar una ejecución fallida desde la primera etapa incompleta.
+
+Clases:
+-------
+PuntoControl
+    - Identifica el punto de control por el hash SHA-256 del archivo CMDM de entrada.
+    - Guarda las claves que escribe cada etapa: DataFrames en Parquet (pickle si pyarrow no está disponible
+      o el DataFrame tiene columnas con tipos mezclados) y el resto de valores en pickle.
+    - Mantiene un manifiesto JSON con el id de ejecución, el hash de entrada, las etapas completadas y
+      el archivo de cada clave.
+    - Al terminar el pipeline marca el punto de control como completo junto con el hash del archivo generado,
+      para que una reanudación después de una falla del FTP no vuelva a procesar el archivo.
+
+Estructura en disco:
+--------------------
+RUTA_CHECKPOINT/<hash de entrada>/manifiesto.json
+RUTA_CHECKPOINT/<hash de entrada>/<clave>.parquet | <clave>.pkl
+
+Notas:
+------
+- El manifiesto se reescribe de forma atómica (archivo temporal + os.replace) después de cada etapa.
+- Solo se guardan las claves declaradas en @etapa(escribe=...) que existen en el contexto; las claves ficticias
+  (tablas, archivos) quedan registradas solo como etapas completadas.
+- fn_guardar_etapa puede llamarse desde varios hilos a la vez.
+"""
+import hashlib
+import json
+import os
+import pickle
+import shutil
+import threading
+from os import path
+
+import pandas as pd
+
+NOMBRE_MANIFIESTO = 'manifiesto.json'
+
+
+def fn_hash_archivo(ruta_archivo):
+    """
+    Calcula el hash SHA-256 de un archivo leyéndolo por bloques.
+
+    Parameters:
+    -----------
+    ruta_archivo : str
+
+    Returns:
+    --------
+    str: Hash hexadecimal.
+    """
+    hash_archivo = hashlib.sha256()
+    with open(ruta_archivo, 'rb') as archivo:
+        for bloque in iter(lambda: archivo.read(1048576), b''):
+            hash_archivo.update(bloque)
+    return hash_archivo.hexdigest()
+
+
+class PuntoControl:
+    """
+    Contexto del pipeline persistido por etapa.
+    """
+    def __init__(self, directorio):
+        """
+        Parameters:
+        -----------
+        directorio : str
+            Carpeta raíz de los puntos de control (RUTA_CHECKPOINT).
+        """
+        self.__directorio = directorio
+        self.__carpeta = None
+        self.__manifiesto = None
+        self.__bloqueo = threading.Lock()
+
+    @property
+    def etapas_completadas(self):
+        """Nombres de las etapas completadas."""
+        return set(self.__manifiesto['etapas_completadas']) if self.__manifiesto else set()
+
+    @property
+    def completo(self):
+        """True si el pipeline terminó y solo falta el resto del flujo (FTP y correo)."""
+        return bool(self.__manifiesto and self.__manifiesto['completo'])
+
+    def __guardar_manifiesto(self):
+        temporal = path.join(self.__carpeta, NOMBRE_MANIFIESTO + '.tmp')
+        with open(temporal, 'w', encoding='utf-8') as archivo:
+            json.dump(self.__manifiesto, archivo, indent=2)
+        os.replace(temporal, path.join(self.__carpeta, NOMBRE_MANIFIESTO))
+
+    def __manifiestos(self):
+        """Retorna (carpeta, manifiesto) de los puntos de control existentes."""
+        if not path.isdir(self.__directorio):
+            return []
+        encontrados = []
+        for nombre in os.listdir(self.__directorio):
+            ruta_manifiesto = path.join(self.__directorio, nombre, NOMBRE_MANIFIESTO)
+            if path.isfile(ruta_manifiesto):
+                with open(ruta_manifiesto, encoding='utf-8') as archivo:
+                    encontrados.append((path.join(self.__directorio, nombre), json.load(archivo)))
+        return encontrados
+
+    def fn_iniciar(self, ruta_archivo, id_ejecucion, hash_entrada = None):
+        """
+        Crea un punto de control vacío para el archivo de entrada, descartando los anteriores.
+
+        Parameters:
+        -----------
+        ruta_archivo : str
+            Archivo CMDM descargado.
+        id_ejecucion : str
+        hash_entrada : str, opcional
+            Hash del archivo ya calculado (fn_hash_archivo); si no se indica se calcula.
+        """
+        hash_entrada = hash_entrada or fn_hash_archivo(ruta_archivo)
+        self.fn_eliminar_todos()
+
+        self.__carpeta = path.join(self.__directorio, hash_entrada)
+        os.makedirs(self.__carpeta, exist_ok=True)
+        self.__manifiesto = {'id_ejecucion': id_ejecucion
+                             ,'hash_entrada': hash_entrada
+                             ,'hash_salida': None
+                             ,'completo': False
+                             ,'etapas_completadas': []
+                             ,'claves': {}}
+        self.__guardar_manifiesto()
+
+    def fn_cargar(self, ruta_archivo, hash_archivo = None):
+        """
+        Busca el punto de control del archivo local: por hash de entrada o, si el pipeline ya había terminado,
+        por hash del archivo generado.
+
+        Parameters:
+        -----------
+        ruta_archivo : str
+        hash_archivo : str, opcional
+            Hash del archivo ya calculado (fn_hash_archivo); si no se indica se calcula.
+
+        Returns:
+        --------
+        bool: True si se encontró un punto de control.
+        """
+        if not path.isfile(ruta_archivo):
+            return False
+        hash_archivo = hash_archivo or fn_hash_archivo(ruta_archivo)
+        for carpeta, manifiesto in self.__manifiestos():
+            if hash_archivo in (manifiesto['hash_entrada'], manifiesto['hash_salida']):
+                self.__carpeta = carpeta
+                self.__manifiesto = manifiesto
+                return True
+        return False
+
+    def fn_cargar_contexto(self):
+        """
+        Lee las claves guardadas.
+
+        Returns:
+        --------
+        dict: Contexto con las claves escritas por las etapas completadas.
+        """
+        contexto = {}
+        for clave, archivo in self.__manifiesto['claves'].items():
+            ruta = path.join(self.__carpeta, archivo)
+            if archivo.endswith('.parquet'):
+                contexto[clave] = pd.read_parquet(ruta)
+            else:
+                with open(ruta, 'rb') as datos:
+                    contexto[clave] = pickle.load(datos)
+        return contexto
+
+    def __guardar_valor(self, clave, valor):
+        """Guarda un valor del contexto y retorna el nombre del archivo."""
+        if isinstance(valor, pd.DataFrame):
+            archivo = f'{clave}.parquet'
+            try:
+                valor.to_parquet(path.join(self.__carpeta, archivo + '.tmp'))
+                os.replace(path.join(self.__carpeta, archivo + '.tmp'), path.join(self.__carpeta, archivo))
+                return archivo
+            except Exception:
+                #Sin pyarrow o con columnas de tipos mezclados (por ejemplo teléfonos int y '')
+                if path.exists(path.join(self.__carpeta, archivo + '.tmp')):
+                    os.remove(path.join(self.__carpeta, archivo + '.tmp'))
+
+        archivo = f'{clave}.pkl'
+        with open(path.join(self.__carpeta, archivo + '.tmp'), 'wb') as datos:
+            pickle.dump(valor, datos, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(path.join(self.__carpeta, archivo + '.tmp'), path.join(self.__carpeta, archivo))
+        return archivo
+
+    def fn_guardar_etapa(self, paso, ctx):
+        """
+        Guarda las claves que escribe la etapa y la marca como completada.
+
+        Parameters:
+        -----------
+        paso : callable
+            Etapa declarada con @etapa.
+        ctx : dict
+        """
+        archivos = {clave: self.__guardar_valor(clave, ctx[clave])
+                    for clave in paso.escribe if clave in ctx}
+
+        with self.__bloqueo:
+            for clave, archivo in archivos.items():
+                anterior = self.__manifiesto['claves'].get(clave)
+                if anterior and anterior != archivo:
+                    os.remove(path.join(self.__carpeta, anterior))
+                self.__manifiesto['claves'][clave] = archivo
+            self.__manifiesto['etapas_completadas'].append(paso.__name__)
+            self.__guardar_manifiesto()
+
+    def fn_marcar_completo(self, ruta_salida):
+        """
+        Marca el pipeline como terminado y registra el hash del archivo generado.
+
+        Parameters:
+        -----------
+        ruta_salida : str
+            Archivo CMDM generado, que se cargará al FTP.
+        """
+        with self.__bloqueo:
+            self.__manifiesto['completo'] = True
+            self.__manifiesto['hash_salida'] = fn_hash_archivo(ruta_salida)
+            self.__guardar_manifiesto()
+
+    def fn_eliminar_todos(self):
+        """
+        Elimina todos los puntos de control del directorio.
+        """
+        for carpeta, _ in self.__manifiestos():
+            shutil.rmtree(carpeta, ignore_errors=True)
+        self.__carpeta = None
+        self.__manifiesto = None
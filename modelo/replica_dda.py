@@ -0,0 +1,231 @@
+"""
+Módulo replica_dda.py
+
+Este módulo define la clase ReplicaDda, una copia local en SQLite de las columnas vin y fecha_entrega de
+DATASTEWARD..reporte_dda. Con la réplica, la validación de entrega DDA y la consulta de fechas de entrega
+se resuelven en memoria con pandas en lugar de enviar listas de VINs a SQL Server.
+
+Clases:
+-------
+ReplicaDda
+    - fn_sincronizar(obj_consultas_sql): Actualiza con SQL Server las entregas desde la última fecha replicada.
+    - fn_vin_entregados(lista_vin): VINs de la lista que tienen entrega en DDA.
+    - fn_fechas_entrega(lista_vin): Fechas de entrega en el formato de fn_consultar_fechas_vin (estilo 103).
+
+Estructura en disco:
+--------------------
+RUTA_REPLICA_DDA -> tabla reporte_dda(vin, fecha_entrega, sincronizado) con fecha ISO 'AAAA-MM-DD' ('' si es NULL)
+y sincronizado = momento (time.time()) en que la fila llegó a la réplica; la caché de enriquecimiento lo usa para
+invalidar los VINs con entregas nuevas.
+
+Notas:
+------
+- reporte_dda es casi solo de inserción: la sincronización vuelve a traer los últimos DIAS_SOLAPAMIENTO_MARCA_AGUA
+  días y las filas sin fecha, y la primera vez trae la tabla completa. Esa ventana de la réplica se reemplaza por lo
+  leído: se eliminan las filas que ya no están en el servidor (borradas, o sin fecha que ahora tienen fecha) y las
+  filas que siguen iguales conservan su momento de sincronización.
+- Una fila sin fecha que en el servidor recibe una fecha anterior a la ventana sale de la réplica y no vuelve hasta
+  reconstruirla; para reconstruirla basta con borrar el archivo.
+- Si la sincronización falla la réplica queda deshabilitada para la ejecución y se consulta SQL Server.
+- La réplica se carga en memoria una sola vez por ejecución, al primer uso; puede usarse desde varios hilos.
+- Los VINs se guardan y se comparan sin espacios y en mayúsculas (fn_normalizar_vin), como los compara SQL Server
+  con su intercalación por defecto; las consultas retornan los VINs tal como los recibieron.
+"""
+import datetime
+import os
+import sqlite3
+import threading
+import time
+from os import path
+
+import pandas as pd
+
+TAMANO_LOTE_SINCRONIZACION = 50000
+
+
+def fn_fecha_iso(fecha):
+    """
+    Convierte la fecha de entrega de SQL Server a texto ISO ('' si es NULL).
+    """
+    if fecha is None:
+        return ''
+    if isinstance(fecha, datetime.datetime):
+        fecha = fecha.date()
+    return fecha.isoformat()
+
+
+def fn_normalizar_vin(vin):
+    """
+    Retorna el VIN sin espacios al inicio o al final y en mayúsculas.
+    """
+    return str(vin).strip().upper()
+
+
+def fn_normalizar_vines(lista_vin):
+    """
+    Retorna una serie con los VINs normalizados como fn_normalizar_vin (NaN para valores que no son texto).
+    """
+    return pd.Series(lista_vin, dtype=object).str.strip().str.upper()
+
+
+class ReplicaDda:
+    """
+    Réplica local de vin y fecha_entrega de reporte_dda.
+    """
+    def __init__(self, ruta, dias_solapamiento):
+        """
+        Parameters:
+        -----------
+        ruta : str
+            Archivo SQLite de la réplica (RUTA_REPLICA_DDA). Si está vacío la réplica no se usa.
+        dias_solapamiento : int
+            Días antes de la última fecha replicada que se vuelven a traer en cada sincronización.
+        """
+        self.__ruta = ruta
+        self.__dias_solapamiento = dias_solapamiento
+        self.__habilitada = bool(ruta)
+        self.__datos = None
+        self.__bloqueo = threading.Lock()
+
+    @property
+    def disponible(self):
+        """True si la réplica está configurada y la sincronización no falló."""
+        return self.__habilitada and path.isfile(self.__ruta)
+
+    def __conectar(self):
+        conexion = sqlite3.connect(self.__ruta)
+        conexion.execute("""CREATE TABLE IF NOT EXISTS reporte_dda (vin TEXT NOT NULL
+                                                                   ,fecha_entrega TEXT NOT NULL
+                                                                   ,sincronizado REAL NOT NULL DEFAULT 0
+                                                                   ,PRIMARY KEY (vin, fecha_entrega))""")
+        columnas = [fila[1] for fila in conexion.execute('PRAGMA table_info(reporte_dda)')]
+        if 'sincronizado' not in columnas:
+            conexion.execute('ALTER TABLE reporte_dda ADD COLUMN sincronizado REAL NOT NULL DEFAULT 0')
+        conexion.execute('CREATE INDEX IF NOT EXISTS ix_reporte_dda_fecha ON reporte_dda (fecha_entrega)')
+        return conexion
+
+    def fn_sincronizar(self, obj_consultas_sql):
+        """
+        Actualiza la réplica con las filas de reporte_dda desde la última fecha replicada menos los días de
+        solapamiento, más las filas sin fecha; las filas de esa ventana que el servidor ya no retorna se eliminan.
+        obj_consultas_sql debe estar conectado.
+
+        Parameters:
+        -----------
+        obj_consultas_sql : ConsultasSql
+
+        Returns:
+        --------
+        dict: {'exito': True, 'data': filas_nuevas, 'error': None} o {'exito': False, 'data': None, 'error': ex}
+        """
+        if not self.__habilitada:
+            return {'exito': True, 'data': 0, 'error': None}
+
+        carpeta = path.dirname(self.__ruta)
+        if carpeta:
+            os.makedirs(carpeta, exist_ok=True)
+
+        conexion = self.__conectar()
+        try:
+            ultima_fecha = conexion.execute("SELECT MAX(fecha_entrega) FROM reporte_dda WHERE fecha_entrega <> ''").fetchone()[0]
+            fecha_desde = None
+            if ultima_fecha:
+                fecha_desde = (datetime.date.fromisoformat(ultima_fecha)
+                               - datetime.timedelta(days=self.__dias_solapamiento))
+
+            #Las filas leídas se juntan primero: un VIN puede tener filas en lotes distintos
+            conexion.execute('DROP TABLE IF EXISTS temp.sincronizacion')
+            conexion.execute("""CREATE TEMP TABLE sincronizacion (vin TEXT NOT NULL
+                                                               ,fecha_entrega TEXT NOT NULL
+                                                               ,PRIMARY KEY (vin, fecha_entrega))""")
+
+            def fn_guardar_lote(filas):
+                conexion.executemany('INSERT OR IGNORE INTO temp.sincronizacion (vin, fecha_entrega) VALUES (?, ?)'
+                                     ,[(fn_normalizar_vin(fila[0]), fn_fecha_iso(fila[1]))
+                                       for fila in filas if fila[0] is not None])
+
+            dic_retorno = obj_consultas_sql.fn_consultar_reporte_dda_desde(fecha_desde
+                                                                          ,TAMANO_LOTE_SINCRONIZACION
+                                                                          ,fn_guardar_lote)
+            if not dic_retorno['exito']:
+                conexion.rollback()
+                self.__habilitada = False
+                return {'exito': False, 'data': None, 'error': dic_retorno['error']}
+
+            #Ventana releída: toda la réplica la primera vez; si no, las filas sin fecha y las desde fecha_desde
+            ventana, parametros = '1 = 1', []
+            if fecha_desde is not None:
+                ventana, parametros = "(fecha_entrega = '' OR fecha_entrega >= ?)", [fecha_desde.isoformat()]
+            conexion.execute(f"""DELETE FROM reporte_dda
+                                  WHERE {ventana}
+                                  AND NOT EXISTS (SELECT 1 FROM temp.sincronizacion AS leidas
+                                                  WHERE leidas.vin = reporte_dda.vin
+                                                  AND leidas.fecha_entrega = reporte_dda.fecha_entrega)""", parametros)
+            filas_nuevas = conexion.execute("""INSERT OR IGNORE INTO reporte_dda (vin, fecha_entrega, sincronizado)
+                                              SELECT vin, fecha_entrega, ? FROM temp.sincronizacion"""
+                                           ,[time.time()]).rowcount
+            conexion.execute('DROP TABLE temp.sincronizacion')
+            conexion.commit()
+            with self.__bloqueo:
+                self.__datos = None
+            return {'exito': True, 'data': filas_nuevas, 'error': None}
+
+        except Exception as ex:
+            conexion.rollback()
+            self.__habilitada = False
+            return {'exito': False, 'data': None, 'error': ex}
+        finally:
+            conexion.close()
+
+    def __cargar(self):
+        """Retorna la réplica como DataFrame (vin, fecha_entrega), cargándola la primera vez."""
+        with self.__bloqueo:
+            if self.__datos is None:
+                conexion = self.__conectar()
+                try:
+                    datos = pd.read_sql_query('SELECT vin, fecha_entrega FROM reporte_dda', conexion)
+                finally:
+                    conexion.close()
+                #Las réplicas anteriores a la normalización pueden tener VINs sin normalizar
+                datos['vin'] = fn_normalizar_vines(datos['vin'])
+                self.__datos = datos.drop_duplicates(ignore_index=True)
+            return self.__datos
+
+    def fn_vin_entregados(self, lista_vin):
+        """
+        Retorna los VINs de la lista que tienen entrega en DDA (como fn_consulta_estado_dda).
+
+        Parameters:
+        -----------
+        lista_vin : list
+
+        Returns:
+        --------
+        list: VINs entregados.
+        """
+        datos = self.__cargar()
+        entregados = fn_normalizar_vines(lista_vin).isin(datos['vin']).to_numpy()
+        return [vin for vin, entregado in zip(lista_vin, entregados) if entregado]
+
+    def fn_fechas_entrega(self, lista_vin):
+        """
+        Retorna las fechas de entrega DDA de los VINs, con las columnas y el formato de fn_consultar_fechas_vin.
+
+        Parameters:
+        -----------
+        lista_vin : list
+
+        Returns:
+        --------
+        pandas.DataFrame: Columnas 'SDI_VHCL.VIN', 'FECHA_DATE' (dd/mm/aaaa) y 'FECHA_DATETIME' (dd/mm/aaaa 12:00:00).
+        """
+        datos = self.__cargar()
+        consulta = pd.DataFrame({'vin_consulta': list(lista_vin), 'vin': fn_normalizar_vines(lista_vin)})
+        entregas = consulta.drop_duplicates().merge(datos, on='vin')
+        fecha = pd.to_datetime(entregas['fecha_entrega'].replace('', None), format='%Y-%m-%d').dt.strftime('%d/%m/%Y')
+        fecha = fecha.astype(object).where(fecha.notna(), None)
+
+        return pd.DataFrame({'SDI_VHCL.VIN': entregas['vin_consulta'].tolist()
+                             ,'FECHA_DATE': fecha.tolist()
+                             ,'FECHA_DATETIME': [valor + ' 12:00:00' if valor is not None else None
+                                                 for valor in fecha.tolist()]})
@@ -0,0 +1,95 @@
+"""
+Módulo benchmark_arranque.py
+
+Este módulo mide el arranque en frío del proceso y lo compara con un presupuesto: lanza procesos nuevos de main.py
+(o del ejecutable de PyInstaller) con --help, que solo carga el intérprete y argparse, y con --perfil-arranque, que
+además importa todos los módulos de una ejecución. Termina con código 1 si la mediana supera el presupuesto.
+
+Funciones:
+----------
+- fn_medir_arranque(comando, repeticiones): Tiempos de arranque de procesos nuevos.
+- fn_imprimir_resultado(resultado, presupuesto): Imprime los tiempos y si se cumple el presupuesto.
+
+Uso:
+----
+python -m rendimiento.benchmark_arranque --repeticiones 5 --presupuesto 2
+python -m rendimiento.benchmark_arranque --ejecutable dist/main.exe --presupuesto 4
+
+Notas:
+------
+- 'base' es el tiempo de un proceso que termina apenas lee los argumentos: intérprete, desempaquetado del
+  ejecutable y carga de main.py. 'importaciones' es lo que reporta --perfil-arranque y 'total' el tiempo del proceso
+  con --perfil-arranque, que es lo que se compara con el presupuesto.
+- La primera repetición suele ser más lenta (caché de disco fría); por eso se usa la mediana.
+- Para ver qué módulos explican el tiempo: python main.py --perfil-arranque.
+"""
+import argparse
+import re
+import statistics
+import subprocess
+import sys
+import time
+from os import path
+
+PRESUPUESTO_SEGUNDOS = 2.0
+CARPETA_PROYECTO = path.dirname(path.dirname(path.abspath(__file__)))
+
+
+def fn_medir_arranque(comando, repeticiones = 5):
+    """
+    Lanza repeticiones procesos nuevos con --help y con --perfil-arranque y mide cada uno.
+
+    Parameters:
+    -----------
+    comando : list
+        Comando que ejecuta main.py (por ejemplo [sys.executable, 'main.py'] o ['dist/main.exe']).
+    repeticiones : int
+
+    Returns:
+    --------
+    dict: {'base', 'importaciones', 'total'}: listas de segundos por repetición.
+    """
+    resultado = {'base': [], 'importaciones': [], 'total': []}
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        subprocess.run(comando + ['--help'], cwd=CARPETA_PROYECTO, check=True, capture_output=True)
+        resultado['base'].append(time.perf_counter() - inicio)
+
+        inicio = time.perf_counter()
+        proceso = subprocess.run(comando + ['--perfil-arranque'], cwd=CARPETA_PROYECTO, check=True
+                                 ,capture_output=True, text=True, encoding='utf-8')
+        resultado['total'].append(time.perf_counter() - inicio)
+        importaciones = re.search(r'Importaciones: ([\d.]+) s', proceso.stdout)
+        resultado['importaciones'].append(float(importaciones.group(1)) if importaciones else float('nan'))
+    return resultado
+
+
+def fn_imprimir_resultado(resultado, presupuesto):
+    """
+    Imprime mínimo, mediana y máximo de cada medición y el resultado frente al presupuesto.
+
+    Returns:
+    --------
+    bool: True si la mediana del total está dentro del presupuesto.
+    """
+    print(f"{'Medición':<16}{'Mín s':>9}{'Mediana s':>11}{'Máx s':>9}")
+    for nombre, segundos in resultado.items():
+        print(f'{nombre:<16}{min(segundos):>9.3f}{statistics.median(segundos):>11.3f}{max(segundos):>9.3f}')
+
+    mediana = statistics.median(resultado['total'])
+    cumple = mediana <= presupuesto
+    print(f"\nArranque {mediana:.3f} s {'dentro del' if cumple else 'SOBRE EL'} presupuesto de {presupuesto:g} s")
+    return cumple
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Benchmark del arranque en frío de main.py')
+    parser.add_argument('--ejecutable', help='Ejecutable de PyInstaller; por defecto main.py con este intérprete')
+    parser.add_argument('--repeticiones', type=int, default=5)
+    parser.add_argument('--presupuesto', type=float, default=PRESUPUESTO_SEGUNDOS
+                        ,help='Segundos máximos de la mediana del arranque con todas las importaciones')
+    argumentos = parser.parse_args()
+
+    comando = [argumentos.ejecutable] if argumentos.ejecutable else [sys.executable, path.join(CARPETA_PROYECTO, 'main.py')]
+    resultado = fn_medir_arranque(comando, argumentos.repeticiones)
+    sys.exit(0 if fn_imprimir_resultado(resultado, argumentos.presupuesto) else 1)
@@ -0,0 +1,143 @@
+"""
+Módulo benchmark_correo.py
+
+Este módulo compara el envío de correos con una conexión SMTP nueva por mensaje (esquema anterior)
+contra ServicioCorreo (conexión reutilizada y envío en segundo plano), usando un ServidorSMTPLocal.
+
+Funciones:
+----------
+- fn_crear_correo(tamano_adjunto): Construye un correo con un adjunto binario del tamaño indicado.
+- fn_envio_conexion_nueva(correos, destinatarios): Envía cada correo abriendo y cerrando su propia conexión.
+- fn_envio_servicio(correos, destinatarios): Envía los correos con ServicioCorreo.
+- fn_ejecutar_benchmark(mensajes, tamano_adjunto, latencia, limite_bytes_segundo): Ejecuta ambos esquemas y retorna los tiempos.
+
+Uso:
+----
+python -m rendimiento.benchmark_correo --mensajes 2 --tamano-adjunto 5000000 --latencia 0.2
+
+Notas:
+------
+- 'retorno' es el tiempo que el flujo principal queda bloqueado; 'entrega' es el tiempo hasta que el servidor aceptó todos los mensajes.
+"""
+import argparse
+import json
+import os
+import smtplib
+import time
+from email.message import EmailMessage
+
+import config
+from rendimiento.benchmark_ftp import fn_configuracion_temporal
+from rendimiento.servidor_smtp_local import ServidorSMTPLocal
+from vista.servicio_correo import ServicioCorreo
+
+
+def fn_crear_correo(tamano_adjunto):
+    """
+    Construye un correo con un adjunto de bytes aleatorios.
+
+    Parameters:
+    -----------
+    tamano_adjunto : int
+
+    Returns:
+    --------
+    EmailMessage
+    """
+    email = EmailMessage()
+    email["From"] = 'cmdm@localhost'
+    email["To"] = 'destino@localhost'
+    email["Subject"] = 'Benchmark CMDM'
+    email.set_content('Correo de prueba')
+    email.add_attachment(os.urandom(tamano_adjunto)
+                        ,maintype="application"
+                        ,subtype="octet-stream"
+                        ,filename='adjunto.bin')
+    return email
+
+
+def fn_envio_conexion_nueva(correos, destinatarios):
+    """
+    Envía cada correo con una conexión SMTP propia, como lo hacía la capa de vista antes de ServicioCorreo.
+
+    Returns:
+    --------
+    dict: {'retorno': segundos, 'entrega': segundos}
+    """
+    inicio = time.perf_counter()
+    for email in correos:
+        smtp = smtplib.SMTP(config.SERVIDOR_SMTP, port=config.PUERTO_SERVIDOR_SMTP)
+        smtp.sendmail('cmdm@localhost', destinatarios, email.as_string())
+        smtp.quit()
+    transcurrido = time.perf_counter() - inicio
+    return {'retorno': transcurrido, 'entrega': transcurrido}
+
+
+def fn_envio_servicio(correos, destinatarios):
+    """
+    Envía los correos con ServicioCorreo en segundo plano.
+
+    Returns:
+    --------
+    dict: {'retorno': segundos, 'entrega': segundos}
+    """
+    servicio = ServicioCorreo()
+    inicio = time.perf_counter()
+    envios = [servicio.fn_enviar_en_segundo_plano(email, destinatarios) for email in correos]
+    retorno = time.perf_counter() - inicio
+
+    errores = [envio.result()['error'] for envio in envios if not envio.result()['exito']]
+    entrega = time.perf_counter() - inicio
+    servicio.fn_cerrar(esperar=True)
+
+    if errores:
+        raise RuntimeError(errores[0])
+    return {'retorno': retorno, 'entrega': entrega}
+
+
+def fn_ejecutar_benchmark(mensajes, tamano_adjunto, latencia = 0.0, limite_bytes_segundo = 0):
+    """
+    Ejecuta ambos esquemas de envío contra un servidor SMTP local.
+
+    Returns:
+    --------
+    dict: {'conexion_nueva': {...}, 'servicio': {...}, 'mensajes_recibidos': int}
+    """
+    correos = [fn_crear_correo(tamano_adjunto) for _ in range(mensajes)]
+    destinatarios = ['destino@localhost']
+
+    with ServidorSMTPLocal(latencia, limite_bytes_segundo) as servidor:
+        valores = {'SERVIDOR_SMTP': '127.0.0.1'
+                   ,'PUERTO_SERVIDOR_SMTP': servidor.puerto
+                   ,'USAR_STARTTLS_SMTP': False
+                   ,'CORREO_REMITENTE': 'cmdm@localhost'}
+
+        with fn_configuracion_temporal(valores):
+            resultado = {'conexion_nueva': fn_envio_conexion_nueva(correos, destinatarios)
+                         ,'servicio': fn_envio_servicio(correos, destinatarios)}
+
+        resultado['mensajes_recibidos'] = servidor.manejador.mensajes
+        return resultado
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Benchmark de envío de correos contra un SMTP local')
+    parser.add_argument('--mensajes', type=int, default=2)
+    parser.add_argument('--tamano-adjunto', type=int, default=5_000_000)
+    parser.add_argument('--latencia', type=float, default=0.0)
+    parser.add_argument('--ancho-banda', type=int, default=0, help='Bytes por segundo; 0 sin límite')
+    parser.add_argument('--salida', help='Ruta de un archivo JSON con los resultados')
+    argumentos = parser.parse_args()
+
+    resultado = fn_ejecutar_benchmark(argumentos.mensajes
+                                      ,argumentos.tamano_adjunto
+                                      ,argumentos.latencia
+                                      ,argumentos.ancho_banda)
+
+    for esquema in ('conexion_nueva', 'servicio'):
+        print(f"{esquema:<16}retorno {resultado[esquema]['retorno']:>8.3f} s"
+              f"   entrega {resultado[esquema]['entrega']:>8.3f} s")
+
+    if argumentos.salida:
+        with open(argumentos.salida, 'w', encoding='utf-8') as archivo:
+            json.dump(resultado, archivo, indent=2)
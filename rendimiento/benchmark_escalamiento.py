@@ -0,0 +1,285 @@
+"""
+Módulo benchmark_escalamiento.py
+
+Este módulo mide cómo escala el procesamiento con el tamaño del archivo CMDM: ejecuta fn_gestion_archivo con el backend
+SQLite sobre archivos sintéticos de 10k, 100k, 1M y 5M filas (por defecto) y cronometra cada método público de
+ProcesarArchivo y el controlador completo. Los resultados se guardan en JSON para comparar versiones.
+
+Funciones:
+----------
+- fn_ejecutar_tamano(filas, directorio, ...): Ejecuta y mide un tamaño (en un proceso aparte).
+- fn_ejecutar_suite(tamanos, directorio, ...): Ejecuta los tamaños en orden y retorna el documento de resultados.
+- fn_exponentes(resultados): Exponente de crecimiento del tiempo entre tamaños consecutivos (1 = lineal).
+- fn_comparar(anterior, actual, umbral): Métodos más lentos que en un documento de resultados anterior.
+- fn_imprimir_resultado(documento, anterior, umbral): Imprime tiempos, exponentes y regresiones.
+
+Uso:
+----
+python -m rendimiento.benchmark_escalamiento --tamanos 10000,100000,1000000 --salida escalamiento.json
+python -m rendimiento.benchmark_escalamiento --salida nueva.json --comparar escalamiento.json --umbral 1.2
+
+Notas:
+------
+- Cada tamaño se ejecuta en un proceso nuevo: la memoria pico y las cachés no se arrastran entre tamaños.
+- Con --limite-segundos se detiene la suite en el primer tamaño cuyo controlador supere el límite; ese es el punto
+  en que el proceso deja de caber en la ventana de ejecución.
+- Los archivos y bases generados se guardan en --directorio y se reutilizan entre corridas; la generación no se mide.
+- Un exponente mayor que UMBRAL_SUPERLINEAL indica un método que crece más rápido que el archivo.
+"""
+import argparse
+import datetime
+import json
+import math
+import multiprocessing
+import platform
+import subprocess
+import time
+from concurrent.futures import ProcessPoolExecutor
+from os import path
+
+TAMANOS = (10000, 100000, 1000000, 5000000)
+UMBRAL_SUPERLINEAL = 1.15
+
+
+def fn_ejecutar_tamano(filas, directorio, semilla = 0, pendientes = None, hilos = 4):
+    """
+    Ejecuta fn_gestion_archivo sobre un archivo de filas filas y cronometra los métodos de ProcesarArchivo.
+
+    Parameters:
+    -----------
+    filas : int
+    directorio : str
+        Carpeta donde se generan o reutilizan el archivo CMDM y la base SQLite.
+    semilla : int
+    pendientes : int
+        Filas previas de delta_cmdm_file; por defecto el 5 % de las filas.
+    hilos : int
+        HILOS_PIPELINE y HILOS_ENRIQUECIMIENTO.
+
+    Returns:
+    --------
+    dict: {'filas', 'bytes_archivo', 'segundos_generacion', 'controlador', 'metodos', 'etapas', 'memoria_pico',
+           'exito', 'error'}
+    """
+    from controlador.controlador_gestion_archivo_cmdm import ControladorGestionArchivoCmdm
+    from controlador.medicion_etapas import fn_memoria_pico
+    from modelo.procesar_archivo import ProcesarArchivo
+    from rendimiento.benchmark_ftp import fn_configuracion_temporal, fn_medir_metodos
+    from rendimiento.perfil_gestion_archivo import fn_preparar_datos
+
+    if pendientes is None:
+        pendientes = filas // 20
+    valores, segundos_generacion = fn_preparar_datos(directorio, filas, semilla, pendientes, hilos)
+
+    objetivos = [(ProcesarArchivo, nombre, nombre) for nombre in sorted(vars(ProcesarArchivo))
+                 if not nombre.startswith('_') and callable(getattr(ProcesarArchivo, nombre))]
+    objetivos.append((ControladorGestionArchivoCmdm, 'fn_gestion_archivo', 'controlador'))
+
+    tiempos = {}
+    error = None
+    medicion = None
+    with fn_configuracion_temporal(valores), fn_medir_metodos(tiempos, objetivos):
+        try:
+            controlador = ControladorGestionArchivoCmdm()
+            resultado = controlador.fn_gestion_archivo()
+            medicion = controlador.fn_ultima_medicion()
+            if resultado['error']:
+                fallidas = [metrica['etapa'] for metrica in medicion['etapas'] if not metrica['ok']]
+                error = 'Falló ' + (', '.join(fallidas) or 'fn_gestion_archivo') + ' (ver log)'
+        except Exception as ex:
+            error = repr(ex)
+
+    return {'filas': filas
+            ,'bytes_archivo': path.getsize(valores['RUTA_GUARDAR_ARCHIVO'])
+            ,'segundos_generacion': round(segundos_generacion, 3)
+            ,'controlador': round(tiempos.pop('controlador', 0.0), 4)
+            ,'metodos': {nombre: round(segundos, 4) for nombre, segundos in sorted(tiempos.items())}
+            ,'etapas': {metrica['etapa']: metrica['segundos'] for metrica in medicion['etapas']} if medicion else {}
+            ,'memoria_pico': fn_memoria_pico()
+            ,'exito': error is None
+            ,'error': error}
+
+
+def fn_version():
+    """Retorna el commit actual del repositorio (None si no se puede consultar)."""
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, check=True
+                              ,cwd=path.dirname(path.dirname(path.abspath(__file__)))).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def fn_ejecutar_suite(tamanos, directorio, semilla = 0, pendientes = None, hilos = 4, limite_segundos = None):
+    """
+    Ejecuta los tamaños en orden, cada uno en un proceso nuevo.
+
+    Parameters:
+    -----------
+    tamanos : list
+    directorio : str
+    semilla : int
+    pendientes : int, opcional
+    hilos : int
+    limite_segundos : float, opcional
+        Si el controlador supera este tiempo en un tamaño, los tamaños mayores no se ejecutan.
+
+    Returns:
+    --------
+    dict: {'fecha', 'version', 'python', 'pandas', 'hilos', 'resultados', 'limite_alcanzado'}
+    """
+    import pandas as pd
+
+    resultados = []
+    limite_alcanzado = None
+    contexto = multiprocessing.get_context('spawn')
+    for filas in sorted(tamanos):
+        with ProcessPoolExecutor(max_workers=1, mp_context=contexto) as ejecutor:
+            resultado = ejecutor.submit(fn_ejecutar_tamano, filas, directorio, semilla, pendientes, hilos).result()
+        resultados.append(resultado)
+        print(f"{filas:>10} filas  {resultado['controlador']:>10.3f} s  "
+              f"{'ok' if resultado['exito'] else resultado['error']}", flush=True)
+        if limite_segundos and resultado['controlador'] > limite_segundos:
+            limite_alcanzado = filas
+            break
+
+    return {'fecha': datetime.datetime.now().isoformat(timespec='seconds')
+            ,'version': fn_version()
+            ,'python': platform.python_version()
+            ,'pandas': pd.__version__
+            ,'hilos': hilos
+            ,'resultados': resultados
+            ,'limite_alcanzado': limite_alcanzado}
+
+
+def fn_exponentes(resultados):
+    """
+    Calcula, para el controlador y cada método, el exponente de crecimiento entre tamaños consecutivos:
+    log(t2 / t1) / log(n2 / n1). 1 es lineal, 2 cuadrático.
+
+    Parameters:
+    -----------
+    resultados : list
+        Lista 'resultados' de fn_ejecutar_suite.
+
+    Returns:
+    --------
+    dict: {nombre: [(filas_desde, filas_hasta, exponente), ...]}
+    """
+    exponentes = {}
+    ordenados = sorted(resultados, key=lambda resultado: resultado['filas'])
+    for anterior, siguiente in zip(ordenados, ordenados[1:]):
+        tiempos_anterior = dict(anterior['metodos'], controlador=anterior['controlador'])
+        tiempos_siguiente = dict(siguiente['metodos'], controlador=siguiente['controlador'])
+        for nombre, segundos in tiempos_siguiente.items():
+            base = tiempos_anterior.get(nombre)
+            #Por debajo de 10 ms el ruido domina la razón
+            if not base or base < 0.01 or segundos <= 0:
+                continue
+            exponente = math.log(segundos / base) / math.log(siguiente['filas'] / anterior['filas'])
+            exponentes.setdefault(nombre, []).append((anterior['filas'], siguiente['filas'], round(exponente, 2)))
+    return exponentes
+
+
+def fn_comparar(anterior, actual, umbral = 1.2):
+    """
+    Compara dos documentos de resultados y retorna los tiempos que crecieron más que el umbral.
+
+    Parameters:
+    -----------
+    anterior : dict
+    actual : dict
+    umbral : float
+        Razón actual / anterior a partir de la cual se reporta.
+
+    Returns:
+    --------
+    list: [(filas, nombre, segundos_anterior, segundos_actual, razon), ...] ordenada por razón descendente.
+    """
+    previos = {resultado['filas']: resultado for resultado in anterior['resultados']}
+    regresiones = []
+    for resultado in actual['resultados']:
+        previo = previos.get(resultado['filas'])
+        if previo is None:
+            continue
+        tiempos_previos = dict(previo['metodos'], controlador=previo['controlador'])
+        for nombre, segundos in dict(resultado['metodos'], controlador=resultado['controlador']).items():
+            base = tiempos_previos.get(nombre)
+            if base and base >= 0.01 and segundos / base > umbral:
+                regresiones.append((resultado['filas'], nombre, base, segundos, round(segundos / base, 2)))
+    return sorted(regresiones, key=lambda regresion: regresion[4], reverse=True)
+
+
+def fn_imprimir_resultado(documento, anterior = None, umbral = 1.2):
+    """
+    Imprime la tabla de tiempos por tamaño, los exponentes superlineales y, si hay documento anterior, las regresiones.
+
+    Parameters:
+    -----------
+    documento : dict
+        Resultado de fn_ejecutar_suite.
+    anterior : dict, opcional
+    umbral : float
+    """
+    resultados = sorted(documento['resultados'], key=lambda resultado: resultado['filas'])
+    nombres = sorted({nombre for resultado in resultados for nombre in resultado['metodos']})
+
+    print(f"Versión: {documento['version']}  Python {documento['python']}  pandas {documento['pandas']}")
+    print(f"{'Método':<38}" + ''.join(f"{resultado['filas']:>12}" for resultado in resultados))
+    for nombre in ['controlador'] + nombres:
+        fila = []
+        for resultado in resultados:
+            segundos = resultado['controlador'] if nombre == 'controlador' else resultado['metodos'].get(nombre)
+            fila.append(f'{segundos:>12.3f}' if segundos is not None else f"{'-':>12}")
+        print(f'{nombre:<38}' + ''.join(fila))
+    print(f"{'memoria pico MB':<38}" + ''.join(f"{(resultado['memoria_pico'] or 0) / 1048576:>12.0f}"
+                                                for resultado in resultados))
+
+    for resultado in resultados:
+        if not resultado['exito']:
+            print(f"Error con {resultado['filas']} filas: {resultado['error']}")
+    if documento.get('limite_alcanzado'):
+        print(f"Límite de tiempo superado con {documento['limite_alcanzado']} filas")
+
+    for nombre, tramos in fn_exponentes(resultados).items():
+        superlineales = [tramo for tramo in tramos if tramo[2] > UMBRAL_SUPERLINEAL]
+        if superlineales:
+            print(f'Superlineal {nombre}: ' + ', '.join(f'{desde}->{hasta}: n^{exponente}'
+                                                       for desde, hasta, exponente in superlineales))
+
+    if anterior:
+        for filas, nombre, base, segundos, razon in fn_comparar(anterior, documento, umbral):
+            print(f'Regresión {nombre} ({filas} filas): {base:.3f} s -> {segundos:.3f} s (x{razon})')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Benchmark de escalamiento de fn_gestion_archivo con el backend SQLite')
+    parser.add_argument('--tamanos', default=','.join(str(filas) for filas in TAMANOS)
+                        ,help='Filas separadas por coma')
+    parser.add_argument('--directorio', default='datos_escalamiento', help='Carpeta de archivos y bases generados')
+    parser.add_argument('--semilla', type=int, default=0)
+    parser.add_argument('--pendientes', type=int, help='Filas previas de delta_cmdm_file; por defecto el 5 %%')
+    parser.add_argument('--hilos', type=int, default=4)
+    parser.add_argument('--limite-segundos', type=float)
+    parser.add_argument('--salida', help='Ruta del archivo JSON con los resultados')
+    parser.add_argument('--comparar', help='Archivo JSON de una corrida anterior')
+    parser.add_argument('--umbral', type=float, default=1.2)
+    argumentos = parser.parse_args()
+
+    inicio = time.perf_counter()
+    documento = fn_ejecutar_suite([int(filas) for filas in argumentos.tamanos.split(',')]
+                                  ,argumentos.directorio
+                                  ,argumentos.semilla
+                                  ,argumentos.pendientes
+                                  ,argumentos.hilos
+                                  ,argumentos.limite_segundos)
+
+    anterior = None
+    if argumentos.comparar:
+        with open(argumentos.comparar, encoding='utf-8') as archivo:
+            anterior = json.load(archivo)
+    fn_imprimir_resultado(documento, anterior, argumentos.umbral)
+    print(f'Total: {time.perf_counter() - inicio:.1f} s')
+
+    if argumentos.salida:
+        with open(argumentos.salida, 'w', encoding='utf-8') as archivo:
+            json.dump(documento, archivo, indent=2)
@@ -0,0 +1,212 @@
+"""
+Módulo benchmark_ftp.py
+
+Este módulo ejecuta main() contra un ServidorFTPLocal y reporta los tiempos de descarga, procesamiento, eliminación, carga y correo.
+Permite validar fuera de línea cualquier cambio de rendimiento en GestionFTP y ConexionFTP.
+
+Funciones:
+----------
+- fn_medir_metodos(registro, objetivos): Administrador de contexto que cronometra métodos de las clases indicadas.
+- fn_configuracion_temporal(valores): Administrador de contexto que reemplaza valores de config y los restaura al salir.
+- fn_ejecutar_benchmark(...): Levanta el FTP local, siembra el archivo CMDM, ejecuta main() y retorna los tiempos por etapa.
+- fn_imprimir_resultado(resultado): Imprime la tabla de tiempos.
+
+Uso:
+----
+python -m rendimiento.benchmark_ftp --filas 100000 --latencia 0.05 --ancho-banda 5000000 --repeticiones 3
+
+Notas:
+------
+- Las etapas que dependen de SQL Server o SMTP se miden igual; si fallan se reporta el error y se conservan los tiempos medidos.
+- Las credenciales y rutas del FTP se reemplazan solo durante la ejecución del benchmark.
+"""
+import argparse
+import json
+import tempfile
+import time
+from contextlib import contextmanager
+from os import makedirs, path
+
+import config
+from rendimiento.servidor_ftp_local import ServidorFTPLocal
+
+
+@contextmanager
+def fn_medir_metodos(registro, objetivos):
+    """
+    Reemplaza temporalmente los métodos indicados por versiones cronometradas.
+
+    Parameters:
+    -----------
+    registro : dict
+        Diccionario donde se acumulan los segundos por etiqueta.
+    objetivos : list
+        Lista de tuplas (clase, nombre_metodo, etiqueta).
+    """
+    originales = []
+
+    def envolver(metodo, etiqueta):
+        def cronometrado(*args, **kwargs):
+            inicio = time.perf_counter()
+            try:
+                return metodo(*args, **kwargs)
+            finally:
+                registro[etiqueta] = registro.get(etiqueta, 0.0) + time.perf_counter() - inicio
+        return cronometrado
+
+    for clase, nombre_metodo, etiqueta in objetivos:
+        metodo = getattr(clase, nombre_metodo)
+        originales.append((clase, nombre_metodo, metodo))
+        setattr(clase, nombre_metodo, envolver(metodo, etiqueta))
+    try:
+        yield registro
+    finally:
+        for clase, nombre_metodo, metodo in originales:
+            setattr(clase, nombre_metodo, metodo)
+
+
+@contextmanager
+def fn_configuracion_temporal(valores):
+    """
+    Reemplaza valores del módulo config y los restaura al salir.
+
+    Parameters:
+    -----------
+    valores : dict
+    """
+    anteriores = {nombre: getattr(config, nombre, None) for nombre in valores}
+    for nombre, valor in valores.items():
+        setattr(config, nombre, valor)
+    try:
+        yield
+    finally:
+        for nombre, valor in anteriores.items():
+            setattr(config, nombre, valor)
+
+
+def fn_ejecutar_benchmark(filas
+                          ,latencia = 0.0
+                          ,limite_bytes_segundo = 0
+                          ,probabilidad_desconexion = 0.0
+                          ,semilla = 0):
+    """
+    Ejecuta main() una vez contra un FTP local sembrado con un archivo CMDM sintético.
+
+    Parameters:
+    -----------
+    filas : int
+        Filas del archivo CMDM sembrado.
+    latencia : float
+        Segundos de latencia por comando FTP.
+    limite_bytes_segundo : int
+        Límite de ancho de banda del FTP; 0 sin límite.
+    probabilidad_desconexion : float
+        Probabilidad de corte de conexión por comando.
+    semilla : int
+
+    Returns:
+    --------
+    dict: {'filas', 'bytes_archivo', 'tiempos', 'total', 'desconexiones', 'error'}
+    """
+    from main import main
+    from controlador.controlador_gestion_ftp import GestionFTP
+    from controlador.controlador_gestion_archivo_cmdm import ControladorGestionArchivoCmdm
+    from controlador.controlador_gestion_correos import ControladorGestionCorreos
+
+    nombre_descarga = config.NOMBRE_ARCHIVO_DESCARGA or 'CMDM.CSV'
+    nombre_carga = config.NOMBRE_ARCHIVO_CARGA or nombre_descarga
+
+    with tempfile.TemporaryDirectory() as directorio:
+        directorio_ftp = path.join(directorio, 'ftp')
+        directorio_local = path.join(directorio, 'local')
+        makedirs(directorio_ftp)
+        makedirs(directorio_local)
+
+        servidor = ServidorFTPLocal(directorio_ftp
+                                    ,latencia = latencia
+                                    ,limite_bytes_segundo = limite_bytes_segundo
+                                    ,probabilidad_desconexion = probabilidad_desconexion
+                                    ,semilla = semilla)
+
+        with servidor:
+            bytes_archivo = servidor.fn_sembrar_archivo_cmdm(nombre_descarga, filas, semilla)
+
+            valores = {'SERVIDOR_FTP': '127.0.0.1'
+                       ,'PUERTO_FTP': servidor.puerto
+                       ,'USUARIO_FTP': 'cmdm'
+                       ,'CONTRASENA_FTP': 'cmdm'
+                       ,'RUTA_FTP': '/'
+                       ,'NOMBRE_ARCHIVO_DESCARGA': nombre_descarga
+                       ,'NOMBRE_ARCHIVO_CARGA': nombre_carga
+                       ,'RUTA_GUARDAR_ARCHIVO': path.join(directorio_local, nombre_descarga)
+                       ,'RUTA_ARCHIVO_BACUP': path.join(directorio_local, 'backup_')
+                       ,'RUTA_ARCHIVO_CORREO': directorio_local + path.sep
+                       ,'NOMBRE_ARCHIVO_CORREO': config.NOMBRE_ARCHIVO_CORREO or 'correo.xlsx'}
+
+            objetivos = [(GestionFTP, 'fn_descargar_archivo_ftp', 'descarga')
+                         ,(ControladorGestionArchivoCmdm, 'fn_gestion_archivo', 'procesamiento')
+                         ,(GestionFTP, 'fn_eliminar_archivo_ftp', 'eliminacion')
+                         ,(GestionFTP, 'fn_cargar_archivo_ftp', 'carga')
+                         ,(ControladorGestionCorreos, 'fn_correo_modificaciones', 'correo')
+                         ,(ControladorGestionCorreos, 'fn_correo_error', 'correo')]
+
+            tiempos = {}
+            error = None
+            inicio = time.perf_counter()
+
+            with fn_configuracion_temporal(valores), fn_medir_metodos(tiempos, objetivos):
+                try:
+                    main()
+                except Exception as ex:
+                    error = repr(ex)
+
+            return {'filas': filas
+                    ,'bytes_archivo': bytes_archivo
+                    ,'tiempos': tiempos
+                    ,'total': time.perf_counter() - inicio
+                    ,'desconexiones': servidor.desconexiones
+                    ,'error': error}
+
+
+def fn_imprimir_resultado(resultado):
+    """
+    Imprime la tabla de tiempos de una ejecución del benchmark.
+
+    Parameters:
+    -----------
+    resultado : dict
+        Resultado de fn_ejecutar_benchmark.
+    """
+    print(f"Filas: {resultado['filas']}  Bytes: {resultado['bytes_archivo']}  "
+          f"Desconexiones: {resultado['desconexiones']}")
+    for etapa in ('descarga', 'procesamiento', 'eliminacion', 'carga', 'correo'):
+        if etapa in resultado['tiempos']:
+            print(f"  {etapa:<15}{resultado['tiempos'][etapa]:>10.3f} s")
+    print(f"  {'total':<15}{resultado['total']:>10.3f} s")
+    if resultado['error']:
+        print(f"  error: {resultado['error']}")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Benchmark de main() contra un FTP local')
+    parser.add_argument('--filas', type=int, default=10000)
+    parser.add_argument('--latencia', type=float, default=0.0)
+    parser.add_argument('--ancho-banda', type=int, default=0, help='Bytes por segundo; 0 sin límite')
+    parser.add_argument('--prob-desconexion', type=float, default=0.0)
+    parser.add_argument('--repeticiones', type=int, default=1)
+    parser.add_argument('--salida', help='Ruta de un archivo JSON con los resultados')
+    argumentos = parser.parse_args()
+
+    resultados = []
+    for repeticion in range(argumentos.repeticiones):
+        resultado = fn_ejecutar_benchmark(argumentos.filas
+                                          ,argumentos.latencia
+                                          ,argumentos.ancho_banda
+                                          ,argumentos.prob_desconexion
+                                          ,semilla = repeticion)
+        fn_imprimir_resultado(resultado)
+        resultados.append(resultado)
+
+    if argumentos.salida:
+        with open(argumentos.salida, 'w', encoding='utf-8') as archivo:
+            json.dump(resultados, archivo, indent=2)
@@ -0,0 +1,92 @@
+"""
+Módulo benchmark_log.py
+
+Este módulo compara el costo de registrar eventos abriendo el archivo en cada llamada (esquema anterior de crea_log)
+contra el registro encolado de vista.registro_log.
+
+Funciones:
+----------
+- fn_log_directo(ruta_log, mensajes): Abre, escribe y cierra el archivo por cada mensaje.
+- fn_log_encolado(ruta_log, mensajes): Registra los mensajes con crea_log y espera a que se escriban.
+- fn_ejecutar_benchmark(mensajes): Ejecuta ambos esquemas en una carpeta temporal y retorna los tiempos.
+
+Uso:
+----
+python -m rendimiento.benchmark_log --mensajes 20000
+
+Notas:
+------
+- 'llamadas' es el tiempo que el hilo que registra queda ocupado; 'total' incluye la escritura pendiente en el archivo.
+"""
+import argparse
+import datetime
+import tempfile
+import time
+from os import path
+
+from rendimiento.benchmark_ftp import fn_configuracion_temporal
+from vista import registro_log
+from vista.crear_log import crea_log
+
+
+def fn_log_directo(ruta_log, mensajes):
+    """
+    Registra los mensajes como lo hacía crea_log antes del registro encolado.
+
+    Returns:
+    --------
+    dict: {'llamadas': segundos, 'total': segundos}
+    """
+    inicio = time.perf_counter()
+    for numero in range(mensajes):
+        fecha_actual = datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        with open(ruta_log, 'a') as log:
+            log.writelines(f'{fecha_actual} Mensaje de prueba {numero}\n')
+    transcurrido = time.perf_counter() - inicio
+    return {'llamadas': transcurrido, 'total': transcurrido}
+
+
+def fn_log_encolado(ruta_log, mensajes):
+    """
+    Registra los mensajes con crea_log y detiene el registro para medir la escritura completa.
+
+    Returns:
+    --------
+    dict: {'llamadas': segundos, 'total': segundos}
+    """
+    with fn_configuracion_temporal({'RUTA_LOG': ruta_log}):
+        registro_log.fn_detener_registro()
+        registro_log.fn_obtener_registro()
+
+        inicio = time.perf_counter()
+        for numero in range(mensajes):
+            crea_log(f'Mensaje de prueba {numero}', etapa='benchmark')
+        llamadas = time.perf_counter() - inicio
+        registro_log.fn_detener_registro()
+        total = time.perf_counter() - inicio
+
+    return {'llamadas': llamadas, 'total': total}
+
+
+def fn_ejecutar_benchmark(mensajes):
+    """
+    Ejecuta ambos esquemas en una carpeta temporal.
+
+    Returns:
+    --------
+    dict: {'directo': {...}, 'encolado': {...}}
+    """
+    with tempfile.TemporaryDirectory() as carpeta:
+        return {'directo': fn_log_directo(path.join(carpeta, 'directo.log'), mensajes)
+                ,'encolado': fn_log_encolado(path.join(carpeta, 'encolado.log'), mensajes)}
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Benchmark del registro de eventos')
+    parser.add_argument('--mensajes', type=int, default=20000)
+    argumentos = parser.parse_args()
+
+    resultado = fn_ejecutar_benchmark(argumentos.mensajes)
+    for esquema in ('directo', 'encolado'):
+        print(f"{esquema:<10}llamadas {resultado[esquema]['llamadas']:>8.3f} s"
+              f"   total {resultado[esquema]['total']:>8.3f} s")
@@ -0,0 +1,202 @@
+"""
+Módulo generador_base_sqlite.py
+
+Este módulo llena una base SQLite (backend BACKEND_SQL=sqlite) con datos sintéticos coherentes con un archivo CMDM
+generado por generador_cmdm, para ejecutar el pipeline completo sin SQL Server.
+
+Funciones:
+----------
+- fn_sembrar_dimensiones(conexion, generador): Parámetros, tipos de vehículo, salas, políticas, ciudades y departamentos.
+- fn_generar_base_sqlite(ruta_base, ruta_archivo_cmdm, ...): Crea la base y siembra vehículos, clientes, entregas DDA,
+  reenvíos, exclusiones y filas pendientes de delta_cmdm_file para los VINs del archivo.
+
+Uso:
+----
+python -m rendimiento.generador_base_sqlite --archivo CMDM.CSV --base cmdm.sqlite --pendientes 1000
+
+Notas:
+------
+- El archivo CMDM se lee fila a fila y las inserciones se hacen por lotes: sirve para archivos de millones de filas.
+- Las proporciones (entregas DDA, ventas jurídicas, reenvíos) son aproximadas y reproducibles con la semilla.
+"""
+import argparse
+import csv
+import datetime
+import random
+import sqlite3
+import time
+
+import config
+from modelo.consultas_sqlite import fn_crear_esquema
+from rendimiento.generador_cmdm import fn_columnas_archivo, fn_generar_fila
+
+TAMANO_LOTE = 50000
+TIPOS_VEHICULO = ('SANDERO STEPWAY', 'LOGAN LIFE', 'DUSTER INTENS', 'KWID OUTSIDER', 'KOLEOS ZEN', 'CAPTUR INTENS'
+                  ,'OROCH DYNAMIQUE', 'MEGANE E-TECH', 'KANGOO VAN', 'MASTER FURGON')
+NOMBRES = ('JUAN', 'MARIA', 'CARLOS', 'ANA', 'LUIS', 'SOFIA', 'ANDRES', 'LAURA')
+APELLIDOS = ('PEREZ', 'GOMEZ', 'RODRIGUEZ', 'LOPEZ', 'MARTINEZ', 'GARCIA', 'TORRES', 'RAMIREZ')
+EMPRESAS = ('TRANSPORTES ANDINOS S.A.S', 'LEASING BOGOTA S.A', 'COOPERATIVA CAFETERA', 'INVERSIONES DEL VALLE LTDA')
+CIUDADES = 1100
+DEPARTAMENTOS = 33
+SALAS = 60
+POLITICAS = 5
+
+
+def fn_sembrar_dimensiones(conexion, generador):
+    """
+    Siembra las tablas pequeñas.
+
+    Parameters:
+    -----------
+    conexion : sqlite3.Connection
+    generador : random.Random
+    """
+    conexion.executemany('INSERT INTO TADEM03_PARAMETROS (CADEM03_DESCRIPCION, CADEM03_VALOR) VALUES (?, ?)'
+                         ,[('Ruta ftp', '/'), ('Email cambios encuestas', 'encuestas@localhost')])
+    conexion.executemany('INSERT INTO TB08_VEHICULO (CB08_CODVEH, CB08_NOMVEH) VALUES (?, ?)'
+                         ,[(f'T{indice:03d}', nombre) for indice, nombre in enumerate(TIPOS_VEHICULO)])
+    conexion.executemany('INSERT INTO EXTT_Salas (ide_Sala, Cod_Bir, Nom_Sala) VALUES (?, ?, ?)'
+                         ,[(indice, str(10000 + indice), f'SALA {indice}') for indice in range(SALAS)])
+    conexion.executemany('INSERT INTO TCA29_POLITICAS_FLOTILLAS (CCA29_COD_POLITICA, CCA29_DES_POLITICA) VALUES (?, ?)'
+                         ,[(indice, f'POLITICA FLOTILLA {indice}') for indice in range(1, POLITICAS + 1)])
+    conexion.executemany('INSERT INTO GEN_DEPARTAMENTOS (coddep) VALUES (?)'
+                         ,[(indice,) for indice in range(1, DEPARTAMENTOS + 1)])
+    conexion.executemany('INSERT INTO GEN_CIUDADES (CODCIU, CODDEP) VALUES (?, ?)'
+                         ,[(indice, generador.randint(1, DEPARTAMENTOS)) for indice in range(1, CIUDADES + 1)])
+
+
+def fn_generar_base_sqlite(ruta_base
+                           ,ruta_archivo_cmdm
+                           ,semilla = 0
+                           ,proporcion_dda = 0.5
+                           ,pendientes = 0
+                           ,dias_rango = 30):
+    """
+    Crea y llena la base SQLite para los VINs de un archivo CMDM.
+
+    Parameters:
+    -----------
+    ruta_base : str
+        Archivo SQLite a crear (se agregan filas si ya existe).
+    ruta_archivo_cmdm : str
+        Archivo CMDM generado con generador_cmdm.
+    semilla : int
+    proporcion_dda : float
+        Fracción de VINs con entrega en reporte_dda.
+    pendientes : int
+        Filas previas de delta_cmdm_file (estado 0), la mitad con entrega DDA reciente.
+    dias_rango : int
+        Antigüedad máxima en días de las entregas DDA generadas (ver RANGO_FECHA_CONSULTA).
+
+    Returns:
+    --------
+    dict: {'vines': int, 'segundos': float}
+    """
+    inicio = time.perf_counter()
+    generador = random.Random(semilla)
+    hoy = datetime.date.today()
+    clientes = {}
+
+    conexion = sqlite3.connect(ruta_base)
+    try:
+        fn_crear_esquema(conexion, config.COLUMNA_ARCHIVO_CMDM)
+        fn_sembrar_dimensiones(conexion, generador)
+
+        def fn_fecha_reciente():
+            return hoy - datetime.timedelta(days=generador.randint(0, max(dias_rango - 1, 0)))
+
+        def fn_cliente(vines):
+            #Un cliente por cada dos vehículos en promedio
+            codigo = generador.randint(1, max(vines // 2, 1))
+            if codigo not in clientes:
+                empresa = generador.random() < 0.1
+                clientes[codigo] = (codigo, str(800000000 + codigo), 'NIT' if empresa else 'CC'
+                                    ,generador.choice(EMPRESAS) if empresa else generador.choice(NOMBRES)
+                                    ,None if empresa else generador.choice(APELLIDOS)
+                                    ,2 if empresa else 1
+                                    ,f'cliente{codigo}@correo.com' if generador.random() < 0.8 else None
+                                    ,generador.choice((0, 1, 1))
+                                    ,generador.randint(1, CIUDADES + 50))
+            return clientes[codigo]
+
+        lotes = {'veh': [], 'dda': [], 'dj': [], 'cj': [], 'reenvio': [], 'excluir': []}
+
+        def fn_vaciar():
+            conexion.executemany('INSERT OR IGNORE INTO VEH_Vehiculos VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)', lotes['veh'])
+            conexion.executemany('INSERT INTO reporte_dda (vin, fecha_entrega) VALUES (?, ?)', lotes['dda'])
+            conexion.executemany('INSERT INTO EXTT_DetalleVentaJuridica VALUES (?, ?, ?)', lotes['dj'])
+            conexion.executemany('INSERT OR IGNORE INTO EXTT_ContactoPersonaJuridica VALUES (?, ?)', lotes['cj'])
+            conexion.executemany('INSERT INTO reenvio_encuestas_cmdm (VIN) VALUES (?)', lotes['reenvio'])
+            conexion.executemany('INSERT OR IGNORE INTO vin_excluir_cierre (vin) VALUES (?)', lotes['excluir'])
+            for lote in lotes.values():
+                lote.clear()
+
+        with open(ruta_archivo_cmdm, encoding='utf-8', newline='') as archivo:
+            lector = csv.reader(archivo, delimiter=';')
+            columnas = next(lector)
+            posicion_vin = columnas.index('SDI_VHCL.VIN')
+            vines = sum(1 for _ in lector)
+
+        with open(ruta_archivo_cmdm, encoding='utf-8', newline='') as archivo:
+            lector = csv.reader(archivo, delimiter=';')
+            next(lector)
+            for numero, fila in enumerate(lector):
+                vin = fila[posicion_vin]
+                cliente = fn_cliente(vines)
+                venta = datetime.datetime.combine(fn_fecha_reciente(), datetime.time(10))
+                entrega = venta + datetime.timedelta(days=generador.randint(0, 5)) if generador.random() < 0.9 else None
+                lotes['veh'].append((vin, cliente[1], cliente[2], f'T{generador.randrange(len(TIPOS_VEHICULO)):03d}'
+                                     ,venta, '100209' if generador.random() < 0.02 else '999', entrega
+                                     ,'PUB' if generador.random() < 0.1 else 'PAR', None
+                                     ,generador.randrange(SALAS + 5)
+                                     ,generador.randint(1, POLITICAS) if generador.random() < 0.2 else None))
+                if generador.random() < proporcion_dda:
+                    lotes['dda'].append((vin, fn_fecha_reciente()))
+                if cliente[2] == 'NIT':
+                    lotes['dj'].append((vin, cliente[0], f'C{cliente[0]}'))
+                    lotes['cj'].append((f'C{cliente[0]}', f'contacto{cliente[0]}@empresa.com'))
+                if generador.random() < 0.01:
+                    lotes['reenvio'].append((vin,))
+                if generador.random() < 0.005:
+                    lotes['excluir'].append((vin,))
+                if numero % TAMANO_LOTE == TAMANO_LOTE - 1:
+                    fn_vaciar()
+            fn_vaciar()
+
+        conexion.executemany('INSERT OR IGNORE INTO GEN_CLIENTES VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)', clientes.values())
+
+        #Filas pendientes de ejecuciones anteriores
+        columnas_archivo = fn_columnas_archivo()
+        placeholders = ', '.join(['?'] * len(config.COLUMNA_ARCHIVO_CMDM))
+        filas_delta = []
+        for _ in range(pendientes):
+            fila = dict(zip(columnas_archivo, fn_generar_fila(columnas_archivo, generador)))
+            filas_delta.append([0 if columna.upper() == 'ESTADO' else fila[columna]
+                                for columna in config.COLUMNA_ARCHIVO_CMDM])
+            if generador.random() < 0.5:
+                conexion.execute('INSERT INTO reporte_dda (vin, fecha_entrega) VALUES (?, ?)'
+                                 ,(fila['SDI_VHCL.VIN'], fn_fecha_reciente()))
+        conexion.executemany(f'INSERT OR IGNORE INTO delta_cmdm_file VALUES ({placeholders})', filas_delta)
+
+        conexion.commit()
+    finally:
+        conexion.close()
+
+    return {'vines': vines, 'segundos': time.perf_counter() - inicio}
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Base SQLite sintética para el backend local')
+    parser.add_argument('--archivo', required=True, help='Archivo CMDM generado con generador_cmdm')
+    parser.add_argument('--base', required=True, help='Archivo SQLite a crear')
+    parser.add_argument('--semilla', type=int, default=0)
+    parser.add_argument('--proporcion-dda', type=float, default=0.5)
+    parser.add_argument('--pendientes', type=int, default=0)
+    argumentos = parser.parse_args()
+
+    resultado = fn_generar_base_sqlite(argumentos.base
+                                       ,argumentos.archivo
+                                       ,argumentos.semilla
+                                       ,argumentos.proporcion_dda
+                                       ,argumentos.pendientes)
+    print(f"VINs: {resultado['vines']}  {resultado['segundos']:.1f} s")
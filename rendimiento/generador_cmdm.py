@@ -0,0 +1,194 @@
+"""
+Módulo generador_cmdm.py
+
+Este módulo genera archivos CMDM sintéticos para pruebas de rendimiento fuera del entorno productivo.
+Los archivos respetan las columnas definidas en config.COLUMNA_ARCHIVO_CMDM y el separador ';' del archivo real.
+
+Funciones:
+----------
+- fn_columnas_archivo(): Retorna las columnas del archivo CMDM (sin la columna interna ESTADO).
+- fn_generar_vin(generador): Genera un VIN con formato ISO 3779 (fabricante, dígito de control, año y serie).
+- fn_generar_fila(columnas, generador, distribucion): Genera los valores de una fila.
+- fn_generar_archivo_cmdm(ruta_archivo, filas, semilla, distribucion): Escribe un archivo CMDM sintético con el
+  número de filas indicado.
+
+Uso:
+----
+python -m rendimiento.generador_cmdm --filas 1000000 --salida CMDM.CSV --duplicados 0.05
+
+Distribución:
+-------------
+DISTRIBUCION_REALISTA fija la mezcla VP/VU, la proporción de 'Y' de cada acuerdo de comunicación, las tasas de
+valores vacíos de teléfonos, concesionarios y acuerdos, y la tasa de VINs repetidos (un mismo vehículo que llega
+actualizado más de una vez en el archivo). Se puede pasar otra distribución con las mismas claves.
+
+Notas:
+------
+- La escritura se hace fila a fila para poder generar archivos grandes sin cargarlos en memoria.
+- Los VINs repetidos se toman de los últimos VENTANA_DUPLICADOS VINs generados, así la memoria no crece con el archivo.
+- Las fechas caen en los DIAS_FECHAS días anteriores a hoy, en formato dd/mm/aaaa.
+- Los valores de columnas que el pipeline no interpreta se rellenan con texto genérico.
+"""
+import argparse
+import datetime
+import random
+from collections import deque
+
+import config
+
+VALORES_ACUERDO = ('Y', 'N')
+VENTANA_DUPLICADOS = 10000
+DIAS_FECHAS = 365
+
+DISTRIBUCION_REALISTA = {
+    'proporcion_vp': 0.85
+    ,'acuerdo_si': {'SDI_PRTY.CMMNCTN_AGRMNT_EML_REN': 0.72
+                    ,'SDI_PRTY.CMMNCTN_AGRMNT_PST_REN': 0.35
+                    ,'SDI_PRTY.CMMNCTN_AGRMNT_PHN_REN': 0.64
+                    ,'SDI_PRTY.CMMNCTN_AGRMNT_SMS_REN': 0.58
+                    ,'SDI_PRTY.SRVY_AGRMNT': 0.81}
+    ,'nulos': {'SDI_PRTY.PHN_NMBR_1': 0.04
+               ,'SDI_PRTY.PHN_NMBR_2': 0.55
+               ,'SDI_VHCL.DLVRY_DLR_CD': 0.02
+               ,'SDI_VHCL.SLLNG_DLR_CD': 0.03
+               ,'acuerdos': 0.01}
+    ,'duplicados': 0.03
+}
+
+#Fabricantes (WMI) y descriptores de modelo (VDS) de vehículos Renault comercializados en Colombia
+FABRICANTES_VIN = ('9FB', '93Y', 'VF1', '8A1')
+MODELOS_VIN = ('5SRB4', '4SRE5', 'HSRA2', 'LJA01', 'RFB21', 'HJD4H', 'FL0HA', 'MA1KC')
+LETRAS_ANIO = 'LMNPRSTV'
+PLANTAS = 'ABCDJS'
+CARACTERES_VIN = 'ABCDEFGHJKLMNPRSTUVWXYZ0123456789'
+VALORES_VIN = dict(zip('ABCDEFGHJKLMNPRSTUVWXYZ', (1, 2, 3, 4, 5, 6, 7, 8, 1, 2, 3, 4, 5, 7, 9
+                                                   ,2, 3, 4, 5, 6, 7, 8, 9)))
+VALORES_VIN.update({str(digito): digito for digito in range(10)})
+PESOS_VIN = (8, 7, 6, 5, 4, 3, 2, 10, 0, 9, 8, 7, 6, 5, 4, 3, 2)
+
+
+def fn_columnas_archivo():
+    """
+    Retorna las columnas del archivo CMDM tal como llegan en el FTP.
+
+    Returns:
+    --------
+    list: Columnas del archivo sin la columna interna 'ESTADO'.
+    """
+    return [columna for columna in config.COLUMNA_ARCHIVO_CMDM if columna.upper() != 'ESTADO']
+
+
+def fn_generar_vin(generador):
+    """
+    Genera un VIN sintético de 17 caracteres: fabricante Renault, modelo, dígito de control, año, planta y serie.
+
+    Parameters:
+    -----------
+    generador : random.Random
+
+    Returns:
+    --------
+    str: VIN sintético con dígito de control válido.
+    """
+    vin = (generador.choice(FABRICANTES_VIN) + generador.choice(MODELOS_VIN) + '0'
+           + generador.choice(LETRAS_ANIO) + generador.choice(PLANTAS) + f'{generador.randrange(1000000):06d}')
+    residuo = sum(VALORES_VIN[caracter] * peso for caracter, peso in zip(vin, PESOS_VIN)) % 11
+    return vin[:8] + ('X' if residuo == 10 else str(residuo)) + vin[9:]
+
+
+def fn_generar_fila(columnas, generador, distribucion = None):
+    """
+    Genera los valores de una fila del archivo CMDM.
+
+    Parameters:
+    -----------
+    columnas : list
+    generador : random.Random
+    distribucion : dict, opcional
+        Proporciones de la fila (ver DISTRIBUCION_REALISTA); por defecto DISTRIBUCION_REALISTA.
+
+    Returns:
+    --------
+    list: Valores de la fila en el orden de las columnas ('' para los vacíos).
+    """
+    distribucion = distribucion or DISTRIBUCION_REALISTA
+    nulos = distribucion['nulos']
+    hoy = datetime.date.today()
+
+    fila = []
+    for columna in columnas:
+        if columna in nulos and generador.random() < nulos[columna]:
+            fila.append('')
+        elif columna == 'SDI_VHCL.VIN':
+            fila.append(fn_generar_vin(generador))
+        elif columna == 'SDI_VHCL.VHCL_TYP_CD':
+            fila.append('VP' if generador.random() < distribucion['proporcion_vp'] else 'VU')
+        elif columna.startswith('SDI_PRTY.CMMNCTN_AGRMNT') or columna == 'SDI_PRTY.SRVY_AGRMNT':
+            if generador.random() < nulos['acuerdos']:
+                fila.append('')
+            else:
+                fila.append('Y' if generador.random() < distribucion['acuerdo_si'].get(columna, 0.5) else 'N')
+        elif columna in ('SDI_PRTY.PHN_NMBR_1', 'SDI_PRTY.PHN_NMBR_2'):
+            fila.append(str(generador.randint(3000000000, 3509999999)))
+        elif columna in ('SDI_VHCL.DLVRY_DLR_CD', 'SDI_VHCL.SLLNG_DLR_CD'):
+            fila.append(str(generador.randint(10000, 99999)))
+        elif columna.endswith('_DATE') or columna.endswith('_DT'):
+            fila.append((hoy - datetime.timedelta(days=generador.randrange(DIAS_FECHAS))).strftime('%d/%m/%Y'))
+        else:
+            fila.append(f'VALOR{generador.randint(0, 999)}')
+    return fila
+
+
+def fn_generar_archivo_cmdm(ruta_archivo, filas, semilla=0, distribucion = None):
+    """
+    Escribe un archivo CMDM sintético.
+
+    Parameters:
+    -----------
+    ruta_archivo : str
+        Ruta donde se escribe el archivo.
+    filas : int
+        Número de filas de datos a generar.
+    semilla : int
+        Semilla del generador aleatorio para obtener archivos reproducibles.
+    distribucion : dict, opcional
+        Proporciones de los datos (ver DISTRIBUCION_REALISTA).
+
+    Returns:
+    --------
+    int: Tamaño en bytes del archivo generado.
+    """
+    distribucion = distribucion or DISTRIBUCION_REALISTA
+    generador = random.Random(semilla)
+    columnas = fn_columnas_archivo()
+    posicion_vin = columnas.index('SDI_VHCL.VIN') if 'SDI_VHCL.VIN' in columnas else None
+    recientes = deque(maxlen=VENTANA_DUPLICADOS)
+
+    with open(ruta_archivo, 'w', encoding='utf-8', newline='') as archivo:
+        archivo.write(';'.join(columnas) + '\n')
+        for _ in range(filas):
+            fila = fn_generar_fila(columnas, generador, distribucion)
+            if posicion_vin is not None:
+                if recientes and generador.random() < distribucion['duplicados']:
+                    fila[posicion_vin] = generador.choice(recientes)
+                else:
+                    recientes.append(fila[posicion_vin])
+            archivo.write(';'.join(fila) + '\n')
+
+        return archivo.tell()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Generador de archivos CMDM sintéticos')
+    parser.add_argument('--filas', type=int, default=10000)
+    parser.add_argument('--salida', required=True, help='Ruta del archivo CMDM a escribir')
+    parser.add_argument('--semilla', type=int, default=0)
+    parser.add_argument('--proporcion-vp', type=float, default=DISTRIBUCION_REALISTA['proporcion_vp'])
+    parser.add_argument('--duplicados', type=float, default=DISTRIBUCION_REALISTA['duplicados'])
+    argumentos = parser.parse_args()
+
+    distribucion = dict(DISTRIBUCION_REALISTA
+                        ,proporcion_vp=argumentos.proporcion_vp
+                        ,duplicados=argumentos.duplicados)
+    tamano = fn_generar_archivo_cmdm(argumentos.salida, argumentos.filas, argumentos.semilla, distribucion)
+    print(f'{argumentos.filas} filas, {tamano} bytes')
@@ -0,0 +1,221 @@
+"""
+Módulo perfil_gestion_archivo.py
+
+Este módulo ejecuta fn_gestion_archivo completo bajo cProfile con el backend SQLite (BACKEND_SQL=sqlite), sobre un
+archivo CMDM y una base sintéticos, para perfilar el procesamiento en un equipo sin SQL Server.
+
+Funciones:
+----------
+- fn_preparar_datos(directorio, filas, ...): Genera el archivo CMDM y la base SQLite y retorna la configuración.
+- fn_ejecutar_perfilado(funcion): Ejecuta una función bajo cProfile, incluidos los hilos que cree.
+- fn_perfilar(filas, ...): Genera los datos, ejecuta fn_gestion_archivo bajo cProfile y retorna las estadísticas.
+- fn_imprimir_resultado(resultado, orden, limite): Imprime las métricas por etapa y las funciones más costosas.
+
+Uso:
+----
+python -m rendimiento.perfil_gestion_archivo --filas 100000 --pendientes 5000 --orden tottime --limite 40
+
+Notas:
+------
+- Los datos se generan en un directorio temporal salvo que se indique --directorio; con --directorio se reutilizan
+  el archivo CMDM y la base si ya existen (la base conserva las filas de delta_cmdm_file de ejecuciones anteriores).
+- El tiempo de generación de datos no entra en el perfil.
+- Por defecto las etapas y las fuentes del correo se ejecutan con un hilo: con HILOS_PIPELINE y
+  HILOS_ENRIQUECIMIENTO en 1 el planificador y el motor de enriquecimiento ejecutan todo en el hilo que llama, que
+  es el que mide cProfile.
+- Con --hilos mayor a 1 (la ejecución paralela de producción) cada etapa corre en un hilo del pool: se activa un
+  perfil en cada hilo (threading.setprofile) y las estadísticas de todos se unen con pstats.Stats.add.
+"""
+import argparse
+import cProfile
+import io
+import pstats
+import sys
+import tempfile
+import threading
+import time
+from os import makedirs, path
+
+import config
+from rendimiento.benchmark_ftp import fn_configuracion_temporal
+from rendimiento.generador_base_sqlite import fn_generar_base_sqlite
+from rendimiento.generador_cmdm import fn_generar_archivo_cmdm
+
+
+def fn_preparar_datos(directorio, filas, semilla = 0, pendientes = 0, hilos = 1):
+    """
+    Genera (o reutiliza) el archivo CMDM y la base SQLite de una carpeta y retorna la configuración para usarlos.
+
+    Parameters:
+    -----------
+    directorio : str
+    filas : int
+    semilla : int
+    pendientes : int
+        Filas previas de delta_cmdm_file en la base.
+    hilos : int
+        HILOS_PIPELINE y HILOS_ENRIQUECIMIENTO.
+
+    Returns:
+    --------
+    tuple: (valores para fn_configuracion_temporal, segundos de generación)
+    """
+    makedirs(directorio, exist_ok=True)
+    ruta_archivo = path.join(directorio, f'CMDM_{filas}.CSV')
+    ruta_base = path.join(directorio, f'cmdm_{filas}.sqlite')
+
+    inicio = time.perf_counter()
+    if not path.isfile(ruta_archivo):
+        fn_generar_archivo_cmdm(ruta_archivo, filas, semilla)
+    if not path.isfile(ruta_base):
+        fn_generar_base_sqlite(ruta_base, ruta_archivo, semilla, pendientes=pendientes)
+
+    valores = {'BACKEND_SQL': 'sqlite'
+               ,'RUTA_BASE_SQLITE': ruta_base
+               ,'RUTA_GUARDAR_ARCHIVO': ruta_archivo
+               ,'RUTA_ARCHIVO_BACUP': path.join(directorio, 'backup_')
+               ,'RUTA_ARCHIVO_CORREO': directorio + path.sep
+               ,'NOMBRE_ARCHIVO_CORREO': config.NOMBRE_ARCHIVO_CORREO or 'correo.xlsx'
+               ,'RUTA_CHECKPOINT': None
+               ,'HILOS_PIPELINE': hilos
+               ,'HILOS_ENRIQUECIMIENTO': hilos}
+    return valores, time.perf_counter() - inicio
+
+
+def fn_ejecutar_perfilado(funcion):
+    """
+    Ejecuta funcion bajo cProfile, incluidos los hilos que cree.
+
+    Desde Python 3.12 cProfile mide todos los hilos. En versiones anteriores solo mide el hilo en que se activa: con
+    threading.setprofile cada hilo nuevo activa su propio perfil y al final las estadísticas se unen.
+
+    Parameters:
+    -----------
+    funcion : callable
+        Función sin argumentos.
+
+    Returns:
+    --------
+    tuple: (resultado de funcion, pstats.Stats)
+    """
+    perfil = cProfile.Profile()
+    perfiles_hilos = []
+    por_hilo = sys.version_info < (3, 12)
+
+    def activar_en_hilo(*_):
+        perfil_hilo = cProfile.Profile()
+        perfiles_hilos.append(perfil_hilo)
+        perfil_hilo.enable()
+
+    if por_hilo:
+        threading.setprofile(activar_en_hilo)
+    perfil.enable()
+    try:
+        resultado = funcion()
+    finally:
+        perfil.disable()
+        if por_hilo:
+            threading.setprofile(None)
+
+    estadisticas = pstats.Stats(perfil, stream=io.StringIO())
+    for perfil_hilo in perfiles_hilos:
+        estadisticas.add(perfil_hilo)
+    return resultado, estadisticas
+
+
+def fn_perfilar(filas
+                ,directorio = None
+                ,semilla = 0
+                ,pendientes = 0
+                ,hilos = 1
+                ,ruta_pstats = None):
+    """
+    Ejecuta fn_gestion_archivo bajo cProfile contra el backend SQLite.
+
+    Parameters:
+    -----------
+    filas : int
+        Filas del archivo CMDM.
+    directorio : str, opcional
+        Carpeta de trabajo; por defecto una temporal.
+    semilla : int
+    pendientes : int
+        Filas previas de delta_cmdm_file en la base.
+    hilos : int
+        HILOS_PIPELINE y HILOS_ENRIQUECIMIENTO durante el perfil.
+    ruta_pstats : str, opcional
+        Archivo donde se guardan las estadísticas de cProfile, de todos los hilos (para snakeviz o pstats).
+
+    Returns:
+    --------
+    dict: {'filas', 'segundos_generacion', 'segundos', 'estadisticas': pstats.Stats, 'medicion', 'resultado'}
+    """
+    from controlador.controlador_gestion_archivo_cmdm import ControladorGestionArchivoCmdm
+
+    with tempfile.TemporaryDirectory() as temporal:
+        valores, segundos_generacion = fn_preparar_datos(directorio or temporal, filas, semilla, pendientes, hilos)
+
+        with fn_configuracion_temporal(valores):
+            controlador = ControladorGestionArchivoCmdm()
+            inicio = time.perf_counter()
+            resultado, estadisticas = fn_ejecutar_perfilado(controlador.fn_gestion_archivo)
+            segundos = time.perf_counter() - inicio
+
+        if ruta_pstats:
+            estadisticas.dump_stats(ruta_pstats)
+
+        return {'filas': filas
+                ,'segundos_generacion': segundos_generacion
+                ,'segundos': segundos
+                ,'estadisticas': estadisticas
+                ,'medicion': controlador.fn_ultima_medicion()
+                ,'resultado': resultado}
+
+
+def fn_imprimir_resultado(resultado, orden = 'cumulative', limite = 30):
+    """
+    Imprime las métricas por etapa y las funciones más costosas de una ejecución de fn_perfilar.
+
+    Parameters:
+    -----------
+    resultado : dict
+        Resultado de fn_perfilar.
+    orden : str
+        Criterio de pstats ('cumulative', 'tottime', 'ncalls', ...).
+    limite : int
+        Funciones a listar.
+    """
+    print(f"Filas: {resultado['filas']}  Generación: {resultado['segundos_generacion']:.1f} s  "
+          f"fn_gestion_archivo: {resultado['segundos']:.3f} s")
+    medicion = resultado['medicion']
+    if medicion:
+        for metrica in medicion['etapas']:
+            print(f"  {metrica['etapa']:<32}{metrica['segundos']:>10.3f} s  {'ok' if metrica['ok'] else 'error'}")
+
+    salida = io.StringIO()
+    estadisticas = resultado['estadisticas']
+    estadisticas.stream = salida
+    estadisticas.sort_stats(orden).print_stats(limite)
+    print(salida.getvalue())
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Perfil de fn_gestion_archivo con el backend SQLite')
+    parser.add_argument('--filas', type=int, default=10000)
+    parser.add_argument('--pendientes', type=int, default=0, help='Filas previas de delta_cmdm_file')
+    parser.add_argument('--semilla', type=int, default=0)
+    parser.add_argument('--hilos', type=int, default=1, help='HILOS_PIPELINE y HILOS_ENRIQUECIMIENTO')
+    parser.add_argument('--directorio', help='Carpeta de trabajo para conservar los datos generados')
+    parser.add_argument('--orden', default='cumulative')
+    parser.add_argument('--limite', type=int, default=30)
+    parser.add_argument('--pstats', help='Ruta donde guardar las estadísticas de cProfile')
+    argumentos = parser.parse_args()
+
+    fn_imprimir_resultado(fn_perfilar(argumentos.filas
+                                      ,argumentos.directorio
+                                      ,argumentos.semilla
+                                      ,argumentos.pendientes
+                                      ,argumentos.hilos
+                                      ,argumentos.pstats)
+                          ,argumentos.orden
+                          ,argumentos.limite)
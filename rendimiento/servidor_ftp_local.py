@@ -0,0 +1,172 @@
+"""
+Módulo servidor_ftp_local.py
+
+Este módulo define la clase ServidorFTPLocal, un servidor FTP en proceso (pyftpdlib) que reemplaza al servidor productivo
+para medir el rendimiento de GestionFTP y ConexionFTP sin salir del equipo local.
+
+Clases:
+-------
+ServidorFTPLocal
+    - Levanta un servidor FTP en localhost en un hilo independiente.
+    - Permite inyectar latencia por comando, limitar el ancho de banda de las transferencias y cortar conexiones al azar.
+    - Siembra archivos CMDM sintéticos del tamaño deseado en el directorio servido.
+
+Dependencias:
+-------------
+- pyftpdlib: Servidor FTP en Python.
+- generador_cmdm: Generación de archivos CMDM sintéticos.
+
+Notas:
+------
+- Se usa ThreadedFTPServer para que la latencia inyectada en una sesión no bloquee a las demás.
+- El servidor se usa como administrador de contexto: se detiene y libera el puerto al salir del bloque with.
+"""
+import random
+import threading
+import time
+from os import path
+
+from pyftpdlib.authorizers import DummyAuthorizer
+from pyftpdlib.handlers import FTPHandler, ThrottledDTPHandler
+from pyftpdlib.servers import ThreadedFTPServer
+
+from rendimiento.generador_cmdm import fn_generar_archivo_cmdm
+
+
+class ServidorFTPLocal:
+    """
+    Servidor FTP local con latencia, límite de ancho de banda y desconexiones configurables.
+    """
+    def __init__(self
+                 ,directorio
+                 ,usuario = 'cmdm'
+                 ,contrasena = 'cmdm'
+                 ,puerto = 0
+                 ,latencia = 0.0
+                 ,limite_bytes_segundo = 0
+                 ,probabilidad_desconexion = 0.0
+                 ,semilla = 0):
+        """
+        Parameters:
+        -----------
+        directorio : str
+            Directorio local que se expone como raíz del FTP.
+        usuario, contrasena : str
+            Credenciales aceptadas por el servidor.
+        puerto : int
+            Puerto de escucha; 0 asigna un puerto libre.
+        latencia : float
+            Segundos de espera antes de responder cada comando FTP.
+        limite_bytes_segundo : int
+            Límite de ancho de banda para cargas y descargas; 0 sin límite.
+        probabilidad_desconexion : float
+            Probabilidad (0 a 1) de cortar la conexión al recibir un comando.
+        semilla : int
+            Semilla para que las desconexiones sean reproducibles.
+        """
+        self.__directorio = directorio
+        self.__usuario = usuario
+        self.__contrasena = contrasena
+        self.__puerto = puerto
+        self.__latencia = latencia
+        self.__limite_bytes_segundo = limite_bytes_segundo
+        self.__probabilidad_desconexion = probabilidad_desconexion
+        self.__aleatorio = random.Random(semilla)
+        self.__servidor = None
+        self.__hilo = None
+        self.desconexiones = 0
+
+    def __enter__(self):
+        self.fn_iniciar()
+        return self
+
+    def __exit__(self, tipo, valor, traza):
+        self.fn_detener()
+
+    @property
+    def puerto(self):
+        """Puerto real en el que escucha el servidor."""
+        return self.__servidor.address[1]
+
+    def __crear_manejador(self):
+        """
+        Construye las clases de manejo de comandos y transferencias con las perturbaciones configuradas.
+        """
+        servidor_local = self
+        latencia = self.__latencia
+        limite = self.__limite_bytes_segundo
+
+        class ManejadorDatos(ThrottledDTPHandler):
+            read_limit = limite
+            write_limit = limite
+
+        class ManejadorComandos(FTPHandler):
+
+            def process_command(self, cmd, *args, **kwargs):
+                if latencia:
+                    time.sleep(latencia)
+
+                if servidor_local.fn_debe_desconectar(cmd):
+                    self.close()
+                    return
+
+                return super().process_command(cmd, *args, **kwargs)
+
+        autorizador = DummyAuthorizer()
+        autorizador.add_user(self.__usuario
+                            ,self.__contrasena
+                            ,self.__directorio
+                            ,perm='elradfmwMT')
+
+        ManejadorComandos.authorizer = autorizador
+        if limite:
+            ManejadorComandos.dtp_handler = ManejadorDatos
+
+        return ManejadorComandos
+
+    def fn_debe_desconectar(self, comando):
+        """
+        Decide si se corta la sesión al recibir el comando indicado.
+        Nunca se corta en USER/PASS para que la falla ocurra con la sesión ya establecida.
+        """
+        if not self.__probabilidad_desconexion or comando in ('USER', 'PASS'):
+            return False
+
+        if self.__aleatorio.random() < self.__probabilidad_desconexion:
+            self.desconexiones += 1
+            return True
+        return False
+
+    def fn_iniciar(self):
+        """Levanta el servidor en un hilo en segundo plano."""
+        self.__servidor = ThreadedFTPServer(('127.0.0.1', self.__puerto)
+                                            ,self.__crear_manejador())
+        self.__hilo = threading.Thread(target=self.__servidor.serve_forever
+                                       ,kwargs={'timeout': 0.2, 'handle_exit': False}
+                                       ,daemon=True)
+        self.__hilo.start()
+
+    def fn_detener(self):
+        """Detiene el servidor y cierra todas las sesiones abiertas."""
+        if self.__servidor is not None:
+            self.__servidor.close_all()
+            self.__hilo.join(timeout=5)
+            self.__servidor = None
+
+    def fn_sembrar_archivo_cmdm(self, nombre_archivo, filas, semilla=0):
+        """
+        Genera un archivo CMDM sintético en el directorio servido.
+
+        Parameters:
+        -----------
+        nombre_archivo : str
+        filas : int
+        semilla : int
+
+        Returns:
+        --------
+        int: Tamaño en bytes del archivo sembrado.
+        """
+        return fn_generar_archivo_cmdm(path.join(self.__directorio, nombre_archivo)
+                                       ,filas
+                                       ,semilla)
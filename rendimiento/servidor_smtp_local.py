@@ -0,0 +1,98 @@
+"""
+Módulo servidor_smtp_local.py
+
+Este módulo define la clase ServidorSMTPLocal, un servidor SMTP en proceso (aiosmtpd) que reemplaza al servidor
+de correo productivo para medir el rendimiento de ServicioCorreo sin enviar correos reales.
+
+Clases:
+-------
+ServidorSMTPLocal
+    - Levanta un servidor SMTP en localhost en un hilo independiente.
+    - Cuenta los mensajes y bytes recibidos.
+    - Permite inyectar latencia por mensaje y limitar la velocidad de recepción para simular adjuntos grandes.
+
+Dependencias:
+-------------
+- aiosmtpd: Servidor SMTP asíncrono.
+
+Notas:
+------
+- El servidor no ofrece STARTTLS; para usarlo se debe configurar USAR_STARTTLS_SMTP=false.
+- Acepta cualquier usuario y contraseña para que ServicioCorreo pueda autenticarse si USUARIO_SMTP está definido.
+"""
+import asyncio
+import socket
+
+from aiosmtpd.controller import Controller
+from aiosmtpd.smtp import AuthResult
+
+
+class ManejadorMensajes:
+    """
+    Manejador de aiosmtpd que registra los mensajes recibidos.
+    """
+    def __init__(self, latencia, limite_bytes_segundo):
+        self.__latencia = latencia
+        self.__limite_bytes_segundo = limite_bytes_segundo
+        self.mensajes = 0
+        self.bytes_recibidos = 0
+
+    async def handle_DATA(self, server, session, envelope):
+        espera = self.__latencia
+        if self.__limite_bytes_segundo:
+            espera += len(envelope.content) / self.__limite_bytes_segundo
+        if espera:
+            await asyncio.sleep(espera)
+
+        self.mensajes += 1
+        self.bytes_recibidos += len(envelope.content)
+        return '250 Message accepted for delivery'
+
+
+def fn_autenticar(server, session, envelope, mechanism, auth_data):
+    """Acepta cualquier credencial."""
+    return AuthResult(success=True)
+
+
+class ServidorSMTPLocal:
+    """
+    Servidor SMTP local con latencia y límite de velocidad configurables.
+    """
+    def __init__(self, latencia = 0.0, limite_bytes_segundo = 0):
+        """
+        Parameters:
+        -----------
+        latencia : float
+            Segundos de espera antes de aceptar cada mensaje.
+        limite_bytes_segundo : int
+            Velocidad simulada de recepción del mensaje; 0 sin límite.
+        """
+        self.manejador = ManejadorMensajes(latencia, limite_bytes_segundo)
+        self.puerto = None
+        self.__controlador = None
+
+    def __enter__(self):
+        self.fn_iniciar()
+        return self
+
+    def __exit__(self, tipo, valor, traza):
+        self.fn_detener()
+
+    def fn_iniciar(self):
+        """Levanta el servidor en un puerto libre de localhost."""
+        with socket.socket() as sock:
+            sock.bind(('127.0.0.1', 0))
+            self.puerto = sock.getsockname()[1]
+
+        self.__controlador = Controller(self.manejador
+                                        ,hostname='127.0.0.1'
+                                        ,port=self.puerto
+                                        ,authenticator=fn_autenticar
+                                        ,auth_require_tls=False)
+        self.__controlador.start()
+
+    def fn_detener(self):
+        """Detiene el servidor."""
+        if self.__controlador is not None:
+            self.__controlador.stop()
+            self.__controlador = None
@@ -0,0 +1,41 @@
+"""
+Pruebas del arranque de main.py.
+
+Comprueban que importar main no carga pandas, pyodbc ni el proceso de gestión del archivo (se importan al ejecutar),
+y que la mediana del arranque en frío medida por rendimiento.benchmark_arranque está dentro de su presupuesto.
+
+Ejecución:
+----------
+python -m pytest tests/test_arranque.py
+"""
+import json
+import statistics
+import subprocess
+import sys
+from os import path
+
+from rendimiento.benchmark_arranque import CARPETA_PROYECTO, PRESUPUESTO_SEGUNDOS, fn_medir_arranque
+
+#Módulos que main importa solo cuando se ejecuta el proceso
+MODULOS_DIFERIDOS = (
+    'pandas',
+    'pyodbc',
+    'controlador.controlador_gestion_archivo_cmdm',
+    'modelo.procesar_archivo',
+)
+
+
+def test_main_no_importa_el_proceso_al_arrancar():
+    codigo = 'import json, sys, main; print(json.dumps(sorted(sys.modules)))'
+    proceso = subprocess.run([sys.executable, '-c', codigo], cwd=CARPETA_PROYECTO, check=True
+                             ,capture_output=True, text=True, encoding='utf-8')
+    modulos_cargados = set(json.loads(proceso.stdout.splitlines()[-1]))
+
+    assert sorted(modulos_cargados.intersection(MODULOS_DIFERIDOS)) == []
+
+
+def test_arranque_dentro_del_presupuesto():
+    resultado = fn_medir_arranque([sys.executable, path.join(CARPETA_PROYECTO, 'main.py')], repeticiones=3)
+    mediana = statistics.median(resultado['total'])
+
+    assert mediana <= PRESUPUESTO_SEGUNDOS, f'Arranque {mediana:.3f} s sobre el presupuesto de {PRESUPUESTO_SEGUNDOS:g} s'
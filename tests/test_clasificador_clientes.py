@@ -0,0 +1,116 @@
+"""
+Pruebas de modelo.clasificador_clientes.
+
+Cada fila fija el nombre, el apellido y el tipo de cliente que producía la consulta original de
+fn_consulta_info_vin_email (CASE WHEN ... LIKE sobre NOMCLI, APECLI y CODTIPPER en SQL Server). Las filas
+marcadas en CAMBIOS_LISTA_UNIFICADA son las que cambian con la lista única de palabras clave: se fija el resultado
+nuevo y se deja anotado el de la consulta original.
+
+Ejecución:
+----------
+python -m pytest tests/test_clasificador_clientes.py
+"""
+import pandas as pd
+import pytest
+
+from modelo.clasificador_clientes import fn_clasificar_clientes, fn_like_a_regex, fn_patron_empresa
+
+#Valores por defecto de SUFIJOS_EMPRESA y PREFIJOS_EMPRESA en config
+SUFIJOS = ['S.A', 'S.A.', 'SA', 'SAS', 'S.A.S', 'S.A.S.', 'S A', 'LTDA']
+PREFIJOS = ['COOPERATIVA', 'BANCO', 'BBVA', 'CONSULTORES', 'TRANSPORTES', 'SUPERTIENDAS', 'DROGUERIAS', 'LEASING'
+            ,'TECNOLOGIA', 'INVERSORA']
+
+#(NOMCLI, APECLI, CODTIPPER) -> (nombre, apellido, tipo), igual a la consulta original
+CASOS_CONSULTA_ORIGINAL = [
+    #NOMCLI = 'POR DEFINIR'; = ignora los espacios finales
+    (('POR DEFINIR', 'GOMEZ', 1), (' ', ' ', 'Persona Natural')),
+    (('POR DEFINIR  ', 'GOMEZ', 1), (' ', ' ', 'Persona Natural')),
+    #NOMCLI = APECLI sin distinguir mayúsculas ni espacios finales; LEN iguales -> APECLI depurado
+    (('JUAN', 'JUAN', 1), (' ', 'JUAN', 'Persona Natural')),
+    (('juan', 'JUAN ', 1), (' ', 'JUAN ', 'Persona Natural')),
+    #NOMCLI razón social (sufijo, prefijo y sufijo con espacio final) -> apellido NOMCLI sin depurar
+    (('ACME S.A.S', 'PEREZ', 2), (' ', 'ACME S.A.S', 'Empresa')),
+    (('ACME LTDA ', 'X', 1), (' ', 'ACME LTDA ', 'Empresa')),
+    (('BANCOLOMBIA', 'X', 2), (' ', 'BANCOLOMBIA', 'Empresa')),
+    (('Leasing Bolivar', 'X', None), (' ', 'Leasing Bolivar', 'Empresa')),
+    #El sufijo debe ir precedido de un espacio
+    (('SAMSA', 'ROJAS', 1), ('SAMSA', 'ROJAS', 'Persona Natural')),
+    #APECLI razón social -> nombre vacío, apellido APECLI depurado
+    (('JUAN CARLOS', 'TRANSPORTES LTDA', 1), (' ', 'TRANSPORTES LTDA', 'Empresa')),
+    (('JUAN', 'COOPERATIVA ABC', None), (' ', 'COOPERATIVA ABC', 'Empresa')),
+    #Depuración: coma por espacio, sin ; ni comillas en APECLI, £ y ¥ por Ñ
+    (('MARIA, JOSE', 'RUIZ;"', 1), ('MARIA  JOSE', 'RUIZ', 'Persona Natural')),
+    (('PE£A', 'MU¥OZ', 1), ('PEÑA', 'MUÑOZ', 'Persona Natural')),
+    #NOMCLI LIKE '%'+APECLI+'%' con NOMCLI más largo -> apellido NOMCLI (sin ; ni comillas, conserva la coma)
+    (('ANA MARIA GOMEZ', 'GOMEZ', 1), ('ANA MARIA GOMEZ', 'ANA MARIA GOMEZ', 'Persona Natural')),
+    (('ANA, GOMEZ;', 'GOMEZ', 1), ('ANA  GOMEZ', 'ANA, GOMEZ', 'Persona Natural')),
+    (('Ana Gomez', 'GOMEZ', None), ('Ana Gomez', 'Ana Gomez', ' ')),
+    #Comodines de LIKE dentro de APECLI: _ y clases [...]
+    (('LUIS DIAZ', 'D_AZ', 1), ('LUIS DIAZ', 'LUIS DIAZ', 'Persona Natural')),
+    (('PEDRO PAEZ', 'P[AE]EZ', 1), ('PEDRO PAEZ', 'PEDRO PAEZ', 'Persona Natural')),
+    (('PEDRO PIEZ', 'P[AE]EZ', 1), ('PEDRO PIEZ', 'P[AE]EZ', 'Persona Natural')),
+    (('PEDRO POEZ', 'P[^A]EZ', 1), ('PEDRO POEZ', 'PEDRO POEZ', 'Persona Natural')),
+    #NULL no cumple ninguna condición; el apellido nulo queda en '' (ISNULL)
+    ((None, 'GOMEZ', 1), (' ', 'GOMEZ', 'Persona Natural')),
+    (('JUAN PEREZ', None, 1), ('JUAN PEREZ', 'JUAN PEREZ', 'Persona Natural')),
+    ((None, None, 2), (' ', '', 'Persona Juridica')),
+    (('ACME', 'PEREZ', '2'), ('ACME', 'PEREZ', 'Persona Juridica')),
+    (('ACME', 'PEREZ', 3), ('ACME', 'PEREZ', ' ')),
+]
+
+#Filas en que la lista unificada cambia el resultado: (entrada, resultado nuevo, resultado de la consulta original)
+CAMBIOS_LISTA_UNIFICADA = [
+    #' SA' solo estaba en la regla del tipo
+    (('ACME SA', 'PEREZ', 2), (' ', 'ACME SA', 'Empresa'), ('ACME SA', 'PEREZ', 'Empresa')),
+    (('JUAN', 'INDUSTRIAS SA', 1), (' ', 'INDUSTRIAS SA', 'Empresa'), ('JUAN', 'INDUSTRIAS SA', 'Empresa')),
+    #' S.A' no estaba en la regla del tipo
+    (('ACME S.A', 'PEREZ', 1), (' ', 'ACME S.A', 'Empresa'), (' ', 'ACME S.A', 'Persona Natural')),
+    (('JUAN', 'ACME S.A', 1), (' ', 'ACME S.A', 'Empresa'), (' ', 'ACME S.A', 'Persona Natural')),
+]
+
+
+def fn_clasificar(nombre, apellido, tipo):
+    dataframe = pd.DataFrame({'NOMCLI': [nombre], 'APECLI': [apellido], 'CODTIPPER': [tipo]}, dtype=object)
+    resultado = fn_clasificar_clientes(dataframe, 'NOMCLI', 'APECLI', 'CODTIPPER'
+                                       ,patron=fn_patron_empresa(SUFIJOS, PREFIJOS))
+    return tuple(resultado.iloc[0][['NOMCLI', 'APECLI', 'CODTIPPER']])
+
+
+@pytest.mark.parametrize('entrada, esperado', CASOS_CONSULTA_ORIGINAL)
+def test_clasificacion_igual_a_la_consulta_original(entrada, esperado):
+    assert fn_clasificar(*entrada) == esperado
+
+
+@pytest.mark.parametrize('entrada, esperado, consulta_original', CAMBIOS_LISTA_UNIFICADA)
+def test_clasificacion_con_lista_unificada(entrada, esperado, consulta_original):
+    assert fn_clasificar(*entrada) == esperado
+    assert esperado != consulta_original
+
+
+def test_clasificacion_de_varias_filas_conserva_el_orden():
+    casos = CASOS_CONSULTA_ORIGINAL + [caso[:2] for caso in CAMBIOS_LISTA_UNIFICADA]
+    dataframe = pd.DataFrame([entrada for entrada, _ in casos], columns=['NOMCLI', 'APECLI', 'CODTIPPER'], dtype=object)
+    resultado = fn_clasificar_clientes(dataframe, 'NOMCLI', 'APECLI', 'CODTIPPER'
+                                       ,patron=fn_patron_empresa(SUFIJOS, PREFIJOS))
+
+    assert list(resultado[['NOMCLI', 'APECLI', 'CODTIPPER']].itertuples(index=False, name=None)) == [
+        esperado for _, esperado in casos]
+
+
+@pytest.mark.parametrize('patron, valor, coincide', [
+    ('%GOMEZ%', 'ANA GOMEZ PEREZ', True),
+    ('%gomez%', 'ANA GOMEZ', True),
+    ('D_AZ', 'DIAZ', True),
+    ('D_AZ', 'DAZ', False),
+    ('P[AE]EZ', 'PEEZ', True),
+    ('P[AE]EZ', 'PIEZ', False),
+    ('P[^A]EZ', 'PAEZ', False),
+    ('[A-C]%', 'BETA', True),
+    ('[A-C]%', 'DELTA', False),
+    ('100[%]', '100%', True),
+    ('100[%]', '1000', False),
+    ('S.A', 'SXA', False),
+    ('A+B', 'A+B', True),
+])
+def test_like_a_regex(patron, valor, coincide):
+    assert bool(fn_like_a_regex(patron).fullmatch(valor)) is coincide
@@ -0,0 +1,87 @@
+"""
+Pruebas de modelo.lote_archivos: unión de los archivos de un lote con un solo encabezado.
+
+Ejecución:
+----------
+python -m pytest tests/test_lote_archivos.py
+"""
+import pytest
+
+from modelo.lote_archivos import BOM_UTF8, LoteArchivos
+
+
+@pytest.fixture
+def fn_consolidar(tmp_path):
+    """Escribe los archivos indicados y los une; retorna el resultado y el contenido del destino."""
+    def consolidar(*contenidos):
+        rutas = []
+        for posicion, contenido in enumerate(contenidos):
+            ruta = tmp_path / f'{posicion:05d}.csv'
+            ruta.write_bytes(contenido)
+            rutas.append(str(ruta))
+        destino = tmp_path / 'CMDM.CSV'
+        resultado = LoteArchivos(str(destino)).fn_consolidar(rutas)
+        return resultado, rutas, destino.read_bytes() if destino.exists() else None
+    return consolidar
+
+
+def test_deja_un_solo_encabezado(fn_consolidar):
+    resultado, _, destino = fn_consolidar(b'VIN;TIPO\r\nA;VP\r\n', b'VIN;TIPO\r\nB;VU\r\n', b'VIN;TIPO\r\nC;VP\r\n')
+
+    assert resultado['exito']
+    assert destino == b'VIN;TIPO\r\nA;VP\r\nB;VU\r\nC;VP\r\n'
+    assert resultado['data']['archivos'] == 3
+    assert resultado['data']['bytes'] == len(destino)
+
+
+def test_ignora_el_bom_y_el_fin_de_linea_del_encabezado(fn_consolidar):
+    resultado, _, destino = fn_consolidar(BOM_UTF8 + b'VIN;TIPO\r\nA;VP\r\n', b'VIN;TIPO\nB;VU\n'
+                                          ,BOM_UTF8 + b'VIN;TIPO\nC;VP\n')
+
+    assert resultado['data']['rechazados'] == {}
+    #Se conserva el encabezado del primer archivo, con su BOM
+    assert destino == BOM_UTF8 + b'VIN;TIPO\r\nA;VP\r\nB;VU\nC;VP\n'
+
+
+def test_agrega_el_fin_de_linea_que_falta(fn_consolidar):
+    resultado, _, destino = fn_consolidar(b'VIN;TIPO\r\nA;VP', b'VIN;TIPO\r\nB;VU')
+
+    assert resultado['exito']
+    assert destino == b'VIN;TIPO\r\nA;VP\nB;VU\n'
+
+
+def test_encabezado_sin_fin_de_linea(fn_consolidar):
+    resultado, _, destino = fn_consolidar(b'VIN;TIPO', b'VIN;TIPO\r\nA;VP\r\n', b'VIN;TIPO')
+
+    assert resultado['data']['archivos'] == 3
+    assert destino == b'VIN;TIPO\nA;VP\r\n'
+
+
+def test_omite_los_vacios_y_reporta_todos_los_rechazados(fn_consolidar):
+    resultado, rutas, destino = fn_consolidar(b'', b'VIN;TIPO\r\nA;VP\r\n', b'VIN;OTRO\r\nB;VU\r\n', b''
+                                              ,b'VIN;TIPO\r\nC;VP\r\n', b'VIN\r\nD\r\n')
+
+    assert resultado['exito']
+    assert destino == b'VIN;TIPO\r\nA;VP\r\nC;VP\r\n'
+    assert resultado['data']['archivos'] == 2
+    assert resultado['data']['vacios'] == [rutas[0], rutas[3]]
+    assert sorted(resultado['data']['rechazados']) == [rutas[2], rutas[5]]
+
+
+def test_sin_archivos_con_datos(fn_consolidar):
+    resultado, rutas, destino = fn_consolidar(b'', b'')
+
+    assert resultado['exito']
+    assert destino == b''
+    assert resultado['data']['archivos'] == 0
+    assert resultado['data']['vacios'] == rutas
+
+
+def test_error_de_lectura_no_deja_el_destino(tmp_path):
+    destino = tmp_path / 'CMDM.CSV'
+    resultado = LoteArchivos(str(destino)).fn_consolidar([str(tmp_path / 'no_existe.csv')])
+
+    assert not resultado['exito']
+    assert isinstance(resultado['error'], OSError)
+    assert not destino.exists()
+    assert not (tmp_path / 'CMDM.CSV.tmp').exists()
@@ -1,38 +1,35 @@
 """
 Módulo para crear logs de la ejecución de tareas.
 
-Este módulo proporciona una función para registrar logs de la ejecución de tareas en un archivo de texto.
+Este módulo proporciona una función para registrar logs de la ejecución de tareas.
+La escritura la realiza vista.registro_log en segundo plano, en formato JSON lines y con rotación del archivo.
 
 Dependencias:
-    - servicios.resolver_rutas: Módulo personalizado para resolver rutas de archivos.
-    - os: Módulo estándar de Python para interactuar con el sistema operativo.
-    - datetime: Módulo estándar de Python para manejar fechas y horas.
+    - logging: Módulo estándar de Python para los niveles de registro.
+    - vista.registro_log: Registro encolado con rotación y formato JSON.
 
 Funciones:
-    - crea_log(ingreso_datos): Ingresa un registro al archivo de log.
+    - crea_log(ingreso_datos, etapa, duracion): Ingresa un registro al archivo de log.
 """
-from servicios.resolver_rutas import resource_path
-import config
-import datetime
+import logging
+from vista.registro_log import fn_registrar
 
-def crea_log(ingreso_datos):
+def crea_log(ingreso_datos, etapa=None, duracion=None):
     """
     Ingresa un registro al archivo de log.
 
     Parameters:
     ingreso_datos (str): El mensaje o datos a registrar en el log.
+    etapa (str): Etapa del proceso que genera el registro (opcional).
+    duracion (float): Duración en segundos de la etapa (opcional).
+
+    Los mensajes que inician con 'Error' se registran con nivel ERROR; el resto con nivel INFO.
 
     Variables de entorno requeridas:
     - RUTA_LOG: Ruta del archivo de log donde se guardarán los registros.
     """
 
-    #Obtenemos la fecha actual y lo formateamos
-    fecha_actual = datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-
-    #Cargamos la ruta donde vamos a guardar el archivo log
-    ruta_log = config.RUTA_LOG
+    mensaje = str(ingreso_datos).rstrip('\n')
+    nivel = logging.ERROR if mensaje.lower().startswith('error') else logging.INFO
 
-    #leemos el archivo txt y le escribimos las nuevas lineas
-    with open (ruta_log,'a') as log:
-        log.writelines(f'{fecha_actual} {ingreso_datos}\n')
-        #log.writelines(f'{ingreso_datos}\n')
+    fn_registrar(mensaje, nivel, etapa, duracion)
@@ -1,38 +1,42 @@
 
 import config
+import gzip
 from email.message import EmailMessage
-import smtplib
+from vista.registro_log import fn_registros_ejecucion
 
-def fn_correo_errores(correos):
+def fn_correo_errores(correos, servicio_correo):
     """
-    Envía un correo electrónico de notificación de error con un archivo adjunto a una lista de destinatarios.
+    Construye el correo electrónico de notificación de error con un archivo adjunto y lo encola en el servicio de correo.
 
     Parámetros:
     -----------
     correos : list
         Lista de listas que contiene las direcciones de correo electrónico de los destinatarios.
+    servicio_correo : ServicioCorreo
+        Servicio que mantiene la conexión SMTP y envía en segundo plano.
 
     Proceso:
     --------
     - Extrae los correos electrónicos de la lista de listas y los agrega a una lista plana.
-    - Configura los parámetros del correo (remitente, asunto, mensaje, servidor SMTP, puerto).
-    - Adjunta el archivo de log especificado en la configuración.
-    - Envía el correo a todos los destinatarios usando SMTP con TLS.
+    - Configura los parámetros del correo (remitente, asunto, mensaje).
+    - Adjunta, comprimidos en gzip, los registros del log de la ejecución actual
+      (como máximo TAMANO_MAXIMO_ADJUNTO_LOG bytes, conservando los más recientes).
+    - Encola el envío en el servicio de correo, que usa la conexión SMTP compartida.
     - Si ocurre una excepción, la captura y la retorna en el diccionario de respuesta.
 
     Retorna:
     --------
     dict
-        {'exito': True, 'data': None} si el correo se envió correctamente.
+        {'exito': True, 'data': envio} si el correo quedó encolado, donde envio es el Future del envío.
         {'exito': False, 'data': ex} si ocurrió una excepción, donde ex es el error capturado.
 
     Ejemplo de uso:
     ---------------
-    resultado = fn_correo_errores([["destinatario1@dominio.com"], ["destinatario2@dominio.com"]])
+    resultado = fn_correo_errores([["destinatario1@dominio.com"], ["destinatario2@dominio.com"]], ServicioCorreo())
     if resultado['exito']:
-        print("Correo enviado correctamente")
+        print("Envío:", resultado['data'].result())
     else:
-        print("Error al enviar correo:", resultado['data'])
+        print("Error al construir correo:", resultado['data'])
     """
     try:
         correos_destinatarios = []
@@ -41,13 +45,10 @@ def fn_correo_errores(correos):
                 correos_destinatarios.append(j)
 
         #Configuración de correo
-        archivo_adjunto = config.RUTA_LOG
-        nombre_archivo =  config.NOMBRE_ARCHIVO_ERROR
+        nombre_archivo =  config.NOMBRE_ARCHIVO_ERROR + '.gz'
         remitente = config.CORREO_REMITENTE
 
         mensaje =config.MENSAJE_CORREO_ERROR
-        servidor_smtp = config.SERVIDOR_SMTP
-        puerto_servidor_smtp = config.PUERTO_SERVIDOR_SMTP
 
         email = EmailMessage()
         email["From"] = remitente
@@ -56,25 +57,18 @@ def fn_correo_errores(correos):
 
         email.set_content(mensaje)
 
-        #Adjuntar archivo
-        with open (archivo_adjunto,"rb") as archivo:
-            datos_archivo = archivo.read()
-            nombre_archivo = nombre_archivo
-            email.add_attachment(datos_archivo
-                                ,maintype="text"
-                                ,subtype="plain"
-                                ,filename=nombre_archivo)
+        #Adjuntar solo los registros de esta ejecución, comprimidos
+        datos_archivo = fn_registros_ejecucion()
+        email.add_attachment(gzip.compress(datos_archivo)
+                            ,maintype="application"
+                            ,subtype="gzip"
+                            ,filename=nombre_archivo)
 
-        smtp = smtplib.SMTP(servidor_smtp,port=puerto_servidor_smtp)
-        smtp.starttls()
-        smtp.sendmail(remitente
-                    ,correos_destinatarios
-                    ,email.as_string()
-                    )
-        smtp.quit()
+        envio = servicio_correo.fn_enviar_en_segundo_plano(email
+                                                            ,correos_destinatarios)
 
         return {'exito':True
-               ,'data':None}
+               ,'data':envio}
 
     except Exception as ex:
 
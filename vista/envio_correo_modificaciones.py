@@ -1,10 +1,28 @@
 
 import config
 from email.message import EmailMessage
-import smtplib
 
-def correo_modificacion_encuestas(correos):
+def correo_modificacion_encuestas(correos, servicio_correo):
+    """
+    Construye el correo de modificaciones con el Excel adjunto y lo encola en el servicio de correo.
 
+    Parámetros:
+    -----------
+    correos : list
+        Lista de listas con las direcciones de correo de los destinatarios.
+    servicio_correo : ServicioCorreo
+        Servicio que mantiene la conexión SMTP y envía en segundo plano.
+
+    Retorna:
+    --------
+    dict
+        {'exito': True, 'data': envio, 'error': None} donde envio es el Future del envío.
+        {'exito': False, 'data': None, 'error': ex} si no fue posible construir el correo.
+
+    Notas:
+    ------
+    - El adjunto se lee completo antes de encolar el envío, así el archivo queda libre mientras el correo se carga.
+    """
     try:
         correos_destinatarios = []
         for i in correos:
@@ -17,8 +35,6 @@ def correo_modificacion_encuestas(correos):
         remitente = config.CORREO_REMITENTE
 
         mensaje =config.MENSAJE_CORREO
-        servidor_smtp = config.SERVIDOR_SMTP
-        puerto_servidor_smtp =int(config.PUERTO_SERVIDOR_SMTP)
 
         email = EmailMessage()
         email["From"] = remitente
@@ -36,18 +52,14 @@ def correo_modificacion_encuestas(correos):
                                 ,subtype="vnd.openxmlformats-officedocument.spreadsheetml.sheet"
                                 ,filename=nombre_archivo)
 
-        smtp = smtplib.SMTP(servidor_smtp,port=puerto_servidor_smtp)
-        smtp.starttls()
-        smtp.sendmail(remitente
-                    ,correos_destinatarios
-                    ,email.as_string()
-                    )
-        smtp.quit()
+        envio = servicio_correo.fn_enviar_en_segundo_plano(email
+                                                            ,correos_destinatarios)
 
         return {'exito':True
+                ,'data':envio
                 ,'error':None}
 
-    except NameError as ex:
-        {'exito':False
-        ,'error':ex}
-
+    except Exception as ex:
+        return {'exito':False
+                ,'data':None
+                ,'error':ex}
@@ -0,0 +1,304 @@
+"""
+Módulo registro_log.py
+
+Este módulo configura el registro de eventos de la aplicación sobre el paquete estándar logging.
+Los registros se encolan en memoria y un hilo en segundo plano los escribe en el archivo de log, de modo que
+registrar un evento no abre ni escribe el archivo en el hilo que procesa el archivo CMDM.
+
+Clases:
+-------
+FormateadorJson
+    - Da formato JSON (una línea por registro) con los campos timestamp, nivel, id_ejecucion, etapa, duracion y mensaje.
+ManejadorCola
+    - Encola los registros sin formatearlos, para que el formato no se haga en el hilo que registra.
+ManejadorRotativo
+    - Escribe el archivo de log y lo rota por tamaño (TAMANO_MAXIMO_LOG) o al cambiar de periodo (HORAS_ROTACION_LOG).
+ManejadorEjecucion
+    - Conserva en memoria los registros de la ejecución actual, acotados a TAMANO_MAXIMO_ADJUNTO_LOG bytes.
+
+Funciones:
+----------
+- fn_registrar(mensaje, nivel, etapa, duracion): Encola un registro.
+- fn_iniciar_ejecucion(): Asigna un nuevo id de ejecución y limpia los registros en memoria.
+- fn_id_ejecucion(): Retorna el id de la ejecución actual.
+- fn_registros_ejecucion(): Retorna los registros de la ejecución actual en formato JSON lines.
+- fn_detener_registro(): Escribe los registros pendientes y detiene el hilo de escritura.
+
+Dependencias:
+-------------
+- logging, logging.handlers: QueueHandler, QueueListener y RotatingFileHandler.
+- config: RUTA_LOG, TAMANO_MAXIMO_LOG, HORAS_ROTACION_LOG, RESPALDOS_LOG, TAMANO_MAXIMO_ADJUNTO_LOG.
+
+Notas:
+------
+- El registro se configura en el primer uso; al terminar el proceso (atexit) se escriben los registros pendientes.
+- Los respaldos rotados se nombran RUTA_LOG.1, RUTA_LOG.2, ... y se conservan RESPALDOS_LOG archivos.
+- La rotación por periodo toma como referencia la última modificación del archivo, por lo que también
+  aplica entre ejecuciones programadas del proceso.
+"""
+import atexit
+import datetime
+import json
+import logging
+import queue
+import threading
+import time
+import uuid
+from collections import deque
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+from os import makedirs, path
+
+import config
+
+NOMBRE_REGISTRO = 'cmdm'
+MARCA_OMITIDOS = '{"mensaje": "[... registros anteriores omitidos ...]"}\n'
+
+_bloqueo = threading.Lock()
+_estado = {'registro': None
+           ,'cola': None
+           ,'escritor': None
+           ,'ejecucion': None
+           ,'id_ejecucion': uuid.uuid4().hex[:12]}
+
+
+class FormateadorJson(logging.Formatter):
+    """
+    Formatea cada registro como un objeto JSON en una sola línea.
+    El resultado se guarda en el registro para no volver a formatearlo en cada manejador.
+    """
+    def format(self, record):
+        linea = getattr(record, 'linea_json', None)
+        if linea is not None:
+            return linea
+        registro = {'timestamp': datetime.datetime.fromtimestamp(record.created).isoformat(timespec='milliseconds')
+                    ,'nivel': record.levelname
+                    ,'id_ejecucion': getattr(record, 'id_ejecucion', None)
+                    ,'etapa': getattr(record, 'etapa', None)
+                    ,'duracion': getattr(record, 'duracion', None)
+                    ,'mensaje': record.getMessage()}
+        record.linea_json = json.dumps(registro, ensure_ascii=False, default=str)
+        return record.linea_json
+
+
+class ManejadorCola(QueueHandler):
+    """
+    Encola los registros sin formatearlos; el formato se aplica en el hilo de escritura.
+    """
+    def prepare(self, record):
+        return record
+
+
+class ManejadorRotativo(RotatingFileHandler):
+    """
+    Archivo de log rotado por tamaño o por periodo de tiempo, lo que ocurra primero.
+    """
+    def __init__(self, ruta_log, tamano_maximo, horas_rotacion, respaldos):
+        """
+        Parameters:
+        -----------
+        ruta_log : str
+        tamano_maximo : int
+            Bytes máximos del archivo antes de rotarlo; 0 sin límite.
+        horas_rotacion : float
+            Duración del periodo en horas; 0 desactiva la rotación por tiempo.
+        respaldos : int
+            Número de archivos rotados que se conservan.
+        """
+        super().__init__(ruta_log
+                         ,maxBytes=tamano_maximo
+                         ,backupCount=respaldos
+                         ,encoding='utf-8'
+                         ,delay=True)
+        self.__segundos_periodo = horas_rotacion * 3600
+        referencia = path.getmtime(ruta_log) if path.exists(ruta_log) else time.time()
+        self.__periodo = self.__calcular_periodo(referencia)
+
+    def __calcular_periodo(self, instante):
+        """Retorna el número de periodo (en hora local) al que pertenece un instante."""
+        if not self.__segundos_periodo:
+            return 0
+        desfase = time.localtime(instante).tm_gmtoff
+        return int((instante + desfase) // self.__segundos_periodo)
+
+    def shouldRollover(self, record):
+        periodo = self.__calcular_periodo(record.created)
+        if periodo != self.__periodo:
+            self.__periodo = periodo
+            if path.isfile(self.baseFilename) and path.getsize(self.baseFilename) > 0:
+                return True
+
+        #Se rota cuando el archivo alcanza el tamaño máximo, sin formatear de nuevo el registro
+        if self.maxBytes > 0 and path.isfile(self.baseFilename):
+            if self.stream is None:
+                self.stream = self._open()
+            return self.stream.tell() >= self.maxBytes
+        return False
+
+
+class ManejadorEjecucion(logging.Handler):
+    """
+    Conserva en memoria los registros de la ejecución actual para adjuntarlos al correo de errores.
+    """
+    def __init__(self, tamano_maximo):
+        super().__init__()
+        self.__tamano_maximo = tamano_maximo
+        self.__lineas = deque()
+        self.__tamano = 0
+        self.__omitidos = False
+
+    def emit(self, record):
+        linea = (self.format(record) + '\n').encode('utf-8')
+        self.__lineas.append(linea)
+        self.__tamano += len(linea)
+        while self.__tamano > self.__tamano_maximo and len(self.__lineas) > 1:
+            self.__tamano -= len(self.__lineas.popleft())
+            self.__omitidos = True
+
+    def fn_limpiar(self):
+        """Descarta los registros conservados."""
+        self.acquire()
+        try:
+            self.__lineas.clear()
+            self.__tamano = 0
+            self.__omitidos = False
+        finally:
+            self.release()
+
+    def fn_contenido(self):
+        """Retorna los registros conservados como bytes."""
+        self.acquire()
+        try:
+            contenido = b''.join(self.__lineas)
+            if self.__omitidos:
+                contenido = MARCA_OMITIDOS.encode('utf-8') + contenido
+            return contenido
+        finally:
+            self.release()
+
+
+def fn_obtener_registro():
+    """
+    Retorna el logger de la aplicación, configurándolo en el primer uso.
+
+    Returns:
+    --------
+    logging.Logger
+    """
+    if _estado['registro'] is not None:
+        return _estado['registro']
+
+    with _bloqueo:
+        if _estado['registro'] is None:
+            ruta_log = config.RUTA_LOG
+            carpeta = path.dirname(ruta_log)
+            if carpeta:
+                makedirs(carpeta, exist_ok=True)
+
+            formateador = FormateadorJson()
+            archivo = ManejadorRotativo(ruta_log
+                                        ,config.TAMANO_MAXIMO_LOG
+                                        ,config.HORAS_ROTACION_LOG
+                                        ,config.RESPALDOS_LOG)
+            archivo.setFormatter(formateador)
+            ejecucion = ManejadorEjecucion(config.TAMANO_MAXIMO_ADJUNTO_LOG)
+            ejecucion.setFormatter(formateador)
+
+            cola = queue.Queue()
+            escritor = QueueListener(cola, archivo, ejecucion)
+            escritor.start()
+
+            registro = logging.getLogger(NOMBRE_REGISTRO)
+            registro.setLevel(logging.INFO)
+            registro.propagate = False
+            registro.addHandler(ManejadorCola(cola))
+
+            _estado.update({'cola': cola
+                            ,'escritor': escritor
+                            ,'ejecucion': ejecucion
+                            ,'registro': registro})
+            atexit.register(fn_detener_registro)
+
+    return _estado['registro']
+
+
+def fn_registrar(mensaje, nivel = logging.INFO, etapa = None, duracion = None):
+    """
+    Encola un registro; el hilo de escritura lo lleva al archivo de log.
+
+    Parameters:
+    -----------
+    mensaje : str
+    nivel : int
+        Nivel de logging (logging.INFO, logging.ERROR, ...).
+    etapa : str
+        Etapa del proceso que genera el registro, si aplica.
+    duracion : float
+        Duración en segundos de la etapa, si aplica.
+    """
+    registro = fn_obtener_registro()
+    if registro.isEnabledFor(nivel):
+        #Se arma el registro directamente para evitar la búsqueda del archivo y línea de origen de logging
+        registro.handle(registro.makeRecord(NOMBRE_REGISTRO, nivel, None, 0, mensaje, None, None
+                                            ,extra={'id_ejecucion': _estado['id_ejecucion']
+                                                    ,'etapa': etapa
+                                                    ,'duracion': duracion}))
+
+
+def fn_iniciar_ejecucion():
+    """
+    Asigna un nuevo id de ejecución y descarta los registros en memoria de la ejecución anterior.
+    Se usa cuando el proceso atiende varias ejecuciones sin reiniciarse.
+
+    Returns:
+    --------
+    str: Nuevo id de ejecución.
+    """
+    fn_obtener_registro()
+    _estado['cola'].join()
+    _estado['ejecucion'].fn_limpiar()
+    _estado['id_ejecucion'] = uuid.uuid4().hex[:12]
+    return _estado['id_ejecucion']
+
+
+def fn_id_ejecucion():
+    """
+    Retorna el id de la ejecución actual.
+
+    Returns:
+    --------
+    str
+    """
+    return _estado['id_ejecucion']
+
+
+def fn_registros_ejecucion():
+    """
+    Retorna los registros de la ejecución actual, esperando a que se procesen los pendientes.
+
+    Returns:
+    --------
+    bytes: Registros en formato JSON lines, como máximo TAMANO_MAXIMO_ADJUNTO_LOG bytes (los más recientes).
+    """
+    fn_obtener_registro()
+    _estado['cola'].join()
+    return _estado['ejecucion'].fn_contenido()
+
+
+def fn_detener_registro():
+    """
+    Escribe los registros pendientes, detiene el hilo de escritura y cierra el archivo de log.
+    """
+    with _bloqueo:
+        escritor = _estado['escritor']
+        if escritor is None:
+            return
+        registro = _estado['registro']
+        for manejador in list(registro.handlers):
+            registro.removeHandler(manejador)
+        escritor.stop()
+        for manejador in escritor.handlers:
+            manejador.close()
+        _estado.update({'registro': None
+                        ,'cola': None
+                        ,'escritor': None
+                        ,'ejecucion': None})
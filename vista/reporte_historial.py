@@ -0,0 +1,75 @@
+"""
+Módulo reporte_historial.py
+
+Este módulo arma el reporte de texto del historial de ejecuciones (python main.py --historial): últimas ejecuciones,
+tendencia de cada métrica de tiempo y ejecuciones con métricas más lentas que su línea base.
+
+Funciones:
+----------
+- fn_reporte_historial(limite): Retorna el reporte como texto.
+
+Dependencias:
+-------------
+- HistorialEjecuciones: Lectura del historial y cálculo de tendencias y regresiones.
+- config: RUTA_HISTORIAL_EJECUCIONES, VENTANA_HISTORIAL, DESVIACIONES_REGRESION.
+"""
+import config
+from modelo.historial_ejecuciones import HistorialEjecuciones
+
+
+def fn_reporte_historial(limite = 20):
+    """
+    Retorna el reporte del historial de ejecuciones.
+
+    Parameters:
+    -----------
+    limite : int
+        Ejecuciones a listar.
+
+    Returns:
+    --------
+    str: Reporte de texto.
+    """
+    if not config.RUTA_HISTORIAL_EJECUCIONES:
+        return 'RUTA_HISTORIAL_EJECUCIONES no está configurada.'
+
+    historial = HistorialEjecuciones(config.RUTA_HISTORIAL_EJECUCIONES)
+    ejecuciones = historial.fn_ejecuciones(limite)
+    if ejecuciones.empty:
+        return 'El historial de ejecuciones está vacío.'
+
+    lineas = [f"{'Inicio':<21}{'Éxito':>6}{'Total s':>10}{'Filas':>10}{'DDA':>9}{'No DDA':>9}{'Delta':>9}"
+              f"{'Reenvío':>9}{'Públicos':>9}{'HO':>7}{'Mem MB':>8}"]
+
+    def entero(fila, columna):
+        valor = fila.get(columna)
+        return '-' if valor is None or valor != valor else f'{int(valor)}'
+
+    for fila in ejecuciones.to_dict('records'):
+        memoria = f"{fila['memoria_pico'] / 1048576:.0f}" if fila['memoria_pico'] else '-'
+        lineas.append(f"{fila['inicio']:<21}{'sí' if fila['exito'] else 'no':>6}{fila['segundos_total'] or 0:>10.1f}"
+                      f"{entero(fila, 'filas_archivo'):>10}{entero(fila, 'filas_dda'):>9}"
+                      f"{entero(fila, 'filas_no_dda'):>9}{entero(fila, 'filas_delta'):>9}"
+                      f"{entero(fila, 'filas_reenvio'):>9}{entero(fila, 'filas_publicos'):>9}"
+                      f"{entero(fila, 'filas_ho_modificado'):>7}{memoria:>8}")
+
+    tendencias = historial.fn_tendencias(config.VENTANA_HISTORIAL)
+    if not tendencias.empty:
+        lineas.append('')
+        lineas.append(f'Tendencia en las últimas {config.VENTANA_HISTORIAL} ejecuciones exitosas')
+        lineas.append(f"{'Métrica':<40}{'Última s':>10}{'Media s':>10}{'s/ejecución':>13}")
+        for fila in tendencias.itertuples():
+            lineas.append(f'{fila.metrica:<40}{fila.ultima:>10.3f}{fila.media:>10.3f}{fila.pendiente:>+13.4f}')
+
+    regresiones = historial.fn_regresiones(config.VENTANA_HISTORIAL, config.DESVIACIONES_REGRESION)
+    regresiones = regresiones[regresiones['id_ejecucion'].isin(ejecuciones['id_ejecucion'])]
+    lineas.append('')
+    if regresiones.empty:
+        lineas.append(f'Sin métricas a más de {config.DESVIACIONES_REGRESION:g} desviaciones de su línea base.')
+    else:
+        lineas.append(f'Métricas a más de {config.DESVIACIONES_REGRESION:g} desviaciones de su línea base')
+        for fila in regresiones.itertuples():
+            lineas.append(f'{fila.inicio:<21}{fila.metrica:<40}{fila.segundos:>10.3f} s  '
+                          f'base {fila.media:.3f} ± {fila.desviacion:.3f}  z = {fila.puntaje_z}')
+
+    return '\n'.join(lineas)
@@ -0,0 +1,172 @@
+"""
+Módulo servicio_correo.py
+
+Este módulo define la clase ServicioCorreo, que mantiene una única conexión SMTP autenticada por ejecución
+y envía los correos en un hilo en segundo plano.
+
+Clases:
+-------
+ServicioCorreo
+    - Abre la conexión SMTP (STARTTLS y login opcionales) en el primer envío y la reutiliza en los siguientes.
+    - Encola los envíos en un único hilo de trabajo para que el flujo principal no espere la carga de adjuntos.
+    - Reconecta una vez si el servidor cerró la sesión entre envíos.
+
+Métodos:
+--------
+- fn_enviar(email, destinatarios): Envía el correo de forma síncrona usando la conexión compartida.
+- fn_enviar_en_segundo_plano(email, destinatarios): Encola el envío y retorna un Future con el resultado.
+- fn_cerrar(esperar): Cierra la conexión cuando terminan los envíos pendientes.
+- fn_verificar(tiempo_espera): Abre y cierra una conexión aparte (EHLO, STARTTLS y login) para la verificación previa.
+
+Dependencias:
+-------------
+- smtplib: Envío de correos.
+- concurrent.futures: Hilo de trabajo para los envíos.
+- config: SERVIDOR_SMTP, PUERTO_SERVIDOR_SMTP, USUARIO_SMTP, CONTRASENA_SMTP, USAR_STARTTLS_SMTP, TIEMPO_ESPERA_SMTP.
+
+Notas:
+------
+- Un solo hilo de trabajo garantiza que la conexión SMTP nunca se use desde dos hilos a la vez.
+- El hilo de trabajo no es daemon: el proceso espera a que terminen los envíos pendientes antes de salir.
+- Los resultados siguen el formato {'exito': bool, 'error': ex} del resto de la capa de vista.
+"""
+import smtplib
+from concurrent.futures import ThreadPoolExecutor
+
+import config
+
+
+class ServicioCorreo:
+    """
+    Conexión SMTP reutilizable con envío en segundo plano.
+    """
+    def __init__(self):
+        self.__servidor_smtp = config.SERVIDOR_SMTP
+        self.__puerto_servidor_smtp = config.PUERTO_SERVIDOR_SMTP
+        self.__usuario = config.USUARIO_SMTP
+        self.__contrasena = config.CONTRASENA_SMTP
+        self.__usar_starttls = config.USAR_STARTTLS_SMTP
+        self.__tiempo_espera = config.TIEMPO_ESPERA_SMTP
+        self.__remitente = config.CORREO_REMITENTE
+        self.__smtp = None
+        self.__ejecutor = ThreadPoolExecutor(max_workers=1
+                                             ,thread_name_prefix='envio_correo')
+
+    def __conectar(self):
+        """Abre la conexión SMTP y la deja lista para enviar."""
+        smtp = smtplib.SMTP(self.__servidor_smtp
+                            ,port=self.__puerto_servidor_smtp
+                            ,timeout=self.__tiempo_espera)
+        if self.__usar_starttls:
+            smtp.starttls()
+        if self.__usuario:
+            smtp.login(self.__usuario, self.__contrasena)
+        self.__smtp = smtp
+
+    def __desconectar(self):
+        """Cierra la conexión SMTP si está abierta."""
+        if self.__smtp is not None:
+            try:
+                self.__smtp.quit()
+            except smtplib.SMTPException:
+                self.__smtp.close()
+            self.__smtp = None
+
+    def fn_enviar(self, email, destinatarios):
+        """
+        Envía un correo usando la conexión compartida.
+
+        Parameters:
+        -----------
+        email : email.message.EmailMessage
+        destinatarios : list
+
+        Returns:
+        --------
+        dict: {'exito': True, 'error': None} o {'exito': False, 'error': ex}
+        """
+        try:
+            mensaje = email.as_string()
+            try:
+                if self.__smtp is None:
+                    self.__conectar()
+                self.__smtp.sendmail(self.__remitente, destinatarios, mensaje)
+            except smtplib.SMTPServerDisconnected:
+                #El servidor cerró la sesión inactiva; reconectamos una vez
+                self.__smtp = None
+                self.__conectar()
+                self.__smtp.sendmail(self.__remitente, destinatarios, mensaje)
+
+            return {'exito':True
+                    ,'error':None}
+
+        except Exception as ex:
+            self.__desconectar()
+            return {'exito':False
+                    ,'error':ex}
+
+    def fn_verificar(self, tiempo_espera = None):
+        """
+        Verifica el servidor SMTP con una conexión aparte de la de envío: EHLO, STARTTLS (si USAR_STARTTLS_SMTP)
+        y login (si hay usuario).
+
+        Parameters:
+        -----------
+        tiempo_espera : float, opcional
+            Segundos máximos por operación; por defecto TIEMPO_ESPERA_SMTP.
+
+        Returns:
+        --------
+        dict: {'exito': True, 'error': None} o {'exito': False, 'error': ex}
+        """
+        smtp = None
+        try:
+            smtp = smtplib.SMTP(self.__servidor_smtp
+                                ,port=self.__puerto_servidor_smtp
+                                ,timeout=tiempo_espera or self.__tiempo_espera)
+            smtp.ehlo()
+            if self.__usar_starttls:
+                smtp.starttls()
+                smtp.ehlo()
+            if self.__usuario:
+                smtp.login(self.__usuario, self.__contrasena)
+            return {'exito':True
+                    ,'error':None}
+        except Exception as ex:
+            return {'exito':False
+                    ,'error':ex}
+        finally:
+            if smtp is not None:
+                try:
+                    smtp.quit()
+                except (smtplib.SMTPException, OSError):
+                    smtp.close()
+
+    def fn_enviar_en_segundo_plano(self, email, destinatarios):
+        """
+        Encola el envío del correo en el hilo de trabajo.
+
+        Parameters:
+        -----------
+        email : email.message.EmailMessage
+            Mensaje con los adjuntos ya cargados en memoria.
+        destinatarios : list
+
+        Returns:
+        --------
+        concurrent.futures.Future: Resultado de fn_enviar cuando termine el envío.
+        """
+        return self.__ejecutor.submit(self.fn_enviar, email, destinatarios)
+
+    def fn_cerrar(self, esperar=False):
+        """
+        Cierra la conexión SMTP cuando terminen los envíos pendientes.
+
+        Parameters:
+        -----------
+        esperar : bool
+            Si es True bloquea hasta que se complete el cierre; si es False retorna de inmediato
+            y el hilo de trabajo termina los envíos antes de que finalice el proceso.
+        """
+        self.__ejecutor.submit(self.__desconectar)
+        self.__ejecutor.shutdown(wait=esperar)